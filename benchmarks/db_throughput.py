@@ -0,0 +1,154 @@
+"""End-to-end DB throughput of order commands and the alert scan's queries.
+
+Runs against whatever backend the settings select — point it at a scratch
+database, it migrates to head and inserts its own baskets/users:
+
+    SQLITE_PATH=/tmp/bench.db python -m benchmarks.db_throughput
+    python -m benchmarks.db_throughput --baskets 20 --orders 2000 --concurrency 16
+
+Commands go through the real /compra and /vende handlers (identity cache,
+per-basket queue, row lock, audit buffer); quotes come from a fixed-price
+provider so only the bot and the database are measured. The scan phase
+repeats what `AlertEngine.scan_all_baskets` reads per round: the active
+baskets, then each basket's open positions joined to their assets.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select
+
+from src.bot.handlers import orders
+from src.config import settings
+from src.data.models import Price
+from src.db.base import async_session_factory, engine
+from src.db.models import Asset, Basket, BasketMember, Position, User
+
+TICKER = "BENCH.MC"
+
+
+class _FixedPrices:
+    def get_current_price(self, ticker: str) -> Price:
+        return Price(ticker, Decimal("10.00"), "EUR")
+
+    def get_ticker_info(self, ticker: str) -> dict:
+        return {"name": ticker, "market": "BME"}
+
+
+async def _noop(*args, **kwargs) -> None:
+    pass
+
+
+def _update(tg_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        effective_user=SimpleNamespace(id=tg_id, username=f"bench{tg_id}"),
+        message=SimpleNamespace(reply_text=_noop),
+    )
+
+
+async def _seed(n_baskets: int, tag: str) -> list[tuple[int, str]]:
+    """Create one basket + owner per slot. Returns (owner tg_id, basket name)."""
+    now = datetime.now()
+    names = [f"bench {tag} {i}" for i in range(n_baskets)]
+    tg_base = int(uuid.UUID(tag.ljust(32, "0")).int % 10**9) * 100
+    async with async_session_factory() as session:
+        if not (await session.execute(select(Asset).where(Asset.ticker == TICKER))).scalar_one_or_none():
+            session.add(Asset(ticker=TICKER, name="Bench", market="BME", currency="EUR"))
+        for i, name in enumerate(names):
+            basket = Basket(
+                name=name, name_normalized=name, strategy="rsi", active=True,
+                cash=Decimal("1000000000"), created_at=now,
+            )
+            user = User(tg_id=tg_base + i, username=f"bench{tg_base + i}", created_at=now)
+            session.add_all([basket, user])
+            await session.flush()
+            session.add(BasketMember(basket_id=basket.id, user_id=user.id, role="OWNER"))
+        await session.commit()
+    return [(tg_base + i, name) for i, name in enumerate(names)]
+
+
+async def bench_orders(slots: list[tuple[int, str]], n_orders: int, concurrency: int) -> list[float]:
+    """Latency (s) of each /compra · /vende, `concurrency` in flight, round-robin over baskets."""
+    latencies: list[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for k in range(n_orders):
+        queue.put_nowait(k)
+
+    async def worker() -> None:
+        while not queue.empty():
+            k = queue.get_nowait()
+            tg_id, name = slots[k % len(slots)]
+            handler = orders.cmd_compra if (k // len(slots)) % 2 == 0 else orders.cmd_vende
+            ctx = SimpleNamespace(args=[TICKER, "1", f"@{name}"])
+            t0 = time.perf_counter()
+            await handler(_update(tg_id), ctx)
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def bench_scan(rounds: int) -> list[float]:
+    """Duration (s) of each scan round's DB reads."""
+    durations = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        async with async_session_factory() as session:
+            baskets = (await session.execute(select(Basket).where(Basket.active == True))).scalars().all()
+        for basket in baskets:
+            async with async_session_factory() as session:
+                (await session.execute(
+                    select(Position, Asset)
+                    .join(Asset, Position.asset_id == Asset.id)
+                    .where(Position.basket_id == basket.id, Position.quantity > 0)
+                )).all()
+        durations.append(time.perf_counter() - t0)
+    return durations
+
+
+def _pct(values: list[float], q: float) -> float:
+    return sorted(values)[min(int(q * len(values)), len(values) - 1)]
+
+
+async def main_async(args) -> None:
+    orders._provider = _FixedPrices()
+    orders.log_command = _noop          # audit rows would only pile up in memory here
+    slots = await _seed(args.baskets, uuid.uuid4().hex[:8])
+
+    t0 = time.perf_counter()
+    lat = await bench_orders(slots, args.orders, args.concurrency)
+    wall = time.perf_counter() - t0
+    print(f"orders   {len(lat)} in {wall:.2f}s → {len(lat) / wall:,.0f} ops/s  "
+          f"p50 {statistics.median(lat) * 1000:.1f} ms  p95 {_pct(lat, 0.95) * 1000:.1f} ms  "
+          f"(baskets={args.baskets}, concurrency={args.concurrency})")
+
+    scan = await bench_scan(args.scan_rounds)
+    print(f"scan     {args.scan_rounds} rounds  p50 {statistics.median(scan) * 1000:.1f} ms  "
+          f"p95 {_pct(scan, 0.95) * 1000:.1f} ms")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baskets", type=int, default=10)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scan-rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    cfg = Config()
+    cfg.set_main_option("script_location", "src/db/migrations")
+    command.upgrade(cfg, "head")
+    print(f"backend  {settings.database_url.split('://')[0]}")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
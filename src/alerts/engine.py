@@ -1,40 +1,31 @@
+import asyncio
 import logging
 from datetime import datetime
 
 from sqlalchemy import select
 
-from src.db.base import async_session_factory
+from src.db.base import scheduler_session_factory
 from src.db.models import Alert, Basket, Asset, Position
 from src.data.yahoo import YahooDataProvider
 from src.metrics import alert_scans_total, alerts_generated_total, market_open, scan_duration_seconds
 from src.scheduler.market_hours import any_market_open, is_market_open
 from decimal import Decimal
 
-from src.strategies.base import Signal, Strategy
-from src.strategies.stop_loss import StopLossStrategy
-from src.strategies.ma_crossover import MACrossoverStrategy
-from src.strategies.rsi import RSIStrategy
-from src.strategies.bollinger import BollingerStrategy
-from src.strategies.safe_haven import SafeHavenStrategy
+from src.strategies.base import Signal
+from src.strategies.registry import STRATEGY_MAP
 from src.alerts.market_context import MarketContext, compute_market_context
+from src.alerts.price_alerts import format_fired, price_alert_index, trigger_price_alerts
 from anthropic import AsyncAnthropic
 
 logger = logging.getLogger(__name__)
 
-STRATEGY_MAP: dict[str, type[Strategy]] = {
-    "stop_loss": StopLossStrategy,
-    "ma_crossover": MACrossoverStrategy,
-    "rsi": RSIStrategy,
-    "bollinger": BollingerStrategy,
-    "safe_haven": SafeHavenStrategy,
-}
-
 
 class AlertEngine:
     def __init__(self, telegram_app=None):
         self.data = YahooDataProvider()
         self.app = telegram_app
         self._anthropic_client = AsyncAnthropic()
+        self._quotes: dict[str, Decimal] = {}   # this scan's quotes, reused by /avisame
 
     async def scan_all_baskets(self) -> None:
         """Called by scheduler every N minutes."""
@@ -49,8 +40,9 @@ class AlertEngine:
             return
 
         logger.info("Alert scan started")
+        self._quotes = {}
         with scan_duration_seconds.time():
-            async with async_session_factory() as session:
+            async with scheduler_session_factory() as session:
                 result = await session.execute(select(Basket).where(Basket.active == True))
                 baskets = result.scalars().all()
 
@@ -60,6 +52,11 @@ class AlertEngine:
                 except Exception as e:
                     logger.error(f"Error scanning basket '{basket.name}': {e}")
 
+            try:
+                await self._check_price_alerts()
+            except Exception as e:
+                logger.error(f"Price alert check error: {e}")
+
         alert_scans_total.labels(result="completed").inc()
 
     async def _scan_basket(self, basket: Basket) -> None:
@@ -68,7 +65,7 @@ class AlertEngine:
             return
         strategy = strategy_cls()
 
-        async with async_session_factory() as session:
+        async with scheduler_session_factory() as session:
             result = await session.execute(
                 select(Position, Asset)
                 .join(Asset, Position.asset_id == Asset.id)
@@ -84,6 +81,7 @@ class AlertEngine:
                         logger.debug(f"Skipping {asset.ticker} — {asset.market} closed")
                         continue
                     price_obj = self.data.get_current_price(asset.ticker)
+                    self._quotes[asset.ticker] = price_obj.price
                     historical = self.data.get_historical(asset.ticker, period="3mo", interval="1d")
                     signal = strategy.evaluate(asset.ticker, historical.data, price_obj.price, pos.avg_price)
 
@@ -150,6 +148,38 @@ class AlertEngine:
             if new_alerts or expired_alerts:
                 await session.commit()
 
+    async def _check_price_alerts(self) -> None:
+        """Fire /avisame thresholds crossed by this scan's quotes.
+
+        Tickers already quoted for a held position are reused; the rest are
+        priced with one batched call (alerts without a stored currency fall
+        back to a single quote each inside the provider).
+        """
+        if not len(price_alert_index):
+            return
+        missing = [t for t in price_alert_index.tickers() if t not in self._quotes]
+        if missing:
+            currencies = price_alert_index.currencies()
+            loop = asyncio.get_running_loop()
+            prices = await loop.run_in_executor(
+                None, self.data.get_current_prices,
+                missing, {t: currencies[t] for t in missing if t in currencies},
+            )
+            self._quotes.update({t: p.price for t, p in prices.items()})
+
+        fired = await trigger_price_alerts(self._quotes, price_alert_index)
+        if fired:
+            logger.info("Price alerts fired: %d", len(fired))
+        if not self.app:
+            return
+        for entry, price in fired:
+            try:
+                await self.app.bot.send_message(
+                    chat_id=entry.tg_id, text=format_fired(entry, price), parse_mode="Markdown",
+                )
+            except Exception as e:
+                logger.error(f"Cannot notify tg_id={entry.tg_id}: {e}")
+
     async def _notify(
         self,
         alert: Alert,
@@ -164,7 +194,7 @@ class AlertEngine:
             logger.warning("No telegram app set — cannot send notifications")
             return
 
-        async with async_session_factory() as session:
+        async with scheduler_session_factory() as session:
             result = await session.execute(
                 select(BasketMember, User)
                 .join(User, BasketMember.user_id == User.id)
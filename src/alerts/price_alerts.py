@@ -0,0 +1,146 @@
+"""/avisame price alerts — per-ticker threshold index checked on every scan.
+
+Active `price_alerts` rows are mirrored in memory as two sorted ladders per
+ticker: *upper* thresholds (fire when the quote rises to or above them) and
+*lower* thresholds (fire at or below). A quote bisects each ladder and pops
+the crossed end, so checking thousands of alerts costs O(log n + fired)
+per ticker instead of a table scan. Fired alerts are marked TRIGGERED with
+one bulk UPDATE.
+
+`AlertEngine.scan_all_baskets` feeds the quotes it already fetched for
+held positions and batch-quotes only the remaining alert tickers, passing
+the currency stored with each alert so the batch needs no per-ticker call.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select, update
+
+from src.db.base import scheduler_session_factory
+from src.db.models import PriceAlert, User
+from src.orders.trigger_book import PriceLadder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PriceAlertEntry:
+    alert_id: int
+    tg_id: int
+    ticker: str
+    direction: str       # ABOVE | BELOW
+    threshold: Decimal
+    currency: str | None = None
+
+
+class PriceAlertIndex:
+    def __init__(self) -> None:
+        self._upper: dict[str, PriceLadder] = {}
+        self._lower: dict[str, PriceLadder] = {}
+        self._entries: dict[int, PriceAlertEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, alert_id: int) -> bool:
+        return alert_id in self._entries
+
+    def clear(self) -> None:
+        self._upper.clear()
+        self._lower.clear()
+        self._entries.clear()
+
+    def _ladder(self, entry: PriceAlertEntry) -> PriceLadder:
+        side = self._upper if entry.direction == "ABOVE" else self._lower
+        return side.setdefault(entry.ticker, PriceLadder())
+
+    def add(self, entry: PriceAlertEntry) -> None:
+        if entry.alert_id in self._entries:
+            self.remove(entry.alert_id)
+        self._entries[entry.alert_id] = entry
+        self._ladder(entry).add(entry.threshold, entry.alert_id)
+
+    def remove(self, alert_id: int) -> PriceAlertEntry | None:
+        entry = self._entries.pop(alert_id, None)
+        if entry:
+            self._ladder(entry).remove(entry.threshold, alert_id)
+        return entry
+
+    def tickers(self) -> set[str]:
+        return {e.ticker for e in self._entries.values()}
+
+    def currencies(self) -> dict[str, str]:
+        """ticker → currency, for the alerts that know it."""
+        return {e.ticker: e.currency for e in self._entries.values() if e.currency}
+
+    def crossed(self, quotes: dict[str, Decimal]) -> list[tuple[PriceAlertEntry, Decimal]]:
+        """Remove and return every alert fired by `quotes`, with its quote."""
+        fired = []
+        for ticker, price in quotes.items():
+            ids = []
+            if ticker in self._upper:
+                ids += self._upper[ticker].pop_at_or_below(price)
+            if ticker in self._lower:
+                ids += self._lower[ticker].pop_at_or_above(price)
+            fired += [(self._entries.pop(i), price) for i in sorted(ids)]
+        return fired
+
+
+price_alert_index = PriceAlertIndex()
+
+
+def entry_for(alert: PriceAlert, tg_id: int) -> PriceAlertEntry:
+    return PriceAlertEntry(
+        alert.id, tg_id, alert.ticker, alert.direction, alert.threshold, alert.currency,
+    )
+
+
+async def load_price_alerts(index: PriceAlertIndex = price_alert_index) -> int:
+    """Rebuild `index` from every ACTIVE row (indexed on status)."""
+    async with scheduler_session_factory() as session:
+        rows = (await session.execute(
+            select(PriceAlert, User.tg_id)
+            .join(User, User.id == PriceAlert.user_id)
+            .where(PriceAlert.status == "ACTIVE")
+        )).all()
+    index.clear()
+    for alert, tg_id in rows:
+        index.add(entry_for(alert, tg_id))
+    logger.info("Price alerts loaded: %d active", len(index))
+    return len(index)
+
+
+async def trigger_price_alerts(
+    quotes: dict[str, Decimal], index: PriceAlertIndex = price_alert_index,
+) -> list[tuple[PriceAlertEntry, Decimal]]:
+    """Pop the alerts `quotes` cross and mark them TRIGGERED in one statement.
+
+    If the UPDATE fails the popped alerts go back into `index` (their rows are
+    still ACTIVE), so the next scan fires them again.
+    """
+    fired = index.crossed(quotes)
+    if not fired:
+        return []
+    now = datetime.utcnow()
+    try:
+        async with scheduler_session_factory() as session:
+            await session.execute(update(PriceAlert), [
+                {"id": e.alert_id, "status": "TRIGGERED", "triggered_at": now, "triggered_price": price}
+                for e, price in fired
+            ])
+            await session.commit()
+    except Exception:
+        for entry, _ in fired:
+            index.add(entry)
+        raise
+    return fired
+
+
+def format_fired(entry: PriceAlertEntry, price: Decimal) -> str:
+    verb = "ha superado" if entry.direction == "ABOVE" else "ha caído por debajo de"
+    return (
+        f"🔔 *{entry.ticker}* {verb} {entry.threshold:.2f} — cotiza a {price:.2f}\n"
+        f"_Aviso #{entry.alert_id} cumplido y eliminado._"
+    )
@@ -1,15 +1,19 @@
 import logging
 import math
 from dataclasses import dataclass
-from decimal import Decimal
 
 import pandas as pd
 
+from src.backtest.incremental import BUY, SELL, signal_cache, strategy_key
+from src.backtest.portfolio_sim import simulate_shared_cash
+from src.data.models import OHLCV
 from src.data.yahoo import YahooDataProvider
 from src.strategies.base import Strategy
 
 logger = logging.getLogger(__name__)
 
+VALID_PERIODS = {"1mo", "3mo", "6mo", "1y", "2y"}
+
 
 @dataclass
 class BacktestResult:
@@ -38,6 +42,10 @@ class PortfolioBacktestResult:
     benchmark_return_pct: float   # equal-weight B&H average
     # Per-asset breakdown
     per_asset: dict[str, BacktestResult]
+    # Shared-cash mode only (see portfolio_sim): allocation rule and equity curve
+    allocation: str | None = None
+    rebalance: str | None = None
+    equity_curve: pd.Series | None = None
 
 
 def _make_entries_for_exit_only(
@@ -62,6 +70,20 @@ class BacktestEngine:
     def __init__(self):
         self.data = YahooDataProvider()
 
+    def fetch_data(self, tickers: list[str], period: str = "1y") -> dict[str, OHLCV]:
+        """Download daily OHLCV once for a set of tickers.
+
+        Tickers that fail to download are logged and left out, so one bad
+        symbol does not sink a multi-basket comparison.
+        """
+        ohlcv_dict: dict[str, OHLCV] = {}
+        for t in dict.fromkeys(tickers):
+            try:
+                ohlcv_dict[t] = self.data.get_historical(t, period=period, interval="1d")
+            except Exception as e:
+                logger.warning("Could not fetch %s (%s): %s", t, period, e)
+        return ohlcv_dict
+
     def run(
         self,
         tickers: list[str],
@@ -69,13 +91,33 @@ class BacktestEngine:
         strategy_name: str,
         period: str = "1y",
         stop_loss_pct: float | None = None,
+        ohlcv_dict: dict[str, OHLCV] | None = None,
+        allocation: str | None = None,
+        rebalance: str | None = None,
     ) -> "PortfolioBacktestResult":
+        """Backtest `strategy` over `tickers`.
+
+        `ohlcv_dict` lets callers share one pre-fetched universe (see
+        `fetch_data`) across several runs; tickers missing from it are skipped.
+
+        With `allocation` ("equal" or "cash10") the aggregate CARTERA stats come
+        from a true shared-cash simulation (`portfolio_sim`), optionally
+        rebalanced every `rebalance` period ("W", "M", "Q"). Without it they are
+        averaged from the per-asset runs.
+        """
         import vectorbt as vbt
 
-        # Step 1: Fetch OHLCV per ticker
-        ohlcv_dict = {}
-        for t in tickers:
-            ohlcv_dict[t] = self.data.get_historical(t, period=period, interval="1d")
+        # Step 1: Fetch OHLCV per ticker (or take it from the shared universe)
+        if ohlcv_dict is None:
+            ohlcv_dict = {}
+            for t in tickers:
+                ohlcv_dict[t] = self.data.get_historical(t, period=period, interval="1d")
+        else:
+            tickers = [t for t in tickers if t in ohlcv_dict]
+            if not tickers:
+                raise ValueError(
+                    "No se pudo obtener datos alineados para ningún ticker en el período indicado."
+                )
 
         # Step 2: Align close prices into one DataFrame
         close_df = pd.concat(
@@ -91,34 +133,22 @@ class BacktestEngine:
 
         window = 60  # bars of lookback for each strategy evaluation
 
-        # Step 3: Generate entries/exits per ticker using rolling-window approach
+        # Step 3: Generate entries/exits per ticker using rolling-window approach.
+        # Signals from previous runs are reused for bars whose input window is
+        # unchanged, so a daily re-run only evaluates the new bar(s).
         entries_dict: dict[str, pd.Series] = {}
         exits_dict: dict[str, pd.Series] = {}
+        key_base = (strategy_key(strategy, strategy_name), period, tuple(sorted(active_tickers)))
 
         for t in active_tickers:
-            entries = pd.Series(False, index=close_df.index)
-            exits = pd.Series(False, index=close_df.index)
             ticker_ohlcv = ohlcv_dict[t].data.reindex(close_df.index).ffill()
-
-            for i in range(window, len(close_df)):
-                window_data = ticker_ohlcv.iloc[i - window:i]
-                current_price = Decimal(str(close_df[t].iloc[i]))
-                try:
-                    signal = strategy.evaluate(t, window_data, current_price)
-                except Exception as e:
-                    logger.warning(
-                        "Strategy %s raised on bar %d for %s: %s",
-                        strategy.__class__.__name__, i, t, e,
-                    )
-                    continue
-                if signal:
-                    if signal.action == "BUY":
-                        entries.iloc[i] = True
-                    elif signal.action == "SELL":
-                        exits.iloc[i] = True
-
-            entries_dict[t] = entries
-            exits_dict[t] = exits
+            signals, n_evaluated = signal_cache.evaluate(
+                key_base + (t,), t, ticker_ohlcv, strategy, window,
+            )
+            logger.debug("Backtest %s/%s: %d of %d bars evaluated", strategy_name, t,
+                         n_evaluated, max(len(close_df) - window, 0))
+            entries_dict[t] = pd.Series(signals == BUY, index=close_df.index)
+            exits_dict[t] = pd.Series(signals == SELL, index=close_df.index)
 
         # Step 4: Apply _make_entries_for_exit_only per ticker if no BUY entries
         for t in active_tickers:
@@ -179,7 +209,29 @@ class BacktestEngine:
         ]
         portfolio_bh = sum(bh_returns) / len(bh_returns)
 
-        # Step 8: Aggregate portfolio stats mathematically from per-asset results
+        # Step 8a: Shared-cash simulation — one account, real equity curve
+        if allocation:
+            sim = simulate_shared_cash(
+                close_df, entries_df, exits_df,
+                init_cash=10_000, allocation=allocation, rebalance=rebalance,
+                stop_loss_pct=stop_loss_pct,
+            )
+            return PortfolioBacktestResult(
+                period=period,
+                strategy_name=strategy_name,
+                total_return_pct=sim.total_return_pct,
+                annualized_return_pct=sim.annualized_return_pct,
+                sharpe_ratio=sim.sharpe_ratio,
+                max_drawdown_pct=sim.max_drawdown_pct,
+                n_trades=sim.n_trades,
+                benchmark_return_pct=portfolio_bh,
+                per_asset=per_asset,
+                allocation=allocation,
+                rebalance=rebalance,
+                equity_curve=sim.equity,
+            )
+
+        # Step 8b: Aggregate portfolio stats mathematically from per-asset results
         # (avoids the cash_sharing bug where the first ticker consumes all capital)
         n_assets = len(per_asset)
         total_return_agg = sum(r.total_return_pct for r in per_asset.values()) / n_assets
@@ -0,0 +1,165 @@
+"""Pluggable synthetic log-return generators for Monte Carlo.
+
+I.i.d. resampling of daily log returns destroys volatility clustering: calm
+and turbulent days get shuffled together, which flatters stop-loss
+strategies. The generators here keep it, and they all share one contract:
+
+    gen = make_generator(name, log_returns)      # fit once per ticker
+    rets = gen.sample(n_sims, horizon, rng)      # (n_sims, horizon) log returns
+
+Sampling is vectorized across paths; only GARCH loops over the horizon
+(one numpy step per day for all paths at once).
+
+  - "iid"    plain bootstrap of the returns pool
+  - "block"  stationary block bootstrap (Politis & Romano), geometric block
+             lengths with mean `MEAN_BLOCK` days, wrapping around the pool
+  - "garch"  GARCH(1,1) fitted by maximum likelihood; innovations are drawn
+             from the model's own standardized residuals (filtered
+             historical simulation), so fat tails are kept as well. Needs
+             `GARCH_MIN_OBS` returns with non-zero variance; `make_generator`
+             falls back to "iid" otherwise
+"""
+import logging
+import math
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MEAN_BLOCK = 10          # days — expected block length for "block"
+_PERSISTENCE_CAP = 0.999  # alpha + beta must stay below this (stationarity)
+GARCH_MIN_OBS = 30       # fewer returns than this can't support a GARCH fit
+
+
+class IIDBootstrap:
+    name = "iid"
+
+    def __init__(self, log_returns: np.ndarray):
+        self.pool = np.asarray(log_returns, dtype=float)
+
+    def sample(self, n_simulations: int, horizon: int, rng: np.random.Generator) -> np.ndarray:
+        return self.pool[rng.integers(0, len(self.pool), size=(n_simulations, horizon))]
+
+
+class StationaryBlockBootstrap:
+    name = "block"
+
+    def __init__(self, log_returns: np.ndarray, mean_block: float = MEAN_BLOCK):
+        self.pool = np.asarray(log_returns, dtype=float)
+        self.mean_block = mean_block
+
+    def sample(self, n_simulations: int, horizon: int, rng: np.random.Generator) -> np.ndarray:
+        n = len(self.pool)
+        starts = rng.integers(0, n, size=(n_simulations, horizon))
+        new_block = rng.random((n_simulations, horizon)) < 1 / self.mean_block
+        new_block[:, 0] = True
+        # position (within the path) where the current block started
+        steps = np.arange(horizon)
+        block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+        first = np.take_along_axis(starts, block_start, axis=1)
+        return self.pool[(first + steps - block_start) % n]
+
+
+class GARCHGenerator:
+    name = "garch"
+
+    def __init__(self, log_returns: np.ndarray):
+        r = np.asarray(log_returns, dtype=float)
+        self.mu = float(r.mean())
+        eps = r - self.mu
+        self.omega, self.alpha, self.beta = _fit_garch(eps)
+        sigma2 = _garch_variance(eps, self.omega, self.alpha, self.beta)
+        self.residuals = eps / np.sqrt(sigma2)
+        # conditional variance of the first simulated day
+        self.next_sigma2 = self.omega + self.alpha * eps[-1] ** 2 + self.beta * sigma2[-1]
+
+    def sample(self, n_simulations: int, horizon: int, rng: np.random.Generator) -> np.ndarray:
+        z = self.residuals[rng.integers(0, len(self.residuals), size=(n_simulations, horizon))]
+        out = np.empty((n_simulations, horizon))
+        sigma2 = np.full(n_simulations, self.next_sigma2)
+        for t in range(horizon):
+            eps = np.sqrt(sigma2) * z[:, t]
+            out[:, t] = self.mu + eps
+            sigma2 = self.omega + self.alpha * eps ** 2 + self.beta * sigma2
+        return out
+
+
+def _garch_variance(eps: np.ndarray, omega: float, alpha: float, beta: float) -> np.ndarray:
+    """Conditional variance path σ²_t = ω + α ε²_{t-1} + β σ²_{t-1}, σ²_0 = sample var."""
+    from scipy.signal import lfilter
+
+    drive = omega + alpha * np.concatenate(([0.0], eps[:-1] ** 2))
+    s0 = float(eps.var())
+    drive[0] = s0
+    # y_t = drive_t + β y_{t-1}, seeded so that y_0 = sample variance
+    return lfilter([1.0], [1.0, -beta], drive)
+
+
+def _fit_garch(eps: np.ndarray) -> tuple[float, float, float]:
+    """Gaussian quasi-MLE of (ω, α, β); falls back to a typical equity fit."""
+    from scipy.optimize import minimize
+
+    var = float(eps.var())
+    if not _garch_fittable(eps):
+        # σ² would be 0 → residuals and paths full of NaN
+        raise ValueError(
+            f"GARCH necesita al menos {GARCH_MIN_OBS} rentabilidades con varianza no nula"
+        )
+
+    def nll(params: np.ndarray) -> float:
+        omega, alpha, beta = params
+        if alpha + beta >= _PERSISTENCE_CAP:
+            return 1e10
+        sigma2 = _garch_variance(eps, omega, alpha, beta)
+        if not np.all(sigma2 > 0):
+            return 1e10
+        return float(0.5 * np.sum(np.log(sigma2) + eps ** 2 / sigma2))
+
+    x0 = np.array([var * 0.05, 0.08, 0.87])
+    res = minimize(
+        nll, x0, method="L-BFGS-B",
+        bounds=[(var * 1e-4, var * 10), (0.0, 0.5), (0.0, _PERSISTENCE_CAP)],
+    )
+    omega, alpha, beta = (float(v) for v in res.x)
+    if not res.success or not math.isfinite(res.fun) or alpha + beta >= _PERSISTENCE_CAP:
+        logger.warning("GARCH fit did not converge (%s) — using default persistence", res.message)
+        alpha, beta = 0.08, 0.87
+        omega = var * (1 - alpha - beta)
+    return omega, alpha, beta
+
+
+def _garch_fittable(log_returns: np.ndarray) -> bool:
+    r = np.asarray(log_returns, dtype=float)
+    return len(r) >= GARCH_MIN_OBS and float(r.var()) > 0
+
+
+GENERATORS = {
+    IIDBootstrap.name: IIDBootstrap,
+    StationaryBlockBootstrap.name: StationaryBlockBootstrap,
+    GARCHGenerator.name: GARCHGenerator,
+}
+
+
+def resolve_generator(name: str, log_returns: np.ndarray) -> str:
+    """Name of the generator `make_generator(name, log_returns)` actually fits."""
+    if name == GARCHGenerator.name and not _garch_fittable(log_returns):
+        return IIDBootstrap.name
+    return name
+
+
+def make_generator(name: str, log_returns: np.ndarray):
+    """Fit the generator `name` to a ticker's historical log returns.
+
+    The returned generator's `name` is the one used: "iid" after a GARCH fallback.
+    """
+    if name not in GENERATORS:
+        raise ValueError(f"Generador no válido: {name}")
+    if len(log_returns) < 2:
+        raise ValueError("Histórico insuficiente para generar trayectorias")
+    used = resolve_generator(name, log_returns)
+    if used != name:
+        logger.warning(
+            "GARCH needs %d+ returns with non-zero variance (got %d) — using iid bootstrap",
+            GARCH_MIN_OBS, len(log_returns),
+        )
+    return GENERATORS[used](log_returns)
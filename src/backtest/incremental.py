@@ -0,0 +1,135 @@
+"""Incremental signal evaluation for BacktestEngine.
+
+Evaluating the strategy bar by bar (a 60-bar pandas window per bar) is the
+dominant cost of a backtest; the vectorbt portfolio simulation on top of the
+resulting entries/exits takes milliseconds. Each new trading day adds one bar,
+so the signal ledger of the previous run is kept and only bars that were not
+evaluated before are sent to the strategy.
+
+A previous signal is reused only when the OHLCV rows it was computed from are
+unchanged. Every aligned row is fingerprinted (`hash_pandas_object`); if any
+bar shared with the previous run differs — e.g. Yahoo re-adjusted history
+after a dividend — the whole ledger is discarded and the ticker is recomputed
+from scratch.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Hashable
+
+import numpy as np
+import pandas as pd
+
+from src.strategies.base import Strategy
+
+logger = logging.getLogger(__name__)
+
+BUY, SELL, NONE = 1, -1, 0
+
+
+@dataclass
+class SignalLedger:
+    index: pd.DatetimeIndex
+    row_hashes: np.ndarray   # uint64 fingerprint per aligned OHLCV row
+    signals: np.ndarray      # int8 per row: BUY | SELL | NONE
+
+
+def strategy_key(strategy: Strategy, strategy_name: str) -> tuple:
+    """Identify a strategy *and* its parameters (read from config at init)."""
+    params = tuple(sorted((k, repr(v)) for k, v in vars(strategy).items()))
+    return (strategy_name, type(strategy).__qualname__, params)
+
+
+def _reusable_mask(
+    prev: SignalLedger, index: pd.DatetimeIndex, hashes: np.ndarray, window: int,
+) -> np.ndarray | None:
+    """Boolean mask of bars whose stored signal is still valid.
+
+    Returns None when the data shared with the previous run changed.
+    """
+    n = len(index)
+    prev_pos = prev.index.get_indexer(index)
+    common = prev_pos >= 0
+    if not common.any():
+        return np.zeros(n, dtype=bool)
+
+    new_pos = np.flatnonzero(common)
+    old_pos = prev_pos[common]
+    if (np.diff(new_pos) != 1).any() or (np.diff(old_pos) != 1).any():
+        return None   # overlap is not one contiguous block — cannot line windows up
+    if (prev.row_hashes[old_pos] != hashes[common]).any():
+        return None   # fingerprint before the new bars changed
+
+    # A bar's signal depends on the `window` rows before it: reuse it only if
+    # that whole window lies inside the unchanged overlap and the previous run
+    # actually evaluated the bar.
+    positions = np.arange(n)
+    return common & (positions - window >= new_pos[0]) & (prev_pos >= window)
+
+
+class SignalCache:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._ledgers: OrderedDict[Hashable, SignalLedger] = OrderedDict()
+        self._lock = threading.Lock()   # /ranking runs backtests in executor threads
+
+    def evaluate(
+        self,
+        key: Hashable,
+        ticker: str,
+        ohlcv: pd.DataFrame,
+        strategy: Strategy,
+        window: int,
+    ) -> tuple[np.ndarray, int]:
+        """Return (signals, n_evaluated) for every bar of the aligned `ohlcv`."""
+        n = len(ohlcv)
+        hashes = pd.util.hash_pandas_object(ohlcv, index=True).to_numpy()
+        signals = np.zeros(n, dtype=np.int8)
+
+        with self._lock:
+            prev = self._ledgers.get(key)
+        reusable = _reusable_mask(prev, ohlcv.index, hashes, window) if prev else None
+        if reusable is None:
+            if prev is not None:
+                logger.info("Signal ledger for %s invalidated — full recompute", ticker)
+            reusable = np.zeros(n, dtype=bool)
+        else:
+            signals[reusable] = prev.signals[prev.index.get_indexer(ohlcv.index[reusable])]
+
+        close = ohlcv["Close"]
+        n_evaluated = 0
+        for i in range(window, n):
+            if reusable[i]:
+                continue
+            n_evaluated += 1
+            window_data = ohlcv.iloc[i - window:i]
+            current_price = Decimal(str(close.iloc[i]))
+            try:
+                signal = strategy.evaluate(ticker, window_data, current_price)
+            except Exception as e:
+                logger.warning(
+                    "Strategy %s raised on bar %d for %s: %s",
+                    strategy.__class__.__name__, i, ticker, e,
+                )
+                continue
+            if signal:
+                if signal.action == "BUY":
+                    signals[i] = BUY
+                elif signal.action == "SELL":
+                    signals[i] = SELL
+
+        with self._lock:
+            self._ledgers[key] = SignalLedger(ohlcv.index, hashes, signals)
+            self._ledgers.move_to_end(key)
+            while len(self._ledgers) > self.max_entries:
+                self._ledgers.popitem(last=False)
+        return signals, n_evaluated
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ledgers.clear()
+
+
+signal_cache = SignalCache()
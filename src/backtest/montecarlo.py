@@ -1,32 +1,171 @@
+import hashlib
 import logging
 import math
+import threading
+import time
+import warnings
+import zlib
+from collections import OrderedDict
 from dataclasses import dataclass
 from decimal import Decimal
 
 import numpy as np
 import pandas as pd
 
+from src.backtest.generators import make_generator, resolve_generator
+from src.backtest.quantiles import DEFAULT_COMPRESSION, QuantileSketch
 from src.strategies.base import Strategy
 
 logger = logging.getLogger(__name__)
 
 LOOKBACK = 60          # bars of real history used as warmup context per simulation
 HIST_PERIOD = "2y"     # how much history to fetch for the returns pool
+DEFAULT_N_SIMS = 100
+DEFAULT_HORIZON = 90   # days
+JOINT_BLOCK = 5        # days per bootstrap block in portfolio mode (one trading week)
+TRADING_DAYS = 252
+
+# Adaptive mode (`/montecarlo ... auto`): chunked runs until the standard errors
+# of median return / VaR 95% (pp) and prob. of loss are within tolerance
+AUTO_CHUNK = 50
+AUTO_MIN_SIMS = 100
+AUTO_MAX_SIMS = 2_000
+AUTO_TIME_BUDGET = 20.0   # seconds per asset
+AUTO_TOL_RETURN = 0.5     # percentage points
+AUTO_TOL_PROB = 0.02
+
+STREAM_CHUNK = 1_000   # paths per chunk in run_asset_streaming
+PATH_CACHE_SIZE = 24   # (ticker, history, seed, size, sampler, generator) entries
+
+# Index samplers over the historical returns pool. "iid" is plain bootstrap;
+# the others are variance-reduction schemes applied to the *sorted* pool, so
+# a low/high index maps to a low/high return:
+#   antithetic  — every path k has a mirror path using index n_pool-1-k
+#   stratified  — Latin hypercube: per day, one draw from each of n_sims strata
+#   sobol       — scrambled Sobol points (one dimension per day), needs scipy
+SAMPLERS = ("iid", "antithetic", "stratified", "sobol")
+
+
+def sample_pool_indices(
+    n_pool: int,
+    n_simulations: int,
+    horizon: int,
+    rng: np.random.Generator,
+    sampler: str,
+) -> np.ndarray:
+    """Indices into the sorted returns pool, shape (n_simulations, horizon)."""
+    if sampler == "iid":
+        return rng.integers(0, n_pool, size=(n_simulations, horizon))
+    if sampler == "antithetic":
+        half = rng.integers(0, n_pool, size=(-(-n_simulations // 2), horizon))
+        return np.vstack([half, n_pool - 1 - half])[:n_simulations]
+    if sampler == "stratified":
+        strata = rng.permuted(
+            np.tile(np.arange(n_simulations)[:, None], (1, horizon)), axis=0,
+        )
+        u = (strata + rng.random((n_simulations, horizon))) / n_simulations
+    elif sampler == "sobol":
+        from scipy.stats import qmc
+
+        with warnings.catch_warnings():
+            # balance properties want 2^m points; any n is still unbiased
+            warnings.simplefilter("ignore", UserWarning)
+            u = qmc.Sobol(d=horizon, scramble=True, seed=rng).random(n_simulations)
+    else:
+        raise ValueError(f"Muestreo no válido: {sampler}")
+    return np.minimum((u * n_pool).astype(int), n_pool - 1)
+
+
+def ticker_rng(seed: int, ticker: str) -> np.random.Generator:
+    """Per-ticker random stream derived from the run seed.
+
+    Paths for a ticker depend only on (seed, ticker), not on which basket or
+    in which order the ticker is simulated — the precondition for reusing them.
+    """
+    return np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+
+
+class PathCache:
+    """LRU of generated price paths shared across strategies and stop-loss levels.
+
+    Keyed by ticker, the last bar/length of its history, seed, size, sampler
+    and generator. Strategies never mutate paths (they only read windows), so
+    the same list of Series is handed to every caller.
+    """
+
+    def __init__(self, max_entries: int = PATH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._paths: OrderedDict[tuple, list[pd.Series]] = OrderedDict()
+        self._lock = threading.Lock()   # handlers run simulations in executor threads
+
+    def get_or_create(self, key: tuple, factory) -> list[pd.Series]:
+        with self._lock:
+            paths = self._paths.get(key)
+            if paths is not None:
+                self._paths.move_to_end(key)
+                self.hits += 1
+                return paths
+            self.misses += 1
+        paths = factory()
+        with self._lock:
+            self._paths[key] = paths
+            while len(self._paths) > self.max_entries:
+                self._paths.popitem(last=False)
+        return paths
+
+    def evict(self, tickers) -> None:
+        """Drop every entry for `tickers` (key[0] is the ticker)."""
+        tickers = set(tickers)
+        with self._lock:
+            for key in [k for k in self._paths if k[0] in tickers]:
+                del self._paths[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._paths.clear()
+            self.hits = self.misses = 0
+
+
+path_cache = PathCache()
 
 
 class MonteCarloSimulator:
+    def __init__(self):
+        # fitted generators per (name, returns fingerprint): GARCH is fitted
+        # once per ticker even when paths are generated chunk by chunk
+        self._fitted: dict[tuple[str, bytes], object] = {}
+
+    def _generator(self, name: str, log_returns: np.ndarray):
+        key = (name, hashlib.blake2b(log_returns.tobytes(), digest_size=16).digest())
+        if key not in self._fitted:
+            self._fitted[key] = make_generator(name, log_returns)
+        return self._fitted[key]
+
+    def generator_fallback(self, hist_df: pd.DataFrame, generator: str) -> str | None:
+        """`generator` if `hist_df` can't support it and paths fall back to "iid", else None."""
+        close = hist_df["Close"]
+        log_returns = np.log(close / close.shift(1)).dropna().values
+        return generator if resolve_generator(generator, log_returns) != generator else None
+
     def generate_paths(
         self,
         hist_df: pd.DataFrame,
         n_simulations: int,
         horizon: int,
         rng: np.random.Generator,
+        sampler: str = "iid",
+        generator: str = "iid",
     ) -> list[pd.Series]:
         """Bootstrap N synthetic Close price series of length `horizon`.
 
         Samples log returns with replacement from the historical pool and
         reconstructs price series starting from the last real Close price.
         Synthetic index uses business-day frequency after the last real date.
+        `sampler` selects a variance-reduction scheme (see `SAMPLERS`);
+        `generator` swaps the i.i.d. bootstrap for a volatility-clustering
+        model from `src.backtest.generators` ("block", "garch").
         """
         close = hist_df["Close"]
         log_returns = np.log(close / close.shift(1)).dropna().values
@@ -37,6 +176,19 @@ class MonteCarloSimulator:
             start=last_date + pd.Timedelta(days=1), periods=horizon
         )
 
+        if generator != "iid":
+            if sampler != "iid":
+                raise ValueError("El muestreo alternativo solo aplica al bootstrap i.i.d.")
+            sampled = self._generator(generator, log_returns).sample(n_simulations, horizon, rng)
+            prices = last_price * np.exp(np.cumsum(sampled, axis=1))
+            return [pd.Series(row, index=future_dates, name="Close") for row in prices]
+
+        if sampler != "iid":
+            pool = np.sort(log_returns)
+            idx = sample_pool_indices(len(pool), n_simulations, horizon, rng, sampler)
+            prices = last_price * np.exp(np.cumsum(pool[idx], axis=1))
+            return [pd.Series(row, index=future_dates, name="Close") for row in prices]
+
         paths = []
         for _ in range(n_simulations):
             sampled = rng.choice(log_returns, size=horizon, replace=True)
@@ -45,6 +197,68 @@ class MonteCarloSimulator:
             paths.append(path)
         return paths
 
+    def cached_paths(
+        self,
+        cache: PathCache,
+        ticker: str,
+        hist_df: pd.DataFrame,
+        n_simulations: int,
+        horizon: int,
+        seed: int,
+        sampler: str = "iid",
+        generator: str = "iid",
+    ) -> list[pd.Series]:
+        """`generate_paths` through `cache`, drawing from `ticker_rng(seed, ticker)`."""
+        key = (
+            ticker, hist_df.index[-1], len(hist_df),
+            seed, n_simulations, horizon, sampler, generator,
+        )
+        return cache.get_or_create(key, lambda: self.generate_paths(
+            hist_df, n_simulations, horizon, ticker_rng(seed, ticker), sampler, generator,
+        ))
+
+    def sample_joint_indices(
+        self,
+        n_rows: int,
+        n_simulations: int,
+        horizon: int,
+        rng: np.random.Generator,
+        block: int = 1,
+    ) -> np.ndarray:
+        """Row indices into a return matrix, shape (n_simulations, horizon).
+
+        `block=1` bootstraps whole dates; `block>1` draws consecutive runs of
+        `block` dates (moving-block bootstrap) to keep short-range
+        autocorrelation and volatility clustering. Indices are drawn once and
+        shared by every ticker, so cross-asset correlation is preserved.
+        """
+        block = max(1, min(block, n_rows))
+        n_blocks = -(-horizon // block)   # ceil
+        starts = rng.integers(0, n_rows - block + 1, size=(n_simulations, n_blocks))
+        idx = (starts[:, :, None] + np.arange(block)).reshape(n_simulations, -1)
+        return idx[:, :horizon]
+
+    def generate_joint_paths(
+        self,
+        close_df: pd.DataFrame,
+        n_simulations: int,
+        horizon: int,
+        rng: np.random.Generator,
+        block: int = 1,
+    ) -> np.ndarray:
+        """Jointly bootstrapped price paths, shape (n_simulations, horizon, n_assets).
+
+        `close_df` is the aligned close matrix (one column per ticker); each
+        simulated day copies the log returns of one historical date across
+        all tickers. Prices start from the last real close of each column.
+        """
+        log_returns = np.log(close_df / close_df.shift(1)).dropna().to_numpy()
+        if len(log_returns) == 0:
+            raise ValueError("Sin histórico común suficiente para el bootstrap conjunto")
+        idx = self.sample_joint_indices(len(log_returns), n_simulations, horizon, rng, block)
+        last = close_df.iloc[-1].to_numpy(dtype=float)
+        return last * np.exp(np.cumsum(log_returns[idx], axis=1))
+
 
 # Thresholds for profile classification — adjust as needed
 _PROB_LOSS_LOW = 0.20
@@ -76,9 +290,42 @@ class AssetMonteCarloResult:
     # Tail risk
     var_95: float             # Value at Risk (5th percentile of returns)
     cvar_95: float            # Conditional VaR / Expected Shortfall
+    # Achieved precision — only set by run_asset_adaptive
+    se_median: float | None = None
+    se_var_95: float | None = None
+    se_prob_loss: float | None = None
+    converged: bool | None = None
+    # requested path generator (e.g. "garch") when the history couldn't
+    # support it and the paths came from the i.i.d. bootstrap instead
+    generator_fallback: str | None = None
+
+
+@dataclass
+class PortfolioMonteCarloResult:
+    tickers: list[str]
+    weights: list[float]      # initial value weights, same order as tickers
+    n_simulations: int
+    horizon: int
+    seed: int
+    block: int
+    # Return distribution of the basket equity (buy & hold over the horizon)
+    return_median: float
+    return_mean: float
+    return_p10: float
+    return_p90: float
+    return_p05: float
+    prob_loss: float
+    # Drawdown
+    max_dd_median: float
+    max_dd_p95: float
+    # Quality
+    sharpe_median: float
+    # Tail risk
+    var_95: float
+    cvar_95: float
 
 
-def _profile_line(r: AssetMonteCarloResult) -> str:
+def _profile_line(r: AssetMonteCarloResult | PortfolioMonteCarloResult) -> str:
     """Single-line risk profile summary with emoji."""
     if r.prob_loss < _PROB_LOSS_LOW and r.sharpe_median > _SHARPE_GOOD:
         return "✅ Perfil favorable"
@@ -87,11 +334,146 @@ def _profile_line(r: AssetMonteCarloResult) -> str:
     return "⚠️ Perfil moderado, revisar riesgo"
 
 
+class MonteCarloAccumulator:
+    """Constant-memory aggregate of per-path metrics.
+
+    One `QuantileSketch` per metric plus exact counters. Accumulators from
+    different chunks or worker processes combine with `merge`.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.returns = QuantileSketch(compression)
+        self.max_dds = QuantileSketch(compression)
+        self.sharpes = QuantileSketch(compression)
+        self.win_rates = QuantileSketch(compression)
+        self.n_loss = 0
+
+    @property
+    def n(self) -> int:
+        return self.returns.count
+
+    def add(
+        self,
+        returns: np.ndarray,
+        max_dds: np.ndarray,
+        sharpes: np.ndarray,
+        win_rates: np.ndarray,
+    ) -> "MonteCarloAccumulator":
+        self.returns.update(returns)
+        self.max_dds.update(max_dds)
+        self.sharpes.update(sharpes)
+        self.win_rates.update(win_rates)
+        self.n_loss += int(np.sum(np.asarray(returns) < 0))
+        return self
+
+    def merge(self, other: "MonteCarloAccumulator") -> "MonteCarloAccumulator":
+        self.returns.merge(other.returns)
+        self.max_dds.merge(other.max_dds)
+        self.sharpes.merge(other.sharpes)
+        self.win_rates.merge(other.win_rates)
+        self.n_loss += other.n_loss
+        return self
+
+    def summarize(
+        self, ticker: str, strategy_name: str, horizon: int, seed: int,
+    ) -> AssetMonteCarloResult:
+        r = self.returns
+        var_95 = r.percentile(5)
+        return AssetMonteCarloResult(
+            ticker=ticker,
+            n_simulations=self.n,
+            horizon=horizon,
+            strategy_name=strategy_name,
+            seed=seed,
+            return_median=r.percentile(50),
+            return_mean=r.mean,
+            return_p10=r.percentile(10),
+            return_p90=r.percentile(90),
+            return_p05=var_95,
+            prob_loss=self.n_loss / self.n,
+            max_dd_median=self.max_dds.percentile(50),
+            max_dd_p95=self.max_dds.percentile(95),
+            sharpe_median=self.sharpes.percentile(50),
+            win_rate_median=self.win_rates.percentile(50),
+            var_95=var_95,
+            cvar_95=min(r.tail_mean(0.05), var_95),
+        )
+
+
 class MonteCarloAnalyzer:
-    """Runs a strategy over N bootstrapped price paths and aggregates metrics."""
+    """Runs a strategy over N bootstrapped price paths and aggregates metrics.
 
-    def __init__(self):
+    With a `path_cache`, `run_asset` takes its paths from the cache (seeded
+    per ticker, `rng` is not used) so several strategies or stop-loss levels
+    are evaluated on identical synthetic paths.
+    """
+
+    def __init__(self, path_cache: PathCache | None = None):
         self.simulator = MonteCarloSimulator()
+        self.path_cache = path_cache
+
+    def run_portfolio(
+        self,
+        close_df: pd.DataFrame,
+        n_simulations: int,
+        horizon: int,
+        rng: np.random.Generator,
+        seed: int,
+        weights: dict[str, float] | None = None,
+        block: int = JOINT_BLOCK,
+    ) -> PortfolioMonteCarloResult:
+        """Basket-level risk: hold the current weights over jointly bootstrapped paths.
+
+        The whole basket is simulated in one vectorized pass over an
+        (n_simulations, horizon, n_assets) price array; no strategy signals
+        are applied. `weights` defaults to equal weight.
+        """
+        tickers = list(close_df.columns)
+        if weights:
+            w = np.array([weights.get(t, 0.0) for t in tickers], dtype=float)
+        else:
+            w = np.ones(len(tickers))
+        if w.sum() <= 0:
+            raise ValueError("Pesos de cartera no válidos")
+        w = w / w.sum()
+
+        paths = self.simulator.generate_joint_paths(close_df, n_simulations, horizon, rng, block)
+        growth = paths / close_df.iloc[-1].to_numpy(dtype=float)      # (sims, horizon, assets)
+        equity = np.concatenate(
+            [np.ones((n_simulations, 1)), growth @ w], axis=1,
+        )                                                              # (sims, horizon + 1)
+
+        returns = (equity[:, -1] - 1) * 100
+        peak = np.maximum.accumulate(equity, axis=1)
+        max_dds = ((peak - equity) / peak).max(axis=1) * 100
+        daily = equity[:, 1:] / equity[:, :-1] - 1
+        std = daily.std(axis=1)
+        sharpes = np.divide(
+            daily.mean(axis=1) * math.sqrt(TRADING_DAYS), std,
+            out=np.zeros(n_simulations), where=std > 0,
+        )
+
+        var_95 = float(np.percentile(returns, 5))
+        tail = returns[returns <= var_95]
+        return PortfolioMonteCarloResult(
+            tickers=tickers,
+            weights=[float(x) for x in w],
+            n_simulations=n_simulations,
+            horizon=horizon,
+            seed=seed,
+            block=block,
+            return_median=float(np.percentile(returns, 50)),
+            return_mean=float(np.mean(returns)),
+            return_p10=float(np.percentile(returns, 10)),
+            return_p90=float(np.percentile(returns, 90)),
+            return_p05=float(np.percentile(returns, 5)),
+            prob_loss=float(np.mean(returns < 0)),
+            max_dd_median=float(np.percentile(max_dds, 50)),
+            max_dd_p95=float(np.percentile(max_dds, 95)),
+            sharpe_median=float(np.percentile(sharpes, 50)),
+            var_95=var_95,
+            cvar_95=float(np.mean(tail)) if len(tail) > 0 else var_95,
+        )
 
     def run_asset(
         self,
@@ -104,16 +486,198 @@ class MonteCarloAnalyzer:
         rng: np.random.Generator,
         seed: int,
         stop_loss_pct: float | None = None,
+        sampler: str = "iid",
+        generator: str = "iid",
     ) -> AssetMonteCarloResult:
-        import vectorbt as vbt
+        return self.run_asset_sl_sweep(
+            ticker, strategy, strategy_name, hist_df, n_simulations, horizon, rng, seed,
+            [stop_loss_pct], sampler, generator,
+        )[0][1]
 
+    def run_asset_sl_sweep(
+        self,
+        ticker: str,
+        strategy: Strategy,
+        strategy_name: str,
+        hist_df: pd.DataFrame,
+        n_simulations: int,
+        horizon: int,
+        rng: np.random.Generator,
+        seed: int,
+        stop_loss_levels: list[float | None],
+        sampler: str = "iid",
+        generator: str = "iid",
+    ) -> list[tuple[float | None, AssetMonteCarloResult]]:
+        """`run_asset` for several stop-loss levels on the same paths.
+
+        The strategy is evaluated once per path; only the vectorbt portfolio
+        (its `sl_stop`) is rebuilt per level.
+        """
         warmup_df = hist_df.tail(LOOKBACK).copy()
-        paths = self.simulator.generate_paths(hist_df, n_simulations, horizon, rng)
+        if self.path_cache is not None:
+            paths = self.simulator.cached_paths(
+                self.path_cache, ticker, hist_df, n_simulations, horizon, seed,
+                sampler, generator,
+            )
+        else:
+            paths = self.simulator.generate_paths(
+                hist_df, n_simulations, horizon, rng, sampler, generator,
+            )
+        per_level = self._simulate_levels(ticker, strategy, warmup_df, paths, stop_loss_levels)
 
-        returns: list[float] = []
-        max_dds: list[float] = []
-        sharpes: list[float] = []
-        win_rates: list[float] = []
+        if not len(per_level[0][0]):
+            raise RuntimeError(
+                f"All {n_simulations} simulations failed for ticker '{ticker}'"
+            )
+        results = [
+            (sl, _summarize(ticker, strategy_name, horizon, seed, *metrics))
+            for sl, metrics in zip(stop_loss_levels, per_level)
+        ]
+        fallback = self.simulator.generator_fallback(hist_df, generator)
+        for _, result in results:
+            result.generator_fallback = fallback
+        return results
+
+    def run_asset_streaming(
+        self,
+        ticker: str,
+        strategy: Strategy,
+        strategy_name: str,
+        hist_df: pd.DataFrame,
+        n_simulations: int,
+        horizon: int,
+        rng: np.random.Generator,
+        seed: int,
+        stop_loss_pct: float | None = None,
+        sampler: str = "iid",
+        chunk: int = STREAM_CHUNK,
+        accumulator: MonteCarloAccumulator | None = None,
+        generator: str = "iid",
+    ) -> AssetMonteCarloResult:
+        """Like `run_asset` but in chunks folded into a `MonteCarloAccumulator`.
+
+        Memory is bounded by one chunk of paths, so very large runs (100k+)
+        are feasible in background jobs. Pass `accumulator` to keep the
+        sketches, e.g. to merge results computed in other processes.
+        """
+        acc = accumulator if accumulator is not None else MonteCarloAccumulator()
+        warmup_df = hist_df.tail(LOOKBACK).copy()
+        remaining = n_simulations
+        while remaining > 0:
+            size = min(chunk, remaining)
+            paths = self.simulator.generate_paths(hist_df, size, horizon, rng, sampler, generator)
+            acc.add(*self._simulate(ticker, strategy, warmup_df, paths, stop_loss_pct))
+            remaining -= size
+
+        if not acc.n:
+            raise RuntimeError(
+                f"All {n_simulations} simulations failed for ticker '{ticker}'"
+            )
+        result = acc.summarize(ticker, strategy_name, horizon, seed)
+        result.generator_fallback = self.simulator.generator_fallback(hist_df, generator)
+        return result
+
+    def run_asset_adaptive(
+        self,
+        ticker: str,
+        strategy: Strategy,
+        strategy_name: str,
+        hist_df: pd.DataFrame,
+        horizon: int,
+        rng: np.random.Generator,
+        seed: int,
+        stop_loss_pct: float | None = None,
+        tol_return: float = AUTO_TOL_RETURN,
+        tol_prob: float = AUTO_TOL_PROB,
+        time_budget: float = AUTO_TIME_BUDGET,
+        chunk: int = AUTO_CHUNK,
+        min_sims: int = AUTO_MIN_SIMS,
+        max_sims: int = AUTO_MAX_SIMS,
+        sampler: str = "iid",
+        generator: str = "iid",
+    ) -> AssetMonteCarloResult:
+        """Run simulations in chunks until the estimates converge.
+
+        After each chunk the standard error of the median return, VaR 95%
+        (both in percentage points) and prob. of loss is estimated; the run
+        stops once all are within tolerance, the time budget (seconds) is
+        spent, or `max_sims` is reached. The result carries the achieved
+        standard errors and whether it converged.
+
+        Like the cached fixed-size paths, chunks are drawn from
+        `ticker_rng(seed, ticker)` (`rng` is not used), so a ticker's result
+        does not depend on which assets were simulated before it.
+        """
+        rng = ticker_rng(seed, ticker)
+        warmup_df = hist_df.tail(LOOKBACK).copy()
+        started = time.monotonic()
+        chunks: list[tuple[np.ndarray, ...]] = []
+        n_done = 0
+        converged = False
+        errors = (math.inf, math.inf, math.inf)
+
+        while n_done < max_sims:
+            size = min(chunk, max_sims - n_done)
+            paths = self.simulator.generate_paths(hist_df, size, horizon, rng, sampler, generator)
+            chunks.append(self._simulate(ticker, strategy, warmup_df, paths, stop_loss_pct))
+            n_done += size
+
+            if n_done >= min_sims:
+                returns = np.concatenate([c[0] for c in chunks])
+                errors = _standard_errors(returns, np.random.default_rng([seed, n_done]))
+                se_median, se_var, se_prob = errors
+                if se_median <= tol_return and se_var <= tol_return and se_prob <= tol_prob:
+                    converged = True
+                    break
+            if time.monotonic() - started >= time_budget:
+                break
+
+        metrics = tuple(np.concatenate([c[i] for c in chunks]) for i in range(4))
+        if not len(metrics[0]):
+            raise RuntimeError(f"All simulations failed for ticker '{ticker}'")
+        if not math.isfinite(errors[0]):
+            errors = _standard_errors(metrics[0], np.random.default_rng([seed, n_done]))
+
+        result = _summarize(ticker, strategy_name, horizon, seed, *metrics)
+        result.se_median, result.se_var_95, result.se_prob_loss = errors
+        result.converged = converged
+        result.generator_fallback = self.simulator.generator_fallback(hist_df, generator)
+        logger.info(
+            "Adaptive Monte Carlo %s: %d sims in %.1fs (converged=%s)",
+            ticker, result.n_simulations, time.monotonic() - started, converged,
+        )
+        return result
+
+    def _simulate(
+        self,
+        ticker: str,
+        strategy: Strategy,
+        warmup_df: pd.DataFrame,
+        paths: list[pd.Series],
+        stop_loss_pct: float | None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Run the strategy over each path → (returns, max_dds, sharpes, win_rates)."""
+        return self._simulate_levels(ticker, strategy, warmup_df, paths, [stop_loss_pct])[0]
+
+    def _simulate_levels(
+        self,
+        ticker: str,
+        strategy: Strategy,
+        warmup_df: pd.DataFrame,
+        paths: list[pd.Series],
+        stop_loss_levels: list[float | None],
+    ) -> list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """`_simulate` for each stop-loss level, evaluating the strategy once per path."""
+        import vectorbt as vbt
+
+        returns: list[list[float]] = [[] for _ in stop_loss_levels]
+        max_dds: list[list[float]] = [[] for _ in stop_loss_levels]
+        sharpes: list[list[float]] = [[] for _ in stop_loss_levels]
+        win_rates: list[list[float]] = [[] for _ in stop_loss_levels]
+
+        def _safe(val, default: float = 0.0) -> float:
+            v = float(val) if val is not None else default
+            return v if math.isfinite(v) else default
 
         for path in paths:
             path_df = path.to_frame("Close")
@@ -145,47 +709,71 @@ class MonteCarloAnalyzer:
                     elif signal.action == "SELL":
                         exits.iloc[i] = True
 
-            sl_kwargs = {"sl_stop": stop_loss_pct / 100} if stop_loss_pct else {}
-            pf = vbt.Portfolio.from_signals(
-                path, entries, exits, init_cash=10_000, freq="1D", **sl_kwargs
-            )
-            stats = pf.stats()
-
-            def _safe(val, default: float = 0.0) -> float:
-                v = float(val) if val is not None else default
-                return v if math.isfinite(v) else default
-
-            returns.append(_safe(stats.get("Total Return [%]")))
-            max_dds.append(_safe(stats.get("Max Drawdown [%]")))
-            sharpes.append(_safe(stats.get("Sharpe Ratio")))
-            win_rates.append(_safe(stats.get("Win Rate [%]")))
-
-        if not returns:
-            raise RuntimeError(
-                f"All {n_simulations} simulations failed for ticker '{ticker}'"
-            )
-
-        arr = np.array(returns)
-        var_95 = float(np.percentile(arr, 5))
-        tail = arr[arr <= var_95]
-        cvar_95 = float(np.mean(tail)) if len(tail) > 0 else var_95
-
-        return AssetMonteCarloResult(
-            ticker=ticker,
-            n_simulations=n_simulations,
-            horizon=horizon,
-            strategy_name=strategy_name,
-            seed=seed,
-            return_median=float(np.percentile(arr, 50)),
-            return_mean=float(np.mean(arr)),
-            return_p10=float(np.percentile(arr, 10)),
-            return_p90=float(np.percentile(arr, 90)),
-            return_p05=float(np.percentile(arr, 5)),
-            prob_loss=float(np.mean(arr < 0)),
-            max_dd_median=float(np.percentile(max_dds, 50)),
-            max_dd_p95=float(np.percentile(max_dds, 95)),
-            sharpe_median=float(np.percentile(sharpes, 50)),
-            win_rate_median=float(np.percentile(win_rates, 50)),
-            var_95=var_95,
-            cvar_95=cvar_95,
-        )
+            for k, stop_loss_pct in enumerate(stop_loss_levels):
+                sl_kwargs = {"sl_stop": stop_loss_pct / 100} if stop_loss_pct else {}
+                pf = vbt.Portfolio.from_signals(
+                    path, entries, exits, init_cash=10_000, freq="1D", **sl_kwargs
+                )
+                stats = pf.stats()
+                returns[k].append(_safe(stats.get("Total Return [%]")))
+                max_dds[k].append(_safe(stats.get("Max Drawdown [%]")))
+                sharpes[k].append(_safe(stats.get("Sharpe Ratio")))
+                win_rates[k].append(_safe(stats.get("Win Rate [%]")))
+
+        return [
+            (np.array(returns[k]), np.array(max_dds[k]), np.array(sharpes[k]), np.array(win_rates[k]))
+            for k in range(len(stop_loss_levels))
+        ]
+
+
+def _standard_errors(
+    returns: np.ndarray, rng: np.random.Generator, n_boot: int = 200,
+) -> tuple[float, float, float]:
+    """Standard errors of (median return, VaR 95%, prob. of loss).
+
+    Quantile SEs come from a vectorized bootstrap over the simulated returns;
+    prob. of loss uses the binomial formula.
+    """
+    n = len(returns)
+    resampled = returns[rng.integers(0, n, size=(n_boot, n))]
+    se_median = float(np.percentile(resampled, 50, axis=1).std(ddof=1))
+    se_var = float(np.percentile(resampled, 5, axis=1).std(ddof=1))
+    p = float(np.mean(returns < 0))
+    se_prob = math.sqrt(p * (1 - p) / n)
+    return se_median, se_var, se_prob
+
+
+def _summarize(
+    ticker: str,
+    strategy_name: str,
+    horizon: int,
+    seed: int,
+    returns: np.ndarray,
+    max_dds: np.ndarray,
+    sharpes: np.ndarray,
+    win_rates: np.ndarray,
+) -> AssetMonteCarloResult:
+    arr = returns
+    var_95 = float(np.percentile(arr, 5))
+    tail = arr[arr <= var_95]
+    cvar_95 = float(np.mean(tail)) if len(tail) > 0 else var_95
+
+    return AssetMonteCarloResult(
+        ticker=ticker,
+        n_simulations=len(arr),
+        horizon=horizon,
+        strategy_name=strategy_name,
+        seed=seed,
+        return_median=float(np.percentile(arr, 50)),
+        return_mean=float(np.mean(arr)),
+        return_p10=float(np.percentile(arr, 10)),
+        return_p90=float(np.percentile(arr, 90)),
+        return_p05=float(np.percentile(arr, 5)),
+        prob_loss=float(np.mean(arr < 0)),
+        max_dd_median=float(np.percentile(max_dds, 50)),
+        max_dd_p95=float(np.percentile(max_dds, 95)),
+        sharpe_median=float(np.percentile(sharpes, 50)),
+        win_rate_median=float(np.percentile(win_rates, 50)),
+        var_95=var_95,
+        cvar_95=cvar_95,
+    )
@@ -0,0 +1,176 @@
+"""Shared-cash multi-asset simulation for basket backtests.
+
+`BacktestEngine.run` historically split the initial capital equally and
+averaged per-asset vectorbt stats, so portfolio Sharpe and drawdown were
+approximations (max DD was the worst single asset). This module simulates
+the basket as one account: every ticker draws from and returns to the same
+cash balance and the result is a real portfolio equity curve.
+
+Cash is path dependent, so the loop runs over bars; each bar is vectorized
+across tickers (numpy over one row of the aligned close matrix).
+
+Execution model (same as vectorbt's `from_signals` defaults): orders fill at
+the bar's close, no fees, fractional quantities. Within a bar exits (signal
+or stop-loss) are processed before entries, so cash freed by a sale can fund
+a purchase on the same day.
+
+Allocation rules for a BUY on a flat ticker:
+  - "equal":  target value `equity / n_tickers`, capped by available cash
+  - "cash10": 10% of available cash (same rule as the alert confirm button)
+
+Periodic rebalancing (`rebalance` = pandas offset alias "W", "M", "Q") resizes
+held positions at the first bar of every new period: to `equity / n_tickers`
+under "equal", to an equal share of the invested value under "cash10".
+
+`n_trades` counts trades the way vectorbt's "Total Trades" does in the
+per-asset mode: one per position opened, whether closed by an exit or still
+open at the end. Rebalancing resizes a trade, it doesn't start one.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+ALLOCATIONS = {"equal", "cash10"}
+REBALANCE_FREQS = {"W", "M", "Q"}
+
+CASH10_FRACTION = 0.10
+TRADING_DAYS = 252
+
+
+@dataclass
+class SharedCashResult:
+    equity: pd.Series     # portfolio value per bar (cash + positions)
+    cash: pd.Series
+    n_trades: int         # positions opened (closed or still open), as vectorbt counts trades
+    total_return_pct: float
+    annualized_return_pct: float
+    sharpe_ratio: float
+    max_drawdown_pct: float
+
+
+def _rebalance_bars(index: pd.DatetimeIndex, freq: str | None) -> np.ndarray:
+    """Boolean mask of the first bar of each new `freq` period (never bar 0)."""
+    mask = np.zeros(len(index), dtype=bool)
+    if not freq or len(index) < 2:
+        return mask
+    periods = index.to_period(freq)
+    mask[1:] = periods[1:] != periods[:-1]
+    return mask
+
+
+def _sequential_spend(wanted: np.ndarray, cash: float) -> np.ndarray:
+    """Fund `wanted` amounts in order until cash runs out (vectorized)."""
+    before = np.concatenate(([0.0], np.cumsum(wanted)[:-1]))
+    return np.clip(np.minimum(wanted, cash - before), 0.0, None)
+
+
+def _stats(equity: pd.Series, init_cash: float) -> tuple[float, float, float, float]:
+    total = (equity.iloc[-1] / init_cash - 1) * 100
+    n_days = max(len(equity), 1)
+    annualized = ((1 + total / 100) ** (TRADING_DAYS / n_days) - 1) * 100 if total > -100 else -100.0
+
+    rets = equity.pct_change().dropna()
+    std = float(rets.std())
+    sharpe = float(rets.mean()) / std * math.sqrt(TRADING_DAYS) if std > 0 else 0.0
+
+    peak = equity.cummax()
+    max_dd = float(((peak - equity) / peak).max() * 100) if len(equity) else 0.0
+    return float(total), float(annualized), sharpe, max_dd
+
+
+def simulate_shared_cash(
+    close_df: pd.DataFrame,
+    entries_df: pd.DataFrame,
+    exits_df: pd.DataFrame,
+    init_cash: float = 10_000.0,
+    allocation: str = "equal",
+    rebalance: str | None = None,
+    stop_loss_pct: float | None = None,
+) -> SharedCashResult:
+    """Run the basket as one shared-cash account over the aligned close matrix."""
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Asignación no válida: {allocation}")
+    if rebalance is not None and rebalance not in REBALANCE_FREQS:
+        raise ValueError(f"Frecuencia de rebalanceo no válida: {rebalance}")
+
+    close = close_df.to_numpy(dtype=float)
+    entries = entries_df.reindex_like(close_df).fillna(False).to_numpy(dtype=bool)
+    exits = exits_df.reindex_like(close_df).fillna(False).to_numpy(dtype=bool)
+    rebalance_at = _rebalance_bars(close_df.index, rebalance)
+    n_bars, n_assets = close.shape
+    sl = stop_loss_pct / 100 if stop_loss_pct else None
+
+    qty = np.zeros(n_assets)
+    entry_price = np.zeros(n_assets)
+    cash = float(init_cash)
+    n_trades = 0
+    equity = np.empty(n_bars)
+    cash_curve = np.empty(n_bars)
+
+    for i in range(n_bars):
+        px = close[i]
+        held = qty > 0
+
+        # 1. Exits: strategy SELL or stop-loss hit
+        sell = held & exits[i]
+        if sl is not None:
+            sell |= held & (px <= entry_price * (1 - sl))
+        if sell.any():
+            cash += float(qty[sell] @ px[sell])
+            qty[sell] = 0.0
+            entry_price[sell] = 0.0
+            held = qty > 0
+
+        # 2. Periodic rebalance of held positions
+        if rebalance_at[i] and held.any():
+            value = qty * px
+            if allocation == "equal":
+                target_each = (cash + value.sum()) / n_assets
+            else:
+                target_each = value[held].sum() / held.sum()
+            delta = np.where(held, target_each - value, 0.0)
+            trim = delta < -1e-9
+            cash -= float(delta[trim].sum())              # proceeds from trims
+            add = _sequential_spend(np.where(delta > 1e-9, delta, 0.0), cash)
+            cash -= float(add.sum())
+            new_qty = qty + np.where(trim, delta, add) / px
+            grown = add > 0
+            # weighted average entry for top-ups, unchanged for trims
+            entry_price[grown] = (
+                qty[grown] * entry_price[grown] + add[grown]
+            ) / new_qty[grown]
+            qty = new_qty
+
+        # 3. Entries on flat tickers
+        buy = (qty == 0) & entries[i]
+        if buy.any():
+            idx = np.flatnonzero(buy)
+            if allocation == "equal":
+                equity_now = cash + float(qty @ px)
+                spend = _sequential_spend(np.full(len(idx), equity_now / n_assets), cash)
+            else:
+                # each order takes 10% of the cash left after the previous one
+                spend = cash * CASH10_FRACTION * (1 - CASH10_FRACTION) ** np.arange(len(idx))
+            filled = spend > 0
+            idx, spend = idx[filled], spend[filled]
+            qty[idx] = spend / px[idx]
+            entry_price[idx] = px[idx]
+            cash -= float(spend.sum())
+            n_trades += len(idx)
+
+        equity[i] = cash + float(qty @ px)
+        cash_curve[i] = cash
+
+    equity_s = pd.Series(equity, index=close_df.index, name="equity")
+    total, annualized, sharpe, max_dd = _stats(equity_s, init_cash)
+    return SharedCashResult(
+        equity=equity_s,
+        cash=pd.Series(cash_curve, index=close_df.index, name="cash"),
+        n_trades=n_trades,
+        total_return_pct=total,
+        annualized_return_pct=annualized,
+        sharpe_ratio=sharpe,
+        max_drawdown_pct=max_dd,
+    )
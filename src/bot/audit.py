@@ -1,20 +1,102 @@
 """Audit logger for write commands.
 
-Persists a row to command_logs for every command that mutates state.
-Failures are silently swallowed and logged via loguru — audit should
-never break the main flow.
+Records a row in command_logs for every command that mutates state.
+`log_command` only appends the row to an in-memory buffer — no DB round-trip
+on the user-visible path. A background task (`audit_buffer.start()`) writes
+the buffer with one bulk INSERT (executemany) every `flush_rows` rows or
+`flush_interval_ms`, and `audit_buffer.stop()` flushes what is left on
+shutdown. Failures are logged and swallowed — audit should never break the
+main flow; rows that cannot be kept are counted as dropped.
 """
+import asyncio
 import logging
+from datetime import datetime
 
+from sqlalchemy import insert
 from telegram import Update
 
+from src.config import app_config
 from src.db.base import async_session_factory
 from src.db.models import CommandLog
-from src.metrics import commands_total
+from src.metrics import audit_rows_total, commands_total
 
 logger = logging.getLogger(__name__)
 
 
+class AuditBuffer:
+    def __init__(self, flush_rows: int = 50, flush_interval_ms: int = 500, max_rows: int = 10_000):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self._rows: list[dict] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: dict) -> None:
+        if len(self._rows) >= self.max_rows:
+            audit_rows_total.labels(result="dropped").inc()
+            return
+        self._rows.append(row)
+        if len(self._rows) >= self.flush_rows:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write every buffered row in one executemany. Returns rows written."""
+        rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            async with async_session_factory() as session:
+                await session.execute(insert(CommandLog), rows)
+                await session.commit()
+        except Exception as exc:
+            # keep them for the next flush, as far as the cap allows
+            room = max(self.max_rows - len(self._rows), 0)
+            self._rows[:0] = rows[-room:] if room else []
+            dropped = len(rows) - min(room, len(rows))
+            if dropped:
+                audit_rows_total.labels(result="dropped").inc(dropped)
+            logger.error(f"audit flush failed ({len(rows)} rows, {dropped} dropped): {exc}")
+            return 0
+        audit_rows_total.labels(result="flushed").inc(len(rows))
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and flush whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+_cfg = app_config.get("audit", {})
+audit_buffer = AuditBuffer(
+    flush_rows=_cfg.get("flush_rows", 50),
+    flush_interval_ms=_cfg.get("flush_interval_ms", 500),
+    max_rows=_cfg.get("max_buffered_rows", 10_000),
+)
+
+
 async def log_command(
     update: Update,
     command: str,
@@ -22,7 +104,7 @@ async def log_command(
     message: str = "",
     args: str | None = None,
 ) -> None:
-    """Write one audit row to command_logs.
+    """Queue one audit row for command_logs.
 
     Args:
         update:  Telegram Update object (provides tg_id / username).
@@ -34,15 +116,14 @@ async def log_command(
     commands_total.labels(command=command, success=str(success).lower()).inc()
     tg_user = update.effective_user
     try:
-        async with async_session_factory() as session:
-            session.add(CommandLog(
-                tg_id=tg_user.id,
-                username=tg_user.username,
-                command=command,
-                args=args,
-                success=success,
-                message=message,
-            ))
-            await session.commit()
+        audit_buffer.add({
+            "tg_id": tg_user.id,
+            "username": tg_user.username,
+            "command": command,
+            "args": args,
+            "success": success,
+            "message": message,
+            "created_at": datetime.now(),   # the command's time, not the flush's
+        })
     except Exception as exc:
         logger.error(f"audit.log_command failed: {exc}")
@@ -14,6 +14,11 @@ from src.bot.handlers.baskets import get_handlers as basket_handlers
 from src.bot.handlers.analysis import get_handlers as analysis_handlers
 from src.bot.handlers.admin import get_handlers as admin_handlers
 from src.bot.handlers.backtest import get_handlers as backtest_handlers
+from src.bot.handlers.ranking import get_handlers as ranking_handlers
+from src.bot.handlers.rendimiento import get_handlers as rendimiento_handlers
+from src.bot.handlers.fiscal import get_handlers as fiscal_handlers
+from src.bot.handlers.resting_orders import get_handlers as resting_order_handlers
+from src.bot.handlers.price_alerts import get_handlers as price_alert_handlers
 from src.bot.handlers.sizing import get_handlers as sizing_handlers
 from src.bot.handlers.search import get_handlers as search_handlers
 from src.bot.handlers.montecarlo import get_handlers as montecarlo_handlers
@@ -21,10 +26,18 @@ from src.bot.handlers.estado import get_handlers as estado_handlers
 from src.bot.handlers.help import get_handlers as help_handlers
 from src.bot.handlers.fallback import get_handlers as fallback_handlers
 from src.alerts.engine import AlertEngine
-from src.bot.audit import log_command
+from src.alerts.price_alerts import load_price_alerts
+from src.bot.audit import audit_buffer, log_command
+from src.bot.identity import identity_cache
 from src.db.base import async_session_factory
+from src.db.instrumentation import with_db_scope
 from src.metrics import start_metrics_server
 from src.scheduler.market_hours import is_market_open
+from src.scheduler.precompute import run_precompute
+from src.scheduler.resting_orders import (
+    DEFAULT_INTERVAL_MINUTES as RESTING_INTERVAL_MINUTES, load_trigger_book, run_resting_orders,
+)
+from src.scheduler.valuation import DEFAULT_INTERVAL_MINUTES, run_valuation_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +51,10 @@ async def handle_alert_callback(update: Update, context) -> None:
 
     action, alert_id = parts[1], int(parts[2])
 
-    from src.db.models import Alert, Asset, Basket, BasketMember, Position, User
+    from src.db.models import Alert, Asset, Basket, Position
     from src.data.yahoo import YahooDataProvider
     from src.orders.paper import PaperTradingExecutor
+    from src.orders.queue import order_queue
     from sqlalchemy import select
 
     async with async_session_factory() as session:
@@ -51,21 +65,12 @@ async def handle_alert_callback(update: Update, context) -> None:
 
         asset = await session.get(Asset, alert.asset_id)
         basket = await session.get(Basket, alert.basket_id)
-        user_result = await session.execute(
-            select(User).where(User.tg_id == query.from_user.id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = await identity_cache.user(session, query.from_user.id)
         if not user:
             await query.edit_message_text("Usa /start primero.")
             return
 
-        member_check = await session.execute(
-            select(BasketMember).where(
-                BasketMember.basket_id == basket.id,
-                BasketMember.user_id == user.id,
-            )
-        )
-        if not member_check.scalar_one_or_none():
+        if not await identity_cache.role(session, basket.id, user.id):
             await query.edit_message_text("No tienes acceso a esta cesta.")
             return
 
@@ -92,38 +97,50 @@ async def handle_alert_callback(update: Update, context) -> None:
                 price = provider.get_current_price(asset.ticker).price
                 executor = PaperTradingExecutor()
 
-                if alert.signal == "SELL":
-                    pos_result = await session.execute(
-                        select(Position).where(
-                            Position.basket_id == basket.id,
-                            Position.asset_id == asset.id,
+                # One order at a time per basket: the alert may have been
+                # confirmed, or the cash spent, while we waited our turn. The
+                # transaction is already open (the reads above), so re-read
+                # with FOR UPDATE — a plain SELECT would return that snapshot.
+                async with order_queue.slot(basket.id):
+                    await session.refresh(alert, with_for_update=True)
+                    await session.refresh(basket, with_for_update=True)
+                    if alert.status != "PENDING":
+                        await query.edit_message_text("Esta alerta ya fue procesada.")
+                        return
+
+                    if alert.signal == "SELL":
+                        pos_result = await session.execute(
+                            select(Position).where(
+                                Position.basket_id == basket.id,
+                                Position.asset_id == asset.id,
+                            ).with_for_update().execution_options(populate_existing=True)
                         )
-                    )
-                    pos = pos_result.scalar_one_or_none()
-                    qty = pos.quantity if pos else Decimal("0")
-                    if qty > 0:
+                        pos = pos_result.scalar_one_or_none()
+                        qty = pos.quantity if pos else Decimal("0")
+                        if qty <= 0:
+                            await query.edit_message_text("Sin posición para vender.")
+                            return
+                    elif alert.signal == "BUY":
+                        qty = (basket.cash * Decimal("0.10") / price).quantize(Decimal("0.01"))
+                        if qty <= 0:
+                            await query.edit_message_text("Cash insuficiente.")
+                            return
+
+                    # committed together with the order, while the alert row is still locked
+                    alert.status = "CONFIRMED"
+                    alert.resolved_at = datetime.utcnow()
+                    if alert.signal == "SELL":
                         await executor.sell(
                             session, basket.id, asset.id, user.id,
                             asset.ticker, qty, price, alert.strategy,
                         )
-                    else:
-                        await query.edit_message_text("Sin posición para vender.")
-                        return
-
-                elif alert.signal == "BUY":
-                    qty = (basket.cash * Decimal("0.10") / price).quantize(Decimal("0.01"))
-                    if qty > 0:
+                    elif alert.signal == "BUY":
                         await executor.buy(
                             session, basket.id, asset.id, user.id,
                             asset.ticker, qty, price, alert.strategy,
                         )
                     else:
-                        await query.edit_message_text("Cash insuficiente.")
-                        return
-
-                alert.status = "CONFIRMED"
-                alert.resolved_at = datetime.utcnow()
-                await session.commit()
+                        await session.commit()
                 ok_msg = f"{alert.signal} {asset.ticker} ejecutado a {price:.2f}"
                 await query.edit_message_text(f"✅ {ok_msg}")
                 await log_command(update, "/alert:confirm", True, ok_msg, f"alert_id={alert_id}")
@@ -134,6 +151,14 @@ async def handle_alert_callback(update: Update, context) -> None:
                 await log_command(update, "/alert:confirm", False, err, f"alert_id={alert_id}")
 
 
+def _scope_name(handler) -> str:
+    """Scope label for a handler's statements: "/compra", "CallbackQueryHandler:handle_alert_callback"."""
+    commands = getattr(handler, "commands", None)
+    if commands:
+        return "/" + min(commands)
+    return f"{type(handler).__name__}:{getattr(handler.callback, '__name__', 'callback')}"
+
+
 async def run() -> None:
     metrics_port = app_config.get("metrics", {}).get("port", 9090)
     start_metrics_server(metrics_port)
@@ -144,6 +169,10 @@ async def run() -> None:
         app.add_handler(handler)
     for handler in order_handlers():
         app.add_handler(handler)
+    for handler in resting_order_handlers():
+        app.add_handler(handler)
+    for handler in price_alert_handlers():
+        app.add_handler(handler)
     for handler in basket_handlers():
         app.add_handler(handler)
     for handler in analysis_handlers():
@@ -152,6 +181,12 @@ async def run() -> None:
         app.add_handler(handler)
     for handler in backtest_handlers():
         app.add_handler(handler)
+    for handler in ranking_handlers():
+        app.add_handler(handler)
+    for handler in rendimiento_handlers():
+        app.add_handler(handler)
+    for handler in fiscal_handlers():
+        app.add_handler(handler)
     for handler in sizing_handlers():
         app.add_handler(handler)
     for handler in search_handlers():
@@ -167,13 +202,40 @@ async def run() -> None:
 
     app.add_handler(CallbackQueryHandler(handle_alert_callback, pattern="^alert:"))
 
+    # statement count / DB time per command (src/db/instrumentation.py)
+    for group in app.handlers.values():
+        for handler in group:
+            handler.callback = with_db_scope(_scope_name(handler), handler.callback)
+
     alert_engine = AlertEngine(telegram_app=app)
     scheduler = AsyncIOScheduler()
     interval = app_config["scheduler"]["interval_minutes"]
-    scheduler.add_job(alert_engine.scan_all_baskets, "interval", minutes=interval)
+    scheduler.add_job(with_db_scope("scan:alerts", alert_engine.scan_all_baskets), "interval", minutes=interval)
+    precompute_cfg = app_config["scheduler"].get("precompute", {})
+    scheduler.add_job(
+        with_db_scope("job:precompute", run_precompute), "cron",
+        day_of_week="mon-fri",
+        hour=precompute_cfg.get("hour", 22),
+        minute=precompute_cfg.get("minute", 0),
+        timezone="UTC",
+    )
+    snapshots_cfg = app_config["scheduler"].get("valuation_snapshots", {})
+    scheduler.add_job(
+        with_db_scope("job:valuation_snapshots", run_valuation_snapshots), "interval",
+        minutes=snapshots_cfg.get("interval_minutes", DEFAULT_INTERVAL_MINUTES),
+        kwargs={"market_hours_only": snapshots_cfg.get("market_hours_only", True)},
+    )
+    resting_cfg = app_config["scheduler"].get("resting_orders", {})
+    scheduler.add_job(
+        with_db_scope("job:resting_orders", run_resting_orders), "interval",
+        minutes=resting_cfg.get("interval_minutes", RESTING_INTERVAL_MINUTES),
+    )
 
     async with app:
         await app.start()
+        await load_trigger_book()
+        await load_price_alerts()
+        audit_buffer.start()
         scheduler.start()
         logger.info(f"ScroogeBot starting — scanning every {interval}min")
         await app.updater.start_polling(drop_pending_updates=True)
@@ -185,3 +247,4 @@ async def run() -> None:
             scheduler.shutdown(wait=False)
             await app.updater.stop()
             await app.stop()
+            await audit_buffer.stop()   # last commands' audit rows
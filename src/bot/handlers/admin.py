@@ -2,21 +2,18 @@ import logging
 from decimal import Decimal
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
-from sqlalchemy import select
+from sqlalchemy import select, union
 
 from src.db.base import async_session_factory
 from sqlalchemy import desc
-from src.db.models import Asset, User, Basket, BasketMember, CommandLog, Watchlist, Position
+from src.db.models import Asset, User, Basket, BasketAsset, BasketMember, CommandLog, Watchlist, Position
+from src.backtest.montecarlo import path_cache
+from src.scheduler.precompute import precomputed
 from src.bot.audit import log_command
+from src.bot.identity import identity_cache
 from src.utils.text import normalize_basket_name
+from src.strategies.registry import STRATEGY_MAP
 
-STRATEGY_MAP = {
-    "stop_loss": None,
-    "ma_crossover": None,
-    "rsi": None,
-    "bollinger": None,
-    "safe_haven": None,
-}
 _STRATEGY_LIST = ", ".join(STRATEGY_MAP.keys())
 
 logger = logging.getLogger(__name__)
@@ -46,6 +43,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if not user.username:
             user.username = tg_user.username
         await session.commit()
+    identity_cache.invalidate_user(tg_user.id)
     await update.message.reply_text(
         f"¡Hola {tg_user.first_name}! 🦆 Soy TioGilito.\n"
         "Usa /valoracion para ver el estado de tus cestas.\n"
@@ -71,10 +69,7 @@ async def cmd_register(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     new_username = context.args[1].lstrip("@")
 
     async with async_session_factory() as session:
-        caller_result = await session.execute(
-            select(User).where(User.tg_id == update.effective_user.id)
-        )
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -126,32 +121,19 @@ async def cmd_adduser(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
 
     async with async_session_factory() as session:
-        basket_result = await session.execute(
-            select(Basket).where(Basket.name_normalized == normalize_basket_name(basket_name), Basket.active == True)
-        )
-        basket = basket_result.scalar_one_or_none()
+        basket = await identity_cache.basket_by_name(session, basket_name)
         if not basket:
             err = f"Cesta '{basket_name}' no encontrada."
             await update.message.reply_text(err)
             await log_command(update, "/adduser", False, err, raw_args)
             return
 
-        caller_result = await session.execute(
-            select(User).where(User.tg_id == update.effective_user.id)
-        )
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
 
-        owner_check = await session.execute(
-            select(BasketMember).where(
-                BasketMember.basket_id == basket.id,
-                BasketMember.user_id == caller.id,
-                BasketMember.role == "OWNER",
-            )
-        )
-        if not owner_check.scalar_one_or_none():
+        if await identity_cache.role(session, basket.id, caller.id) != "OWNER":
             err = "Solo el OWNER puede añadir usuarios."
             await update.message.reply_text(err)
             await log_command(update, "/adduser", False, err, raw_args)
@@ -179,6 +161,7 @@ async def cmd_adduser(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         else:
             session.add(BasketMember(basket_id=basket.id, user_id=target.id, role=role))
         await session.commit()
+        identity_cache.invalidate_role(basket.id, target.id)
         ok_msg = f"@{username} → {role} en '{basket_name}'"
         await update.message.reply_text(f"✅ {ok_msg}.")
         await log_command(update, "/adduser", True, ok_msg, raw_args)
@@ -186,10 +169,7 @@ async def cmd_adduser(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
 async def cmd_watchlist(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     async with async_session_factory() as session:
-        user_result = await session.execute(
-            select(User).where(User.tg_id == update.effective_user.id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = await identity_cache.user(session, update.effective_user.id)
         if not user:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -222,10 +202,7 @@ async def cmd_addwatch(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     name, _, note = rest.partition("|")
 
     async with async_session_factory() as session:
-        user_result = await session.execute(
-            select(User).where(User.tg_id == update.effective_user.id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = await identity_cache.user(session, update.effective_user.id)
         if not user:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -246,10 +223,7 @@ async def cmd_logs(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         n = min(int(context.args[0]), 50)
 
     async with async_session_factory() as session:
-        caller_result = await session.execute(
-            select(User).where(User.tg_id == update.effective_user.id)
-        )
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -314,8 +288,7 @@ async def cmd_estrategia(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     change_mode = new_strategy is not None or new_stop_loss is not None
 
     async with async_session_factory() as session:
-        caller_result = await session.execute(select(User).where(User.tg_id == update.effective_user.id))
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -341,14 +314,7 @@ async def cmd_estrategia(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
             return
 
-        owner_check = await session.execute(
-            select(BasketMember).where(
-                BasketMember.basket_id == basket.id,
-                BasketMember.user_id == caller.id,
-                BasketMember.role == "OWNER",
-            )
-        )
-        if not owner_check.scalar_one_or_none():
+        if await identity_cache.role(session, basket.id, caller.id) != "OWNER":
             await update.message.reply_text("Solo el OWNER puede cambiar la estrategia.")
             return
 
@@ -359,6 +325,16 @@ async def cmd_estrategia(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
         await session.commit()
 
+        # nightly backtest / Monte Carlo results were computed with the old settings
+        tickers = (await session.execute(union(
+            select(Asset.ticker).join(BasketAsset, BasketAsset.asset_id == Asset.id)
+            .where(BasketAsset.basket_id == basket.id, BasketAsset.active == True),
+            select(Asset.ticker).join(Position, Position.asset_id == Asset.id)
+            .where(Position.basket_id == basket.id, Position.quantity > 0),
+        ))).scalars().all()
+        precomputed.evict_basket(basket.id)
+        path_cache.evict(tickers)
+
         changes = []
         if new_strategy:
             changes.append(f"estrategia `{new_strategy}`")
@@ -403,8 +379,7 @@ async def cmd_nuevacesta(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     async with async_session_factory() as session:
-        caller_result = await session.execute(select(User).where(User.tg_id == update.effective_user.id))
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -448,8 +423,7 @@ async def cmd_eliminarcesta(update: Update, context: ContextTypes.DEFAULT_TYPE)
     basket_name = " ".join(context.args)
 
     async with async_session_factory() as session:
-        caller_result = await session.execute(select(User).where(User.tg_id == update.effective_user.id))
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
@@ -462,14 +436,7 @@ async def cmd_eliminarcesta(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text(f"Cesta '{basket_name}' no encontrada.")
             return
 
-        owner_check = await session.execute(
-            select(BasketMember).where(
-                BasketMember.basket_id == basket.id,
-                BasketMember.user_id == caller.id,
-                BasketMember.role == "OWNER",
-            )
-        )
-        if not owner_check.scalar_one_or_none():
+        if await identity_cache.role(session, basket.id, caller.id) != "OWNER":
             await update.message.reply_text("Solo el OWNER puede eliminar una cesta.")
             return
 
@@ -492,6 +459,7 @@ async def cmd_eliminarcesta(update: Update, context: ContextTypes.DEFAULT_TYPE)
         basket.name = f"{basket_name}#{basket.id:x}"
         basket.name_normalized = f"{normalize_basket_name(basket_name)}#{basket.id:x}"
         await session.commit()
+        identity_cache.invalidate_basket(basket.id)
         await update.message.reply_text(f"✅ Cesta `{basket_name}` desactivada.", parse_mode="Markdown")
 
 
@@ -523,10 +491,12 @@ async def cmd_modo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if arg == "avanzado":
             user.advanced_mode = True
             await session.commit()
+            identity_cache.invalidate_user(update.effective_user.id)
             await update.message.reply_text("✅ Modo *avanzado* activado: recibirás alertas técnicas concisas.", parse_mode="Markdown")
         elif arg == "basico":
             user.advanced_mode = False
             await session.commit()
+            identity_cache.invalidate_user(update.effective_user.id)
             await update.message.reply_text("✅ Modo *básico* activado: recibirás alertas con explicación educativa.", parse_mode="Markdown")
         else:
             await update.message.reply_text("Uso: `/modo avanzado` o `/modo basico`", parse_mode="Markdown")
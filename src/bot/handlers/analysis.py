@@ -1,4 +1,5 @@
 import logging
+from decimal import Decimal
 
 import pandas as pd
 import ta.momentum
@@ -7,75 +8,93 @@ from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 
 from src.data.yahoo import YahooDataProvider
+from src.scheduler.precompute import computed_stamp, pop_live_flag, precomputed
 
 logger = logging.getLogger(__name__)
 _provider = YahooDataProvider()
 
 
+def build_analysis_text(ticker: str, price: Decimal, currency: str, data: pd.DataFrame) -> str:
+    """Render the /analiza message from a price and ~3mo of daily OHLCV."""
+    close = data["Close"]
+
+    rsi_series = ta.momentum.RSIIndicator(close=close, window=14).rsi()
+    last_rsi = rsi_series.iloc[-1] if (rsi_series is not None and not rsi_series.empty) else None
+    rsi_val = last_rsi if (last_rsi is not None and pd.notna(last_rsi)) else None
+
+    sma20 = close.rolling(20).mean().iloc[-1]
+    sma50 = close.rolling(50).mean().iloc[-1]
+
+    high = data["High"]
+    low = data["Low"]
+    atr_series = ta.volatility.AverageTrueRange(
+        high=high, low=low, close=close, window=14
+    ).average_true_range()
+    atr_val = atr_series.iloc[-1] if (atr_series is not None and not atr_series.empty and pd.notna(atr_series.iloc[-1])) else None
+    atr_pct = (atr_val / float(price) * 100) if (atr_val is not None and float(price) > 0) else None
+
+    lines = [
+        f"📊 *Análisis: {ticker}*",
+        f"💰 Precio: {price:.2f} {currency}",
+    ]
+
+    if len(close) >= 2:
+        change_1d = (close.iloc[-1] - close.iloc[-2]) / close.iloc[-2] * 100
+        sign = "+" if change_1d >= 0 else ""
+        lines.append(f"📅 Cambio 1d: {sign}{change_1d:.2f}%")
+
+    lines.append("")
+    if pd.notna(sma20):
+        lines.append(f"SMA 20: {sma20:.2f}")
+    if pd.notna(sma50):
+        lines.append(f"SMA 50: {sma50:.2f}")
+    if pd.notna(sma20) and pd.notna(sma50):
+        lines.append(f"Tendencia: {'📈 Alcista' if sma20 > sma50 else '📉 Bajista'}")
+
+    if rsi_val is not None:
+        if rsi_val > 70:
+            rsi_label = "sobrecomprado 🔴"
+        elif rsi_val < 30:
+            rsi_label = "sobrevendido 🟢"
+        else:
+            rsi_label = "neutral ⚪"
+        lines.append(f"RSI (14): {rsi_val:.1f} — {rsi_label}")
+
+    if atr_pct is not None:
+        if atr_pct < 0.8:
+            atr_label = "baja 🟢"
+        elif atr_pct < 2.0:
+            atr_label = "moderada 🟡"
+        else:
+            atr_label = "alta 🔴"
+        lines.append(f"ATR (14): {atr_pct:.1f}% — volatilidad {atr_label}")
+
+    lines.append(f"\n🔍 [Finviz](https://finviz.com/quote.ashx?t={ticker}) · [Yahoo](https://finance.yahoo.com/quote/{ticker})")
+    return "\n".join(lines)
+
+
 async def cmd_analiza(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if not context.args:
-        await update.message.reply_text("Uso: /analiza TICKER")
+    """Usage: /analiza TICKER [live] — `live` skips the post-close precomputed snapshot."""
+    args, live = pop_live_flag(list(context.args) if context.args else [])
+    if not args:
+        await update.message.reply_text("Uso: /analiza TICKER [live]")
         return
-    ticker = context.args[0].upper()
+    ticker = args[0].upper()
+
+    cached = precomputed.analyses.get(ticker)
+    if cached and not live:
+        await update.message.reply_text(
+            f"{cached.value}\n{computed_stamp(cached.computed_at)}",
+            parse_mode="Markdown",
+        )
+        return
+
     msg = await update.message.reply_text(f"⏳ Analizando {ticker}...")
     try:
         price = _provider.get_current_price(ticker)
         ohlcv = _provider.get_historical(ticker, period="3mo", interval="1d")
-        close = ohlcv.data["Close"]
-
-        rsi_series = ta.momentum.RSIIndicator(close=close, window=14).rsi()
-        last_rsi = rsi_series.iloc[-1] if (rsi_series is not None and not rsi_series.empty) else None
-        rsi_val = last_rsi if (last_rsi is not None and pd.notna(last_rsi)) else None
-
-        sma20 = close.rolling(20).mean().iloc[-1]
-        sma50 = close.rolling(50).mean().iloc[-1]
-
-        high = ohlcv.data["High"]
-        low = ohlcv.data["Low"]
-        atr_series = ta.volatility.AverageTrueRange(
-            high=high, low=low, close=close, window=14
-        ).average_true_range()
-        atr_val = atr_series.iloc[-1] if (atr_series is not None and not atr_series.empty and pd.notna(atr_series.iloc[-1])) else None
-        atr_pct = (atr_val / float(price.price) * 100) if (atr_val is not None and float(price.price) > 0) else None
-
-        lines = [
-            f"📊 *Análisis: {ticker}*",
-            f"💰 Precio: {price.price:.2f} {price.currency}",
-        ]
-
-        if len(close) >= 2:
-            change_1d = (close.iloc[-1] - close.iloc[-2]) / close.iloc[-2] * 100
-            sign = "+" if change_1d >= 0 else ""
-            lines.append(f"📅 Cambio 1d: {sign}{change_1d:.2f}%")
-
-        lines.append("")
-        if pd.notna(sma20):
-            lines.append(f"SMA 20: {sma20:.2f}")
-        if pd.notna(sma50):
-            lines.append(f"SMA 50: {sma50:.2f}")
-        if pd.notna(sma20) and pd.notna(sma50):
-            lines.append(f"Tendencia: {'📈 Alcista' if sma20 > sma50 else '📉 Bajista'}")
-
-        if rsi_val is not None:
-            if rsi_val > 70:
-                rsi_label = "sobrecomprado 🔴"
-            elif rsi_val < 30:
-                rsi_label = "sobrevendido 🟢"
-            else:
-                rsi_label = "neutral ⚪"
-            lines.append(f"RSI (14): {rsi_val:.1f} — {rsi_label}")
-
-        if atr_pct is not None:
-            if atr_pct < 0.8:
-                atr_label = "baja 🟢"
-            elif atr_pct < 2.0:
-                atr_label = "moderada 🟡"
-            else:
-                atr_label = "alta 🔴"
-            lines.append(f"ATR (14): {atr_pct:.1f}% — volatilidad {atr_label}")
-
-        lines.append(f"\n🔍 [Finviz](https://finviz.com/quote.ashx?t={ticker}) · [Yahoo](https://finance.yahoo.com/quote/{ticker})")
-        await msg.edit_text("\n".join(lines), parse_mode="Markdown")
+        text = build_analysis_text(ticker, price.price, price.currency, ohlcv.data)
+        await msg.edit_text(text, parse_mode="Markdown")
     except Exception as e:
         await msg.edit_text(f"❌ Error analizando {ticker}: {e}")
 
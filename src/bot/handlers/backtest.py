@@ -8,12 +8,10 @@ from sqlalchemy import select
 from src.db.base import async_session_factory
 from src.db.models import Basket, BasketAsset, Asset, User, Position
 from src.utils.text import normalize_basket_name
-from src.backtest.engine import BacktestEngine, PortfolioBacktestResult
-from src.strategies.stop_loss import StopLossStrategy
-from src.strategies.ma_crossover import MACrossoverStrategy
-from src.strategies.rsi import RSIStrategy
-from src.strategies.bollinger import BollingerStrategy
-from src.strategies.safe_haven import SafeHavenStrategy
+from src.backtest.engine import VALID_PERIODS, BacktestEngine, PortfolioBacktestResult
+from src.backtest.portfolio_sim import ALLOCATIONS
+from src.scheduler.precompute import computed_stamp, pop_live_flag, precomputed
+from src.strategies.registry import STRATEGY_MAP
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +30,6 @@ def _ff(val: float, decimals: int = 2) -> str:
         return "N/A"
     return f"{val:.{decimals}f}"
 
-VALID_PERIODS = {"1mo", "3mo", "6mo", "1y", "2y"}
-
-STRATEGY_MAP = {
-    "stop_loss": StopLossStrategy,
-    "ma_crossover": MACrossoverStrategy,
-    "rsi": RSIStrategy,
-    "bollinger": BollingerStrategy,
-    "safe_haven": SafeHavenStrategy,
-}
-
 
 def _parse_args(args: list[str]) -> tuple[str | None, str]:
     """Parse optional basket name and optional period.
@@ -58,9 +46,81 @@ def _parse_args(args: list[str]) -> tuple[str | None, str]:
     return basket_name, period
 
 
+_REBALANCE_TOKENS = {"semanal": "W", "mensual": "M", "trimestral": "Q"}
+_REBALANCE_LABELS = {v: k for k, v in _REBALANCE_TOKENS.items()}
+
+
+def _pop_sim_options(args: list[str]) -> tuple[list[str], str | None, str | None]:
+    """Strip shared-cash tokens from args. Returns (remaining, allocation, rebalance).
+
+    `equal` / `cash10` select the allocation rule; `semanal` / `mensual` /
+    `trimestral` add periodic rebalancing (implies `equal` if no rule given).
+    """
+    remaining: list[str] = []
+    allocation = rebalance = None
+    for a in args:
+        token = a.lower()
+        if token in ALLOCATIONS:
+            allocation = token
+        elif token in _REBALANCE_TOKENS:
+            rebalance = _REBALANCE_TOKENS[token]
+        else:
+            remaining.append(a)
+    if rebalance and not allocation:
+        allocation = "equal"
+    return remaining, allocation, rebalance
+
+
+def _format_result(
+    basket_name: str,
+    strategy: str,
+    period: str,
+    backtest_result: PortfolioBacktestResult,
+    allocation: str | None = None,
+    rebalance: str | None = None,
+) -> list[str]:
+    alpha_portfolio = backtest_result.total_return_pct - backtest_result.benchmark_return_pct
+    n_assets = len(backtest_result.per_asset)
+
+    lines = [
+        f"📊 *Backtest:* `{basket_name}` ({period})",
+        f"   Estrategia: `{strategy}`",
+        "",
+        f"*CARTERA* ({n_assets} activos)",
+    ]
+    if allocation:
+        sim = f"  Caja compartida: `{allocation}`"
+        if rebalance:
+            sim += f", rebalanceo {_REBALANCE_LABELS[rebalance]}"
+        lines.append(sim)
+    lines += [
+        f"  Rentabilidad: {_fp(backtest_result.total_return_pct)}  (B&H: {_fp(backtest_result.benchmark_return_pct)},  α: {_fp(alpha_portfolio)})",
+        f"  Sharpe: {_ff(backtest_result.sharpe_ratio)}  |  Max DD: {_fp(-backtest_result.max_drawdown_pct)}",
+        f"  Operaciones: {backtest_result.n_trades}",
+        "",
+        "*DESGLOSE*",
+    ]
+
+    for ticker, r in backtest_result.per_asset.items():
+        alpha = r.total_return_pct - r.benchmark_return_pct
+        lines += [
+            f"*{ticker}*",
+            f"  Rentabilidad: {_fp(r.total_return_pct)}  (B&H: {_fp(r.benchmark_return_pct)},  α: {_fp(alpha)})",
+            f"  Sharpe: {_ff(r.sharpe_ratio)}  |  Max DD: {_fp(-r.max_drawdown_pct)}",
+            f"  Operaciones: {r.n_trades}  |  Win rate: {_fp(r.win_rate_pct, 0)}",
+            "",
+        ]
+    return lines
+
+
 async def cmd_backtest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Usage: /backtest [CESTA] [period]  e.g. /backtest CestaAgresiva 1y"""
-    basket_name_arg, period = _parse_args(list(context.args) if context.args else [])
+    """Usage: /backtest [CESTA] [period] [equal|cash10] [semanal|mensual|trimestral] [live]
+
+    e.g. /backtest CestaAgresiva 1y cash10 mensual
+    """
+    args, live = pop_live_flag(list(context.args) if context.args else [])
+    args, allocation, rebalance = _pop_sim_options(args)
+    basket_name_arg, period = _parse_args(args)
 
     async with async_session_factory() as session:
         basket = None
@@ -105,6 +165,13 @@ async def cmd_backtest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             )
             return
 
+        cached = precomputed.backtests.get((basket.id, period))
+        if cached and cached.computed_for(basket) and not live and not allocation:
+            lines = _format_result(basket.name, basket.strategy, period, cached.value)
+            lines.append(computed_stamp(cached.computed_at))
+            await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+            return
+
         strategy = strategy_cls()
         assets_result = await session.execute(
             select(Asset)
@@ -142,38 +209,17 @@ async def cmd_backtest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         sl_pct = float(basket.stop_loss_pct) if basket.stop_loss_pct else None
         try:
             backtest_result: PortfolioBacktestResult = await loop.run_in_executor(
-                None, engine.run, tickers, strategy, basket.strategy, period, sl_pct
+                None, engine.run, tickers, strategy, basket.strategy, period, sl_pct,
+                None, allocation, rebalance,
             )
         except Exception as e:
             logger.error("Backtest error for %s: %s", basket.name, e)
             await msg.edit_text(f"❌ Error en backtest de `{basket.name}`: {e}", parse_mode="Markdown")
             return
 
-        alpha_portfolio = backtest_result.total_return_pct - backtest_result.benchmark_return_pct
-        n_assets = len(backtest_result.per_asset)
-
-        lines = [
-            f"📊 *Backtest:* `{basket.name}` ({period})",
-            f"   Estrategia: `{basket.strategy}`",
-            "",
-            f"*CARTERA* ({n_assets} activos)",
-            f"  Rentabilidad: {_fp(backtest_result.total_return_pct)}  (B&H: {_fp(backtest_result.benchmark_return_pct)},  α: {_fp(alpha_portfolio)})",
-            f"  Sharpe: {_ff(backtest_result.sharpe_ratio)}  |  Max DD: {_fp(-backtest_result.max_drawdown_pct)}",
-            f"  Operaciones: {backtest_result.n_trades}",
-            "",
-            "*DESGLOSE*",
-        ]
-
-        for ticker, r in backtest_result.per_asset.items():
-            alpha = r.total_return_pct - r.benchmark_return_pct
-            lines += [
-                f"*{ticker}*",
-                f"  Rentabilidad: {_fp(r.total_return_pct)}  (B&H: {_fp(r.benchmark_return_pct)},  α: {_fp(alpha)})",
-                f"  Sharpe: {_ff(r.sharpe_ratio)}  |  Max DD: {_fp(-r.max_drawdown_pct)}",
-                f"  Operaciones: {r.n_trades}  |  Win rate: {_fp(r.win_rate_pct, 0)}",
-                "",
-            ]
-
+        lines = _format_result(
+            basket.name, basket.strategy, period, backtest_result, allocation, rebalance,
+        )
         await msg.edit_text("\n".join(lines), parse_mode="Markdown")
 
 
@@ -3,6 +3,7 @@ from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 from sqlalchemy import select
 
+from src.bot.identity import identity_cache
 from src.db.base import async_session_factory
 from src.db.models import Basket, BasketAsset, Asset, BasketMember, Position, User
 from src.utils.text import normalize_basket_name
@@ -120,6 +121,7 @@ async def cmd_sel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
         caller.active_basket_id = basket.id
         await session.commit()
+        identity_cache.invalidate_user(update.effective_user.id)
         await update.message.reply_text(
             f"🗂 Cesta activa: `{basket.name}`",
             parse_mode="Markdown",
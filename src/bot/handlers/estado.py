@@ -4,8 +4,13 @@ from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 
 from prometheus_client import REGISTRY
+from sqlalchemy import select
 
+from src.bot.identity import identity_cache
 from src.config import app_config
+from src.db.base import async_session_factory
+from src.db.instrumentation import statement_text
+from src.db.models import BasketMember
 from src.scheduler.market_hours import is_market_open
 
 logger = logging.getLogger(__name__)
@@ -21,11 +26,99 @@ def _get_float(name: str) -> float:
     return float(v) if v is not None else 0.0
 
 
+def _histogram_totals(metric: str, label: str) -> dict[str, tuple[float, float]]:
+    """{label value: (sum, count)} for a labelled histogram."""
+    totals: dict[str, list[float]] = {}
+    for mf in REGISTRY.collect():
+        if mf.name != metric:
+            continue
+        for sample in mf.samples:
+            if sample.name in (f"{metric}_sum", f"{metric}_count"):
+                pair = totals.setdefault(sample.labels[label], [0.0, 0.0])
+                pair[0 if sample.name.endswith("_sum") else 1] = sample.value
+    return {k: (v[0], v[1]) for k, v in totals.items() if v[1] > 0}
+
+
+def _sql_snippet(fp: str, width: int = 70) -> str:
+    sql = (statement_text(fp) or "?").replace("`", "")
+    return sql if len(sql) <= width else sql[:width - 1] + "…"
+
+
+def _db_report(top: int = 8) -> str:
+    lines = ["🗄 *ScroogeBot — base de datos*", ""]
+
+    statements = _histogram_totals("scroogebot_db_scope_statements", "scope")
+    seconds = _histogram_totals("scroogebot_db_scope_seconds", "scope")
+    if statements:
+        lines.append("*Por comando / tarea* (media por ejecución)")
+        ranked = sorted(statements.items(), key=lambda kv: -kv[1][0] / kv[1][1])
+        for scope, (total, runs) in ranked[:top]:
+            ms = seconds.get(scope, (0.0, runs))[0] / runs * 1000
+            lines.append(f"`{scope}` ×{int(runs)} · {total / runs:.1f} consultas · {ms:.1f} ms")
+    else:
+        lines.append("Sin consultas registradas aún.")
+
+    repeated: list[tuple[str, str, int]] = []
+    for mf in REGISTRY.collect():
+        if mf.name == "scroogebot_db_repeated_statements":
+            for sample in mf.samples:
+                if sample.name == "scroogebot_db_repeated_statements_total" and sample.value > 0:
+                    repeated.append((sample.labels["scope"], sample.labels["fingerprint"], int(sample.value)))
+    if repeated:
+        lines += ["", "🔁 *Consultas repetidas (posible N+1)*"]
+        for scope, fp, runs in sorted(repeated, key=lambda r: -r[2])[:top]:
+            lines.append(f"`{scope}` en {runs} ejecuciones: `{_sql_snippet(fp)}`")
+
+    per_statement = _histogram_totals("scroogebot_db_statement_seconds", "fingerprint")
+    if per_statement:
+        lines += ["", "🐢 *Consultas con más tiempo total*"]
+        for fp, (total, n) in sorted(per_statement.items(), key=lambda kv: -kv[1][0])[:5]:
+            lines.append(f"×{int(n)} · {total / n * 1000:.2f} ms · `{_sql_snippet(fp)}`")
+
+    waits = _histogram_totals("scroogebot_db_pool_wait_seconds", "pool")
+    pools = [
+        (name, REGISTRY.get_sample_value("scroogebot_db_pool_size", {"pool": name}))
+        for name in ("pool", "scheduler_pool")
+    ]
+    pool_lines = []
+    for name, size in pools:
+        if size is None:
+            continue
+        in_use = _get_counter("scroogebot_db_pool_checked_out", {"pool": name})
+        overflow = _get_counter("scroogebot_db_pool_overflow", {"pool": name})
+        total, n = waits.get(name, (0.0, 0.0))
+        wait = f" · espera media {total / n * 1000:.1f} ms" if n else ""
+        pool_lines.append(f"`{name}`: {in_use}/{int(size)} en uso · overflow {overflow}{wait}")
+    if pool_lines:
+        lines += ["", "🔌 *Conexiones*"] + pool_lines
+
+    lines += ["", "_Contadores desde el último arranque._"]
+    return "\n".join(lines)
+
+
+async def _is_owner(tg_id: int) -> bool:
+    async with async_session_factory() as session:
+        caller = await identity_cache.user(session, tg_id)
+        if not caller:
+            return False
+        owner = await session.execute(
+            select(BasketMember.basket_id).where(BasketMember.user_id == caller.id, BasketMember.role == "OWNER")
+        )
+        return owner.first() is not None
+
+
 async def cmd_estado(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Show operational metrics since last bot restart."""
+    """Show operational metrics since last bot restart. `/estado db`: SQL per command (OWNER)."""
     if not update.message:
         return
 
+    if context.args and context.args[0].lower() == "db":
+        if not await _is_owner(update.effective_user.id):
+            await update.message.reply_text("Solo los OWNER pueden ver las métricas de base de datos.")
+            return
+        await update.message.reply_text(_db_report(), parse_mode="Markdown")
+        return
+
     # --- Scans ---
     completed = _get_counter("scroogebot_alert_scans_total", {"result": "completed"})
     skipped   = _get_counter("scroogebot_alert_scans_total", {"result": "skipped_closed"})
@@ -96,7 +189,7 @@ async def cmd_estado(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     else:
         lines.append("📋 Comandos: ninguno aún")
 
-    lines += ["", "_Contadores desde el último arranque._"]
+    lines += ["", "_Contadores desde el último arranque. Consultas SQL: /estado db_"]
 
     await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
 
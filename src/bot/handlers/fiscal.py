@@ -0,0 +1,190 @@
+"""/fiscal — realized gains of a basket for one tax year (FIFO lots).
+
+Answered from `realized_gains` and `tax_lots` only (both indexed by basket
+and date), which `PaperTradingExecutor` keeps up to date on every order.
+Open lots are marked at the prices of the basket's latest valuation snapshot
+(`src/scheduler/valuation.py`), so the unrealized gain per lot needs no quote.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from sqlalchemy import func, select
+
+from src.bot.identity import identity_cache
+from src.db.base import async_session_factory
+from src.db.models import Asset, RealizedGain, TaxLot, ValuationSnapshot
+from src.portfolio.tax_lots import WASH_SALE_WINDOW, savings_tax, wash_sale_flags
+
+logger = logging.getLogger(__name__)
+
+MAX_OPEN_LOTS = 20   # lines listed in the report; the rest are summarised
+
+
+def _fmt(val, decimals=2) -> str:
+    return f"{val:,.{decimals}f}"
+
+
+def _sign(v) -> str:
+    return "+" if v >= 0 else ""
+
+
+def _parse_args(args: list[str]) -> tuple[str | None, int]:
+    """Split `[CESTA ...] [AÑO]` — the year is the last token if it is 4 digits."""
+    if args and args[-1].isdigit() and len(args[-1]) == 4:
+        return (" ".join(args[:-1]) or None), int(args[-1])
+    return (" ".join(args) or None), datetime.now().year
+
+
+def format_open_lots(open_lots: list, marks: dict[str, Decimal], marked_at: datetime | None) -> list[str]:
+    """One line per open lot with its unrealized gain at `marks` (ticker → price)."""
+    when = f" a {marked_at:%d/%m %H:%M}" if marked_at else ""
+    lines = ["", f"📦 *Lotes abiertos* ({len(open_lots)}) — latente{when}"]
+    for lot in open_lots[:MAX_OPEN_LOTS]:
+        sym = "€" if lot.currency == "EUR" else f" {lot.currency}"
+        head = (
+            f"{lot.ticker:<8} {lot.acquired_at:%d/%m/%Y} · {_fmt(lot.remaining, 2)} u "
+            f"@ {_fmt(lot.price)}"
+        )
+        mark = marks.get(lot.ticker)
+        if mark is None:
+            lines.append(f"{head} · sin cotización")
+            continue
+        gain = (mark - lot.price) * lot.remaining
+        lines.append(f"{head} → {_sign(gain)}{_fmt(gain)}{sym}")
+    if len(open_lots) > MAX_OPEN_LOTS:
+        lines.append(f"… y {len(open_lots) - MAX_OPEN_LOTS} lotes más")
+    return lines
+
+
+def format_fiscal(
+    basket_name: str, year: int, per_asset: list, deferred: dict[str, Decimal],
+    open_lots: list, marks: dict[str, Decimal] | None = None, marked_at: datetime | None = None,
+) -> str:
+    lines = [f"🧾 Fiscal `{basket_name}` — {year} (FIFO)", ""]
+    totals: dict[str, Decimal] = {}
+    for r in per_asset:
+        sym = "€" if r.currency == "EUR" else f" {r.currency}"
+        lines.append(
+            f"{r.ticker:<8} {r.n} ventas · {_fmt(r.quantity, 2)} u · "
+            f"{_sign(r.gain)}{_fmt(r.gain)}{sym}"
+        )
+        totals[r.currency] = totals.get(r.currency, Decimal("0")) + r.gain
+    lines += ["", "*Saldo neto de ganancias y pérdidas*"]
+    for currency, total in sorted(totals.items()):
+        sym = "€" if currency == "EUR" else f" {currency}"
+        lines.append(f"  {_sign(total)}{_fmt(total)}{sym}")
+    for currency, amount in sorted(deferred.items()):
+        sym = "€" if currency == "EUR" else f" {currency}"
+        lines.append(
+            f"  ⚠️ {_fmt(-amount)}{sym} en pérdidas con recompra en ±2 meses "
+            "(norma antiaplicación: podrían no computar este año)"
+        )
+    eur = totals.get("EUR", Decimal("0")) - deferred.get("EUR", Decimal("0"))
+    if eur > 0:
+        lines.append(f"  Cuota orientativa base del ahorro: {_fmt(savings_tax(eur))}€ (19–30%)")
+    if open_lots:
+        lines += format_open_lots(open_lots, marks or {}, marked_at)
+    lines += ["", "_Importes en la divisa de cada activo, sin comisiones._"]
+    return "\n".join(lines)
+
+
+async def cmd_fiscal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Usage: /fiscal [CESTA] [AÑO]"""
+    basket_name_arg, year = _parse_args(list(context.args) if context.args else [])
+    year_start, year_end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+    async with async_session_factory() as session:
+        basket = None
+        if basket_name_arg:
+            basket = await identity_cache.basket_by_name(session, basket_name_arg)
+            if not basket:
+                await update.message.reply_text(f"Cesta '{basket_name_arg}' no encontrada.")
+                return
+        else:
+            user = await identity_cache.user(session, update.effective_user.id)
+            if user and user.active_basket_id:
+                basket = await identity_cache.basket_by_id(session, user.active_basket_id)
+            if not basket:
+                await update.message.reply_text(
+                    "No tienes cesta activa. Usa /sel para seleccionar una o "
+                    "indica el nombre: /fiscal Mi_Cesta 2025"
+                )
+                return
+
+        in_year = (
+            RealizedGain.basket_id == basket.id,
+            RealizedGain.sold_at >= year_start,
+            RealizedGain.sold_at < year_end,
+        )
+        per_asset = (await session.execute(
+            select(
+                Asset.ticker, Asset.currency,
+                func.count(RealizedGain.id).label("n"),
+                func.sum(RealizedGain.quantity).label("quantity"),
+                func.sum(RealizedGain.gain).label("gain"),
+            )
+            .join(Asset, Asset.id == RealizedGain.asset_id)
+            .where(*in_year)
+            .group_by(Asset.ticker, Asset.currency)
+            .order_by(Asset.ticker)
+        )).all()
+
+        if not per_asset:
+            await update.message.reply_text(
+                f"`{basket.name}`: sin ventas en {year}.", parse_mode="Markdown",
+            )
+            return
+
+        losses = (await session.execute(
+            select(RealizedGain.asset_id, RealizedGain.lot_id, RealizedGain.sold_at,
+                   RealizedGain.gain, Asset.currency)
+            .join(Asset, Asset.id == RealizedGain.asset_id)
+            .where(*in_year, RealizedGain.gain < 0)
+        )).all()
+        deferred: dict[str, Decimal] = {}
+        if losses:
+            lots = (await session.execute(
+                select(TaxLot.id, TaxLot.asset_id, TaxLot.acquired_at, TaxLot.closed_at).where(
+                    TaxLot.basket_id == basket.id,
+                    TaxLot.asset_id.in_({r.asset_id for r in losses}),
+                    TaxLot.acquired_at >= (year_start - WASH_SALE_WINDOW).to_pydatetime(),
+                    TaxLot.acquired_at < (year_end + WASH_SALE_WINDOW).to_pydatetime(),
+                )
+            )).all()
+            flagged = wash_sale_flags(
+                [(r.asset_id, r.lot_id, r.sold_at) for r in losses], [tuple(l) for l in lots],
+            )
+            for i in flagged:
+                r = losses[i]
+                deferred[r.currency] = deferred.get(r.currency, Decimal("0")) + r.gain
+
+        open_lots = (await session.execute(
+            select(Asset.ticker, Asset.currency, TaxLot.acquired_at, TaxLot.remaining, TaxLot.price)
+            .join(Asset, Asset.id == TaxLot.asset_id)
+            .where(TaxLot.basket_id == basket.id, TaxLot.remaining > 0)
+            .order_by(Asset.ticker, TaxLot.acquired_at)
+        )).all()
+        marks: dict[str, Decimal] = {}
+        marked_at = None
+        if open_lots:
+            snapshot = (await session.execute(
+                select(ValuationSnapshot.taken_at, ValuationSnapshot.positions)
+                .where(ValuationSnapshot.basket_id == basket.id)
+                .order_by(ValuationSnapshot.taken_at.desc())
+                .limit(1)
+            )).first()
+            if snapshot:
+                marked_at = snapshot.taken_at
+                marks = {p["ticker"]: Decimal(str(p["price"])) for p in snapshot.positions or []}
+
+    await update.message.reply_text(
+        format_fiscal(basket.name, year, per_asset, deferred, open_lots, marks, marked_at),
+        parse_mode="Markdown",
+    )
+
+
+def get_handlers():
+    return [CommandHandler("fiscal", cmd_fiscal)]
@@ -16,11 +16,16 @@ COMMAND_LIST = [
     ("__header__", "", "💼 *Portfolio*"),
     ("valoracion", "[nombre\\_cesta]", "Valor actual de las cestas"),
     ("historial", "", "Últimas 10 órdenes por cesta"),
+    ("rendimiento", "[cesta] [1w|1mo|3mo|6mo|1y|max]", "Evolución del valor de la cesta (histórico guardado)"),
+    ("fiscal", "[cesta] [año]", "Ganancias y pérdidas realizadas del año (FIFO)"),
 
     # --- Órdenes ---
     ("__header__", "", "📈 *Órdenes*"),
     ("compra", "TICKER cantidad", "Comprar acciones (paper trading)"),
     ("vende", "TICKER cantidad", "Vender acciones (paper trading)"),
+    ("orden", "compra|vende TICKER cant limite|stop|stoplimit PRECIO", "Orden límite / stop / stop-límite"),
+    ("ordenes", "[@cesta]", "Órdenes pendientes de la cesta"),
+    ("cancelaorden", "ID", "Cancelar una orden pendiente"),
 
     # --- Cestas ---
     ("__header__", "", "🗂 *Cestas*"),
@@ -29,13 +34,16 @@ COMMAND_LIST = [
 
     # --- Análisis ---
     ("__header__", "", "🔍 *Análisis*"),
-    ("analiza", "TICKER", "RSI, SMA y tendencia"),
+    ("analiza", "TICKER [live]", "RSI, SMA y tendencia"),
     ("buscar", "nombre|ticker", "Buscar activos en cestas y Yahoo Finance"),
+    ("avisame", "[TICKER >|< PRECIO]", "Aviso cuando un precio cruce un umbral (sin args: lista)"),
+    ("quitaraviso", "ID", "Eliminar un aviso de precio"),
 
     # --- Estrategias ---
     ("__header__", "", "📊 *Estrategias*"),
-    ("backtest", "[periodo]", "Backtest de estrategia (1mo/3mo/6mo/1y/2y)"),
-    ("montecarlo", "CESTA [sims] [dias]", "Simulación Monte Carlo"),
+    ("backtest", "[cesta] [periodo] [equal|cash10] [mensual] [live]", "Backtest de estrategia (1mo/3mo/6mo/1y/2y), con caja compartida opcional"),
+    ("montecarlo", "CESTA [sims|auto] [dias] [cartera] [sobol|antitetico|estratificado] [bloques|garch] [seed=N] [sl=5,10] [live]", "Simulación Monte Carlo (cartera: bootstrap conjunto de la cesta)"),
+    ("ranking", "[periodo]", "Comparar todas las cestas con universo fijo en una tabla"),
 
     # --- Sizing ---
     ("__header__", "", "📐 *Sizing*"),
@@ -50,7 +58,7 @@ COMMAND_LIST = [
 
     # --- Admin ---
     ("__header__", "", "🛠 *Admin*"),
-    ("estado", "", "Estado del bot: escaneos, alertas, mercados (desde arranque)"),
+    ("estado", "[db]", "Estado del bot: escaneos, alertas, mercados; `db`: consultas SQL por comando (OWNER)"),
     ("register", "tg\\_id username", "Pre-registrar usuario (OWNER)"),
     ("adduser", "@user ROL cesta", "Añadir usuario a cesta (OWNER)"),
     ("watchlist", "", "Ver tu watchlist personal"),
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import logging
 
 from telegram import Update
@@ -9,28 +10,121 @@ from src.db.base import async_session_factory
 from src.db.models import Basket, BasketAsset, Asset, Position
 from src.utils.text import normalize_basket_name
 from src.data.yahoo import YahooDataProvider
-from src.backtest.montecarlo import MonteCarloAnalyzer, AssetMonteCarloResult, _profile_line
-from src.strategies.stop_loss import StopLossStrategy
-from src.strategies.ma_crossover import MACrossoverStrategy
-from src.strategies.rsi import RSIStrategy
-from src.strategies.bollinger import BollingerStrategy
-from src.strategies.safe_haven import SafeHavenStrategy
+from src.backtest.montecarlo import (
+    AUTO_MAX_SIMS, DEFAULT_HORIZON, DEFAULT_N_SIMS, HIST_PERIOD, MonteCarloAnalyzer,
+    AssetMonteCarloResult, PortfolioMonteCarloResult, _profile_line, path_cache,
+)
+from src.data.bar_store import STORE_PERIOD, bar_store
+from src.scheduler.precompute import computed_stamp, pop_live_flag, precomputed
+from src.strategies.registry import STRATEGY_MAP
 
 import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
-STRATEGY_MAP = {
-    "stop_loss": StopLossStrategy,
-    "ma_crossover": MACrossoverStrategy,
-    "rsi": RSIStrategy,
-    "bollinger": BollingerStrategy,
-    "safe_haven": SafeHavenStrategy,
-}
-
 _sign = lambda v: "+" if v >= 0 else ""
 
 
+def _fallback_line(r: AssetMonteCarloResult) -> list[str]:
+    return [f"  Generador: {r.generator_fallback}→iid (datos insuficientes)"] if r.generator_fallback else []
+
+PORTFOLIO_FLAG = "cartera"
+AUTO_FLAG = "auto"
+_SAMPLER_TOKENS = {
+    "antitetico": "antithetic",
+    "antitético": "antithetic",
+    "estratificado": "stratified",
+    "sobol": "sobol",
+}
+_GENERATOR_TOKENS = {"bloques": "block", "garch": "garch"}
+
+
+def _pop_portfolio_flag(args: list[str]) -> tuple[list[str], bool]:
+    """Strip a `cartera` token from args. Returns (remaining_args, portfolio_mode)."""
+    remaining = [a for a in args if a.lower() != PORTFOLIO_FLAG]
+    return remaining, len(remaining) != len(args)
+
+
+def _pop_auto_flag(args: list[str]) -> tuple[list[str], bool]:
+    """Strip an `auto` token from args. Returns (remaining_args, adaptive_mode)."""
+    remaining = [a for a in args if a.lower() != AUTO_FLAG]
+    return remaining, len(remaining) != len(args)
+
+
+def _pop_sampler(args: list[str]) -> tuple[list[str], str]:
+    """Strip a sampler token (antitetico/estratificado/sobol). Returns (remaining, sampler)."""
+    remaining: list[str] = []
+    sampler = "iid"
+    for a in args:
+        if a.lower() in _SAMPLER_TOKENS:
+            sampler = _SAMPLER_TOKENS[a.lower()]
+        else:
+            remaining.append(a)
+    return remaining, sampler
+
+
+def _pop_generator(args: list[str]) -> tuple[list[str], str]:
+    """Strip a path-generator token (bloques/garch). Returns (remaining, generator)."""
+    remaining: list[str] = []
+    generator = "iid"
+    for a in args:
+        if a.lower() in _GENERATOR_TOKENS:
+            generator = _GENERATOR_TOKENS[a.lower()]
+        else:
+            remaining.append(a)
+    return remaining, generator
+
+
+def _pop_seed(args: list[str]) -> tuple[list[str], int | None]:
+    """Strip a `seed=N` token. Reusing a seed reuses the same synthetic paths."""
+    remaining: list[str] = []
+    seed = None
+    for a in args:
+        key, _, value = a.partition("=")
+        if key.lower() == "seed" and value.isdigit():
+            seed = int(value)
+        else:
+            remaining.append(a)
+    return remaining, seed
+
+
+def _pop_sl_sweep(args: list[str]) -> tuple[list[str], list[float | None] | None]:
+    """Strip an `sl=5,10,15` token (0 = sin stop-loss). Returns (remaining, levels)."""
+    remaining: list[str] = []
+    levels = None
+    for a in args:
+        key, _, value = a.partition("=")
+        if key.lower() == "sl" and value:
+            try:
+                parsed = [float(v.replace("%", "")) for v in value.split(",") if v]
+            except ValueError:
+                remaining.append(a)
+                continue
+            levels = [v if v > 0 else None for v in parsed]
+        else:
+            remaining.append(a)
+    return remaining, levels
+
+
+def _load_history(data_provider: YahooDataProvider, ticker: str) -> pd.DataFrame:
+    """2y of daily bars — from the nightly bar store when available, else Yahoo."""
+    stored = bar_store.get(ticker, STORE_PERIOD)
+    if stored is not None:
+        return stored.data
+    return data_provider.get_historical(ticker, period=HIST_PERIOD, interval="1d").data
+
+
+def _parse_auto_args(args: list[str]) -> tuple[str, int]:
+    """Adaptive mode: the number of sims is chosen by convergence, so a single
+    trailing int is the HORIZONTE. Rest is basket name."""
+    parts = list(args)
+    horizon = DEFAULT_HORIZON
+    if parts and parts[-1].isdigit():
+        horizon = min(int(parts.pop()), 365)
+    return " ".join(parts), horizon
+
+
 def _parse_args(args: list[str]) -> tuple[str, int, int]:
     """Parse: trailing ints (in order) are N_SIMS then HORIZONTE. Rest is basket name."""
     parts = list(args)
@@ -39,8 +133,8 @@ def _parse_args(args: list[str]) -> tuple[str, int, int]:
     while parts and parts[-1].isdigit():
         numerics.insert(0, int(parts.pop()))
 
-    n_sims = min(numerics[0], 500) if len(numerics) >= 1 else 100
-    horizon = min(numerics[1], 365) if len(numerics) >= 2 else 90
+    n_sims = min(numerics[0], 500) if len(numerics) >= 1 else DEFAULT_N_SIMS
+    horizon = min(numerics[1], 365) if len(numerics) >= 2 else DEFAULT_HORIZON
     basket_name = " ".join(parts)
     return basket_name, n_sims, horizon
 
@@ -51,14 +145,19 @@ class MonteCarloFormatter:
         basket_name: str,
         strategy: str,
         n_assets: int,
-        n_sims: int,
+        n_sims: int | str,
         horizon: int,
         seed: int,
+        sampler: str = "iid",
+        generator: str = "iid",
     ) -> str:
+        sampling = f" | Muestreo: `{sampler}`" if sampler != "iid" else ""
+        if generator != "iid":
+            sampling += f" | Generador: `{generator}`"
         return (
             f"🎲 *Monte Carlo —* `{basket_name}` "
             f"({n_sims} sims, {horizon} días, seed: {seed})\n"
-            f"   Estrategia: `{strategy}` | Activos: {n_assets}\n"
+            f"   Estrategia: `{strategy}` | Activos: {n_assets}{sampling}\n"
         )
 
     def format_asset(self, r: AssetMonteCarloResult) -> str:
@@ -74,11 +173,69 @@ class MonteCarloFormatter:
             f"    Max DD mediano: {r.max_dd_median:.1f}%  |  Max DD peor (5%): {r.max_dd_p95:.1f}%",
             f"  Calidad",
             f"    Sharpe mediano: {r.sharpe_median:.2f}  |  Win rate mediano: {r.win_rate_median:.0f}%",
+        ]
+        if r.se_median is not None:
+            status = "convergido" if r.converged else "límite de tiempo/sims"
+            lines.append(
+                f"  Precisión ({r.n_simulations} sims, {status})\n"
+                f"    ±{r.se_median:.2f}pp mediana  |  ±{r.se_var_95:.2f}pp VaR  |  "
+                f"±{r.se_prob_loss*100:.1f}pp prob. pérdida"
+            )
+        lines += _fallback_line(r)
+        lines += [
+            f"  {_profile_line(r)}",
+            "",
+        ]
+        return "\n".join(lines)
+
+    def format_sl_sweep(
+        self, ticker: str, results: list[tuple[float | None, AssetMonteCarloResult]],
+    ) -> str:
+        """One row per stop-loss level — all levels ran on the same paths."""
+        s = _sign
+        lines = [
+            f"*{ticker}* — comparativa de stop-loss (mismas trayectorias)",
+            "```",
+            f"{'SL':>5} {'Mediana':>8} {'VaR95':>7} {'CVaR95':>7} {'DD p95':>7} {'P.pérd':>6}",
+        ]
+        for sl, r in results:
+            label = f"{sl:g}%" if sl else "—"
+            lines.append(
+                f"{label:>5} {s(r.return_median)}{r.return_median:>6.1f}% "
+                f"{r.var_95:>6.1f}% {r.cvar_95:>6.1f}% {r.max_dd_p95:>6.1f}% "
+                f"{r.prob_loss*100:>5.0f}%"
+            )
+        lines.append("```")
+        lines += _fallback_line(results[0][1])
+        lines.append("")
+        return "\n".join(lines)
+
+    def format_portfolio(self, r: PortfolioMonteCarloResult) -> str:
+        s = _sign
+        weights = "  ".join(f"{t} {w*100:.0f}%" for t, w in zip(r.tickers, r.weights))
+        lines = [
+            f"*CARTERA* (bootstrap conjunto, bloques de {r.block} días)",
+            f"  Pesos: {weights}",
+            "  Rentabilidad",
+            f"    Mediana:          {s(r.return_median)}{r.return_median:.1f}%",
+            f"    Rango 80%:        {s(r.return_p10)}{r.return_p10:.1f}% a {s(r.return_p90)}{r.return_p90:.1f}%",
+            f"    Peor caso (5%):   {s(r.return_p05)}{r.return_p05:.1f}%  |  Prob. pérdida: {r.prob_loss*100:.0f}%",
+            "  Riesgo",
+            f"    VaR 95%: {s(r.var_95)}{r.var_95:.1f}%  |  CVaR 95%: {s(r.cvar_95)}{r.cvar_95:.1f}%",
+            f"    Max DD mediano: {r.max_dd_median:.1f}%  |  Max DD peor (5%): {r.max_dd_p95:.1f}%",
+            "  Calidad",
+            f"    Sharpe mediano: {r.sharpe_median:.2f}",
             f"  {_profile_line(r)}",
             "",
         ]
         return "\n".join(lines)
 
+    def format_portfolio_footer(self) -> str:
+        return (
+            "_Cartera mantenida con los pesos actuales, sin señales de la estrategia._\n"
+            "_Se remuestrean fechas completas: las correlaciones históricas se conservan._"
+        )
+
     def format_footer(self) -> str:
         return (
             "⚠️ _Correlaciones entre activos no modeladas — el riesgo real puede ser mayor._\n"
@@ -86,31 +243,131 @@ class MonteCarloFormatter:
         )
 
 
+async def _reply_precomputed(update: Update, fmt: MonteCarloFormatter, basket, cached) -> None:
+    snap = cached.value
+    header = fmt.format_header(
+        basket_name=basket.name,
+        strategy=basket.strategy,
+        n_assets=len(snap.results) + len(snap.errors),
+        n_sims=snap.n_sims,
+        horizon=snap.horizon,
+        seed=snap.seed,
+    )
+    await update.message.reply_text(
+        f"{header}{computed_stamp(cached.computed_at)}", parse_mode="Markdown"
+    )
+    for r in snap.results:
+        await update.message.reply_text(fmt.format_asset(r), parse_mode="Markdown")
+    for ticker, err in snap.errors.items():
+        await update.message.reply_text(f"❌ {ticker}: {err}")
+    await update.message.reply_text(fmt.format_footer(), parse_mode="Markdown")
+
+
+async def _run_portfolio_mode(
+    update: Update, session, basket, assets, n_sims: int, horizon: int, seed: int,
+    rng: np.random.Generator, data_provider: YahooDataProvider,
+    analyzer: MonteCarloAnalyzer, fmt: MonteCarloFormatter,
+) -> None:
+    """Basket-level Monte Carlo: one joint bootstrap over the aligned close matrix."""
+    loop = asyncio.get_running_loop()
+    closes: dict[str, pd.Series] = {}
+    for asset in assets:
+        try:
+            hist = await loop.run_in_executor(None, _load_history, data_provider, asset.ticker)
+            closes[asset.ticker] = hist["Close"]
+        except Exception as e:
+            logger.error("Monte Carlo data error %s: %s", asset.ticker, e)
+            await update.message.reply_text(f"❌ {asset.ticker}: {e}")
+    close_df = pd.concat(closes, axis=1).ffill().dropna() if closes else pd.DataFrame()
+    if close_df.empty:
+        await update.message.reply_text("❌ Sin histórico común para simular la cartera.")
+        return
+
+    # Weight by current position value when the basket holds anything, else equal
+    held = (await session.execute(
+        select(Asset.ticker, Position.quantity)
+        .join(Position, Position.asset_id == Asset.id)
+        .where(Position.basket_id == basket.id, Position.quantity > 0)
+    )).all()
+    last = close_df.iloc[-1]
+    weights = {t: float(q) * float(last[t]) for t, q in held if t in last.index} or None
+
+    try:
+        mc_result = await loop.run_in_executor(
+            None, analyzer.run_portfolio, close_df, n_sims, horizon, rng, seed, weights,
+        )
+    except Exception as e:
+        logger.error("Portfolio Monte Carlo error %s: %s", basket.name, e)
+        await update.message.reply_text(f"❌ Error en Monte Carlo de cartera: {e}")
+        return
+
+    header = fmt.format_header(
+        basket_name=basket.name,
+        strategy=basket.strategy,
+        n_assets=len(close_df.columns),
+        n_sims=n_sims,
+        horizon=horizon,
+        seed=seed,
+    )
+    await update.message.reply_text(header, parse_mode="Markdown")
+    await update.message.reply_text(fmt.format_portfolio(mc_result), parse_mode="Markdown")
+    await update.message.reply_text(fmt.format_portfolio_footer(), parse_mode="Markdown")
+
+
 async def cmd_montecarlo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Usage: /montecarlo CESTA [N_SIMS] [HORIZONTE]"""
-    if not context.args:
+    """Usage: /montecarlo CESTA [N_SIMS] [HORIZONTE] [cartera] [live]
+              /montecarlo CESTA auto [HORIZONTE]
+       Optional sampler token: antitetico | estratificado | sobol
+       Optional generator token: bloques | garch
+       Optional `seed=N` (same paths as an earlier run) and `sl=5,10,15`
+       (compare stop-loss levels on identical paths)"""
+    args, live = pop_live_flag(list(context.args) if context.args else [])
+    args, portfolio_mode = _pop_portfolio_flag(args)
+    args, adaptive = _pop_auto_flag(args)
+    args, sampler = _pop_sampler(args)
+    args, generator = _pop_generator(args)
+    args, fixed_seed = _pop_seed(args)
+    args, sl_levels = _pop_sl_sweep(args)
+    if sampler != "iid" and generator != "iid":
         await update.message.reply_text(
-            "Uso: `/montecarlo Nombre Cesta [simulaciones] [horizonte_días]`\n"
+            "El muestreo antitético/estratificado/sobol solo se combina con el bootstrap i.i.d."
+        )
+        return
+    if portfolio_mode and (adaptive or sampler != "iid" or generator != "iid" or sl_levels):
+        # run_portfolio has its own joint block bootstrap and no strategy to stop out
+        await update.message.reply_text(
+            f"El modo `{PORTFOLIO_FLAG}` usa su propio bootstrap conjunto por bloques: "
+            f"no admite `{AUTO_FLAG}`, muestreo, generador ni `sl=`.",
+            parse_mode="Markdown",
+        )
+        return
+    if not args:
+        await update.message.reply_text(
+            "Uso: `/montecarlo Nombre Cesta [simulaciones] [horizonte_días] [cartera] [live]`\n"
             "Ejemplo: `/montecarlo Cesta Agresiva 100 90`",
             parse_mode="Markdown",
         )
         return
 
-    basket_name, n_sims, horizon = _parse_args(list(context.args))
+    if adaptive:
+        basket_name, horizon = _parse_auto_args(args)
+        n_sims = AUTO_MAX_SIMS
+    else:
+        basket_name, n_sims, horizon = _parse_args(args)
     if not basket_name:
         await update.message.reply_text("Indica el nombre de la cesta.")
         return
 
-    seed = int(np.random.default_rng().integers(0, 99_999))
+    seed = fixed_seed if fixed_seed is not None else int(np.random.default_rng().integers(0, 99_999))
     rng = np.random.default_rng(seed)
 
     msg = await update.message.reply_text(
-        f"⏳ Monte Carlo en curso ({n_sims} simulaciones, {horizon} días)..."
+        f"⏳ Monte Carlo en curso ({AUTO_FLAG if adaptive else n_sims} simulaciones, {horizon} días)..."
         f"\nEsto puede tardar un momento."
     )
 
     data_provider = YahooDataProvider()
-    analyzer = MonteCarloAnalyzer()
+    analyzer = MonteCarloAnalyzer(path_cache=path_cache)
     fmt = MonteCarloFormatter()
 
     async with async_session_factory() as session:
@@ -132,6 +389,18 @@ async def cmd_montecarlo(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
             return
 
+        cached = precomputed.montecarlo.get(basket.id)
+        if (
+            cached and cached.computed_for(basket)
+            and not live and not portfolio_mode and not adaptive
+            and sampler == "iid" and generator == "iid"
+            and fixed_seed is None and sl_levels is None
+            and cached.value.n_sims >= n_sims and cached.value.horizon == horizon
+        ):
+            await msg.delete()
+            await _reply_precomputed(update, fmt, basket, cached)
+            return
+
         strategy = strategy_cls()
 
         assets_result = await session.execute(
@@ -156,33 +425,66 @@ async def cmd_montecarlo(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await update.message.reply_text(f"Cesta '{basket_name}' sin activos activos.")
             return
 
+        if portfolio_mode:
+            await _run_portfolio_mode(
+                update, session, basket, assets, n_sims, horizon, seed, rng,
+                data_provider, analyzer, fmt,
+            )
+            await msg.delete()
+            return
+
         header = fmt.format_header(
             basket_name=basket.name,
             strategy=basket.strategy,
             n_assets=len(assets),
-            n_sims=n_sims,
+            n_sims=AUTO_FLAG if adaptive else n_sims,
             horizon=horizon,
             seed=seed,
+            sampler=sampler,
+            generator=generator,
         )
         await update.message.reply_text(header, parse_mode="Markdown")
 
         loop = asyncio.get_event_loop()
+        basket_sl = float(basket.stop_loss_pct) if basket.stop_loss_pct else None
         for asset in assets:
             try:
-                ohlcv = await loop.run_in_executor(
-                    None,
-                    lambda t=asset.ticker: data_provider.get_historical(t, period="2y", interval="1d"),
-                )
-                sl_pct = float(basket.stop_loss_pct) if basket.stop_loss_pct else None
-                mc_result = await loop.run_in_executor(
-                    None,
-                    analyzer.run_asset,
-                    asset.ticker, strategy, basket.strategy,
-                    ohlcv.data, n_sims, horizon, rng, seed, sl_pct,
-                )
-                await update.message.reply_text(
-                    fmt.format_asset(mc_result), parse_mode="Markdown"
+                hist = await loop.run_in_executor(
+                    None, _load_history, data_provider, asset.ticker,
                 )
+                if adaptive:
+                    mc_result = await loop.run_in_executor(
+                        None,
+                        functools.partial(
+                            analyzer.run_asset_adaptive, sampler=sampler, generator=generator,
+                        ),
+                        asset.ticker, strategy, basket.strategy,
+                        hist, horizon, rng, seed, basket_sl,
+                    )
+                    text = fmt.format_asset(mc_result)
+                elif sl_levels:
+                    # One pass over the paths: the strategy's signals are
+                    # computed once and only the stop-loss changes per level
+                    sweep = await loop.run_in_executor(
+                        None,
+                        functools.partial(
+                            analyzer.run_asset_sl_sweep, sampler=sampler, generator=generator,
+                        ),
+                        asset.ticker, strategy, basket.strategy,
+                        hist, n_sims, horizon, rng, seed, sl_levels,
+                    )
+                    text = fmt.format_sl_sweep(asset.ticker, sweep)
+                else:
+                    mc_result = await loop.run_in_executor(
+                        None,
+                        functools.partial(
+                            analyzer.run_asset, sampler=sampler, generator=generator,
+                        ),
+                        asset.ticker, strategy, basket.strategy,
+                        hist, n_sims, horizon, rng, seed, basket_sl,
+                    )
+                    text = fmt.format_asset(mc_result)
+                await update.message.reply_text(text, parse_mode="Markdown")
             except Exception as e:
                 logger.error("Monte Carlo error %s: %s", asset.ticker, e)
                 await update.message.reply_text(f"❌ {asset.ticker}: {e}")
@@ -6,11 +6,13 @@ from telegram.ext import ContextTypes, CommandHandler
 from sqlalchemy import select
 
 from src.db.base import async_session_factory
-from src.db.models import Asset, Basket, BasketMember, Position, User
+from src.db.models import Asset, Position
 from src.data.yahoo import YahooDataProvider
+from src.orders.base import OrderRequest
 from src.orders.paper import PaperTradingExecutor
+from src.orders.queue import order_queue
 from src.bot.audit import log_command
-from src.utils.text import normalize_basket_name
+from src.bot.identity import identity_cache
 
 logger = logging.getLogger(__name__)
 _provider = YahooDataProvider()
@@ -73,8 +75,7 @@ async def _handle_order(update: Update, context, order_type: str) -> None:
 
     async with async_session_factory() as session:
         # Resolve caller
-        caller_result = await session.execute(select(User).where(User.tg_id == update.effective_user.id))
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
 
         # Resolve asset — auto-create if ticker is valid but not yet in DB
         asset_result = await session.execute(select(Asset).where(Asset.ticker == ticker))
@@ -92,10 +93,7 @@ async def _handle_order(update: Update, context, order_type: str) -> None:
 
         # Resolve basket
         if basket_override:
-            basket_result = await session.execute(
-                select(Basket).where(Basket.name_normalized == normalize_basket_name(basket_override), Basket.active == True)
-            )
-            basket = basket_result.scalar_one_or_none()
+            basket = await identity_cache.basket_by_name(session, basket_override)
             if not basket:
                 err = f"Cesta '@{basket_override}' no encontrada."
                 await update.message.reply_text(err)
@@ -108,10 +106,7 @@ async def _handle_order(update: Update, context, order_type: str) -> None:
                     parse_mode="Markdown",
                 )
                 return
-            basket_result = await session.execute(
-                select(Basket).where(Basket.id == caller.active_basket_id, Basket.active == True)
-            )
-            basket = basket_result.scalar_one_or_none()
+            basket = await identity_cache.basket_by_id(session, caller.active_basket_id)
             if not basket:
                 await update.message.reply_text(
                     "🗂 La cesta seleccionada ya no está activa. Usa `/sel <nombre>` para elegir otra.",
@@ -121,10 +116,11 @@ async def _handle_order(update: Update, context, order_type: str) -> None:
 
         user_id = caller.id if caller else 0
         try:
-            if order_type == "BUY":
-                await _executor.buy(session, basket.id, asset.id, user_id, ticker, quantity, price_obj.price)
-            else:
-                await _executor.sell(session, basket.id, asset.id, user_id, ticker, quantity, price_obj.price)
+            async with order_queue.slot(basket.id):
+                if order_type == "BUY":
+                    await _executor.buy(session, basket.id, asset.id, user_id, ticker, quantity, price_obj.price)
+                else:
+                    await _executor.sell(session, basket.id, asset.id, user_id, ticker, quantity, price_obj.price)
 
             verb = "Compra" if order_type == "BUY" else "Venta"
             ok_msg = (
@@ -150,28 +146,17 @@ async def cmd_liquidarcesta(update: Update, context: ContextTypes.DEFAULT_TYPE)
     basket_name = " ".join(context.args)
 
     async with async_session_factory() as session:
-        caller_result = await session.execute(select(User).where(User.tg_id == update.effective_user.id))
-        caller = caller_result.scalar_one_or_none()
+        caller = await identity_cache.user(session, update.effective_user.id)
         if not caller:
             await update.message.reply_text("Usa /start primero.")
             return
 
-        basket_result = await session.execute(
-            select(Basket).where(Basket.name_normalized == normalize_basket_name(basket_name), Basket.active == True)
-        )
-        basket = basket_result.scalar_one_or_none()
+        basket = await identity_cache.basket_by_name(session, basket_name)
         if not basket:
             await update.message.reply_text(f"Cesta '{basket_name}' no encontrada.")
             return
 
-        owner_check = await session.execute(
-            select(BasketMember).where(
-                BasketMember.basket_id == basket.id,
-                BasketMember.user_id == caller.id,
-                BasketMember.role == "OWNER",
-            )
-        )
-        if not owner_check.scalar_one_or_none():
+        if await identity_cache.role(session, basket.id, caller.id) != "OWNER":
             await update.message.reply_text("Solo el OWNER puede liquidar una cesta.")
             return
 
@@ -185,6 +170,7 @@ async def cmd_liquidarcesta(update: Update, context: ContextTypes.DEFAULT_TYPE)
             {
                 "asset_id": asset.id,
                 "ticker": asset.ticker,
+                "currency": asset.currency,
                 "quantity": pos.quantity,
                 "avg_price": pos.avg_price,
             }
@@ -198,28 +184,45 @@ async def cmd_liquidarcesta(update: Update, context: ContextTypes.DEFAULT_TYPE)
             return
 
         lines = [f"💰 *Liquidación:* `{basket_name}`\n"]
-        total_recovered = Decimal("0")
 
-        for item in positions_data:
-            ticker = item["ticker"]
-            try:
-                price_obj = _provider.get_current_price(ticker)
-                await _executor.sell(
-                    session, basket.id, item["asset_id"], caller.id,
-                    ticker, item["quantity"], price_obj.price,
-                    triggered_by="MANUAL",
-                )
-                recovered = item["quantity"] * price_obj.price
-                total_recovered += recovered
-                pct = (price_obj.price - item["avg_price"]) / item["avg_price"] * 100
-                sign = "+" if pct >= 0 else ""
-                lines.append(
-                    f"✅ *{ticker}*: {item['quantity']} × {price_obj.price:.2f}"
-                    f"  ({sign}{pct:.1f}% vs entrada {item['avg_price']:.2f})"
-                )
-            except Exception as e:
-                logger.error("Liquidation error %s/%s: %s", basket_name, ticker, e)
-                lines.append(f"❌ *{ticker}*: {e}")
+        # One batched quote for every ticker, then one transaction for all sales
+        prices = _provider.get_current_prices(
+            [item["ticker"] for item in positions_data],
+            {item["ticker"]: item["currency"] for item in positions_data},
+        )
+        # All or nothing: a partial liquidation would leave the basket half sold
+        unpriced = [item["ticker"] for item in positions_data if item["ticker"] not in prices]
+        if unpriced:
+            lines.append(
+                f"❌ Liquidación cancelada, no se ha vendido nada: sin cotización de "
+                f"{', '.join(unpriced)}. Inténtalo de nuevo más tarde."
+            )
+            await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+            return
+
+        requests = [
+            OrderRequest(item["asset_id"], item["ticker"], item["quantity"], prices[item["ticker"]].price)
+            for item in positions_data
+        ]
+        try:
+            async with order_queue.slot(basket.id):
+                await _executor.sell_many(session, basket.id, caller.id, requests, triggered_by="MANUAL")
+        except Exception as e:
+            await session.rollback()
+            logger.error("Liquidation error %s: %s", basket_name, e)
+            lines.append(f"❌ Liquidación cancelada, no se ha vendido nada: {e}")
+            await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+            return
+
+        total_recovered = Decimal("0")
+        for item, req in zip(positions_data, requests):
+            total_recovered += item["quantity"] * req.price
+            pct = (req.price - item["avg_price"]) / item["avg_price"] * 100
+            sign = "+" if pct >= 0 else ""
+            lines.append(
+                f"✅ *{item['ticker']}*: {item['quantity']} × {req.price:.2f}"
+                f"  ({sign}{pct:.1f}% vs entrada {item['avg_price']:.2f})"
+            )
 
         lines.append(f"\n💵 Cash recuperado: {total_recovered:.2f}")
         await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 
@@ -23,6 +24,43 @@ def _arrow(pnl) -> str:
     return "📈" if pnl >= 0 else "📉"
 
 
+def _format_valuation(val) -> str:
+    tickers = ",".join(p.ticker for p in val.positions)
+    finviz_url = f"https://finviz.com/screener.ashx?v=111&t={tickers}" if tickers else ""
+    yahoo_url = f"https://finance.yahoo.com/quotes/{tickers}/" if tickers else ""
+    sign = lambda v: "+" if v >= 0 else ""
+    activos_value = val.total_value - val.cash
+    lines = [
+        f"📊 `{val.basket_name}` — {datetime.now().strftime('%d %b %Y %H:%M')}",
+        "",
+        f"💼 Coste a tipo actual: {_fmt(val.total_invested)}€",
+        f"💵 Cash disponible:     {_fmt(val.cash)}€",
+        f"💰 Valor actual:        {_fmt(val.total_value)}€  ({_fmt(activos_value)}€ + {_fmt(val.cash)}€ cash)",
+        f"{_arrow(val.total_pnl)} P&L total: {sign(val.total_pnl)}{_fmt(val.total_pnl)}€ ({sign(val.total_pnl_pct)}{_fmt(val.total_pnl_pct)}%)",
+        "", "─" * 33,
+    ]
+    for p in val.positions:
+        sym = p.currency if p.currency != "EUR" else "€"
+        lines.append(
+            f"{p.ticker:<8} {_fmt(p.quantity, 0)} × {sym}{_fmt(p.current_price)} = {_fmt(p.market_value)}€  {_arrow(p.pnl)} {sign(p.pnl_pct)}{_fmt(p.pnl_pct)}%"
+        )
+    lines += ["─" * 33]
+    if finviz_url:
+        lines.append(f"\n🔍 [Finviz]({finviz_url})  |  [Yahoo Finance]({yahoo_url})")
+    return "\n".join(lines)
+
+
+async def _render_basket(basket, msg, snapshot) -> None:
+    """Value one basket in its own session and edit its placeholder message."""
+    try:
+        async with async_session_factory() as session:
+            val = await _engine.get_valuation(session, basket.id, snapshot=snapshot)
+        await msg.edit_text(_format_valuation(val), parse_mode="Markdown")
+    except Exception as e:
+        logger.error(f"Valuation error basket {basket.id}: {e}")
+        await msg.edit_text(f"❌ Error calculando {basket.name}: {e}")
+
+
 async def cmd_valoracion(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     async with async_session_factory() as session:
         result = await session.execute(select(Basket).where(Basket.active == True))
@@ -33,37 +71,31 @@ async def cmd_valoracion(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         if context.args:
             name_filter = " ".join(context.args).lower()
             baskets = [b for b in baskets if name_filter in b.name.lower()]
+        if not baskets:
+            return
+        held = (await session.execute(
+            select(Asset.ticker, Asset.currency)
+            .join(Position, Position.asset_id == Asset.id)
+            .where(Position.basket_id.in_([b.id for b in baskets]), Position.quantity > 0)
+            .distinct()
+        )).all()
+
+    # Placeholders first so messages keep basket order whatever finishes first
+    msgs = [await update.message.reply_text(f"⏳ Calculando {b.name}...") for b in baskets]
+
+    # One quote per ticker and one FX rate per currency, shared by all baskets
+    loop = asyncio.get_running_loop()
+    try:
+        snapshot = await loop.run_in_executor(None, _engine.snapshot, dict(held))
+    except Exception as e:
+        logger.error(f"Valuation snapshot error: {e}")
+        for basket, msg in zip(baskets, msgs):
+            await msg.edit_text(f"❌ Error calculando {basket.name}: {e}")
+        return
 
-        for basket in baskets:
-            msg = await update.message.reply_text(f"⏳ Calculando {basket.name}...")
-            try:
-                val = await _engine.get_valuation(session, basket.id)
-                tickers = ",".join(p.ticker for p in val.positions)
-                finviz_url = f"https://finviz.com/screener.ashx?v=111&t={tickers}" if tickers else ""
-                yahoo_url = f"https://finance.yahoo.com/quotes/{tickers}/" if tickers else ""
-                sign = lambda v: "+" if v >= 0 else ""
-                activos_value = val.total_value - val.cash
-                lines = [
-                    f"📊 `{val.basket_name}` — {datetime.now().strftime('%d %b %Y %H:%M')}",
-                    "",
-                    f"💼 Coste a tipo actual: {_fmt(val.total_invested)}€",
-                    f"💵 Cash disponible:     {_fmt(val.cash)}€",
-                    f"💰 Valor actual:        {_fmt(val.total_value)}€  ({_fmt(activos_value)}€ + {_fmt(val.cash)}€ cash)",
-                    f"{_arrow(val.total_pnl)} P&L total: {sign(val.total_pnl)}{_fmt(val.total_pnl)}€ ({sign(val.total_pnl_pct)}{_fmt(val.total_pnl_pct)}%)",
-                    "", "─" * 33,
-                ]
-                for p in val.positions:
-                    sym = p.currency if p.currency != "EUR" else "€"
-                    lines.append(
-                        f"{p.ticker:<8} {_fmt(p.quantity, 0)} × {sym}{_fmt(p.current_price)} = {_fmt(p.market_value)}€  {_arrow(p.pnl)} {sign(p.pnl_pct)}{_fmt(p.pnl_pct)}%"
-                    )
-                lines += ["─" * 33]
-                if finviz_url:
-                    lines.append(f"\n🔍 [Finviz]({finviz_url})  |  [Yahoo Finance]({yahoo_url})")
-                await msg.edit_text("\n".join(lines), parse_mode="Markdown")
-            except Exception as e:
-                logger.error(f"Valuation error basket {basket.id}: {e}")
-                await msg.edit_text(f"❌ Error calculando {basket.name}: {e}")
+    await asyncio.gather(*(
+        _render_basket(basket, msg, snapshot) for basket, msg in zip(baskets, msgs)
+    ))
 
 
 async def cmd_historial(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -0,0 +1,145 @@
+"""/avisame, /quitaraviso — one-shot price threshold alerts.
+
+Stored in `price_alerts` and indexed in memory (`src/alerts/price_alerts.py`);
+the alert scan checks them against its quotes and notifies the user once.
+"""
+import logging
+from decimal import Decimal, InvalidOperation
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from sqlalchemy import select
+
+from src.alerts.price_alerts import entry_for, price_alert_index
+from src.bot.audit import log_command
+from src.bot.identity import identity_cache
+from src.data.yahoo import YahooDataProvider
+from src.db.base import async_session_factory
+from src.db.models import PriceAlert
+
+logger = logging.getLogger(__name__)
+_provider = YahooDataProvider()
+
+DIRECTIONS = {">": "ABOVE", "<": "BELOW"}
+USAGE = (
+    "Uso: `/avisame TICKER >|< PRECIO`\n"
+    "Ejemplo: `/avisame SAN.MC > 4.00` — aviso cuando supere 4.00\n"
+    "Sin argumentos: lista tus avisos activos"
+)
+
+
+def _parse_avisame_args(args: list[str]) -> tuple[str, str, Decimal]:
+    """Parse `TICKER > 4.00` (operator may be glued: `>4,00`).
+
+    Returns (ticker, direction, threshold). Raises ValueError.
+    """
+    if len(args) < 2:
+        raise ValueError("Argumentos incompletos.")
+    ticker = args[0].upper()
+    rest = "".join(args[1:]).replace(",", ".")
+    direction = DIRECTIONS.get(rest[:1])
+    if not direction:
+        raise ValueError("Indica `>` (supera) o `<` (cae por debajo).")
+    try:
+        threshold = Decimal(rest[1:])
+    except InvalidOperation:
+        raise ValueError("Precio inválido.")
+    if not threshold.is_finite():
+        raise ValueError("Precio inválido.")
+    if threshold <= 0:
+        raise ValueError("El precio debe ser positivo.")
+    return ticker, direction, threshold
+
+
+def _describe(alert: PriceAlert) -> str:
+    op = ">" if alert.direction == "ABOVE" else "<"
+    return f"#{alert.id} {alert.ticker} {op} {alert.threshold:.2f}"
+
+
+async def cmd_avisame(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    raw_args = " ".join(context.args) if context.args else ""
+    async with async_session_factory() as session:
+        user = await identity_cache.user(session, update.effective_user.id)
+        if not user:
+            await update.message.reply_text("Usa /start primero.")
+            return
+
+        if not context.args:
+            alerts = (await session.execute(
+                select(PriceAlert)
+                .where(PriceAlert.user_id == user.id, PriceAlert.status == "ACTIVE")
+                .order_by(PriceAlert.ticker, PriceAlert.threshold)
+            )).scalars().all()
+            if not alerts:
+                await update.message.reply_text(f"Sin avisos activos.\n{USAGE}", parse_mode="Markdown")
+                return
+            lines = ["🔔 *Avisos activos*", ""] + [_describe(a) for a in alerts]
+            lines += ["", "_Elimina con /quitaraviso ID_"]
+            await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+            return
+
+        try:
+            ticker, direction, threshold = _parse_avisame_args(list(context.args))
+        except ValueError as e:
+            await update.message.reply_text(f"{e}\n{USAGE}", parse_mode="Markdown")
+            return
+
+        try:
+            quote = _provider.get_current_price(ticker)
+            price = quote.price
+        except Exception as e:
+            err = f"Error obteniendo precio de {ticker}: {e}"
+            await update.message.reply_text(err)
+            await log_command(update, "/avisame", False, err, raw_args)
+            return
+        if (direction == "ABOVE" and price >= threshold) or (direction == "BELOW" and price <= threshold):
+            await update.message.reply_text(
+                f"{ticker} ya cotiza a {price:.2f} — el aviso saltaría ahora mismo."
+            )
+            return
+
+        alert = PriceAlert(
+            user_id=user.id, ticker=ticker, direction=direction,
+            threshold=threshold, currency=quote.currency, status="ACTIVE",
+        )
+        session.add(alert)
+        await session.commit()
+        await session.refresh(alert)
+        price_alert_index.add(entry_for(alert, update.effective_user.id))
+
+    msg = _describe(alert)
+    await update.message.reply_text(
+        f"🔔 Aviso registrado: {msg} (ahora {price:.2f})\n"
+        "_Se comprueba en cada escaneo de alertas._",
+        parse_mode="Markdown",
+    )
+    await log_command(update, "/avisame", True, msg, raw_args)
+
+
+async def cmd_quitaraviso(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Usage: /quitaraviso ID"""
+    raw_args = " ".join(context.args) if context.args else ""
+    if not context.args or not context.args[0].lstrip("#").isdigit():
+        await update.message.reply_text("Uso: `/quitaraviso ID` (ver /avisame)", parse_mode="Markdown")
+        return
+    alert_id = int(context.args[0].lstrip("#"))
+
+    async with async_session_factory() as session:
+        user = await identity_cache.user(session, update.effective_user.id)
+        alert = await session.get(PriceAlert, alert_id)
+        if not user or not alert or alert.user_id != user.id or alert.status != "ACTIVE":
+            await update.message.reply_text(f"Aviso #{alert_id} no encontrado.")
+            return
+        alert.status = "CANCELLED"
+        await session.commit()
+    price_alert_index.remove(alert_id)
+
+    await update.message.reply_text(f"🗑 Aviso #{alert_id} eliminado.")
+    await log_command(update, "/quitaraviso", True, f"#{alert_id}", raw_args)
+
+
+def get_handlers():
+    return [
+        CommandHandler("avisame", cmd_avisame),
+        CommandHandler("quitaraviso", cmd_quitaraviso),
+    ]
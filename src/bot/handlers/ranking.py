@@ -0,0 +1,139 @@
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from sqlalchemy import select
+
+from src.db.base import async_session_factory
+from src.db.models import Basket, BasketAsset, Asset
+from src.backtest.engine import VALID_PERIODS, BacktestEngine, PortfolioBacktestResult
+from src.bot.handlers.backtest import STRATEGY_MAP, _fp, _ff
+
+logger = logging.getLogger(__name__)
+
+_NAME_WIDTH = 16
+
+
+def _parse_period(args: list[str]) -> str | None:
+    """Return the requested period (default 1y) or None if it is not valid."""
+    if not args:
+        return "1y"
+    period = args[0].lower()
+    return period if period in VALID_PERIODS else None
+
+
+def _format_ranking(
+    period: str,
+    results: list[tuple[str, str, PortfolioBacktestResult]],
+    failed: list[str],
+    n_tickers: int,
+) -> str:
+    """Render one monospace table sorted by total return (best first)."""
+    ranked = sorted(results, key=lambda r: r[2].total_return_pct, reverse=True)
+    lines = [
+        f"🏆 *Ranking de estrategias* ({period})",
+        f"   Universo: {n_tickers} activos, descargados una sola vez",
+        "",
+        "```",
+        f"{'#':<2} {'Cesta':<{_NAME_WIDTH}} {'Rent.':>7} {'Sharpe':>6} {'MaxDD':>7} {'α B&H':>7}",
+    ]
+    for pos, (name, _, r) in enumerate(ranked, start=1):
+        alpha = r.total_return_pct - r.benchmark_return_pct
+        short = name if len(name) <= _NAME_WIDTH else name[:_NAME_WIDTH - 1] + "…"
+        lines.append(
+            f"{pos:<2} {short:<{_NAME_WIDTH}} {_fp(r.total_return_pct):>7} "
+            f"{_ff(r.sharpe_ratio):>6} {_fp(-r.max_drawdown_pct):>7} {_fp(alpha):>7}"
+        )
+    lines.append("```")
+    if ranked:
+        lines.append("")
+        for name, strategy, _ in ranked:
+            lines.append(f"• `{name}` → `{strategy}`")
+    if failed:
+        lines += ["", "❌ Sin resultado: " + ", ".join(f"`{n}`" for n in failed)]
+    return "\n".join(lines)
+
+
+async def cmd_ranking(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Usage: /ranking [period] — backtest every basket with a fixed universe on shared data."""
+    period = _parse_period(list(context.args) if context.args else [])
+    if period is None:
+        await update.message.reply_text(
+            f"Periodo no válido. Usa uno de: {', '.join(sorted(VALID_PERIODS))}"
+        )
+        return
+
+    async with async_session_factory() as session:
+        baskets = (await session.execute(
+            select(Basket).where(Basket.active == True).order_by(Basket.id)
+        )).scalars().all()
+        rows = (await session.execute(
+            select(BasketAsset.basket_id, Asset.ticker)
+            .join(Asset, Asset.id == BasketAsset.asset_id)
+            .where(BasketAsset.active == True)
+        )).all()
+
+    tickers_by_basket: dict[int, list[str]] = {}
+    for basket_id, ticker in rows:
+        tickers_by_basket.setdefault(basket_id, []).append(ticker)
+
+    configs = [
+        (b, tickers_by_basket[b.id])
+        for b in baskets
+        if b.id in tickers_by_basket and b.strategy in STRATEGY_MAP
+    ]
+    if not configs:
+        await update.message.reply_text(
+            "No hay cestas con universo de activos definido para comparar."
+        )
+        return
+
+    universe = list(dict.fromkeys(t for _, tickers in configs for t in tickers))
+    msg = await update.message.reply_text(
+        f"⏳ Ranking de {len(configs)} cestas sobre {len(universe)} activos ({period})..."
+    )
+
+    engine = BacktestEngine()
+    loop = asyncio.get_running_loop()
+    try:
+        ohlcv_dict = await loop.run_in_executor(None, engine.fetch_data, universe, period)
+    except Exception as e:
+        logger.error("Ranking data fetch error: %s", e)
+        await msg.edit_text(f"❌ Error descargando datos: {e}")
+        return
+    if not ohlcv_dict:
+        await msg.edit_text("❌ No se pudo descargar ningún activo del universo.")
+        return
+
+    # One backtest per basket config, all reading the same in-memory universe
+    outcomes = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                None, engine.run,
+                tickers, STRATEGY_MAP[b.strategy](), b.strategy, period,
+                float(b.stop_loss_pct) if b.stop_loss_pct else None,
+                ohlcv_dict,
+            )
+            for b, tickers in configs
+        ),
+        return_exceptions=True,
+    )
+
+    results: list[tuple[str, str, PortfolioBacktestResult]] = []
+    failed: list[str] = []
+    for (b, _), outcome in zip(configs, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Ranking backtest error for %s: %s", b.name, outcome)
+            failed.append(b.name)
+        else:
+            results.append((b.name, b.strategy, outcome))
+
+    await msg.edit_text(
+        _format_ranking(period, results, failed, len(ohlcv_dict)),
+        parse_mode="Markdown",
+    )
+
+
+def get_handlers():
+    return [CommandHandler("ranking", cmd_ranking)]
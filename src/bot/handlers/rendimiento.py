@@ -0,0 +1,193 @@
+"""/rendimiento — basket equity curve and ledger-based returns.
+
+The curve comes from `valuation_snapshots` (filled by
+`src/scheduler/valuation.py`) and never touches the network. TWR / MWR,
+volatility and drawdown are computed from the order ledger against the
+daily closes in the bar store (`src/portfolio/performance.py`). The handler
+only reads what the store already holds — filling it is the precompute job's
+work — so tickers without cached closes are reported as unavailable.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from sqlalchemy import select
+
+from src.data.bar_store import STORE_PERIOD, bar_store
+from src.db.base import async_session_factory
+from src.db.models import Basket, User, ValuationSnapshot
+from src.portfolio.performance import OrderLedger, PerformanceResult, compute_performance, load_ledger
+from src.utils.text import normalize_basket_name
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAYS = {"1w": 7, "1mo": 30, "3mo": 91, "6mo": 182, "1y": 365, "max": None}
+DEFAULT_PERIOD = "1mo"
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+SPARK_WIDTH = 30
+
+
+def _fmt(val, decimals=2) -> str:
+    return f"{val:,.{decimals}f}"
+
+
+def _parse_args(args: list[str]) -> tuple[str | None, str]:
+    """Split `[CESTA ...] [periodo]` — the period is the last token if valid."""
+    if args and args[-1].lower() in PERIOD_DAYS:
+        return (" ".join(args[:-1]) or None), args[-1].lower()
+    return (" ".join(args) or None), DEFAULT_PERIOD
+
+
+def _sparkline(values: list[float], width: int = SPARK_WIDTH) -> str:
+    if len(values) > width:
+        step = (len(values) - 1) / (width - 1)
+        values = [values[round(i * step)] for i in range(width)]
+    lo, hi = min(values), max(values)
+    if hi == lo:
+        return SPARK_BLOCKS[len(SPARK_BLOCKS) // 2] * len(values)
+    scale = (len(SPARK_BLOCKS) - 1) / (hi - lo)
+    return "".join(SPARK_BLOCKS[round((v - lo) * scale)] for v in values)
+
+
+def _max_drawdown_pct(values: list[float]) -> float:
+    peak, worst = values[0], 0.0
+    for v in values:
+        peak = max(peak, v)
+        if peak > 0:
+            worst = max(worst, (peak - v) / peak * 100)
+    return worst
+
+
+def format_rendimiento(basket_name: str, period: str, points: list[tuple[datetime, float]]) -> str:
+    values = [v for _, v in points]
+    start, end = values[0], values[-1]
+    change = end - start
+    change_pct = change / start * 100 if start else 0.0
+    sign = "+" if change >= 0 else ""
+    arrow = "📈" if change >= 0 else "📉"
+    first, last = points[0][0], points[-1][0]
+    return "\n".join([
+        f"📊 Rendimiento `{basket_name}` — {period}",
+        f"_{first:%d/%m/%Y %H:%M} → {last:%d/%m/%Y %H:%M} ({len(points)} registros)_",
+        "",
+        f"`{_sparkline(values)}`",
+        "",
+        f"Inicio:  {_fmt(start)}€",
+        f"Actual:  {_fmt(end)}€",
+        f"{arrow} Variación: {sign}{_fmt(change)}€ ({sign}{_fmt(change_pct)}%)",
+        f"Máximo: {_fmt(max(values))}€  |  Mínimo: {_fmt(min(values))}€",
+        f"Max DD: -{_fmt(_max_drawdown_pct(values))}%",
+    ])
+
+
+def format_performance(perf: PerformanceResult) -> str:
+    sign = lambda v: "+" if v >= 0 else ""
+    mwr = (
+        f"{sign(perf.mwr_annualized_pct)}{_fmt(perf.mwr_annualized_pct)}%"
+        if perf.mwr_annualized_pct is not None else "n/d"
+    )
+    return "\n".join([
+        f"*Según órdenes* ({perf.n_orders} órdenes, {perf.start:%d/%m/%Y} → {perf.end:%d/%m/%Y})",
+        f"  Cuenta (cash + posiciones): {sign(perf.account_return_pct)}{_fmt(perf.account_return_pct)}%",
+        f"  TWR: {sign(perf.twr_pct)}{_fmt(perf.twr_pct)}%  "
+        f"(anual {sign(perf.twr_annualized_pct)}{_fmt(perf.twr_annualized_pct)}%)",
+        f"  MWR (TIR anual): {mwr}",
+        f"  Volatilidad: {_fmt(perf.volatility_pct)}%  |  Max DD: -{_fmt(perf.max_drawdown_pct)}%",
+    ])
+
+
+def _ledger_performance(
+    ledger: OrderLedger, cash: float, since: datetime | None,
+) -> PerformanceResult:
+    """Blocking: replay the ledger against the closes cached in the bar store."""
+    bars = bar_store.get_many(list(dict.fromkeys(ledger.tickers)), STORE_PERIOD)
+    closes = pd.DataFrame({t: o.data["Close"] for t, o in bars.items()}).sort_index()
+    # no point measuring the days before the first order
+    first_order = pd.Timestamp(ledger.when.min()).normalize()
+    start = max(first_order, pd.Timestamp(since).normalize()) if since else first_order
+    return compute_performance(ledger, closes, cash, start=start)
+
+
+async def cmd_rendimiento(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Usage: /rendimiento [CESTA] [1w|1mo|3mo|6mo|1y|max]"""
+    basket_name_arg, period = _parse_args(list(context.args) if context.args else [])
+
+    async with async_session_factory() as session:
+        basket = None
+        if basket_name_arg:
+            basket = (await session.execute(
+                select(Basket).where(
+                    Basket.name_normalized == normalize_basket_name(basket_name_arg),
+                    Basket.active == True,
+                )
+            )).scalar_one_or_none()
+            if not basket:
+                await update.message.reply_text(f"Cesta '{basket_name_arg}' no encontrada.")
+                return
+        else:
+            user = (await session.execute(
+                select(User).where(User.tg_id == update.effective_user.id)
+            )).scalar_one_or_none()
+            if user and user.active_basket_id:
+                basket = (await session.execute(
+                    select(Basket).where(Basket.id == user.active_basket_id, Basket.active == True)
+                )).scalar_one_or_none()
+            if not basket:
+                await update.message.reply_text(
+                    "No tienes cesta activa. Usa /sel para seleccionar una o "
+                    "indica el nombre: /rendimiento Mi_Cesta 3mo"
+                )
+                return
+
+        query = (
+            select(ValuationSnapshot.taken_at, ValuationSnapshot.total_value)
+            .where(ValuationSnapshot.basket_id == basket.id)
+            .order_by(ValuationSnapshot.taken_at)
+        )
+        days = PERIOD_DAYS[period]
+        if days is not None:
+            query = query.where(ValuationSnapshot.taken_at >= datetime.now() - timedelta(days=days))
+        rows = (await session.execute(query)).all()
+        ledger = await load_ledger(session, basket.id)
+        cash = float(basket.cash)
+
+    sections = []
+    if len(rows) >= 2:
+        points = [(taken_at, float(value)) for taken_at, value in rows]
+        sections.append(format_rendimiento(basket.name, period, points))
+
+    uncached = [t for t in dict.fromkeys(ledger.tickers) if bar_store.get(t, STORE_PERIOD) is None]
+    if len(ledger) and uncached:
+        if not sections:
+            sections.append(f"📊 Rendimiento `{basket.name}` — {period}")
+        sections.append(
+            f"*Según órdenes*: sin cierres guardados de {', '.join(uncached)} — "
+            "disponible tras el próximo precálculo."
+        )
+    elif len(ledger):
+        since = datetime.now() - timedelta(days=days) if days is not None else None
+        loop = asyncio.get_running_loop()
+        try:
+            perf = await loop.run_in_executor(None, _ledger_performance, ledger, cash, since)
+            if not sections:
+                sections.append(f"📊 Rendimiento `{basket.name}` — {period}")
+            sections.append(format_performance(perf))
+        except Exception as e:
+            logger.warning("Ledger performance error basket %s: %s", basket.id, e)
+
+    if not sections:
+        await update.message.reply_text(
+            f"`{basket.name}`: aún no hay suficiente histórico de valoración para {period}.",
+            parse_mode="Markdown",
+        )
+        return
+
+    await update.message.reply_text("\n\n".join(sections), parse_mode="Markdown")
+
+
+def get_handlers():
+    return [CommandHandler("rendimiento", cmd_rendimiento)]
@@ -0,0 +1,223 @@
+"""/orden, /ordenes, /cancelaorden — resting limit / stop / stop-limit orders.
+
+Orders are stored in `resting_orders` and added to the in-memory
+`trigger_book`; the scheduler job in `src/scheduler/resting_orders.py`
+fills them when a quote crosses their price.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+from sqlalchemy import select
+
+from src.bot.audit import log_command
+from src.bot.identity import identity_cache
+from src.data.yahoo import YahooDataProvider
+from src.db.base import async_session_factory
+from src.db.models import Asset, Position, RestingOrder
+from src.orders.trigger_book import trigger_book
+from src.scheduler.resting_orders import ACTIVE_STATUSES, trigger_for
+
+logger = logging.getLogger(__name__)
+_provider = YahooDataProvider()
+
+SIDES = {"compra": "BUY", "vende": "SELL"}
+KINDS = {"limite": "LIMIT", "stop": "STOP", "stoplimit": "STOP_LIMIT"}
+KIND_LABELS = {"LIMIT": "límite", "STOP": "stop", "STOP_LIMIT": "stop-límite"}
+USAGE = (
+    "Uso: `/orden compra|vende TICKER cantidad limite PRECIO [@cesta]`\n"
+    "`/orden compra|vende TICKER cantidad stop PRECIO [@cesta]`\n"
+    "`/orden compra|vende TICKER cantidad stoplimit STOP LIMITE [@cesta]`\n"
+    "Ejemplo: `/orden vende AAPL 10 stop 180` — vende si cae a 180"
+)
+
+
+def _parse_orden_args(args: list[str]) -> tuple[str, str, Decimal, str, Decimal | None, Decimal | None, str | None]:
+    """Parse /orden args.
+
+    Returns (side, ticker, quantity, kind, stop_price, limit_price, basket_override).
+    Raises ValueError with a user-facing message.
+    """
+    basket_override = None
+    for i, a in enumerate(args):
+        if a.startswith("@"):
+            basket_override = " ".join([a.lstrip("@")] + list(args[i + 1:]))
+            args = args[:i]
+            break
+    if len(args) < 5 or args[0].lower() not in SIDES or args[3].lower() not in KINDS:
+        raise ValueError("Argumentos incompletos.")
+    side, kind = SIDES[args[0].lower()], KINDS[args[3].lower()]
+    n_prices = 2 if kind == "STOP_LIMIT" else 1
+    if len(args) != 4 + n_prices:
+        raise ValueError("Número de precios incorrecto.")
+    try:
+        quantity = Decimal(args[2])
+        prices = [Decimal(p) for p in args[4:]]
+    except InvalidOperation:
+        raise ValueError("Cantidad o precio inválido.")
+    if quantity <= 0 or any(p <= 0 for p in prices):
+        raise ValueError("Cantidad y precios deben ser positivos.")
+
+    stop_price = prices[0] if kind != "LIMIT" else None
+    limit_price = prices[-1] if kind != "STOP" else None
+    return side, args[1].upper(), quantity, kind, stop_price, limit_price, basket_override
+
+
+def _describe(order: RestingOrder, ticker: str) -> str:
+    verb = "Compra" if order.side == "BUY" else "Venta"
+    prices = []
+    if order.stop_price is not None:
+        prices.append(f"stop {order.stop_price:.2f}")
+    if order.limit_price is not None:
+        prices.append(f"límite {order.limit_price:.2f}")
+    armed = " (stop alcanzado)" if order.status == "ARMED" else ""
+    return (
+        f"#{order.id} {verb} {KIND_LABELS[order.kind]} {order.quantity} {ticker} "
+        f"· {' · '.join(prices)}{armed}"
+    )
+
+
+async def _resolve_basket(session, caller, basket_override: str | None):
+    """Basket named with @ or the caller's active basket (None if not found)."""
+    if basket_override:
+        return await identity_cache.basket_by_name(session, basket_override)
+    if caller and caller.active_basket_id:
+        return await identity_cache.basket_by_id(session, caller.active_basket_id)
+    return None
+
+
+async def cmd_orden(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    raw_args = " ".join(context.args) if context.args else ""
+    try:
+        side, ticker, quantity, kind, stop_price, limit_price, basket_override = (
+            _parse_orden_args(list(context.args or []))
+        )
+    except ValueError as e:
+        await update.message.reply_text(f"{e}\n{USAGE}", parse_mode="Markdown")
+        return
+    if kind == "STOP_LIMIT" and (
+        (side == "BUY" and limit_price < stop_price) or (side == "SELL" and limit_price > stop_price)
+    ):
+        await update.message.reply_text(
+            "El límite de una stop-límite debe dejar margen: ≥ stop al comprar, ≤ stop al vender."
+        )
+        return
+
+    async with async_session_factory() as session:
+        caller = await identity_cache.user(session, update.effective_user.id)
+        if not caller:
+            await update.message.reply_text("Usa /start primero.")
+            return
+        basket = await _resolve_basket(session, caller, basket_override)
+        if not basket:
+            await update.message.reply_text(
+                "🗂 Cesta no encontrada. Usa `/sel <nombre>` o indica `@cesta`.",
+                parse_mode="Markdown",
+            )
+            return
+
+        asset = (await session.execute(select(Asset).where(Asset.ticker == ticker))).scalar_one_or_none()
+        if not asset:
+            try:
+                price_obj = _provider.get_current_price(ticker)
+                info = _provider.get_ticker_info(ticker)
+            except Exception as e:
+                await update.message.reply_text(f"Error obteniendo precio de {ticker}: {e}")
+                return
+            asset = Asset(ticker=ticker, name=info["name"], market=info["market"], currency=price_obj.currency)
+            session.add(asset)
+            await session.flush()   # assign asset.id before using it below
+
+        if side == "SELL":
+            pos = (await session.execute(
+                select(Position).where(Position.basket_id == basket.id, Position.asset_id == asset.id)
+            )).scalar_one_or_none()
+            held = pos.quantity if pos else Decimal("0")
+            if held < quantity:
+                err = f"Posición insuficiente: tienes {held} {ticker}"
+                await update.message.reply_text(f"❌ {err}")
+                await log_command(update, "/orden", False, err, raw_args)
+                return
+
+        order = RestingOrder(
+            basket_id=basket.id, asset_id=asset.id, user_id=caller.id,
+            side=side, kind=kind, quantity=quantity,
+            stop_price=stop_price, limit_price=limit_price, status="OPEN",
+        )
+        session.add(order)
+        await session.commit()
+        await session.refresh(order)
+        trigger_book.add(trigger_for(order, asset))
+
+    msg = _describe(order, ticker)
+    await update.message.reply_text(
+        f"🗂 `{basket.name}`\n📌 Orden registrada: {msg}\n"
+        "_Se revisa en cada escaneo con el mercado abierto; el cash se comprueba al ejecutarse._",
+        parse_mode="Markdown",
+    )
+    await log_command(update, "/orden", True, msg, raw_args)
+
+
+async def cmd_ordenes(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Usage: /ordenes [@cesta] — órdenes pendientes de la cesta."""
+    override = " ".join(context.args).lstrip("@") if context.args else None
+    async with async_session_factory() as session:
+        caller = await identity_cache.user(session, update.effective_user.id)
+        basket = await _resolve_basket(session, caller, override)
+        if not basket:
+            await update.message.reply_text(
+                "🗂 Cesta no encontrada. Usa `/sel <nombre>` o `/ordenes @cesta`.",
+                parse_mode="Markdown",
+            )
+            return
+        rows = (await session.execute(
+            select(RestingOrder, Asset.ticker)
+            .join(Asset, Asset.id == RestingOrder.asset_id)
+            .where(RestingOrder.basket_id == basket.id, RestingOrder.status.in_(ACTIVE_STATUSES))
+            .order_by(RestingOrder.id)
+        )).all()
+
+    if not rows:
+        await update.message.reply_text(f"`{basket.name}`: sin órdenes pendientes.", parse_mode="Markdown")
+        return
+    lines = [f"📌 Órdenes pendientes `{basket.name}`", ""]
+    lines += [_describe(order, ticker) for order, ticker in rows]
+    lines += ["", "_Cancela con /cancelaorden ID_"]
+    await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+
+
+async def cmd_cancelaorden(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Usage: /cancelaorden ID — creador de la orden u OWNER de la cesta."""
+    raw_args = " ".join(context.args) if context.args else ""
+    if not context.args or not context.args[0].lstrip("#").isdigit():
+        await update.message.reply_text("Uso: `/cancelaorden ID` (ver /ordenes)", parse_mode="Markdown")
+        return
+    order_id = int(context.args[0].lstrip("#"))
+
+    async with async_session_factory() as session:
+        caller = await identity_cache.user(session, update.effective_user.id)
+        order = await session.get(RestingOrder, order_id, with_for_update=True)
+        if not caller or not order or order.status not in ACTIVE_STATUSES:
+            await update.message.reply_text(f"Orden #{order_id} no encontrada o ya resuelta.")
+            return
+        if order.user_id != caller.id:
+            if await identity_cache.role(session, order.basket_id, caller.id) != "OWNER":
+                await update.message.reply_text("Solo quien creó la orden o el OWNER pueden cancelarla.")
+                return
+        order.status = "CANCELLED"
+        order.resolved_at = datetime.utcnow()
+        await session.commit()
+    trigger_book.remove(order_id)
+
+    await update.message.reply_text(f"🗑 Orden #{order_id} cancelada.")
+    await log_command(update, "/cancelaorden", True, f"#{order_id}", raw_args)
+
+
+def get_handlers():
+    return [
+        CommandHandler("orden", cmd_orden),
+        CommandHandler("ordenes", cmd_ordenes),
+        CommandHandler("cancelaorden", cmd_cancelaorden),
+    ]
@@ -0,0 +1,151 @@
+"""Read-through cache for the auth lookups every handler starts with.
+
+Caches three things, keyed the way handlers look them up:
+
+- tg_id → `CachedUser` (id, active basket, mode)
+- normalized name / id → `CachedBasket` (id and name of an *active* basket)
+- (basket_id, user_id) → membership role
+
+Entries are immutable snapshots, never ORM objects, so they are safe to
+share between sessions — handlers that mutate a user or basket still load
+the row. Only identity is cached: cash, strategy and positions are always
+read from the DB. Misses run the same query the handler used to run, in
+the caller's session; "not found" is never cached, so newly registered
+users and new baskets are seen immediately.
+
+Handlers that change these rows invalidate explicitly (`/start`, `/sel`,
+`/modo`, `/adduser`, `/eliminarcesta`); the TTL
+(`cache.identity_ttl_seconds`) bounds staleness from other processes.
+"""
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from src.config import app_config
+from src.db.models import Basket, BasketMember, User
+from src.metrics import identity_cache_total
+from src.utils.text import normalize_basket_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    tg_id: int
+    username: str | None
+    first_name: str | None
+    active_basket_id: int | None
+    advanced_mode: bool
+
+
+@dataclass(frozen=True)
+class CachedBasket:
+    id: int
+    name: str
+    name_normalized: str
+
+
+class IdentityCache:
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.ttl = ttl_seconds
+        self._users: dict[int, tuple[float, CachedUser]] = {}
+        self._baskets_by_name: dict[str, tuple[float, CachedBasket]] = {}
+        self._baskets_by_id: dict[int, tuple[float, CachedBasket]] = {}
+        self._roles: dict[tuple[int, int], tuple[float, str]] = {}
+
+    def _get(self, store: dict, key, kind: str):
+        entry = store.get(key)
+        if entry and entry[0] > time.monotonic():
+            identity_cache_total.labels(kind=kind, result="hit").inc()
+            return entry[1]
+        identity_cache_total.labels(kind=kind, result="miss").inc()
+        return None
+
+    def _put(self, store: dict, key, value) -> None:
+        store[key] = (time.monotonic() + self.ttl, value)
+
+    async def user(self, session, tg_id: int) -> CachedUser | None:
+        cached = self._get(self._users, tg_id, "user")
+        if cached:
+            return cached
+        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalar_one_or_none()
+        if not user:
+            return None
+        cached = CachedUser(
+            id=user.id, tg_id=tg_id, username=user.username, first_name=user.first_name,
+            active_basket_id=user.active_basket_id, advanced_mode=user.advanced_mode,
+        )
+        self._put(self._users, tg_id, cached)
+        return cached
+
+    def _put_basket(self, basket) -> CachedBasket:
+        cached = CachedBasket(id=basket.id, name=basket.name, name_normalized=basket.name_normalized)
+        self._put(self._baskets_by_name, cached.name_normalized, cached)
+        self._put(self._baskets_by_id, cached.id, cached)
+        return cached
+
+    async def basket_by_name(self, session, name: str) -> CachedBasket | None:
+        """Active basket whose normalized name matches `name`."""
+        key = normalize_basket_name(name)
+        cached = self._get(self._baskets_by_name, key, "basket")
+        if cached:
+            return cached
+        basket = (await session.execute(
+            select(Basket).where(Basket.name_normalized == key, Basket.active == True)
+        )).scalar_one_or_none()
+        return self._put_basket(basket) if basket else None
+
+    async def basket_by_id(self, session, basket_id: int) -> CachedBasket | None:
+        """Active basket with this id."""
+        cached = self._get(self._baskets_by_id, basket_id, "basket")
+        if cached:
+            return cached
+        basket = (await session.execute(
+            select(Basket).where(Basket.id == basket_id, Basket.active == True)
+        )).scalar_one_or_none()
+        return self._put_basket(basket) if basket else None
+
+    async def role(self, session, basket_id: int, user_id: int) -> str | None:
+        """OWNER | MEMBER, or None if `user_id` is not a member of the basket."""
+        key = (basket_id, user_id)
+        cached = self._get(self._roles, key, "role")
+        if cached:
+            return cached
+        member = (await session.execute(
+            select(BasketMember).where(
+                BasketMember.basket_id == basket_id, BasketMember.user_id == user_id,
+            )
+        )).scalar_one_or_none()
+        if not member:
+            return None
+        self._put(self._roles, key, member.role)
+        return member.role
+
+    def invalidate_user(self, tg_id: int) -> None:
+        self._users.pop(tg_id, None)
+
+    def invalidate_basket(self, basket_id: int) -> None:
+        entry = self._baskets_by_id.pop(basket_id, None)
+        if entry:
+            self._baskets_by_name.pop(entry[1].name_normalized, None)
+        for key in [k for k in self._roles if k[0] == basket_id]:
+            del self._roles[key]
+
+    def invalidate_role(self, basket_id: int, user_id: int) -> None:
+        self._roles.pop((basket_id, user_id), None)
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._baskets_by_name.clear()
+        self._baskets_by_id.clear()
+        self._roles.clear()
+
+
+identity_cache = IdentityCache(
+    app_config.get("cache", {}).get("identity_ttl_seconds", DEFAULT_TTL_SECONDS)
+)
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Any
 
 import yaml
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,12 +16,24 @@ class Settings(BaseSettings):
 
     mariadb_host: str = "localhost"
     mariadb_port: int = 3306
-    mariadb_database: str
-    mariadb_user: str
-    mariadb_password: str
+    mariadb_database: str = ""
+    mariadb_user: str = ""
+    mariadb_password: str = ""
+
+    # Embedded backend: a file path switches bot, seed and Alembic to SQLite
+    # (aiosqlite, WAL — see src/db/base.py) and the MARIADB_* values are ignored.
+    sqlite_path: str = ""
+
+    @model_validator(mode="after")
+    def _check_backend(self) -> "Settings":
+        if not self.sqlite_path and not (self.mariadb_database and self.mariadb_user):
+            raise ValueError("Set MARIADB_DATABASE / MARIADB_USER / MARIADB_PASSWORD or SQLITE_PATH")
+        return self
 
     @property
     def database_url(self) -> str:
+        if self.sqlite_path:
+            return f"sqlite+aiosqlite:///{self.sqlite_path}"
         return (
             f"mysql+aiomysql://{self.mariadb_user}:{self.mariadb_password}"
             f"@{self.mariadb_host}:{self.mariadb_port}/{self.mariadb_database}"
@@ -28,6 +41,8 @@ class Settings(BaseSettings):
 
     @property
     def database_url_sync(self) -> str:
+        if self.sqlite_path:
+            return f"sqlite:///{self.sqlite_path}"
         return (
             f"mysql+pymysql://{self.mariadb_user}:{self.mariadb_password}"
             f"@{self.mariadb_host}:{self.mariadb_port}/{self.mariadb_database}"
@@ -0,0 +1,80 @@
+"""In-process store of daily OHLCV bars.
+
+The nightly precompute job downloads the longest history once per ticker
+(`refresh`) and every shorter period is sliced from that frame (`get`), so
+backtests over 1mo…2y and the Monte Carlo returns pool share one download.
+"""
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from src.data.base import DataProvider
+from src.data.models import OHLCV
+from src.data.yahoo import YahooDataProvider
+
+logger = logging.getLogger(__name__)
+
+STORE_PERIOD = "2y"   # longest period served by the store
+
+_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+}
+
+
+class BarStore:
+    def __init__(self, provider: DataProvider | None = None):
+        self.provider = provider or YahooDataProvider()
+        self._bars: dict[str, pd.DataFrame] = {}
+        self._refreshed_at: dict[str, datetime] = {}
+
+    def refresh(self, tickers: list[str]) -> list[str]:
+        """Re-download `STORE_PERIOD` of daily bars for each ticker.
+
+        Returns the tickers that were refreshed; failures are logged and the
+        previous bars (if any) are kept.
+        """
+        refreshed = []
+        for t in dict.fromkeys(tickers):
+            try:
+                ohlcv = self.provider.get_historical(t, period=STORE_PERIOD, interval="1d")
+            except Exception as e:
+                logger.warning("Bar store refresh failed for %s: %s", t, e)
+                continue
+            self._bars[t] = ohlcv.data
+            self._refreshed_at[t] = datetime.now()
+            refreshed.append(t)
+        return refreshed
+
+    def get(self, ticker: str, period: str = STORE_PERIOD) -> OHLCV | None:
+        """Return the stored bars for `ticker` trimmed to `period`, or None."""
+        df = self._bars.get(ticker)
+        if df is None or df.empty:
+            return None
+        offset = _PERIOD_OFFSETS.get(period)
+        if offset is None:
+            raise ValueError(f"Periodo no soportado por el bar store: {period}")
+        return OHLCV(ticker=ticker, data=df.loc[df.index >= df.index[-1] - offset])
+
+    def get_many(self, tickers: list[str], period: str = STORE_PERIOD) -> dict[str, OHLCV]:
+        """Like `get` for several tickers; tickers without bars are left out."""
+        result = {}
+        for t in tickers:
+            ohlcv = self.get(t, period)
+            if ohlcv is not None:
+                result[t] = ohlcv
+        return result
+
+    def refreshed_at(self, ticker: str) -> datetime | None:
+        return self._refreshed_at.get(ticker)
+
+    def clear(self) -> None:
+        self._bars.clear()
+        self._refreshed_at.clear()
+
+
+bar_store = BarStore()
@@ -1,6 +1,17 @@
+import logging
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from src.data.models import Price, OHLCV
+from src.data.models import Price, PriceSnapshot, OHLCV
+
+logger = logging.getLogger(__name__)
+
+# Minor-unit currencies Yahoo quotes some listings in (LSE in pence) → (major, units per major)
+MINOR_UNITS = {
+    "GBp": ("GBP", Decimal("100")),
+    "GBX": ("GBP", Decimal("100")),
+    "ZAc": ("ZAR", Decimal("100")),
+    "ILA": ("ILS", Decimal("100")),
+}
 
 
 class DataProvider(ABC):
@@ -18,3 +29,58 @@ class DataProvider(ABC):
             return Decimal("1")
         fx_ticker = f"{from_currency}{to_currency}=X"
         return self.get_current_price(fx_ticker).price
+
+    def get_current_prices(
+        self, tickers: list[str], currencies: dict[str, str] | None = None,
+    ) -> dict[str, Price]:
+        """Quotes for several tickers; failures are logged and left out.
+
+        Providers with a batch endpoint override this. `currencies` (ticker →
+        currency) lets a batch call skip per-ticker metadata lookups.
+        """
+        prices: dict[str, Price] = {}
+        for t in dict.fromkeys(tickers):
+            try:
+                prices[t] = self.get_current_price(t)
+            except Exception as e:
+                logger.warning("Could not price %s: %s", t, e)
+        return prices
+
+    def get_price_snapshot(
+        self, currencies: dict[str, str], base: str = "EUR",
+    ) -> PriceSnapshot:
+        """Price every ticker in `currencies` (ticker → currency) and each
+        distinct FX pair to `base` in a single `get_current_prices` call.
+
+        FX is keyed by the currency each quote came back in. A fallback quote
+        can use another unit than the stored currency (LSE in pence, "GBp"
+        instead of "GBP"); the pairs only those need cost one more batch.
+        """
+        pairs = _fx_pairs(set(currencies.values()), base)
+        quotes = self.get_current_prices(
+            list(currencies) + list(dict.fromkeys(pairs.values())),
+            {**currencies, **{pair: base for pair in pairs.values()}},
+        )
+        prices = {t: quotes[t] for t in currencies if t in quotes}
+
+        extra = _fx_pairs({p.currency for p in prices.values()}, base)
+        unquoted = [pair for pair in dict.fromkeys(extra.values()) if pair not in quotes]
+        if unquoted:
+            quotes.update(self.get_current_prices(unquoted, {pair: base for pair in unquoted}))
+        pairs.update(extra)
+
+        fx = {
+            cur: quotes[pair].price / MINOR_UNITS.get(cur, (cur, Decimal("1")))[1]
+            for cur, pair in pairs.items() if pair in quotes
+        }
+        return PriceSnapshot(prices=prices, fx=fx, base=base)
+
+
+def _fx_pairs(currencies: set[str], base: str) -> dict[str, str]:
+    """currency → Yahoo FX ticker to `base`; minor units use their major's pair."""
+    pairs = {}
+    for cur in sorted(currencies):
+        major = MINOR_UNITS.get(cur, (cur,))[0]
+        if major != base:
+            pairs[cur] = f"{major}{base}=X"
+    return pairs
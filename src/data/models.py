@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from decimal import Decimal
 import pandas as pd
 
@@ -12,6 +13,20 @@ class Price:
     currency: str
 
 
+@dataclass
+class PriceSnapshot:
+    """Quotes for a set of tickers plus each FX pair resolved once, at one instant."""
+    prices: dict[str, Price] = field(default_factory=dict)
+    fx: dict[str, Decimal] = field(default_factory=dict)   # currency → rate to `base`
+    base: str = "EUR"
+    taken_at: datetime = field(default_factory=datetime.now)
+
+    def fx_rate(self, currency: str) -> Decimal:
+        if currency == self.base:
+            return Decimal("1")
+        return self.fx[currency]
+
+
 @dataclass
 class OHLCV:
     ticker: str
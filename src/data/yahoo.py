@@ -19,6 +19,47 @@ class YahooDataProvider(DataProvider):
         currency = getattr(info, "currency", "USD") or "USD"
         return Price(ticker=ticker, price=price, currency=currency)
 
+    def get_current_prices(
+        self, tickers: list[str], currencies: dict[str, str] | None = None,
+    ) -> dict[str, Price]:
+        """One `yf.download` for all tickers; last close of the recent daily bars.
+
+        Tickers missing from the batch, or whose currency is not in
+        `currencies`, fall back to `get_current_price` (one fast_info call each).
+        """
+        tickers = list(dict.fromkeys(tickers))
+        currencies = currencies or {}
+        if not tickers:
+            return {}
+        closes: dict[str, float] = {}
+        try:
+            df = yf.download(
+                tickers, period="5d", interval="1d", progress=False,
+                auto_adjust=True, group_by="column",
+            )
+            if not df.empty:
+                close = df["Close"]
+                if isinstance(close, pd.Series):
+                    close = close.to_frame(tickers[0])
+                for t in tickers:
+                    if t in close.columns:
+                        col = close[t].dropna()
+                        if not col.empty:
+                            closes[t] = float(col.iloc[-1])
+        except Exception as e:
+            logger.warning("Batch download failed for %d tickers: %s", len(tickers), e)
+
+        prices: dict[str, Price] = {}
+        missing = []
+        for t in tickers:
+            if t in closes and t in currencies:
+                prices[t] = Price(ticker=t, price=Decimal(str(closes[t])), currency=currencies[t])
+            else:
+                missing.append(t)
+        if missing:
+            prices.update(super().get_current_prices(missing))
+        return prices
+
     def get_historical(self, ticker: str, period: str = "3mo", interval: str = "1d") -> OHLCV:
         df = yf.download(ticker, period=period, interval=interval, progress=False, auto_adjust=True)
         if df.empty:
@@ -1,21 +1,112 @@
+import time
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from src.config import settings
+from src.config import app_config, settings
+from src.db.instrumentation import instrument
+from src.metrics import db_pool_checked_out, db_pool_overflow, db_pool_size, db_pool_wait_seconds
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    pool_pre_ping=True,   # reconnect transparently if MariaDB closed idle connection
-    pool_recycle=3600,    # retire connections after 1h (before MariaDB wait_timeout)
-)
+# Applied on every new SQLite connection; `database.sqlite_pragmas` in
+# config.yaml overrides individual values.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # readers don't block the writer (scans vs commands)
+    "synchronous": "NORMAL",      # fsync at checkpoints only — safe with WAL
+    "busy_timeout": 5000,         # ms to wait for the write lock instead of failing
+    "foreign_keys": "ON",         # InnoDB enforces them; keep parity
+    "cache_size": -65536,         # 64 MiB page cache (negative = KiB)
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,       # 256 MiB
+}
+
+
+def sqlite_pragmas() -> dict:
+    return {**SQLITE_PRAGMAS, **app_config.get("database", {}).get("sqlite_pragmas", {})}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+# `database.pool` / `database.scheduler_pool` in config.yaml; keys missing there fall back to these.
+POOL_DEFAULTS = {"size": 5, "max_overflow": 10, "timeout_seconds": 30}
+
+
+def pool_config(section: str = "pool") -> dict:
+    return {**POOL_DEFAULTS, **(app_config.get("database", {}).get(section) or {})}
+
+
+def _timed_pool(name: str) -> type:
+    """Queue pool that reports how long each checkout waited, labelled `name`."""
+    class TimedQueuePool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            t0 = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                db_pool_wait_seconds.labels(pool=name).observe(time.perf_counter() - t0)
+    return TimedQueuePool
+
+
+def _export_pool_gauges(eng, name: str) -> None:
+    # read on scrape; engine.pool is looked up each time because dispose() replaces it
+    db_pool_size.labels(pool=name).set_function(lambda: eng.sync_engine.pool.size())
+    db_pool_checked_out.labels(pool=name).set_function(lambda: eng.sync_engine.pool.checkedout())
+    db_pool_overflow.labels(pool=name).set_function(lambda: max(eng.sync_engine.pool.overflow(), 0))
+
+
+def make_engine(url: str, pool: str | None = None, **kwargs):
+    """Async engine for `url`, instrumented; SQLite URLs get the pragma hook instead of MariaDB pool recycling.
+
+    `pool` names a `database.<pool>` section: the engine gets that sizing plus
+    checkout-wait and checked-out/overflow metrics labelled with the name.
+    """
+    if pool is not None:
+        cfg = pool_config(pool)
+        kwargs = {
+            "poolclass": _timed_pool(pool), "pool_size": cfg["size"],
+            "max_overflow": cfg["max_overflow"], "pool_timeout": cfg["timeout_seconds"],
+            **kwargs,
+        }
+    if url.startswith("sqlite"):
+        eng = create_async_engine(url, echo=False, **kwargs)
+        event.listen(eng.sync_engine, "connect", _set_sqlite_pragmas)
+    else:
+        eng = create_async_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,   # reconnect transparently if MariaDB closed idle connection
+            pool_recycle=3600,    # retire connections after 1h (before MariaDB wait_timeout)
+            **kwargs,
+        )
+    instrument(eng.sync_engine)   # statement counts / timings (src/db/instrumentation.py)
+    if pool is not None:
+        _export_pool_gauges(eng, pool)
+    return eng
+
+
+engine = make_engine(settings.database_url, pool="pool")
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
+# Alert scans and scheduler jobs use their own pool when `database.scheduler_pool`
+# is configured, so they never queue behind user commands (and vice versa).
+if app_config.get("database", {}).get("scheduler_pool"):
+    scheduler_engine = make_engine(settings.database_url, pool="scheduler_pool")
+    scheduler_session_factory = async_sessionmaker(scheduler_engine, expire_on_commit=False)
+else:
+    scheduler_engine = engine
+    scheduler_session_factory = async_session_factory
+
 
 async def get_session() -> AsyncSession:
     async with async_session_factory() as session:
@@ -0,0 +1,140 @@
+"""Statement counting and timing per command / scan and per statement fingerprint.
+
+`instrument(engine)` hooks the engine's cursor events; `make_engine` calls it
+for every engine. Each statement is timed and attributed to:
+
+- its *fingerprint* — the SQL with whitespace collapsed and IN-lists folded,
+  hashed to 8 hex chars (`scroogebot_db_statement_seconds{fingerprint}`;
+  `statement_text()` maps it back to the SQL);
+- the *scope* it ran in — a command ("/compra"), a callback or a scheduler
+  job, set with `db_scope(name)` / `with_db_scope(name, fn)`. When a scope
+  ends, its statement count and DB time feed
+  `scroogebot_db_scope_statements{scope}` / `scroogebot_db_scope_seconds{scope}`.
+
+A fingerprint that runs `database.repeated_statement_threshold` times or more
+within one scope (default 5) is the N+1 shape — the same query in a loop —
+and counts in `scroogebot_db_repeated_statements_total{scope, fingerprint}`
+(logged once per process). `/estado db` shows all of it.
+"""
+import functools
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from src.config import app_config
+from src.metrics import (
+    db_repeated_statements_total, db_scope_seconds, db_scope_statements, db_statement_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPEAT_THRESHOLD = 5
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+_statements: dict[str, str] = {}          # fingerprint → normalized SQL
+_warned: set[tuple[str, str]] = set()
+
+
+@dataclass
+class ScopeStats:
+    name: str
+    statements: int = 0
+    seconds: float = 0.0
+    by_fingerprint: Counter = field(default_factory=Counter)
+
+
+_current: ContextVar[ScopeStats | None] = ContextVar("db_scope", default=None)
+
+
+def normalize(sql: str) -> str:
+    """Collapse whitespace and fold `IN (?, ?, …)` so batch sizes share a fingerprint."""
+    return _IN_LIST.sub("(…)", _SPACES.sub(" ", sql).strip())
+
+
+def fingerprint(sql: str) -> str:
+    norm = normalize(sql)
+    fp = hashlib.sha1(norm.encode()).hexdigest()[:8]
+    _statements.setdefault(fp, norm)
+    return fp
+
+
+def statement_text(fp: str) -> str | None:
+    return _statements.get(fp)
+
+
+def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    fp = fingerprint(statement)
+    db_statement_seconds.labels(fingerprint=fp).observe(elapsed)
+    scope = _current.get()
+    if scope is not None:
+        scope.statements += 1
+        scope.seconds += elapsed
+        scope.by_fingerprint[fp] += 1
+
+
+def _on_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument(sync_engine) -> None:
+    """Attach the timing hooks to a (sync) Engine — `async_engine.sync_engine`."""
+    event.listen(sync_engine, "before_cursor_execute", _before)
+    event.listen(sync_engine, "after_cursor_execute", _after)
+    event.listen(sync_engine, "handle_error", _on_error)
+
+
+def _repeat_threshold() -> int:
+    return app_config.get("database", {}).get("repeated_statement_threshold", DEFAULT_REPEAT_THRESHOLD)
+
+
+def _record(scope: ScopeStats) -> None:
+    if not scope.statements:
+        return
+    db_scope_statements.labels(scope=scope.name).observe(scope.statements)
+    db_scope_seconds.labels(scope=scope.name).observe(scope.seconds)
+    threshold = _repeat_threshold()
+    for fp, n in scope.by_fingerprint.items():
+        if n < threshold:
+            continue
+        db_repeated_statements_total.labels(scope=scope.name, fingerprint=fp).inc()
+        if (scope.name, fp) not in _warned:
+            _warned.add((scope.name, fp))
+            logger.warning(f"{scope.name}: statement {fp} ran {n}× in one run — {_statements[fp][:120]}")
+
+
+@contextmanager
+def db_scope(name: str):
+    """Attribute every statement run inside the block (and its tasks) to `name`."""
+    scope = ScopeStats(name)
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+        _record(scope)
+
+
+def with_db_scope(name: str, fn):
+    """Wrap a coroutine function (handler callback, scheduler job) in `db_scope(name)`."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with db_scope(name):
+            return await fn(*args, **kwargs)
+    return wrapper
@@ -37,10 +37,13 @@ def upgrade() -> None:
         )
 
     # Step 3: apply NOT NULL + UNIQUE
-    op.alter_column('baskets', 'name_normalized', existing_type=sa.String(100), nullable=False)
-    op.create_unique_constraint('uq_baskets_name_normalized', 'baskets', ['name_normalized'])
+    # (batch: plain ALTERs on MariaDB, a table rebuild on SQLite)
+    with op.batch_alter_table('baskets') as batch_op:
+        batch_op.alter_column('name_normalized', existing_type=sa.String(100), nullable=False)
+        batch_op.create_unique_constraint('uq_baskets_name_normalized', ['name_normalized'])
 
 
 def downgrade() -> None:
-    op.drop_constraint('uq_baskets_name_normalized', 'baskets', type_='unique')
-    op.drop_column('baskets', 'name_normalized')
+    with op.batch_alter_table('baskets') as batch_op:
+        batch_op.drop_constraint('uq_baskets_name_normalized', type_='unique')
+        batch_op.drop_column('name_normalized')
@@ -0,0 +1,128 @@
+"""add tax_lots and realized_gains (FIFO ledger), backfilled from orders
+
+Revision ID: a7b8c9d0e123
+Revises: f6a7b8c9d012
+Create Date: 2026-10-19
+"""
+from collections import deque
+from decimal import Decimal
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a7b8c9d0e123'
+down_revision = 'f6a7b8c9d012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tax_lots = op.create_table(
+        'tax_lots',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('basket_id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('buy_order_id', sa.Integer(), nullable=True),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('quantity', sa.Numeric(15, 6), nullable=False),
+        sa.Column('remaining', sa.Numeric(15, 6), nullable=False),
+        sa.Column('price', sa.Numeric(15, 4), nullable=False),
+        sa.Column('closed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['basket_id'], ['baskets.id']),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.id']),
+        sa.ForeignKeyConstraint(['buy_order_id'], ['orders.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_tax_lots_basket_asset_acquired', 'tax_lots', ['basket_id', 'asset_id', 'acquired_at'],
+    )
+    realized_gains = op.create_table(
+        'realized_gains',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('basket_id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('lot_id', sa.Integer(), nullable=True),
+        sa.Column('sell_order_id', sa.Integer(), nullable=True),
+        sa.Column('acquired_at', sa.DateTime(), nullable=True),
+        sa.Column('sold_at', sa.DateTime(), nullable=False),
+        sa.Column('quantity', sa.Numeric(15, 6), nullable=False),
+        sa.Column('cost', sa.Numeric(15, 4), nullable=False),
+        sa.Column('proceeds', sa.Numeric(15, 4), nullable=False),
+        sa.Column('gain', sa.Numeric(15, 4), nullable=False),
+        sa.ForeignKeyConstraint(['basket_id'], ['baskets.id']),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.id']),
+        sa.ForeignKeyConstraint(['lot_id'], ['tax_lots.id']),
+        sa.ForeignKeyConstraint(['sell_order_id'], ['orders.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_realized_gains_basket_sold', 'realized_gains', ['basket_id', 'sold_at'])
+
+    # Backfill: replay existing orders FIFO once, per (basket, asset)
+    conn = op.get_bind()
+    o_t = sa.table(
+        'orders',
+        sa.column('id', sa.Integer), sa.column('basket_id', sa.Integer),
+        sa.column('asset_id', sa.Integer), sa.column('type', sa.String),
+        sa.column('quantity', sa.Numeric(15, 6)), sa.column('price', sa.Numeric(15, 4)),
+        sa.column('status', sa.String), sa.column('created_at', sa.DateTime),
+        sa.column('executed_at', sa.DateTime),
+    )
+    orders = conn.execute(
+        sa.select(
+            o_t.c.id, o_t.c.basket_id, o_t.c.asset_id, o_t.c.type, o_t.c.quantity, o_t.c.price,
+            sa.func.coalesce(o_t.c.executed_at, o_t.c.created_at, type_=sa.DateTime).label('at'),
+        )
+        .where(o_t.c.status == 'EXECUTED')
+        .order_by(o_t.c.created_at, o_t.c.id)
+    ).all()
+    # quantity sold beyond the replayed buys (positions opened before the
+    # ledger) is valued at the position's average price, as realize_fifo does
+    p_t = sa.table(
+        'positions',
+        sa.column('basket_id', sa.Integer), sa.column('asset_id', sa.Integer),
+        sa.column('avg_price', sa.Numeric(15, 4)),
+    )
+    avg_prices = {
+        (p.basket_id, p.asset_id): Decimal(str(p.avg_price))
+        for p in conn.execute(sa.select(p_t.c.basket_id, p_t.c.asset_id, p_t.c.avg_price)).all()
+    }
+    open_lots: dict[tuple[int, int], deque] = {}
+    for o in orders:
+        key = (o.basket_id, o.asset_id)
+        qty, price = Decimal(str(o.quantity)), Decimal(str(o.price))
+        lots = open_lots.setdefault(key, deque())
+        if o.type == "BUY":
+            lot_id = conn.execute(tax_lots.insert().values(
+                basket_id=o.basket_id, asset_id=o.asset_id, buy_order_id=o.id,
+                acquired_at=o.at, quantity=qty, remaining=qty, price=price,
+            )).inserted_primary_key[0]
+            lots.append([lot_id, o.at, qty, price])
+            continue
+        left = qty
+        while left > 0:
+            if lots:
+                lot = lots[0]
+                take = min(lot[2], left)
+                lot_id, acquired_at, cost = lot[0], lot[1], lot[3] * take
+                lot[2] -= take
+                if lot[2] <= 0:
+                    lots.popleft()
+                conn.execute(tax_lots.update().where(tax_lots.c.id == lot_id).values(
+                    remaining=lot[2], closed_at=o.at if lot[2] <= 0 else None,
+                ))
+            else:   # sold more than was ever bought — position's average price
+                take, lot_id, acquired_at = left, None, None
+                cost = avg_prices.get(key, Decimal("0")) * take
+            conn.execute(realized_gains.insert().values(
+                basket_id=o.basket_id, asset_id=o.asset_id, lot_id=lot_id,
+                sell_order_id=o.id, acquired_at=acquired_at, sold_at=o.at,
+                quantity=take, cost=cost, proceeds=price * take, gain=price * take - cost,
+            ))
+            left -= take
+
+
+def downgrade() -> None:
+    op.drop_index('ix_realized_gains_basket_sold', table_name='realized_gains')
+    op.drop_table('realized_gains')
+    op.drop_index('ix_tax_lots_basket_asset_acquired', table_name='tax_lots')
+    op.drop_table('tax_lots')
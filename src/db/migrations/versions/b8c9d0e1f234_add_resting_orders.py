@@ -0,0 +1,44 @@
+"""add resting_orders (paper limit / stop / stop-limit orders)
+
+Revision ID: b8c9d0e1f234
+Revises: a7b8c9d0e123
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b8c9d0e1f234'
+down_revision = 'a7b8c9d0e123'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resting_orders',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('basket_id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('side', sa.String(10), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('quantity', sa.Numeric(15, 6), nullable=False),
+        sa.Column('limit_price', sa.Numeric(15, 4), nullable=True),
+        sa.Column('stop_price', sa.Numeric(15, 4), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('resolved_at', sa.DateTime(), nullable=True),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['basket_id'], ['baskets.id']),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_resting_orders_status', 'resting_orders', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resting_orders_status', table_name='resting_orders')
+    op.drop_table('resting_orders')
@@ -0,0 +1,36 @@
+"""add price_alerts (/avisame thresholds)
+
+Revision ID: c9d0e1f2a345
+Revises: b8c9d0e1f234
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c9d0e1f2a345'
+down_revision = 'b8c9d0e1f234'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_alerts',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('ticker', sa.String(20), nullable=False),
+        sa.Column('direction', sa.String(10), nullable=False),
+        sa.Column('threshold', sa.Numeric(15, 4), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('triggered_at', sa.DateTime(), nullable=True),
+        sa.Column('triggered_price', sa.Numeric(15, 4), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_price_alerts_status', 'price_alerts', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_alerts_status', table_name='price_alerts')
+    op.drop_table('price_alerts')
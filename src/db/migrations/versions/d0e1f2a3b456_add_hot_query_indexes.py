@@ -0,0 +1,34 @@
+"""add composite indexes for the hot query paths
+
+alerts dedup per position per scan, open positions per basket, /historial,
+OWNER checks by user and lookups by username. Guarded by
+tests/test_query_plans.py.
+
+Revision ID: d0e1f2a3b456
+Revises: c9d0e1f2a345
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = 'd0e1f2a3b456'
+down_revision = 'c9d0e1f2a345'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_alerts_basket_asset_status', 'alerts', ['basket_id', 'asset_id', 'status']),
+    ('ix_positions_basket_quantity', 'positions', ['basket_id', 'quantity']),
+    ('ix_orders_basket_created', 'orders', ['basket_id', 'created_at']),
+    ('ix_basket_members_user_role', 'basket_members', ['user_id', 'role']),
+    ('ix_users_username', 'users', ['username']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -14,11 +14,23 @@ depends_on = None
 
 
 def upgrade() -> None:
-    op.add_column(
-        'users',
-        sa.Column('active_basket_id', sa.Integer(), sa.ForeignKey('baskets.id'), nullable=True)
-    )
+    # batch: SQLite can only add the FK by rebuilding the table (plain ALTER elsewhere)
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                'active_basket_id', sa.Integer(),
+                sa.ForeignKey('baskets.id', name='fk_users_active_basket_id'), nullable=True,
+            )
+        )
 
 
 def downgrade() -> None:
-    op.drop_column('users', 'active_basket_id')
+    # The FK is named on databases created by this revision's batch upgrade,
+    # but MariaDB databases migrated before carry an auto-generated name
+    # (users_ibfk_N) — look it up instead of assuming it.
+    fks = sa.inspect(op.get_bind()).get_foreign_keys('users')
+    names = [fk['name'] for fk in fks if fk['constrained_columns'] == ['active_basket_id'] and fk['name']]
+    with op.batch_alter_table('users') as batch_op:
+        for name in names:
+            batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.drop_column('active_basket_id')
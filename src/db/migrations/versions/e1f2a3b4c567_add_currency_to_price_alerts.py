@@ -0,0 +1,30 @@
+"""add currency to price_alerts
+
+The scan batch-quotes alert tickers with one download, which needs each
+ticker's currency. Existing rows take it from `assets` when the ticker is
+known there; the rest stay NULL and are quoted one by one.
+
+Revision ID: e1f2a3b4c567
+Revises: d0e1f2a3b456
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e1f2a3b4c567'
+down_revision = 'd0e1f2a3b456'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('price_alerts', sa.Column('currency', sa.String(10), nullable=True))
+    op.execute(
+        "UPDATE price_alerts SET currency = "
+        "(SELECT assets.currency FROM assets WHERE assets.ticker = price_alerts.ticker)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('price_alerts') as batch_op:
+        batch_op.drop_column('currency')
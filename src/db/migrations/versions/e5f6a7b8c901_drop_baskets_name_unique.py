@@ -12,9 +12,22 @@ branch_labels = None
 depends_on = None
 
 
+# SQLite keeps the UNIQUE as an unnamed table constraint: name it by convention
+# so batch mode can rebuild the table without it.
+_SQLITE_NAMING = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
 def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('baskets', naming_convention=_SQLITE_NAMING) as batch_op:
+            batch_op.drop_constraint('uq_baskets_name', type_='unique')
+        return
     op.drop_index('name', table_name='baskets')
 
 
 def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('baskets', naming_convention=_SQLITE_NAMING) as batch_op:
+            batch_op.create_unique_constraint('uq_baskets_name', ['name'])
+        return
     op.create_index('name', 'baskets', ['name'], unique=True)
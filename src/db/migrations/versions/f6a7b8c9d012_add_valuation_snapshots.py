@@ -0,0 +1,37 @@
+"""add valuation_snapshots (periodic basket equity history)
+
+Revision ID: f6a7b8c9d012
+Revises: a621def3cced
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f6a7b8c9d012'
+down_revision = 'a621def3cced'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'valuation_snapshots',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('basket_id', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(), nullable=False),
+        sa.Column('total_value', sa.Numeric(15, 4), nullable=False),
+        sa.Column('cash', sa.Numeric(15, 4), nullable=False),
+        sa.Column('invested', sa.Numeric(15, 4), nullable=False),
+        sa.Column('pnl', sa.Numeric(15, 4), nullable=False),
+        sa.Column('positions', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['basket_id'], ['baskets.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_valuation_snapshots_basket_taken', 'valuation_snapshots', ['basket_id', 'taken_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_valuation_snapshots_basket_taken', table_name='valuation_snapshots')
+    op.drop_table('valuation_snapshots')
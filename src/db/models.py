@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from sqlalchemy import (
-    BigInteger, Boolean, DateTime, ForeignKey, Numeric,
+    JSON, BigInteger, Boolean, DateTime, ForeignKey, Index, Numeric,
     String, Text, func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -13,6 +13,9 @@ from src.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_username", "username"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
@@ -49,6 +52,9 @@ class Basket(Base):
 
 class BasketMember(Base):
     __tablename__ = "basket_members"
+    __table_args__ = (
+        Index("ix_basket_members_user_role", "user_id", "role"),
+    )
 
     basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
@@ -81,6 +87,9 @@ class BasketAsset(Base):
 
 class Position(Base):
     __tablename__ = "positions"
+    __table_args__ = (
+        Index("ix_positions_basket_quantity", "basket_id", "quantity"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
@@ -95,6 +104,9 @@ class Position(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_basket_created", "basket_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
@@ -115,6 +127,9 @@ class Order(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_basket_asset_status", "basket_id", "asset_id", "status"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
@@ -131,6 +146,117 @@ class Alert(Base):
     asset: Mapped[Asset] = relationship()
 
 
+class TaxLot(Base):
+    """One BUY fill, consumed FIFO by later SELLs of the same basket/asset."""
+    __tablename__ = "tax_lots"
+    __table_args__ = (
+        Index("ix_tax_lots_basket_asset_acquired", "basket_id", "asset_id", "acquired_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id"), nullable=False)
+    buy_order_id: Mapped[int | None] = mapped_column(ForeignKey("orders.id"))
+    acquired_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    quantity: Mapped[Decimal] = mapped_column(Numeric(15, 6), nullable=False)
+    remaining: Mapped[Decimal] = mapped_column(Numeric(15, 6), nullable=False)
+    price: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    closed_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+    asset: Mapped[Asset] = relationship()
+    buy_order: Mapped[Order | None] = relationship()
+
+
+class RealizedGain(Base):
+    """The part of a SELL matched against one lot (lot_id NULL: no lot covered it)."""
+    __tablename__ = "realized_gains"
+    __table_args__ = (
+        Index("ix_realized_gains_basket_sold", "basket_id", "sold_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id"), nullable=False)
+    lot_id: Mapped[int | None] = mapped_column(ForeignKey("tax_lots.id"))
+    sell_order_id: Mapped[int | None] = mapped_column(ForeignKey("orders.id"))
+    acquired_at: Mapped[datetime | None] = mapped_column(DateTime)
+    sold_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    quantity: Mapped[Decimal] = mapped_column(Numeric(15, 6), nullable=False)
+    cost: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    proceeds: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    gain: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+
+    lot: Mapped[TaxLot | None] = relationship()
+    sell_order: Mapped[Order | None] = relationship()
+
+
+class ValuationSnapshot(Base):
+    __tablename__ = "valuation_snapshots"
+    __table_args__ = (
+        Index("ix_valuation_snapshots_basket_taken", "basket_id", "taken_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    total_value: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)   # EUR, cash included
+    cash: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    invested: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)      # cost basis, EUR
+    pnl: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    positions: Mapped[list | None] = mapped_column(JSON)   # [{ticker, quantity, price, currency, value_eur}]
+
+
+class RestingOrder(Base):
+    """A paper limit / stop / stop-limit order waiting for its price.
+
+    Loaded into the in-memory `trigger_book` while OPEN or ARMED (a
+    stop-limit whose stop has fired and now rests as a limit); filled
+    through `PaperTradingExecutor`, which writes the `Order`.
+    """
+    __tablename__ = "resting_orders"
+    __table_args__ = (
+        Index("ix_resting_orders_status", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    basket_id: Mapped[int] = mapped_column(ForeignKey("baskets.id"), nullable=False)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    side: Mapped[str] = mapped_column(String(10), nullable=False)   # BUY | SELL
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)   # LIMIT | STOP | STOP_LIMIT
+    quantity: Mapped[Decimal] = mapped_column(Numeric(15, 6), nullable=False)
+    limit_price: Mapped[Decimal | None] = mapped_column(Numeric(15, 4))
+    stop_price: Mapped[Decimal | None] = mapped_column(Numeric(15, 4))
+    status: Mapped[str] = mapped_column(String(20), default="OPEN")  # OPEN | ARMED | FILLED | CANCELLED | REJECTED
+    reason: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    resolved_at: Mapped[datetime | None] = mapped_column(DateTime)
+    order_id: Mapped[int | None] = mapped_column(ForeignKey("orders.id"))
+
+    asset: Mapped[Asset] = relationship()
+
+
+class PriceAlert(Base):
+    """/avisame threshold: notify `user` once `ticker` crosses `threshold`."""
+    __tablename__ = "price_alerts"
+    __table_args__ = (
+        Index("ix_price_alerts_status", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    ticker: Mapped[str] = mapped_column(String(20), nullable=False)
+    direction: Mapped[str] = mapped_column(String(10), nullable=False)   # ABOVE | BELOW
+    threshold: Mapped[Decimal] = mapped_column(Numeric(15, 4), nullable=False)
+    currency: Mapped[str | None] = mapped_column(String(10))             # quote currency, for batch pricing
+    status: Mapped[str] = mapped_column(String(20), default="ACTIVE")    # ACTIVE | TRIGGERED | CANCELLED
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    triggered_at: Mapped[datetime | None] = mapped_column(DateTime)
+    triggered_price: Mapped[Decimal | None] = mapped_column(Numeric(15, 4))
+
+    user: Mapped[User] = relationship()
+
+
 class Watchlist(Base):
     __tablename__ = "watchlist"
 
@@ -9,6 +9,18 @@ Metrics exposed:
   scroogebot_scan_duration_seconds    histogram
   scroogebot_market_open              gauge    market=NYSE|BME|LSE …
   scroogebot_commands_total           counter  command=<name>, success=true|false
+  scroogebot_order_queue_depth        gauge    basket=<id>
+  scroogebot_order_queue_wait_seconds histogram
+  scroogebot_audit_rows_total         counter  result=flushed|dropped
+  scroogebot_identity_cache_total     counter  kind=user|basket|role, result=hit|miss
+  scroogebot_db_statement_seconds     histogram fingerprint=<sql hash>
+  scroogebot_db_scope_statements      histogram scope=<command|job>  (statements per run)
+  scroogebot_db_scope_seconds         histogram scope=<command|job>  (DB time per run)
+  scroogebot_db_repeated_statements_total counter scope, fingerprint  (N+1 suspects)
+  scroogebot_db_pool_size             gauge    pool=pool|scheduler_pool
+  scroogebot_db_pool_checked_out      gauge    pool=…  (connections in use)
+  scroogebot_db_pool_overflow         gauge    pool=…  (connections beyond pool size)
+  scroogebot_db_pool_wait_seconds     histogram pool=…  (time to check out a connection)
 """
 import logging
 
@@ -50,6 +62,82 @@ commands_total = Counter(
     ["command", "success"],   # success = "true" | "false"
 )
 
+order_queue_depth = Gauge(
+    "scroogebot_order_queue_depth",
+    "Orders running or waiting in a basket's order queue",
+    ["basket"],          # basket id
+)
+
+order_queue_wait_seconds = Histogram(
+    "scroogebot_order_queue_wait_seconds",
+    "Time an order waited for its basket's turn (seconds)",
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1, 5],
+)
+
+audit_rows_total = Counter(
+    "scroogebot_audit_rows_total",
+    "command_logs rows written by the audit buffer, or dropped",
+    ["result"],          # "flushed" | "dropped"
+)
+
+identity_cache_total = Counter(
+    "scroogebot_identity_cache_total",
+    "User / basket / membership lookups served by the identity cache",
+    ["kind", "result"],  # kind = "user" | "basket" | "role", result = "hit" | "miss"
+)
+
+db_statement_seconds = Histogram(
+    "scroogebot_db_statement_seconds",
+    "Duration of each SQL statement, by normalized-SQL fingerprint (seconds)",
+    ["fingerprint"],     # see src/db/instrumentation.py
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1],
+)
+
+db_scope_statements = Histogram(
+    "scroogebot_db_scope_statements",
+    "SQL statements issued by one run of a command or scheduler job",
+    ["scope"],           # "/compra", "callback:handle_alert_callback", "scan:alerts" …
+    buckets=[1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144],
+)
+
+db_scope_seconds = Histogram(
+    "scroogebot_db_scope_seconds",
+    "Total time spent in SQL by one run of a command or scheduler job (seconds)",
+    ["scope"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5],
+)
+
+db_repeated_statements_total = Counter(
+    "scroogebot_db_repeated_statements_total",
+    "Runs in which one statement repeated past the threshold (N+1 pattern)",
+    ["scope", "fingerprint"],
+)
+
+db_pool_size = Gauge(
+    "scroogebot_db_pool_size",
+    "Configured size of a connection pool",
+    ["pool"],            # "pool" (commands) | "scheduler_pool"
+)
+
+db_pool_checked_out = Gauge(
+    "scroogebot_db_pool_checked_out",
+    "Connections currently checked out of a pool",
+    ["pool"],
+)
+
+db_pool_overflow = Gauge(
+    "scroogebot_db_pool_overflow",
+    "Connections open beyond the pool size (bounded by max_overflow)",
+    ["pool"],
+)
+
+db_pool_wait_seconds = Histogram(
+    "scroogebot_db_pool_wait_seconds",
+    "Time to check a connection out of a pool, including opening it (seconds)",
+    ["pool"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30],
+)
+
 
 # ---------------------------------------------------------------------------
 # Server bootstrap
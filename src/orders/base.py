@@ -1,8 +1,18 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from decimal import Decimal
 from src.db.models import Order
 
 
+@dataclass
+class OrderRequest:
+    """One leg of a batch order (`OrderExecutor.sell_many`)."""
+    asset_id: int
+    ticker: str
+    quantity: Decimal
+    price: Decimal
+
+
 class OrderExecutor(ABC):
     @abstractmethod
     async def buy(
@@ -17,3 +27,10 @@ class OrderExecutor(ABC):
         ticker: str, quantity: Decimal, price: Decimal,
         triggered_by: str = "MANUAL",
     ) -> Order: ...
+
+    @abstractmethod
+    async def sell_many(
+        self, session, basket_id: int, user_id: int,
+        requests: list[OrderRequest], triggered_by: str = "MANUAL",
+    ) -> list[Order]:
+        """Sell several assets of one basket atomically: all legs or none."""
@@ -6,26 +6,49 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models import Order, Position, Basket
-from src.orders.base import OrderExecutor
+from src.orders.base import OrderExecutor, OrderRequest
+from src.portfolio.tax_lots import close_lots_fifo, load_open_lots, open_lot, realize_fifo
 
 logger = logging.getLogger(__name__)
 
 
+async def _lock_basket(session: AsyncSession, basket_id: int) -> Basket:
+    """Re-read the basket row with SELECT ... FOR UPDATE.
+
+    Concurrent writers on the same basket (other processes included) block
+    here until this transaction commits. In-process callers are already
+    serialized by `order_queue`.
+    """
+    return await session.get(Basket, basket_id, with_for_update=True, populate_existing=True)
+
+
+def _locked_positions(basket_id: int, *where):
+    """Position rows of `basket_id` matching `where`, as a locking read.
+
+    Callers usually opened the transaction (e.g. `select(Asset)`) before
+    waiting for their turn, and under REPEATABLE READ a plain SELECT returns
+    that earlier snapshot. FOR UPDATE reads the latest committed row, and
+    populate_existing overwrites any copy already in the session.
+    """
+    return (
+        select(Position)
+        .where(Position.basket_id == basket_id, *where)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+
 class PaperTradingExecutor(OrderExecutor):
     async def buy(self, session: AsyncSession, basket_id, asset_id, user_id,
                   ticker, quantity, price, triggered_by="MANUAL") -> Order:
         total_cost = quantity * price
-        basket = await session.get(Basket, basket_id)
+        basket = await _lock_basket(session, basket_id)
         if basket.cash < total_cost:
             raise ValueError(f"Insufficient cash: {basket.cash:.2f} < {total_cost:.2f}")
 
         basket.cash -= total_cost
 
-        result = await session.execute(
-            select(Position).where(
-                Position.basket_id == basket_id, Position.asset_id == asset_id,
-            )
-        )
+        result = await session.execute(_locked_positions(basket_id, Position.asset_id == asset_id))
         pos = result.scalar_one_or_none()
         if pos:
             total_qty = pos.quantity + quantity
@@ -41,24 +64,22 @@ class PaperTradingExecutor(OrderExecutor):
             triggered_by=triggered_by, executed_at=datetime.utcnow(),
         )
         session.add(order)
+        session.add(open_lot(basket_id, asset_id, quantity, price, order.executed_at, order))
         await session.commit()
         await session.refresh(order)
         return order
 
     async def sell(self, session: AsyncSession, basket_id, asset_id, user_id,
                    ticker, quantity, price, triggered_by="MANUAL") -> Order:
-        result = await session.execute(
-            select(Position).where(
-                Position.basket_id == basket_id, Position.asset_id == asset_id,
-            )
-        )
+        basket = await _lock_basket(session, basket_id)
+        result = await session.execute(_locked_positions(basket_id, Position.asset_id == asset_id))
         pos = result.scalar_one_or_none()
         if not pos or pos.quantity < quantity:
             held = pos.quantity if pos else Decimal("0")
             raise ValueError(f"Insufficient position: have {held}, selling {quantity}")
 
+        avg_price = pos.avg_price
         pos.quantity -= quantity
-        basket = await session.get(Basket, basket_id)
         basket.cash += quantity * price
 
         order = Order(
@@ -67,6 +88,52 @@ class PaperTradingExecutor(OrderExecutor):
             triggered_by=triggered_by, executed_at=datetime.utcnow(),
         )
         session.add(order)
+        await close_lots_fifo(
+            session, basket_id, asset_id, quantity, price,
+            order.executed_at, avg_price, order,
+        )
         await session.commit()
         await session.refresh(order)
         return order
+
+    async def sell_many(self, session: AsyncSession, basket_id, user_id,
+                        requests: list[OrderRequest], triggered_by="MANUAL") -> list[Order]:
+        """All legs are validated before anything changes, then written with a
+        single commit — a failing leg leaves the basket untouched."""
+        if not requests:
+            return []
+        asset_ids = [r.asset_id for r in requests]
+        if len(set(asset_ids)) != len(asset_ids):
+            raise ValueError("Duplicate asset in batch")
+
+        basket = await _lock_basket(session, basket_id)
+        result = await session.execute(_locked_positions(basket_id, Position.asset_id.in_(asset_ids)))
+        positions = {p.asset_id: p for p in result.scalars().all()}
+        for r in requests:
+            pos = positions.get(r.asset_id)
+            if not pos or pos.quantity < r.quantity:
+                held = pos.quantity if pos else Decimal("0")
+                raise ValueError(f"Insufficient position {r.ticker}: have {held}, selling {r.quantity}")
+
+        open_lots = await load_open_lots(session, basket_id, asset_ids)
+        executed_at = datetime.utcnow()
+        orders, gains = [], []
+        for r in requests:
+            pos = positions[r.asset_id]
+            avg_price = pos.avg_price
+            pos.quantity -= r.quantity
+            basket.cash += r.quantity * r.price
+            order = Order(
+                basket_id=basket_id, asset_id=r.asset_id, user_id=user_id,
+                type="SELL", quantity=r.quantity, price=r.price, status="EXECUTED",
+                triggered_by=triggered_by, executed_at=executed_at,
+            )
+            orders.append(order)
+            gains += realize_fifo(
+                open_lots[r.asset_id], basket_id, r.asset_id, r.quantity, r.price,
+                executed_at, avg_price, order,
+            )
+        session.add_all(orders)
+        session.add_all(gains)
+        await session.commit()
+        return orders
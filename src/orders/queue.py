@@ -0,0 +1,59 @@
+"""Per-basket order queue: serializes writes to one basket, in arrival order.
+
+Every order touching a basket's cash, positions or tax lots runs inside
+`order_queue.slot(basket_id)`. Requests for the same basket wait their turn
+(asyncio locks wake waiters FIFO); different baskets never wait for each
+other. This only covers one process — `PaperTradingExecutor` also locks the
+basket row with `SELECT ... FOR UPDATE`, so a second process (or a manual
+SQL session) is serialized by the database.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from src.metrics import order_queue_depth, order_queue_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class _Lane:
+    __slots__ = ("lock", "depth")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.depth = 0      # running + waiting
+
+
+class BasketOrderQueue:
+    def __init__(self) -> None:
+        self._lanes: dict[int, _Lane] = {}
+
+    def depth(self, basket_id: int) -> int:
+        lane = self._lanes.get(basket_id)
+        return lane.depth if lane else 0
+
+    @asynccontextmanager
+    async def slot(self, basket_id: int):
+        """Hold the basket's turn for the duration of the block."""
+        lane = self._lanes.get(basket_id)
+        if lane is None:
+            lane = self._lanes[basket_id] = _Lane()
+        lane.depth += 1
+        order_queue_depth.labels(basket=str(basket_id)).set(lane.depth)
+        queued = time.monotonic()
+        try:
+            async with lane.lock:
+                waited = time.monotonic() - queued
+                order_queue_wait_seconds.observe(waited)
+                if waited > 1:
+                    logger.info("Basket %s order waited %.2fs in queue", basket_id, waited)
+                yield
+        finally:
+            lane.depth -= 1
+            order_queue_depth.labels(basket=str(basket_id)).set(lane.depth)
+            if lane.depth == 0:
+                self._lanes.pop(basket_id, None)
+
+
+order_queue = BasketOrderQueue()
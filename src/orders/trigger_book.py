@@ -0,0 +1,130 @@
+"""In-memory trigger book for resting limit / stop / stop-limit orders.
+
+Per ticker, resting orders sit on two ladders sorted by trigger price:
+
+- *below*: fires when the quote falls to or under the level — BUY LIMIT,
+  SELL STOP;
+- *above*: fires when the quote rises to or over the level — SELL LIMIT,
+  BUY STOP.
+
+A quote only has to bisect each ladder and slice off the crossed end, so a
+scan costs O(log n + fired) however many thousands of orders rest on the
+ticker. A STOP_LIMIT sits on its stop ladder until the stop fires; the
+caller then re-adds it as a LIMIT at its limit price (`Trigger.armed()`).
+
+The book is a cache of `resting_orders` rows (status OPEN / ARMED): it is
+rebuilt from the table at startup and the table stays the source of truth
+when filling.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from decimal import Decimal
+
+
+@dataclass(frozen=True)
+class Trigger:
+    order_id: int
+    basket_id: int
+    ticker: str
+    side: str                          # BUY | SELL
+    kind: str                          # LIMIT | STOP | STOP_LIMIT
+    level: Decimal                     # price that fires this trigger
+    limit_price: Decimal | None = None  # STOP_LIMIT: limit once armed
+    currency: str = "USD"
+    market: str | None = None
+
+    @property
+    def fires_below(self) -> bool:
+        return (self.side == "BUY") == (self.kind == "LIMIT")
+
+    def armed(self) -> "Trigger":
+        """The LIMIT a STOP_LIMIT becomes once its stop has fired."""
+        return replace(self, kind="LIMIT", level=self.limit_price, limit_price=None)
+
+
+class PriceLadder:
+    """Ids sorted by price level (two parallel arrays); ties keep arrival order."""
+    __slots__ = ("levels", "ids")
+
+    def __init__(self) -> None:
+        self.levels: list[Decimal] = []
+        self.ids: list[int] = []
+
+    def add(self, level: Decimal, order_id: int) -> None:
+        i = bisect_right(self.levels, level)
+        self.levels.insert(i, level)
+        self.ids.insert(i, order_id)
+
+    def remove(self, level: Decimal, order_id: int) -> None:
+        i = bisect_left(self.levels, level)
+        while self.ids[i] != order_id:
+            i += 1
+        del self.levels[i], self.ids[i]
+
+    def pop_at_or_above(self, price: Decimal) -> list[int]:
+        i = bisect_left(self.levels, price)
+        fired = self.ids[i:]
+        del self.levels[i:], self.ids[i:]
+        return fired
+
+    def pop_at_or_below(self, price: Decimal) -> list[int]:
+        i = bisect_right(self.levels, price)
+        fired = self.ids[:i]
+        del self.levels[:i], self.ids[:i]
+        return fired
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class TriggerBook:
+    def __init__(self) -> None:
+        self._below: dict[str, PriceLadder] = {}
+        self._above: dict[str, PriceLadder] = {}
+        self._triggers: dict[int, Trigger] = {}
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._triggers
+
+    def clear(self) -> None:
+        self._below.clear()
+        self._above.clear()
+        self._triggers.clear()
+
+    def _ladder(self, trigger: Trigger) -> PriceLadder:
+        side = self._below if trigger.fires_below else self._above
+        return side.setdefault(trigger.ticker, PriceLadder())
+
+    def add(self, trigger: Trigger) -> None:
+        if trigger.order_id in self._triggers:
+            self.remove(trigger.order_id)
+        self._triggers[trigger.order_id] = trigger
+        self._ladder(trigger).add(trigger.level, trigger.order_id)
+
+    def remove(self, order_id: int) -> Trigger | None:
+        trigger = self._triggers.pop(order_id, None)
+        if trigger:
+            self._ladder(trigger).remove(trigger.level, order_id)
+        return trigger
+
+    def tickers(self) -> dict[str, Trigger]:
+        """One resting trigger per ticker (for its currency / market)."""
+        return {t.ticker: t for t in self._triggers.values()}
+
+    def crossed(self, ticker: str, price: Decimal) -> list[Trigger]:
+        """Remove and return every trigger on `ticker` that `price` fires.
+
+        Returned oldest order first (time priority when cash runs short).
+        """
+        ids = []
+        if ticker in self._below:
+            ids += self._below[ticker].pop_at_or_above(price)
+        if ticker in self._above:
+            ids += self._above[ticker].pop_at_or_below(price)
+        return [self._triggers.pop(i) for i in sorted(ids)]
+
+
+trigger_book = TriggerBook()
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.data.base import DataProvider
+from src.data.models import PriceSnapshot
 from src.db.models import Basket, Position, Asset
 from src.portfolio.models import BasketValuation, PositionView
 
@@ -16,7 +17,19 @@ class PortfolioEngine:
     def __init__(self, data_provider: DataProvider):
         self.data = data_provider
 
-    async def get_valuation(self, session: AsyncSession, basket_id: int) -> BasketValuation:
+    def snapshot(self, currencies: dict[str, str]) -> PriceSnapshot:
+        """Price `currencies` (ticker → currency) in one batch, each FX pair once."""
+        return self.data.get_price_snapshot(currencies, base=EUR)
+
+    async def get_valuation(
+        self, session: AsyncSession, basket_id: int, snapshot: PriceSnapshot | None = None,
+    ) -> BasketValuation:
+        """Value a basket in EUR.
+
+        Without `snapshot` one is taken for this basket's positions; callers
+        valuing several baskets can pass a shared one so every ticker and FX
+        pair is fetched once.
+        """
         basket = await session.get(Basket, basket_id)
         result = await session.execute(
             select(Position, Asset)
@@ -24,6 +37,8 @@ class PortfolioEngine:
             .where(Position.basket_id == basket_id, Position.quantity > 0)
         )
         rows = result.all()
+        if snapshot is None:
+            snapshot = self.snapshot({asset.ticker: asset.currency for _, asset in rows})
 
         positions = []
         total_invested = Decimal("0")
@@ -31,10 +46,12 @@ class PortfolioEngine:
 
         for pos, asset in rows:
             try:
-                price_obj = self.data.get_current_price(asset.ticker)
+                price_obj = snapshot.prices.get(asset.ticker)
+                if price_obj is None:
+                    raise ValueError("sin cotización")
                 current_price = price_obj.price
                 if price_obj.currency != EUR:
-                    fx = self.data.get_fx_rate(price_obj.currency, EUR)
+                    fx = snapshot.fx_rate(price_obj.currency)
                     current_price_eur = current_price * fx
                     avg_price_eur = pos.avg_price * fx
                 else:
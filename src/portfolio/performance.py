@@ -0,0 +1,189 @@
+"""Basket performance from the order ledger: TWR, MWR (IRR), volatility, drawdown.
+
+The basket's orders are loaded once (`load_ledger`) and replayed as arrays
+over a daily close matrix (normally from the bar store):
+
+    qty[t, i]  = cumulative signed quantity of ticker i at day t   (np.add.at + cumsum)
+    flow[t]    = net cash moved into positions on day t            (buys − sells)
+    value[t]   = Σ_i qty[t, i] · close[t, i]
+    cash[t]    = cash at the first day − cumsum(flow)
+
+Nothing loops over orders or days in Python, so thousands of orders cost a
+few array operations.
+
+Two views are reported:
+
+  - the *account* (cash + positions). Paper baskets receive no deposits, so
+    its return is simply final / initial equity.
+  - the *invested sleeve* (positions only). Buys are inflows, sells outflows:
+    TWR chain-links daily returns net of those flows (the strategy's
+    selection), MWR is the IRR of the same flows (selection + timing).
+
+Prices are marked in each asset's own currency, the same units in which
+`PaperTradingExecutor` moves basket cash. Orders older than the close matrix
+are folded into the opening positions; flows on the first day are part of
+the opening value.
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Asset, Order
+
+TRADING_DAYS = 252
+_IRR_ITERATIONS = 200
+
+
+@dataclass
+class OrderLedger:
+    """A basket's executed orders as parallel arrays (chronological)."""
+    when: np.ndarray      # datetime64[ns]
+    tickers: np.ndarray   # object (str)
+    qty: np.ndarray       # float, + for BUY, − for SELL
+    price: np.ndarray     # float, execution price
+
+    def __len__(self) -> int:
+        return len(self.qty)
+
+    @property
+    def cash_flow(self) -> np.ndarray:
+        """Cash moved into positions per order (buys positive, sells negative)."""
+        return self.qty * self.price
+
+
+@dataclass
+class PerformanceResult:
+    start: datetime
+    end: datetime
+    n_days: int
+    n_orders: int
+    account_return_pct: float
+    twr_pct: float
+    twr_annualized_pct: float
+    mwr_annualized_pct: float | None   # None when the IRR has no root
+    volatility_pct: float              # annualized, from daily TWR returns
+    max_drawdown_pct: float            # of the TWR index
+    equity: pd.Series                  # account value per day
+
+
+async def load_ledger(session: AsyncSession, basket_id: int) -> OrderLedger:
+    """Fetch every executed order of a basket in one query."""
+    rows = (await session.execute(
+        select(Order.type, Order.quantity, Order.price, Order.created_at, Order.executed_at, Asset.ticker)
+        .join(Asset, Asset.id == Order.asset_id)
+        .where(Order.basket_id == basket_id, Order.status == "EXECUTED")
+        .order_by(Order.created_at, Order.id)
+    )).all()
+    sign = np.array([1.0 if r.type == "BUY" else -1.0 for r in rows])
+    return OrderLedger(
+        when=np.array([r.executed_at or r.created_at for r in rows], dtype="datetime64[ns]"),
+        tickers=np.array([r.ticker for r in rows], dtype=object),
+        qty=sign * np.array([float(r.quantity) for r in rows]),
+        price=np.array([float(r.price) for r in rows]),
+    )
+
+
+def _irr(flows: np.ndarray, years: np.ndarray) -> float | None:
+    """Annual rate r with Σ flows · (1+r)^(−years) = 0 (bisection on log(1+r))."""
+    def npv(log_growth: float) -> float:
+        return float(np.sum(flows * np.exp(-log_growth * years)))
+
+    lo, hi = math.log(1e-4), math.log(1e3)     # −99.99% … +99,900% per year
+    f_lo, f_hi = npv(lo), npv(hi)
+    if not (math.isfinite(f_lo) and math.isfinite(f_hi)) or f_lo * f_hi > 0:
+        return None
+    for _ in range(_IRR_ITERATIONS):
+        mid = (lo + hi) / 2
+        f_mid = npv(mid)
+        if f_mid == 0 or hi - lo < 1e-12:
+            break
+        if (f_mid > 0) == (f_lo > 0):
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+    return math.exp((lo + hi) / 2) - 1
+
+
+def compute_performance(
+    ledger: OrderLedger, closes: pd.DataFrame, current_cash: float,
+    start: datetime | None = None,
+) -> PerformanceResult:
+    """Replay `ledger` over `closes` (daily, one column per ticker).
+
+    `current_cash` anchors the cash curve: the opening cash is the current
+    balance plus every flow since. `start` trims the window (the ledger
+    before it becomes the opening position).
+    """
+    if start is not None:
+        closes = closes.loc[closes.index >= pd.Timestamp(start)]
+    if len(closes) < 2:
+        raise ValueError("Histórico de precios insuficiente para el periodo")
+    missing = set(ledger.tickers) - set(closes.columns)
+    if missing:
+        raise ValueError(f"Sin cotizaciones para: {', '.join(sorted(missing))}")
+
+    index = closes.index
+    tickers = list(closes.columns)
+    n_days, n_assets = len(index), len(tickers)
+    px = closes.ffill().bfill().to_numpy(dtype=float)
+
+    col = pd.Index(tickers).get_indexer(ledger.tickers)
+    day = np.searchsorted(index.values, ledger.when, side="right") - 1
+    day = np.clip(day, 0, None)    # before the window → opening position
+
+    delta = np.zeros((n_days, n_assets))
+    np.add.at(delta, (day, col), ledger.qty)
+    qty = np.cumsum(delta, axis=0)
+    qty[np.abs(qty) < 1e-9] = 0.0
+    value = (qty * px).sum(axis=1)
+
+    flow = np.zeros(n_days)
+    np.add.at(flow, day, ledger.cash_flow)
+    # everything up to and including day 0 is the opening state
+    cash = current_cash + float(flow[1:].sum()) - np.concatenate(([0.0], np.cumsum(flow[1:])))
+    equity = cash + value
+
+    # Daily sleeve returns net of flows (flows valued at day-end)
+    prev = value[:-1]
+    net = value[1:] - flow[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = np.where(
+            prev > 0, net / prev - 1,
+            np.where(flow[1:] > 0, value[1:] / flow[1:] - 1, 0.0),
+        )
+    growth = np.cumprod(1 + rets)
+    twr = float(growth[-1] - 1)
+
+    span_years = (index[-1] - index[0]).days / 365.25
+    twr_ann = (1 + twr) ** (1 / span_years) - 1 if span_years > 0 and twr > -1 else twr
+    std = float(rets.std(ddof=1)) if len(rets) > 1 else 0.0
+
+    index_curve = np.concatenate(([1.0], growth))
+    peak = np.maximum.accumulate(index_curve)
+    max_dd = float(((peak - index_curve) / peak).max())
+
+    # MWR: opening value and flows are contributions, final value is returned
+    years = (index - index[0]).days.to_numpy(dtype=float) / 365.25
+    irr_flows = -flow.copy()
+    irr_flows[0] = -value[0]
+    irr_flows[-1] += value[-1]
+    mwr = _irr(irr_flows, years) if np.any(irr_flows < 0) and np.any(irr_flows > 0) else None
+
+    return PerformanceResult(
+        start=index[0].to_pydatetime(),
+        end=index[-1].to_pydatetime(),
+        n_days=n_days,
+        n_orders=len(ledger),
+        account_return_pct=float((equity[-1] / equity[0] - 1) * 100) if equity[0] else 0.0,
+        twr_pct=twr * 100,
+        twr_annualized_pct=float(twr_ann) * 100,
+        mwr_annualized_pct=mwr * 100 if mwr is not None else None,
+        volatility_pct=std * math.sqrt(TRADING_DAYS) * 100,
+        max_drawdown_pct=max_dd * 100,
+        equity=pd.Series(equity, index=index, name="equity"),
+    )
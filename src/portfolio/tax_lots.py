@@ -0,0 +1,157 @@
+"""FIFO tax lots and Spanish savings-base (base del ahorro) helpers.
+
+Every BUY opens a `TaxLot`; every SELL consumes the oldest open lots of the
+same basket/asset first (FIFO, as the Spanish IRPF requires — see
+docs/mercado-espanol-productos-fiscalidad.md §4.2) and writes one
+`RealizedGain` per lot touched. The ledger is maintained by
+`PaperTradingExecutor` inside the order's own transaction, so a sale costs
+O(lots touched) instead of a replay of the `orders` table.
+
+Amounts are in the asset's own currency, like order prices and basket cash.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import RealizedGain, TaxLot
+
+# (upper bound of the bracket, rate) — tipos 2025 de la base del ahorro
+SAVINGS_BRACKETS: list[tuple[Decimal | None, Decimal]] = [
+    (Decimal("6000"), Decimal("0.19")),
+    (Decimal("50000"), Decimal("0.21")),
+    (Decimal("200000"), Decimal("0.23")),
+    (Decimal("300000"), Decimal("0.27")),
+    (None, Decimal("0.30")),
+]
+WASH_SALE_WINDOW = pd.DateOffset(months=2)   # norma antiaplicación, valores cotizados
+
+
+@dataclass
+class LotFill:
+    lot: TaxLot | None   # None: quantity not covered by any open lot
+    quantity: Decimal
+
+
+def match_fifo(open_lots: list[TaxLot], quantity: Decimal) -> list[LotFill]:
+    """Split `quantity` across `open_lots` (oldest first); remainder gets lot=None."""
+    fills = []
+    left = quantity
+    for lot in open_lots:
+        if left <= 0:
+            break
+        take = min(lot.remaining, left)
+        if take > 0:
+            fills.append(LotFill(lot, take))
+            left -= take
+    if left > 0:
+        fills.append(LotFill(None, left))
+    return fills
+
+
+def open_lot(basket_id: int, asset_id: int, quantity: Decimal, price: Decimal,
+             acquired_at: datetime, buy_order=None) -> TaxLot:
+    return TaxLot(
+        basket_id=basket_id, asset_id=asset_id, buy_order=buy_order,
+        acquired_at=acquired_at, quantity=quantity, remaining=quantity, price=price,
+    )
+
+
+def realize_fifo(
+    open_lots: list[TaxLot], basket_id: int, asset_id: int, quantity: Decimal,
+    price: Decimal, sold_at: datetime, fallback_cost: Decimal, sell_order=None,
+) -> list[RealizedGain]:
+    """Consume `open_lots` (oldest first) for one SELL; returns unsaved gains.
+
+    `fallback_cost` (the position's average price) values any quantity that
+    no lot covers — positions opened before the ledger existed.
+    """
+    gains = []
+    for fill in match_fifo(open_lots, quantity):
+        unit_cost = fill.lot.price if fill.lot else fallback_cost
+        cost = unit_cost * fill.quantity
+        proceeds = price * fill.quantity
+        if fill.lot:
+            fill.lot.remaining -= fill.quantity
+            if fill.lot.remaining <= 0:
+                fill.lot.closed_at = sold_at
+        gains.append(RealizedGain(
+            basket_id=basket_id, asset_id=asset_id, lot=fill.lot, sell_order=sell_order,
+            acquired_at=fill.lot.acquired_at if fill.lot else None, sold_at=sold_at,
+            quantity=fill.quantity, cost=cost, proceeds=proceeds, gain=proceeds - cost,
+        ))
+    return gains
+
+
+async def load_open_lots(
+    session: AsyncSession, basket_id: int, asset_ids: list[int],
+) -> dict[int, list[TaxLot]]:
+    """Open lots of several assets in one locked query, FIFO-ordered per asset."""
+    lots = (await session.execute(
+        select(TaxLot)
+        .where(TaxLot.basket_id == basket_id, TaxLot.asset_id.in_(asset_ids), TaxLot.remaining > 0)
+        .order_by(TaxLot.asset_id, TaxLot.acquired_at, TaxLot.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )).scalars().all()
+    by_asset: dict[int, list[TaxLot]] = {a: [] for a in asset_ids}
+    for lot in lots:
+        by_asset[lot.asset_id].append(lot)
+    return by_asset
+
+
+async def close_lots_fifo(
+    session: AsyncSession, basket_id: int, asset_id: int, quantity: Decimal,
+    price: Decimal, sold_at: datetime, fallback_cost: Decimal, sell_order=None,
+) -> list[RealizedGain]:
+    """Consume open lots FIFO for a SELL and add one `RealizedGain` per lot."""
+    open_lots = (await load_open_lots(session, basket_id, [asset_id]))[asset_id]
+    gains = realize_fifo(
+        open_lots, basket_id, asset_id, quantity, price, sold_at, fallback_cost, sell_order,
+    )
+    session.add_all(gains)
+    return gains
+
+
+def savings_tax(net_gain: Decimal) -> Decimal:
+    """Tax on `net_gain` with the progressive savings-base brackets (0 if ≤ 0)."""
+    tax = Decimal("0")
+    lower = Decimal("0")
+    for upper, rate in SAVINGS_BRACKETS:
+        if net_gain <= lower:
+            break
+        top = net_gain if upper is None else min(net_gain, upper)
+        tax += (top - lower) * rate
+        if upper is None:
+            break
+        lower = upper
+    return tax
+
+
+def wash_sale_flags(
+    losses: list[tuple[int, int | None, datetime]],
+    lots: list[tuple[int, int, datetime, datetime | None]],
+) -> set[int]:
+    """Loss rows with a repurchase of the same asset within ±2 months.
+
+    `losses`: (asset_id, lot_id, sold_at) per realized loss.
+    `lots`: (lot_id, asset_id, acquired_at, closed_at). A lot counts if it
+    was acquired inside the window and was still held after the sale (lots
+    emptied by that same sale are not a repurchase). Returns the indexes of
+    `losses` that the norma antiaplicación may defer.
+    """
+    by_asset: dict[int, list[tuple[int, datetime, datetime | None]]] = {}
+    for lot_id, asset_id, acquired_at, closed_at in lots:
+        by_asset.setdefault(asset_id, []).append((lot_id, acquired_at, closed_at))
+    flagged = set()
+    for i, (asset_id, lot_id, sold_at) in enumerate(losses):
+        lo, hi = sold_at - WASH_SALE_WINDOW, sold_at + WASH_SALE_WINDOW
+        if any(
+            lid != lot_id and lo <= acq <= hi and (closed is None or closed > sold_at)
+            for lid, acq, closed in by_asset.get(asset_id, [])
+        ):
+            flagged.add(i)
+    return flagged
@@ -0,0 +1,238 @@
+"""Post-close precomputation of heavy analytics.
+
+Scheduled once per weekday after the markets close. Refreshes the bar store
+for every asset of every active basket (and every ticker in their order
+ledgers, which /rendimiento reads), then materialises:
+
+  - backtests for each basket × `VALID_PERIODS`
+  - Monte Carlo summaries per basket, `scheduler.precompute.montecarlo_sims`
+    paths per asset (default `DEFAULT_N_SIMS`); above `STREAM_CHUNK` they are
+    folded chunk by chunk into a constant-memory `MonteCarloAccumulator`
+  - the /analiza indicator snapshot per ticker
+
+`/backtest`, `/montecarlo` and `/analiza` answer from `precomputed` (with a
+"calculado a las HH:MM" stamp) unless the user passes `live`, or the basket's
+strategy / stop-loss changed since (`/estrategia` also evicts the basket). The
+store is in-process: after a restart handlers compute live until the next run.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+
+from src.backtest.engine import VALID_PERIODS, BacktestEngine, PortfolioBacktestResult
+from src.backtest.montecarlo import (
+    DEFAULT_HORIZON, DEFAULT_N_SIMS, STREAM_CHUNK, AssetMonteCarloResult, MonteCarloAnalyzer,
+    path_cache, ticker_rng,
+)
+from src.config import app_config
+from src.data.bar_store import STORE_PERIOD, bar_store
+from src.db.base import scheduler_session_factory
+from src.db.models import Asset, Basket, BasketAsset, Order, Position
+from src.strategies.registry import STRATEGY_MAP
+
+logger = logging.getLogger(__name__)
+
+LIVE_FLAG = "live"
+
+
+@dataclass
+class Materialized:
+    value: Any
+    computed_at: datetime
+    # basket settings a backtest / Monte Carlo value was computed with
+    strategy: str | None = None
+    stop_loss_pct: Decimal | None = None
+
+    def computed_for(self, basket: Basket) -> bool:
+        """False once /estrategia changed the basket's strategy or stop-loss."""
+        return self.strategy == basket.strategy and self.stop_loss_pct == basket.stop_loss_pct
+
+
+@dataclass
+class MonteCarloSnapshot:
+    seed: int
+    n_sims: int
+    horizon: int
+    results: list[AssetMonteCarloResult] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)   # ticker → error
+
+
+class PrecomputeStore:
+    def __init__(self):
+        self.backtests: dict[tuple[int, str], Materialized] = {}   # (basket_id, period)
+        self.montecarlo: dict[int, Materialized] = {}              # basket_id
+        self.analyses: dict[str, Materialized] = {}                # ticker → /analiza text
+
+    def evict_basket(self, basket_id: int) -> None:
+        for key in [k for k in self.backtests if k[0] == basket_id]:
+            del self.backtests[key]
+        self.montecarlo.pop(basket_id, None)
+
+    def clear(self) -> None:
+        self.backtests.clear()
+        self.montecarlo.clear()
+        self.analyses.clear()
+
+
+precomputed = PrecomputeStore()
+
+
+def computed_stamp(computed_at: datetime) -> str:
+    return f"🕒 _calculado a las {computed_at:%H:%M} ({computed_at:%d/%m}) — añade `live` para recalcular_"
+
+
+def pop_live_flag(args: list[str]) -> tuple[list[str], bool]:
+    """Strip a `live` token from command args. Returns (remaining_args, live)."""
+    remaining = [a for a in args if a.lower() != LIVE_FLAG]
+    return remaining, len(remaining) != len(args)
+
+
+async def _load_universe() -> tuple[list[Basket], dict[int, list[str]], dict[str, str], list[str]]:
+    """Active baskets, their tickers (BasketAsset, else open positions), ticker
+    currencies and every ticker those baskets ever traded."""
+    async with scheduler_session_factory() as session:
+        baskets = (await session.execute(
+            select(Basket).where(Basket.active == True)
+        )).scalars().all()
+        fixed = (await session.execute(
+            select(BasketAsset.basket_id, Asset.ticker, Asset.currency)
+            .join(Asset, Asset.id == BasketAsset.asset_id)
+            .where(BasketAsset.active == True)
+        )).all()
+        held = (await session.execute(
+            select(Position.basket_id, Asset.ticker, Asset.currency)
+            .join(Asset, Asset.id == Position.asset_id)
+            .where(Position.quantity > 0)
+        )).all()
+        traded = (await session.execute(
+            select(Asset.ticker).distinct()
+            .join(Order, Order.asset_id == Asset.id)
+            .join(Basket, Basket.id == Order.basket_id)
+            .where(Basket.active == True)
+        )).scalars().all()
+
+    tickers: dict[int, list[str]] = {}
+    currencies: dict[str, str] = {}
+    for basket_id, ticker, currency in fixed:
+        tickers.setdefault(basket_id, []).append(ticker)
+        currencies[ticker] = currency
+    fixed_ids = set(tickers)
+    for basket_id, ticker, currency in held:
+        currencies.setdefault(ticker, currency)
+        if basket_id not in fixed_ids:
+            bucket = tickers.setdefault(basket_id, [])
+            if ticker not in bucket:
+                bucket.append(ticker)
+    return list(baskets), tickers, currencies, list(traded)
+
+
+def montecarlo_sims() -> int:
+    return app_config.get("scheduler", {}).get("precompute", {}).get("montecarlo_sims", DEFAULT_N_SIMS)
+
+
+def _run_montecarlo(
+    basket: Basket, tickers: list[str], seed: int, analyzer: MonteCarloAnalyzer,
+) -> MonteCarloSnapshot:
+    strategy = STRATEGY_MAP[basket.strategy]()
+    rng = np.random.default_rng(seed)
+    sl_pct = float(basket.stop_loss_pct) if basket.stop_loss_pct else None
+    n_sims = montecarlo_sims()
+    snap = MonteCarloSnapshot(seed=seed, n_sims=n_sims, horizon=DEFAULT_HORIZON)
+    for t in tickers:
+        ohlcv = bar_store.get(t, STORE_PERIOD)
+        if ohlcv is None:
+            snap.errors[t] = "sin datos"
+            continue
+        try:
+            if n_sims > STREAM_CHUNK:
+                # too many paths to hold at once: stream them through sketches
+                result = analyzer.run_asset_streaming(
+                    t, strategy, basket.strategy, ohlcv.data,
+                    n_sims, DEFAULT_HORIZON, ticker_rng(seed, t), seed, sl_pct,
+                )
+            else:
+                result = analyzer.run_asset(
+                    t, strategy, basket.strategy, ohlcv.data,
+                    n_sims, DEFAULT_HORIZON, rng, seed, sl_pct,
+                )
+            snap.results.append(result)
+        except Exception as e:
+            logger.error("Precompute Monte Carlo error %s/%s: %s", basket.name, t, e)
+            snap.errors[t] = str(e)
+    return snap
+
+
+async def run_precompute(store: PrecomputeStore = precomputed) -> None:
+    """Scheduler entry point — refresh bars and materialise all analytics."""
+    from src.bot.handlers.analysis import build_analysis_text
+
+    started = datetime.now()
+    baskets, tickers_by_basket, currencies, traded = await _load_universe()
+    universe = list(dict.fromkeys(t for ts in tickers_by_basket.values() for t in ts))
+    to_refresh = list(dict.fromkeys(universe + traded))
+    if not to_refresh:
+        logger.info("Precompute: no assets to process")
+        return
+
+    loop = asyncio.get_running_loop()
+    refreshed = await loop.run_in_executor(None, bar_store.refresh, to_refresh)
+    logger.info("Precompute: bar store refreshed %d/%d tickers", len(refreshed), len(to_refresh))
+
+    # /analiza — indicators from the last close
+    for t in refreshed:
+        if t not in currencies:      # only in a ledger: nothing else to materialise
+            continue
+        ohlcv = bar_store.get(t, "3mo")
+        try:
+            last_close = Decimal(str(round(float(ohlcv.data["Close"].iloc[-1]), 4)))
+            text = build_analysis_text(t, last_close, currencies.get(t, "USD"), ohlcv.data)
+        except Exception as e:
+            logger.warning("Precompute analysis error %s: %s", t, e)
+            continue
+        store.analyses[t] = Materialized(text, datetime.now())
+
+    engine = BacktestEngine()
+    # One seed and a shared path cache per run: baskets holding the same
+    # tickers are evaluated on identical synthetic paths
+    seed = int(np.random.default_rng().integers(0, 99_999))
+    analyzer = MonteCarloAnalyzer(path_cache=path_cache)
+    for basket in baskets:
+        tickers = tickers_by_basket.get(basket.id)
+        if not tickers or basket.strategy not in STRATEGY_MAP:
+            continue
+        sl_pct = float(basket.stop_loss_pct) if basket.stop_loss_pct else None
+
+        for period in sorted(VALID_PERIODS):
+            ohlcv_dict = bar_store.get_many(tickers, period)
+            try:
+                result: PortfolioBacktestResult = await loop.run_in_executor(
+                    None, engine.run,
+                    tickers, STRATEGY_MAP[basket.strategy](), basket.strategy,
+                    period, sl_pct, ohlcv_dict,
+                )
+            except Exception as e:
+                logger.error("Precompute backtest error %s (%s): %s", basket.name, period, e)
+                continue
+            store.backtests[(basket.id, period)] = Materialized(
+                result, datetime.now(), basket.strategy, basket.stop_loss_pct,
+            )
+
+        snap = await loop.run_in_executor(
+            None, _run_montecarlo, basket, tickers, seed, analyzer,
+        )
+        if snap.results:
+            store.montecarlo[basket.id] = Materialized(
+                snap, datetime.now(), basket.strategy, basket.stop_loss_pct,
+            )
+
+    logger.info(
+        "Precompute finished in %.0fs: %d backtests, %d Monte Carlo, %d analyses",
+        (datetime.now() - started).total_seconds(),
+        len(store.backtests), len(store.montecarlo), len(store.analyses),
+    )
@@ -0,0 +1,152 @@
+"""Resting-order scan: fill limit / stop / stop-limit paper orders.
+
+Every `scheduler.resting_orders.interval_minutes` the job quotes each ticker
+that has a resting order (one batched `get_current_prices` call, open
+markets only), asks the `trigger_book` which orders the quote crosses and
+fills those through `PaperTradingExecutor.buy` / `sell` at the quote, inside
+the basket's `order_queue` slot. The `resting_orders` row is re-read with
+`FOR UPDATE` first, so an order cancelled meanwhile (or filled by another
+process) is skipped.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from src.data.base import DataProvider
+from src.data.yahoo import YahooDataProvider
+from src.db.base import scheduler_session_factory
+from src.db.models import Asset, RestingOrder
+from src.orders.paper import PaperTradingExecutor
+from src.orders.queue import order_queue
+from src.orders.trigger_book import Trigger, TriggerBook, trigger_book
+from src.scheduler.market_hours import is_market_open
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MINUTES = 5
+ACTIVE_STATUSES = ("OPEN", "ARMED")
+
+_provider = YahooDataProvider()
+_executor = PaperTradingExecutor()
+
+
+def trigger_for(order: RestingOrder, asset: Asset) -> Trigger:
+    """Book entry for a resting order in its current phase."""
+    if order.kind == "LIMIT" or order.status == "ARMED":
+        kind, level, limit = "LIMIT", order.limit_price, None
+    else:
+        kind, level, limit = order.kind, order.stop_price, order.limit_price
+    return Trigger(
+        order_id=order.id, basket_id=order.basket_id, ticker=asset.ticker,
+        side=order.side, kind=kind, level=level, limit_price=limit,
+        currency=asset.currency, market=asset.market,
+    )
+
+
+async def load_trigger_book(book: TriggerBook = trigger_book) -> int:
+    """Rebuild `book` from every OPEN / ARMED row (indexed on status)."""
+    async with scheduler_session_factory() as session:
+        rows = (await session.execute(
+            select(RestingOrder, Asset)
+            .join(Asset, Asset.id == RestingOrder.asset_id)
+            .where(RestingOrder.status.in_(ACTIVE_STATUSES))
+        )).all()
+    book.clear()
+    for order, asset in rows:
+        book.add(trigger_for(order, asset))
+    logger.info("Trigger book loaded: %d resting orders", len(book))
+    return len(book)
+
+
+async def _fill(trigger: Trigger, price: Decimal, book: TriggerBook) -> str:
+    """Arm or fill one crossed trigger. Returns the row's new status."""
+    async with order_queue.slot(trigger.basket_id):
+        async with scheduler_session_factory() as session:
+            order = await session.get(
+                RestingOrder, trigger.order_id, with_for_update=True, populate_existing=True,
+            )
+            if not order or order.status not in ACTIVE_STATUSES:
+                return order.status if order else "MISSING"
+
+            if trigger.kind == "STOP_LIMIT":
+                order.status = "ARMED"
+                await session.commit()
+                book.add(trigger.armed())
+                return "ARMED"
+
+            order.status = "FILLED"
+            order.resolved_at = datetime.utcnow()
+            fill = _executor.buy if trigger.side == "BUY" else _executor.sell
+            try:
+                executed = await fill(
+                    session, order.basket_id, order.asset_id, order.user_id,
+                    trigger.ticker, order.quantity, price, order.kind,
+                )
+            except ValueError as e:
+                await session.rollback()
+                order = await session.get(RestingOrder, trigger.order_id, with_for_update=True)
+                order.status = "REJECTED"
+                order.reason = str(e)
+                order.resolved_at = datetime.utcnow()
+                await session.commit()
+                logger.warning("Resting order %s rejected: %s", trigger.order_id, e)
+                return "REJECTED"
+            order.order_id = executed.id
+            await session.commit()
+            logger.info(
+                "Resting order %s filled: %s %s %s @ %s",
+                trigger.order_id, trigger.side, order.quantity, trigger.ticker, price,
+            )
+            return "FILLED"
+
+
+async def scan_book(
+    prices: dict[str, Decimal], book: TriggerBook = trigger_book,
+) -> dict[int, str]:
+    """Apply one round of quotes to `book`; returns {order_id: new status}."""
+    results = {}
+    for ticker, price in prices.items():
+        retry = []
+        # an armed stop-limit goes back in the book and may fire right away
+        while crossed := book.crossed(ticker, price):
+            for trigger in crossed:
+                try:
+                    results[trigger.order_id] = await _fill(trigger, price, book)
+                except Exception as e:
+                    logger.error("Resting order %s error: %s", trigger.order_id, e)
+                    retry.append(trigger)
+                    results[trigger.order_id] = "ERROR"
+        for trigger in retry:          # back in the book for the next scan
+            book.add(trigger)
+    return results
+
+
+async def run_resting_orders(
+    provider: DataProvider = _provider, book: TriggerBook = trigger_book,
+) -> int:
+    """Scheduler entry point — returns the number of orders filled."""
+    if not len(book):
+        return 0
+    tickers = {t: trig for t, trig in book.tickers().items()
+               if not trig.market or is_market_open(trig.market)}
+    if not tickers:
+        return 0
+
+    loop = asyncio.get_running_loop()
+    try:
+        quotes = await loop.run_in_executor(
+            None, provider.get_current_prices,
+            list(tickers), {t: trig.currency for t, trig in tickers.items()},
+        )
+    except Exception as e:
+        logger.error("Resting orders: pricing failed: %s", e)
+        return 0
+
+    results = await scan_book({t: q.price for t, q in quotes.items()}, book)
+    filled = sum(1 for s in results.values() if s == "FILLED")
+    if results:
+        logger.info("Resting orders: %d triggered, %d filled", len(results), filled)
+    return filled
@@ -0,0 +1,112 @@
+"""Periodic valuation snapshots — the equity-curve history of every basket.
+
+`/valoracion` only ever values baskets live, so there was no record of how a
+basket's value evolved. This job (cadence in `scheduler.valuation_snapshots`)
+takes one shared `PriceSnapshot` for every held ticker, values each active
+basket from it and bulk-inserts one `ValuationSnapshot` row per basket.
+`/rendimiento` reads the table back without touching the network.
+
+A basket with any held ticker (or its FX rate) missing from the snapshot is
+skipped for that run rather than stored with an understated total.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from src.data.models import PriceSnapshot
+from src.data.yahoo import YahooDataProvider
+from src.db.base import scheduler_session_factory
+from src.db.models import Asset, Basket, Position, ValuationSnapshot
+from src.portfolio.engine import PortfolioEngine
+from src.portfolio.models import BasketValuation
+from src.scheduler.market_hours import any_market_open
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MINUTES = 60
+
+_engine = PortfolioEngine(YahooDataProvider())
+
+
+def _priced(snapshot: PriceSnapshot, holdings: list[tuple[str, str]]) -> bool:
+    """True if every (ticker, currency) held can be valued from `snapshot`."""
+    return all(
+        t in snapshot.prices
+        and (snapshot.prices[t].currency == snapshot.base or snapshot.prices[t].currency in snapshot.fx)
+        for t, _ in holdings
+    )
+
+
+def snapshot_row(val: BasketValuation, taken_at: datetime) -> dict:
+    return {
+        "basket_id": val.basket_id,
+        "taken_at": taken_at,
+        "total_value": val.total_value,
+        "cash": val.cash,
+        "invested": val.total_invested,
+        "pnl": val.total_pnl,
+        "positions": [
+            {
+                "ticker": p.ticker,
+                "quantity": float(p.quantity),
+                "price": float(p.current_price),
+                "currency": p.currency,
+                "value_eur": float(p.market_value),
+            }
+            for p in val.positions
+        ],
+    }
+
+
+async def run_valuation_snapshots(
+    engine: PortfolioEngine = _engine, market_hours_only: bool = True,
+) -> int:
+    """Scheduler entry point — store one valuation row per active basket.
+
+    Returns the number of rows inserted.
+    """
+    if market_hours_only and not any_market_open():
+        return 0
+
+    async with scheduler_session_factory() as session:
+        baskets = (await session.execute(
+            select(Basket).where(Basket.active == True)
+        )).scalars().all()
+        held = (await session.execute(
+            select(Position.basket_id, Asset.ticker, Asset.currency)
+            .join(Asset, Asset.id == Position.asset_id)
+            .where(Position.quantity > 0)
+        )).all()
+
+        holdings: dict[int, list[tuple[str, str]]] = {}
+        for basket_id, ticker, currency in held:
+            holdings.setdefault(basket_id, []).append((ticker, currency))
+        currencies = {t: c for hs in holdings.values() for t, c in hs}
+
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(None, engine.snapshot, currencies)
+        except Exception as e:
+            logger.error("Valuation snapshot: pricing failed: %s", e)
+            return 0
+
+        taken_at = datetime.now()
+        rows = []
+        for basket in baskets:
+            if not _priced(snapshot, holdings.get(basket.id, [])):
+                logger.warning("Valuation snapshot: %s skipped (incomplete prices)", basket.name)
+                continue
+            try:
+                val = await engine.get_valuation(session, basket.id, snapshot=snapshot)
+            except Exception as e:
+                logger.error("Valuation snapshot error basket %s: %s", basket.id, e)
+                continue
+            rows.append(snapshot_row(val, taken_at))
+
+        if rows:
+            await session.execute(insert(ValuationSnapshot), rows)
+            await session.commit()
+    logger.info("Valuation snapshot: %d/%d baskets stored", len(rows), len(baskets))
+    return len(rows)
@@ -0,0 +1,47 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert
+
+from src.bot.identity import identity_cache
+from src.config import settings
+from src.db.models import Basket, BasketMember, User
+
+SQLITE_OWNER_TG_ID = 5001
+
+
+@pytest.fixture(autouse=True)
+def _clear_identity_cache():
+    """Handlers cache users / baskets / roles across calls; start each test cold."""
+    identity_cache.clear()
+    yield
+    identity_cache.clear()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """SQLite file migrated to head with basket 1 ("Mi Cesta", 1000 cash) owned by tg 5001.
+
+    Points `settings.sqlite_path` at it, so `settings.database_url` is the aiosqlite URL.
+    """
+    path = tmp_path / "scroogebot.db"
+    monkeypatch.setattr(settings, "sqlite_path", str(path))
+    cfg = Config()   # no ini file → alembic leaves logging alone
+    cfg.set_main_option("script_location", "src/db/migrations")
+    command.upgrade(cfg, "head")
+
+    sync = create_engine(settings.database_url_sync)
+    with sync.begin() as c:
+        c.execute(insert(Basket), [{
+            "id": 1, "name": "Mi Cesta", "name_normalized": "mi cesta", "strategy": "rsi",
+            "cash": Decimal("1000"), "active": True, "created_at": datetime(2026, 1, 1),
+        }])
+        c.execute(insert(User), [{
+            "id": 1, "tg_id": SQLITE_OWNER_TG_ID, "username": "ana", "created_at": datetime(2026, 1, 1),
+        }])
+        c.execute(insert(BasketMember), [{"basket_id": 1, "user_id": 1, "role": "OWNER"}])
+    sync.dispose()
+    return path
@@ -77,7 +77,7 @@ async def test_stoploss_generates_sell_when_price_drops_below_threshold():
     mock_cls = _mock_strategy(return_value=None)   # strategy returns no signal
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=MagicMock(data=MagicMock())),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -108,7 +108,7 @@ async def test_stoploss_no_alert_when_price_above_threshold():
     mock_cls = _mock_strategy(return_value=None)
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=MagicMock(data=MagicMock())),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -135,7 +135,7 @@ async def test_stoploss_ignored_when_pct_is_none():
     mock_cls = _mock_strategy(return_value=None)
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=MagicMock(data=MagicMock())),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -165,7 +165,7 @@ async def test_stoploss_overrides_strategy_buy_signal():
     mock_cls = _mock_strategy(return_value=buy_signal)   # strategy says BUY
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=MagicMock(data=MagicMock())),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -196,7 +196,7 @@ async def test_scan_passes_avg_price_to_strategy():
     mock_cls = _mock_strategy(return_value=None)
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=hist_mock),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -248,7 +248,7 @@ async def test_scan_expires_stale_pending_alert():
     mock_cls = _mock_strategy(return_value=None)  # <- condition gone: signal = None
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=MagicMock(data=MagicMock())),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -300,7 +300,7 @@ async def test_scan_keeps_pending_when_condition_still_holds():
     mock_cls = _mock_strategy(return_value=sell_signal)  # <- condition still holds
 
     with (
-        patch("src.alerts.engine.async_session_factory", return_value=session_cm),
+        patch("src.alerts.engine.scheduler_session_factory", return_value=session_cm),
         patch.object(engine.data, "get_current_price", return_value=price_mock),
         patch.object(engine.data, "get_historical", return_value=MagicMock(data=MagicMock())),
         patch("src.alerts.engine.is_market_open", return_value=True),
@@ -92,7 +92,7 @@ async def test_notify_advanced_mode_does_not_call_anthropic():
     mock_cm.__aenter__ = AsyncMock(return_value=mock_session)
     mock_cm.__aexit__ = AsyncMock(return_value=False)
 
-    with patch("src.alerts.engine.async_session_factory", return_value=mock_cm):
+    with patch("src.alerts.engine.scheduler_session_factory", return_value=mock_cm):
         await engine._notify(alert, "MiCesta", "SAN.MC", ctx)
 
     # messages.create should never have been called for an advanced_mode user
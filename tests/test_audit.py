@@ -0,0 +1,85 @@
+"""Tests for the buffered audit log (command_logs)."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.bot.audit import AuditBuffer, log_command
+
+
+def _session():
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm, session
+
+
+def _update():
+    update = MagicMock()
+    update.effective_user.id = 42
+    update.effective_user.username = "ana"
+    return update
+
+
+@pytest.mark.asyncio
+async def test_log_command_only_buffers():
+    buffer = AuditBuffer()
+    with patch("src.bot.audit.audit_buffer", buffer), \
+         patch("src.bot.audit.async_session_factory") as factory:
+        await log_command(_update(), "/compra", True, "ok", "AAPL 3")
+    factory.assert_not_called()
+    assert len(buffer) == 1
+    row = buffer._rows[0]
+    assert (row["tg_id"], row["command"], row["args"], row["success"]) == (42, "/compra", "AAPL 3", True)
+    assert row["created_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_flush_is_one_executemany():
+    buffer = AuditBuffer()
+    for i in range(3):
+        buffer.add({"tg_id": i, "command": "/x", "success": True})
+    cm, session = _session()
+    with patch("src.bot.audit.async_session_factory", return_value=cm):
+        assert await buffer.flush() == 3
+    session.execute.assert_awaited_once()
+    assert [r["tg_id"] for r in session.execute.call_args.args[1]] == [0, 1, 2]
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_background_task_flushes_on_row_threshold_and_on_stop():
+    buffer = AuditBuffer(flush_rows=2, flush_interval_ms=60_000)
+    cm, session = _session()
+    with patch("src.bot.audit.async_session_factory", return_value=cm):
+        buffer.start()
+        buffer.add({"tg_id": 1})
+        buffer.add({"tg_id": 2})             # reaches flush_rows → wakes the task
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert session.execute.await_count == 1
+
+        buffer.add({"tg_id": 3})             # below threshold, long interval
+        await buffer.stop()                  # shutdown flush
+    assert session.execute.await_count == 2
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows_up_to_cap_and_counts_drops():
+    buffer = AuditBuffer(max_rows=3)
+    for i in range(3):
+        buffer.add({"tg_id": i})
+    buffer.add({"tg_id": 99})                # over the cap → dropped
+    assert len(buffer) == 3
+
+    cm, session = _session()
+    session.execute.side_effect = RuntimeError("db down")
+    with patch("src.bot.audit.async_session_factory", return_value=cm), \
+         patch("src.bot.audit.audit_rows_total") as counter:
+        assert await buffer.flush() == 0
+    assert [r["tg_id"] for r in buffer._rows] == [0, 1, 2]   # retried next time
+    counter.labels.assert_not_called()
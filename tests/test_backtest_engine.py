@@ -148,3 +148,55 @@ def test_backtest_engine_no_sl_stop_when_pct_is_none():
     assert result.n_trades == 3
     assert "AAPL" in result.per_asset
     assert "sl_stop" not in captured, f"sl_stop must NOT be passed when pct is None. Got: {captured}"
+
+
+# ---------------------------------------------------------------------------
+# Shared universe — fetch_data once, run many
+# ---------------------------------------------------------------------------
+
+def _fake_pf(**_):
+    pf = MagicMock()
+    pf.stats.return_value = {
+        "Total Return [%]": 5.0, "Sharpe Ratio": 1.0,
+        "Max Drawdown [%]": 5.0, "Total Trades": 3, "Win Rate [%]": 66.0,
+    }
+    return pf
+
+
+def test_fetch_data_deduplicates_and_skips_failures():
+    engine = BacktestEngine()
+    ohlcv = _make_ohlcv()
+
+    def fake_hist(ticker, period, interval):
+        if ticker == "BAD":
+            raise ValueError("No data for BAD")
+        return ohlcv
+
+    with patch.object(engine.data, "get_historical", side_effect=fake_hist) as mock_hist:
+        data = engine.fetch_data(["AAPL", "MSFT", "AAPL", "BAD"], period="1y")
+
+    assert set(data) == {"AAPL", "MSFT"}
+    assert mock_hist.call_count == 3, "AAPL must be downloaded only once"
+
+
+def test_run_with_shared_ohlcv_does_not_download():
+    """Passing ohlcv_dict must reuse it and ignore tickers missing from it."""
+    engine = BacktestEngine()
+    strategy = MagicMock()
+    strategy.evaluate.return_value = None
+    shared = {"AAPL": _make_ohlcv(), "MSFT": _make_ohlcv()}
+
+    with (
+        patch.object(engine.data, "get_historical") as mock_hist,
+        patch("vectorbt.Portfolio.from_signals", side_effect=lambda *a, **k: _fake_pf()),
+    ):
+        result = engine.run(["AAPL", "GONE"], strategy, "rsi", period="1y", ohlcv_dict=shared)
+
+    mock_hist.assert_not_called()
+    assert list(result.per_asset) == ["AAPL"]
+
+
+def test_run_with_shared_ohlcv_and_no_overlap_raises():
+    engine = BacktestEngine()
+    with pytest.raises(ValueError):
+        engine.run(["GONE"], MagicMock(), "rsi", period="1y", ohlcv_dict={"AAPL": _make_ohlcv()})
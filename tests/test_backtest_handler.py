@@ -476,3 +476,47 @@ async def test_backtest_shows_strategy_name_in_output():
 
     text = msg.edit_text.call_args[0][0]
     assert "stop_loss" in text, f"Strategy name must appear in output. Got:\n{text}"
+
+
+# ---------------------------------------------------------------------------
+# Shared-cash simulation tokens
+# ---------------------------------------------------------------------------
+
+def test_pop_sim_options_parses_allocation_and_rebalance():
+    from src.bot.handlers.backtest import _pop_sim_options
+
+    assert _pop_sim_options(["Cesta", "1y"]) == (["Cesta", "1y"], None, None)
+    assert _pop_sim_options(["Cesta", "CASH10", "1y"]) == (["Cesta", "1y"], "cash10", None)
+    # rebalancing alone implies equal weights
+    assert _pop_sim_options(["mensual"]) == ([], "equal", "M")
+
+
+@pytest.mark.asyncio
+async def test_backtest_shared_cash_tokens_reach_engine():
+    """/backtest CestaAgresiva 6mo cash10 trimestral → engine.run in shared-cash mode."""
+    update, msg = _make_update()
+    ctx = _make_context(["CestaAgresiva", "6mo", "cash10", "trimestral"])
+
+    basket = _make_basket("CestaAgresiva", "stop_loss", basket_id=1)
+    session = _make_session(_exec(basket), _exec_scalars([_make_asset("SAN.MC")]))
+
+    fake_result = MagicMock()
+    fake_result.total_return_pct = 5.0
+    fake_result.benchmark_return_pct = 3.0
+    fake_result.sharpe_ratio = 1.2
+    fake_result.max_drawdown_pct = 10.0
+    fake_result.n_trades = 4
+    fake_result.per_asset = {}
+
+    with (
+        patch("src.bot.handlers.backtest.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.backtest.BacktestEngine") as MockEngine,
+    ):
+        MockEngine.return_value.run.return_value = fake_result
+        await cmd_backtest(update, ctx)
+
+    args = MockEngine.return_value.run.call_args[0]
+    assert args[3] == "6mo"
+    assert args[-2:] == ("cash10", "Q")
+    text = msg.edit_text.call_args[0][0]
+    assert "Caja compartida" in text and "trimestral" in text
@@ -0,0 +1,110 @@
+"""Tests for incremental signal evaluation (SignalCache) used by BacktestEngine."""
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.incremental import BUY, SELL, SignalCache, signal_cache, strategy_key
+from src.strategies.base import Signal
+
+
+def _frame(start: int, n: int, shift: float = 0.0) -> pd.DataFrame:
+    """Deterministic OHLCV where bar k (global position) always has the same values."""
+    idx = pd.bdate_range("2024-01-01", periods=start + n)[start:]
+    k = np.arange(start, start + n, dtype=float)
+    close = 100 + np.sin(k / 5) * 10 + shift
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                         "Close": close, "Volume": 1_000.0}, index=idx)
+
+
+class _ThresholdStrategy:
+    """BUY above 105, SELL below 95 — counts evaluations."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def evaluate(self, ticker, data, current_price, avg_price=None):
+        self.calls += 1
+        if current_price > Decimal("105"):
+            return Signal("BUY", ticker, current_price, "up")
+        if current_price < Decimal("95"):
+            return Signal("SELL", ticker, current_price, "down")
+        return None
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    signal_cache.clear()
+    yield
+    signal_cache.clear()
+
+
+def test_first_run_evaluates_every_bar_after_warmup():
+    cache = SignalCache()
+    strat = _ThresholdStrategy()
+    signals, n_eval = cache.evaluate("k", "T", _frame(0, 100), strat, window=60)
+    assert n_eval == 40 and strat.calls == 40
+    assert len(signals) == 100 and not signals[:60].any()
+
+
+def test_next_day_only_evaluates_new_bar_and_matches_full_recompute():
+    cache = SignalCache()
+    strat = _ThresholdStrategy()
+    cache.evaluate("k", "T", _frame(0, 100), strat, window=60)
+
+    # Sliding window: oldest bar dropped, one new bar appended
+    strat.calls = 0
+    signals, n_eval = cache.evaluate("k", "T", _frame(1, 100), strat, window=60)
+    assert n_eval == 1 and strat.calls == 1
+
+    full, _ = SignalCache().evaluate("k", "T", _frame(1, 100), _ThresholdStrategy(), window=60)
+    np.testing.assert_array_equal(signals, full)
+    assert (signals == BUY).any() and (signals == SELL).any()
+
+
+def test_changed_history_forces_full_recompute():
+    cache = SignalCache()
+    strat = _ThresholdStrategy()
+    cache.evaluate("k", "T", _frame(0, 100), strat, window=60)
+
+    strat.calls = 0
+    _, n_eval = cache.evaluate("k", "T", _frame(1, 100, shift=0.5), strat, window=60)
+    assert n_eval == 40, "re-adjusted history must invalidate the ledger"
+
+
+def test_strategy_key_includes_parameters():
+    a, b = MagicMock(spec=[]), MagicMock(spec=[])
+    a.period, b.period = 14, 21
+    assert strategy_key(a, "rsi") != strategy_key(b, "rsi")
+
+
+def test_engine_rerun_reuses_signals():
+    from src.backtest.engine import BacktestEngine
+
+    class _Counted(_ThresholdStrategy):
+        calls = 0   # class attribute: strategy_key reads instance params only
+
+        def __init__(self):
+            pass
+
+        def evaluate(self, *args, **kwargs):
+            type(self).calls += 1
+            return _ThresholdStrategy.evaluate(_ThresholdStrategy(), *args, **kwargs)
+
+    engine = BacktestEngine()
+    strat = _Counted()
+    day1 = MagicMock(data=_frame(0, 150))
+    day2 = MagicMock(data=_frame(1, 150))
+
+    with patch.object(engine.data, "get_historical", return_value=day1):
+        r1 = engine.run(["AAPL"], strat, "threshold", period="6mo")
+    calls_day1 = strat.calls
+    with patch.object(engine.data, "get_historical", return_value=day2):
+        r2 = engine.run(["AAPL"], _Counted(), "threshold", period="6mo")
+
+    assert calls_day1 == 90
+    assert _Counted.calls - calls_day1 == 1
+    assert r2.per_asset["AAPL"].n_trades >= 1
+    assert r1.period == r2.period == "6mo"
@@ -90,8 +90,8 @@ async def test_estrategia_read():
 async def test_estrategia_change_ok():
     caller = MagicMock(id=1)
     basket = MagicMock(id=10, name="MiCesta", strategy="ma_crossover")
-    owner_membership = MagicMock()
-    session = _make_session(_exec(caller), _exec(basket), _exec(owner_membership))
+    owner_membership = MagicMock(role="OWNER")
+    session = _make_session(_exec(caller), _exec(basket), _exec(owner_membership), _exec_scalars([]))
 
     update = _make_update()
     ctx = _make_context(["MiCesta", "rsi"])
@@ -242,7 +242,7 @@ async def test_eliminarcesta_ok():
     # Note: MagicMock(name=...) sets mock display name, not .name attr — set separately
     basket = MagicMock(id=10, active=True)
     basket.name = "TechGrowth"
-    owner_membership = MagicMock()
+    owner_membership = MagicMock(role="OWNER")
     session = _make_session(
         _exec(caller),
         _exec(basket),
@@ -273,7 +273,7 @@ async def test_eliminarcesta_ok():
 async def test_eliminarcesta_with_positions():
     caller = MagicMock(id=1)
     basket = MagicMock(id=10, name="TechGrowth", active=True)
-    owner_membership = MagicMock()
+    owner_membership = MagicMock(role="OWNER")
     pos_aapl  = MagicMock(); asset_aapl  = MagicMock(ticker="AAPL")
     pos_san   = MagicMock(); asset_san   = MagicMock(ticker="SAN.MC")
     session = _make_session(
@@ -396,12 +396,13 @@ async def test_estrategia_changes_strategy_and_stop_loss_pct():
     caller = MagicMock(id=1)
     basket = MagicMock(id=10, strategy="stop_loss", stop_loss_pct=None, active=True)
     basket.name = "MiCesta"
-    owner = MagicMock()
+    owner = MagicMock(role="OWNER")
 
     session = _make_session(
         _exec(caller),
         _exec(basket),
         _exec(owner),
+        _exec_scalars([]),
     )
 
     with patch("src.bot.handlers.admin.async_session_factory", return_value=_wrap(session)):
@@ -420,12 +421,13 @@ async def test_estrategia_changes_only_stop_loss_pct():
     caller = MagicMock(id=1)
     basket = MagicMock(id=10, strategy="rsi", stop_loss_pct=None, active=True)
     basket.name = "MiCesta"
-    owner = MagicMock()
+    owner = MagicMock(role="OWNER")
 
     session = _make_session(
         _exec(caller),
         _exec(basket),
         _exec(owner),
+        _exec_scalars([]),
     )
 
     with patch("src.bot.handlers.admin.async_session_factory", return_value=_wrap(session)):
@@ -444,12 +446,13 @@ async def test_estrategia_zero_disables_stop_loss():
     caller = MagicMock(id=1)
     basket = MagicMock(id=10, strategy="stop_loss", stop_loss_pct=Decimal("8"), active=True)
     basket.name = "MiCesta"
-    owner = MagicMock()
+    owner = MagicMock(role="OWNER")
 
     session = _make_session(
         _exec(caller),
         _exec(basket),
         _exec(owner),
+        _exec_scalars([]),
     )
 
     with patch("src.bot.handlers.admin.async_session_factory", return_value=_wrap(session)):
@@ -91,3 +91,77 @@ async def test_confirm_blocked_when_market_closed():
     # Alert must NOT be committed (stays PENDING)
     session.commit.assert_not_called()
     assert alert.status == "PENDING"
+
+
+@pytest.mark.asyncio
+async def test_confirm_skips_alert_resolved_while_waiting_for_basket():
+    """Another member confirmed first: nothing is executed twice."""
+    query = _make_query("alert:confirm:1")
+    update = _make_update(query)
+
+    alert = _make_alert(signal="BUY")
+    asset = _make_asset(market="NYSE")
+    basket = MagicMock()
+    basket.id = 5
+    user = MagicMock()
+    user.id = 1
+
+    session_cm, session = _make_session_for_callback(alert, asset, basket, user)
+
+    async def resolved_elsewhere(obj, **kwargs):
+        if obj is alert:
+            alert.status = "CONFIRMED"
+    session.refresh = AsyncMock(side_effect=resolved_elsewhere)
+
+    with (
+        patch("src.bot.bot.async_session_factory", return_value=session_cm),
+        patch("src.bot.bot.is_market_open", return_value=True),
+        patch("src.data.yahoo.YahooDataProvider") as mock_provider,
+        patch("src.orders.paper.PaperTradingExecutor") as mock_executor,
+    ):
+        mock_provider.return_value.get_current_price.return_value.price = Decimal("100")
+        await handle_alert_callback(update, MagicMock())
+
+    mock_executor.return_value.buy.assert_not_called()
+    session.commit.assert_not_called()
+    assert "ya fue procesada" in query.edit_message_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_confirm_rereads_alert_and_position_for_update():
+    """The session's transaction is open before the order slot: the re-checks
+    inside it are locking reads, and the status is committed with the order."""
+    from sqlalchemy.dialects import mysql
+
+    query = _make_query("alert:confirm:1")
+    alert = _make_alert(signal="SELL")
+    basket = MagicMock()
+    basket.id = 5
+    user = MagicMock()
+    user.id = 1
+    session_cm, session = _make_session_for_callback(alert, _make_asset(), basket, user)
+    pos_result = MagicMock()
+    pos_result.scalar_one_or_none.return_value = MagicMock(quantity=Decimal("3"))
+    session.execute = AsyncMock(return_value=pos_result)
+    session.refresh = AsyncMock()
+
+    statuses = []
+    with (
+        patch("src.bot.bot.async_session_factory", return_value=session_cm),
+        patch("src.bot.bot.is_market_open", return_value=True),
+        patch("src.bot.bot.identity_cache") as cache,
+        patch("src.bot.bot.log_command", AsyncMock()),
+        patch("src.data.yahoo.YahooDataProvider") as mock_provider,
+        patch("src.orders.paper.PaperTradingExecutor") as mock_executor,
+    ):
+        cache.user = AsyncMock(return_value=user)
+        cache.role = AsyncMock(return_value="OWNER")
+        mock_provider.return_value.get_current_price.return_value.price = Decimal("100")
+        mock_executor.return_value.sell = AsyncMock(side_effect=lambda *a: statuses.append(alert.status))
+        await handle_alert_callback(_make_update(query), MagicMock())
+
+    session.refresh.assert_any_await(alert, with_for_update=True)
+    session.refresh.assert_any_await(basket, with_for_update=True)
+    sql = str(session.execute.call_args.args[0].compile(dialect=mysql.dialect()))
+    assert "FROM positions" in sql and sql.endswith("FOR UPDATE")
+    assert statuses == ["CONFIRMED"]
@@ -0,0 +1,131 @@
+"""Tests for statement counting / timing (src/db/instrumentation.py) and /estado db.
+
+The budget tests pin how many statements the hot commands issue on the
+SQLite backend. If one fails after a change, the command gained round-trips:
+fix the query or raise the budget deliberately in the same commit.
+"""
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.bot.handlers.estado import _db_report, cmd_estado
+from src.config import settings
+from src.data.models import Price
+from src.db.base import make_engine
+from src.db.instrumentation import db_scope, fingerprint, normalize, statement_text, with_db_scope
+from src.db.models import User
+
+TG_ID = 5001   # owner of basket 1 in the `sqlite_db` fixture (conftest.py)
+
+# statements per run with a warm identity cache
+BUDGETS = {"/compra": 8, "/vende": 10}
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _update():
+    update = MagicMock()
+    update.effective_user.id = TG_ID
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+def _ctx(*args):
+    ctx = MagicMock()
+    ctx.args = list(args)
+    return ctx
+
+
+@pytest.fixture
+async def factory(sqlite_db):
+    engine = make_engine(settings.database_url)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def test_normalize_folds_in_lists_and_whitespace():
+    a = "SELECT x FROM t\n  WHERE id IN (?, ?, ?)"
+    b = "SELECT x FROM t WHERE id IN (?,?)"
+    assert normalize(a) == normalize(b) == "SELECT x FROM t WHERE id IN (…)"
+    assert fingerprint(a) == fingerprint(b)
+    assert statement_text(fingerprint(a)) == "SELECT x FROM t WHERE id IN (…)"
+    assert normalize("WHERE id IN (%(id_1)s, %(id_2)s)") == "WHERE id IN (…)"
+
+
+@pytest.mark.asyncio
+async def test_scope_counts_statements_and_feeds_histograms(factory):
+    before = _sample("scroogebot_db_scope_statements_count", {"scope": "test:count"})
+    async with factory() as session:
+        await session.execute(text("SELECT 1"))              # outside any scope
+        with db_scope("test:count") as scope:
+            await session.execute(select(User))
+            await session.execute(select(User).where(User.id == 1))
+
+    assert scope.statements == 2 and scope.seconds > 0
+    assert _sample("scroogebot_db_scope_statements_count", {"scope": "test:count"}) == before + 1
+    assert _sample("scroogebot_db_scope_statements_sum", {"scope": "test:count"}) >= 2
+    fp = fingerprint(str(select(User).compile(dialect=session.bind.dialect)))
+    assert _sample("scroogebot_db_statement_seconds_count", {"fingerprint": fp}) >= 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_in_one_run_is_flagged(factory):
+    async def n_plus_one():
+        async with factory() as session:
+            for user_id in range(6):
+                await session.get(User, user_id)
+
+    await with_db_scope("test:loop", n_plus_one)()
+
+    repeated = [
+        s for mf in REGISTRY.collect() if mf.name == "scroogebot_db_repeated_statements"
+        for s in mf.samples if s.labels.get("scope") == "test:loop" and s.name.endswith("_total")
+    ]
+    assert len(repeated) == 1 and repeated[0].value == 1
+    assert "FROM users" in statement_text(repeated[0].labels["fingerprint"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cmd", ["/compra", "/vende"])
+async def test_order_commands_stay_within_statement_budget(factory, cmd):
+    from src.bot.handlers.orders import cmd_compra, cmd_vende
+
+    provider = MagicMock()
+    provider.get_current_price.return_value = Price("SAN.MC", Decimal("4.00"), "EUR")
+    provider.get_ticker_info.return_value = {"name": "Santander", "market": "BME"}
+    with patch("src.bot.handlers.orders.async_session_factory", factory), \
+         patch("src.bot.handlers.orders._provider", provider):
+        await cmd_compra(_update(), _ctx("SAN.MC", "10", "@mi", "cesta"))   # warms caches, creates asset
+        handler = cmd_compra if cmd == "/compra" else cmd_vende
+        with db_scope(cmd) as scope:
+            await handler(_update(), _ctx("SAN.MC", "5", "@mi", "cesta"))
+
+    assert scope.statements <= BUDGETS[cmd], dict(scope.by_fingerprint)
+    assert max(scope.by_fingerprint.values()) == 1      # nothing runs in a loop
+
+
+def test_db_report_lists_scopes_and_statements():
+    with patch("src.bot.handlers.estado._histogram_totals", side_effect=[
+        {"/compra": (16.0, 2.0)},
+        {"/compra": (0.01, 2.0)},
+        {"abcd1234": (0.5, 10.0)},
+        {},                                   # pool waits
+    ]), patch("src.bot.handlers.estado.statement_text", return_value="SELECT * FROM positions"):
+        report = _db_report()
+
+    assert "`/compra` ×2 · 8.0 consultas · 5.0 ms" in report
+    assert "×10 · 50.00 ms · `SELECT * FROM positions`" in report
+
+
+@pytest.mark.asyncio
+async def test_estado_db_requires_owner():
+    update = _update()
+    with patch("src.bot.handlers.estado._is_owner", AsyncMock(return_value=False)):
+        await cmd_estado(update, _ctx("db"))
+    assert "Solo los OWNER" in update.message.reply_text.call_args.args[0]
@@ -0,0 +1,61 @@
+"""Tests for pool sizing from config.yaml and the pool metrics (src/db/base.py)."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from src.config import settings
+from src.db import base
+from src.db.base import make_engine, pool_config
+
+
+def _gauge(name: str, pool: str) -> float | None:
+    return REGISTRY.get_sample_value(f"scroogebot_db_pool_{name}", {"pool": pool})
+
+
+def test_pool_config_falls_back_to_defaults():
+    cfg = {"database": {"pool": {"size": 20}, "scheduler_pool": None}}
+    with patch.object(base, "app_config", cfg):
+        assert pool_config("pool") == {"size": 20, "max_overflow": 10, "timeout_seconds": 30}
+        assert pool_config("scheduler_pool") == base.POOL_DEFAULTS
+
+
+def test_scheduler_shares_the_command_pool_unless_configured():
+    # config.yaml ships with scheduler_pool commented out
+    assert base.scheduler_session_factory is base.async_session_factory
+    assert base.scheduler_engine is base.engine
+
+
+@pytest.mark.asyncio
+async def test_engine_uses_configured_sizing_and_exports_gauges(sqlite_db):
+    cfg = {"database": {"bench_pool": {"size": 1, "max_overflow": 0, "timeout_seconds": 5}}}
+    with patch.object(base, "app_config", cfg):
+        engine = make_engine(settings.database_url, pool="bench_pool")
+    pool = engine.sync_engine.pool
+    assert (pool.size(), pool.timeout()) == (1, 5)
+    assert _gauge("size", "bench_pool") == 1
+
+    waits_before = REGISTRY.get_sample_value(
+        "scroogebot_db_pool_wait_seconds_count", {"pool": "bench_pool"}) or 0
+    async with engine.connect() as first:
+        await first.execute(text("SELECT 1"))
+        assert _gauge("checked_out", "bench_pool") == 1
+        assert _gauge("overflow", "bench_pool") == 0
+
+        async def second():
+            async with engine.connect() as conn:    # waits for `first` (size 1, no overflow)
+                await conn.execute(text("SELECT 1"))
+
+        waiting = asyncio.create_task(second())
+        await asyncio.sleep(0.2)
+        assert not waiting.done()
+    await waiting
+
+    assert _gauge("checked_out", "bench_pool") == 0
+    assert REGISTRY.get_sample_value(
+        "scroogebot_db_pool_wait_seconds_count", {"pool": "bench_pool"}) == waits_before + 2
+    assert REGISTRY.get_sample_value(
+        "scroogebot_db_pool_wait_seconds_sum", {"pool": "bench_pool"}) >= 0.2
+    await engine.dispose()
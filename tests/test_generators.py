@@ -0,0 +1,105 @@
+"""Tests for Monte Carlo path generators (i.i.d., stationary block, GARCH)."""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.generators import (
+    GENERATORS, GARCHGenerator, IIDBootstrap, make_generator, resolve_generator,
+)
+from src.backtest.montecarlo import MonteCarloSimulator
+
+
+def _garch_returns(n: int = 1_500, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    omega, alpha, beta = 2e-6, 0.10, 0.85
+    sigma2 = omega / (1 - alpha - beta)
+    out = np.empty(n)
+    for t in range(n):
+        out[t] = np.sqrt(sigma2) * rng.standard_normal()
+        sigma2 = omega + alpha * out[t] ** 2 + beta * sigma2
+    return out
+
+
+def _sq_autocorr(x: np.ndarray) -> float:
+    """Lag-1 autocorrelation of squared returns, pooled across paths."""
+    z = x ** 2 - (x ** 2).mean()
+    return float((z[:, 1:] * z[:, :-1]).mean() / (z * z).mean())
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generators_share_array_contract_and_seed(name):
+    gen = make_generator(name, _garch_returns())
+    a = gen.sample(40, 30, np.random.default_rng(7))
+    b = gen.sample(40, 30, np.random.default_rng(7))
+    assert a.shape == (40, 30)
+    assert np.isfinite(a).all()
+    np.testing.assert_array_equal(a, b)
+
+
+def test_block_bootstrap_copies_contiguous_runs():
+    pool = np.arange(100, dtype=float)
+    gen = make_generator("block", pool)
+    x = gen.sample(200, 50, np.random.default_rng(1))
+    steps = np.diff(x, axis=1)
+    continued = np.isin(steps, (1.0, -99.0))   # next pool element (with wrap)
+    assert 0.8 < continued.mean() < 0.99       # mean block of 10 → ~90% continuation
+
+
+def test_volatility_clustering_is_kept_by_block_and_garch_not_iid():
+    r = _garch_returns()
+    rng = np.random.default_rng(3)
+    iid = _sq_autocorr(make_generator("iid", r).sample(400, 250, rng))
+    block = _sq_autocorr(make_generator("block", r).sample(400, 250, rng))
+    garch = _sq_autocorr(make_generator("garch", r).sample(400, 250, rng))
+    assert abs(iid) < 0.03
+    assert block > 0.05
+    assert garch > 0.05
+
+
+def test_garch_fit_recovers_persistence():
+    gen = make_generator("garch", _garch_returns(n=3_000, seed=5))
+    assert 0.85 < gen.alpha + gen.beta < 0.999
+
+
+@pytest.mark.parametrize("returns", [
+    np.zeros(200),                                 # constant price: zero variance
+    _garch_returns(n=20),                          # too short to fit
+], ids=["zero-variance", "short"])
+def test_garch_falls_back_to_iid_when_it_cannot_be_fitted(returns):
+    gen = make_generator("garch", returns)
+    assert isinstance(gen, IIDBootstrap) and gen.name == "iid"
+    assert resolve_generator("garch", returns) == "iid"
+    assert np.isfinite(gen.sample(10, 30, np.random.default_rng(0))).all()
+
+    with pytest.raises(ValueError, match="varianza"):
+        GARCHGenerator(returns)
+
+
+def test_unknown_generator_raises():
+    with pytest.raises(ValueError):
+        make_generator("heston", _garch_returns())
+
+
+def test_generators_are_fast_for_large_requests():
+    """500 sims × 365 days must be a few ms per ticker — well inside /montecarlo time."""
+    r = _garch_returns()
+    for name in GENERATORS:
+        gen = make_generator(name, r)
+        started = time.perf_counter()
+        gen.sample(500, 365, np.random.default_rng(0))
+        assert time.perf_counter() - started < 0.5, name
+
+
+def test_simulator_generator_paths_and_single_fit():
+    idx = pd.bdate_range("2022-01-03", periods=400)
+    hist = pd.DataFrame({"Close": 100 * np.exp(np.cumsum(_garch_returns(400)))}, index=idx)
+    sim = MonteCarloSimulator()
+    paths = sim.generate_paths(hist, 8, 20, np.random.default_rng(0), generator="garch")
+    sim.generate_paths(hist, 8, 20, np.random.default_rng(1), generator="garch")
+    assert len(paths) == 8 and all(len(p) == 20 for p in paths)
+    assert len(sim._fitted) == 1
+
+    with pytest.raises(ValueError):
+        sim.generate_paths(hist, 8, 20, np.random.default_rng(0), "sobol", "garch")
@@ -0,0 +1,109 @@
+"""Tests for the read-through identity cache."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.bot.identity import IdentityCache
+
+
+def _exec(obj):
+    r = MagicMock()
+    r.scalar_one_or_none.return_value = obj
+    return r
+
+
+def _session(*results):
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=list(results))
+    return session
+
+
+def _user(**kw):
+    defaults = dict(id=1, username="ana", first_name="Ana", active_basket_id=10, advanced_mode=False)
+    defaults.update(kw)
+    return MagicMock(**defaults)
+
+
+def _basket(basket_id=10, name="Mi Cesta"):
+    basket = MagicMock(id=basket_id, name_normalized="mi cesta")
+    basket.name = name
+    return basket
+
+
+@pytest.mark.asyncio
+async def test_user_hit_skips_query():
+    cache = IdentityCache()
+    session = _session(_exec(_user()))
+
+    first = await cache.user(session, 111)
+    second = await cache.user(session, 111)
+
+    assert first == second and first.id == 1 and first.active_basket_id == 10
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_not_cached():
+    cache = IdentityCache()
+    session = _session(_exec(None), _exec(_user()))
+
+    assert await cache.user(session, 111) is None
+    assert (await cache.user(session, 111)).id == 1    # registered since → seen at once
+
+
+@pytest.mark.asyncio
+async def test_basket_cached_by_name_and_id():
+    cache = IdentityCache()
+    session = _session(_exec(_basket()))
+
+    by_name = await cache.basket_by_name(session, "MI CESTA")
+    by_id = await cache.basket_by_id(session, 10)
+
+    assert by_name is by_id and by_name.name == "Mi Cesta"
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_basket_drops_names_and_roles():
+    cache = IdentityCache()
+    session = _session(_exec(_basket()), _exec(MagicMock(role="OWNER")))
+    await cache.basket_by_id(session, 10)
+    assert await cache.role(session, 10, 1) == "OWNER"
+
+    cache.invalidate_basket(10)
+
+    session.execute = AsyncMock(side_effect=[_exec(None), _exec(None)])
+    assert await cache.basket_by_name(session, "Mi Cesta") is None
+    assert await cache.role(session, 10, 1) is None
+    assert session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_and_role_force_reload():
+    cache = IdentityCache()
+    session = _session(
+        _exec(_user()), _exec(MagicMock(role="MEMBER")),
+        _exec(_user(active_basket_id=20)), _exec(MagicMock(role="OWNER")),
+    )
+    await cache.user(session, 111)
+    await cache.role(session, 10, 1)
+
+    cache.invalidate_user(111)
+    cache.invalidate_role(10, 1)
+
+    assert (await cache.user(session, 111)).active_basket_id == 20
+    assert await cache.role(session, 10, 1) == "OWNER"
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    cache = IdentityCache(ttl_seconds=60)
+    session = _session(_exec(_user()), _exec(_user(advanced_mode=True)))
+
+    with patch("src.bot.identity.time.monotonic", return_value=1000.0):
+        await cache.user(session, 111)
+    with patch("src.bot.identity.time.monotonic", return_value=1059.0):
+        assert not (await cache.user(session, 111)).advanced_mode
+    with patch("src.bot.identity.time.monotonic", return_value=1061.0):
+        assert (await cache.user(session, 111)).advanced_mode
+    assert session.execute.await_count == 2
@@ -255,3 +255,366 @@ def test_montecarlo_no_sl_stop_when_pct_is_none():
 
     for call_kwargs in captured_calls:
         assert "sl_stop" not in call_kwargs, f"sl_stop must not be passed. Got: {call_kwargs}"
+
+
+# ---------------------------------------------------------------------------
+# Portfolio mode: joint bootstrap
+# ---------------------------------------------------------------------------
+
+from src.backtest.montecarlo import PortfolioMonteCarloResult
+
+
+def _make_close_matrix(n: int = 250) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    common = rng.normal(0, 0.01, n)
+    idx = pd.bdate_range("2023-01-01", periods=n)
+    return pd.DataFrame({
+        "A": 100 * np.exp(np.cumsum(common)),
+        "B": 50 * np.exp(np.cumsum(common)),     # perfectly correlated with A
+        "C": 20 * np.exp(np.cumsum(-common)),    # perfectly anti-correlated
+    }, index=idx)
+
+
+def test_joint_indices_are_contiguous_blocks():
+    sim = MonteCarloSimulator()
+    idx = sim.sample_joint_indices(100, 20, 12, np.random.default_rng(1), block=4)
+    assert idx.shape == (20, 12)
+    assert idx.min() >= 0 and idx.max() < 100
+    steps = np.diff(idx.reshape(20, 3, 4), axis=2)
+    assert (steps == 1).all()
+
+
+def test_joint_paths_preserve_cross_asset_correlation():
+    close = _make_close_matrix()
+    paths = MonteCarloSimulator().generate_joint_paths(
+        close, n_simulations=50, horizon=30, rng=np.random.default_rng(3),
+    )
+    assert paths.shape == (50, 30, 3)
+    growth = paths / close.iloc[-1].to_numpy()
+    np.testing.assert_allclose(growth[..., 0], growth[..., 1])
+    np.testing.assert_allclose(growth[..., 0] * growth[..., 2], 1.0)
+
+
+def test_run_portfolio_hedged_basket_has_lower_risk_than_single_asset():
+    close = _make_close_matrix()
+    analyzer = MonteCarloAnalyzer()
+    hedged = analyzer.run_portfolio(
+        close[["A", "C"]], 200, 60, np.random.default_rng(5), seed=5,
+    )
+    single = analyzer.run_portfolio(
+        close[["A"]], 200, 60, np.random.default_rng(5), seed=5,
+    )
+    assert isinstance(hedged, PortfolioMonteCarloResult)
+    assert hedged.weights == [0.5, 0.5]
+    assert hedged.max_dd_p95 < single.max_dd_p95
+    assert hedged.var_95 > single.var_95
+    assert hedged.cvar_95 <= hedged.var_95
+
+
+def test_run_portfolio_uses_given_weights():
+    close = _make_close_matrix()
+    r = MonteCarloAnalyzer().run_portfolio(
+        close, 10, 5, np.random.default_rng(0), seed=0, weights={"A": 3.0, "B": 1.0},
+    )
+    assert r.weights == [0.75, 0.25, 0.0]
+
+
+# ---------------------------------------------------------------------------
+# Adaptive precision
+# ---------------------------------------------------------------------------
+
+def _fake_vbt(total_returns):
+    """from_signals stand-in returning the next value of `total_returns` per path."""
+    it = iter(total_returns)
+
+    def fake_from_signals(close, entries, exits, **kwargs):
+        pf = MagicMock()
+        pf.stats.return_value = {
+            "Total Return [%]": next(it), "Sharpe Ratio": 1.0,
+            "Max Drawdown [%]": 5.0, "Win Rate [%]": 60.0,
+        }
+        return pf
+    return fake_from_signals
+
+
+def _quiet_strategy():
+    strategy = MagicMock()
+    strategy.evaluate.return_value = None
+    return strategy
+
+
+def test_adaptive_stops_early_when_estimates_converge():
+    # Identical outcome on every path → zero standard error after min_sims
+    with patch("vectorbt.Portfolio.from_signals", side_effect=_fake_vbt([2.0] * 1_000)):
+        r = MonteCarloAnalyzer().run_asset_adaptive(
+            "TEST", _quiet_strategy(), "rsi", _make_hist_df(120), horizon=5,
+            rng=np.random.default_rng(1), seed=1, chunk=10, min_sims=20, max_sims=1_000,
+        )
+    assert r.n_simulations == 20
+    assert r.converged is True
+    assert r.se_median == 0.0 and r.se_prob_loss == 0.0
+
+
+def test_adaptive_runs_past_fixed_cap_for_noisy_assets():
+    noisy = np.random.default_rng(0).normal(0, 30, 1_000).tolist()
+    with patch("vectorbt.Portfolio.from_signals", side_effect=_fake_vbt(noisy)):
+        r = MonteCarloAnalyzer().run_asset_adaptive(
+            "TEST", _quiet_strategy(), "rsi", _make_hist_df(120), horizon=5,
+            rng=np.random.default_rng(1), seed=1, chunk=100, min_sims=100,
+            max_sims=600, tol_return=0.01,
+        )
+    assert r.n_simulations == 600 > 500
+    assert r.converged is False
+    assert r.se_median > 0 and r.se_var_95 > 0
+
+
+def test_adaptive_respects_time_budget():
+    with patch("vectorbt.Portfolio.from_signals", side_effect=_fake_vbt([1.0, -1.0] * 500)):
+        r = MonteCarloAnalyzer().run_asset_adaptive(
+            "TEST", _quiet_strategy(), "rsi", _make_hist_df(120), horizon=5,
+            rng=np.random.default_rng(1), seed=1, chunk=10, min_sims=10,
+            max_sims=1_000, tol_return=0.0, time_budget=0.0,
+        )
+    assert r.n_simulations == 10
+    assert r.converged is False
+    assert r.se_median is not None
+
+
+def test_adaptive_paths_do_not_depend_on_previous_tickers():
+    def last_price(close, entries, exits, **kwargs):
+        pf = MagicMock()
+        pf.stats.return_value = {"Total Return [%]": float(close.iloc[-1]), "Sharpe Ratio": 1.0,
+                                 "Max Drawdown [%]": 1.0, "Win Rate [%]": 50.0}
+        return pf
+
+    def run(ticker, rng):
+        return MonteCarloAnalyzer().run_asset_adaptive(
+            ticker, _quiet_strategy(), "rsi", _make_hist_df(120), horizon=5,
+            rng=rng, seed=3, chunk=10, min_sims=10, max_sims=10,
+        )
+
+    with patch("vectorbt.Portfolio.from_signals", side_effect=last_price):
+        shared = np.random.default_rng(3)
+        run("AAA", shared)                                  # consumes the shared stream
+        after = run("BBB", shared)
+        alone = run("BBB", np.random.default_rng(3))
+
+    assert after.return_mean == alone.return_mean
+
+
+def test_formatter_shows_precision_only_for_adaptive_results():
+    fmt = MonteCarloFormatter()
+    assert "Precisión" not in fmt.format_asset(_make_result())
+    adaptive = _make_result(se_median=0.3, se_var_95=0.4, se_prob_loss=0.01, converged=True)
+    text = fmt.format_asset(adaptive)
+    assert "Precisión" in text and "convergido" in text and "±0.30pp" in text
+
+
+def test_garch_fallback_is_reported_in_the_result_and_reply():
+    hist_df = _make_hist_df(25)          # too few returns for a GARCH fit
+    analyzer = MonteCarloAnalyzer()
+    result = analyzer.run_asset(
+        "TEST", StopLossStrategy(), "stop_loss", hist_df, 5, 10,
+        np.random.default_rng(0), seed=0, generator="garch",
+    )
+    assert result.generator_fallback == "garch"
+    assert "garch→iid (datos insuficientes)" in MonteCarloFormatter().format_asset(result)
+
+    ok = analyzer.run_asset(
+        "TEST", StopLossStrategy(), "stop_loss", _make_hist_df(120), 5, 10,
+        np.random.default_rng(0), seed=0, generator="block",
+    )
+    assert ok.generator_fallback is None
+    assert "Generador" not in MonteCarloFormatter().format_asset(ok)
+
+
+def test_parse_auto_args_single_number_is_horizon():
+    from src.bot.handlers.montecarlo import _parse_auto_args
+
+    assert _parse_auto_args(["Cesta", "Agresiva", "180"]) == ("Cesta Agresiva", 180)
+    assert _parse_auto_args(["Cesta"]) == ("Cesta", 90)
+    assert _parse_auto_args(["Cesta", "999"]) == ("Cesta", 365)
+
+
+# ---------------------------------------------------------------------------
+# Variance-reduction samplers
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from src.backtest.montecarlo import SAMPLERS, sample_pool_indices
+
+
+@pytest.mark.parametrize("sampler", SAMPLERS)
+def test_sample_pool_indices_shape_and_range(sampler):
+    idx = sample_pool_indices(250, 33, 20, np.random.default_rng(0), sampler)
+    assert idx.shape == (33, 20)
+    assert idx.min() >= 0 and idx.max() < 250
+
+
+def test_antithetic_pairs_mirror_each_other():
+    idx = sample_pool_indices(100, 10, 5, np.random.default_rng(0), "antithetic")
+    np.testing.assert_array_equal(idx[:5] + idx[5:], 99)
+
+
+def test_stratified_covers_every_stratum_each_day():
+    idx = sample_pool_indices(1000, 10, 4, np.random.default_rng(0), "stratified")
+    for day in range(4):
+        assert sorted(idx[:, day] // 100) == list(range(10))
+
+
+def test_unknown_sampler_raises():
+    with pytest.raises(ValueError):
+        sample_pool_indices(10, 2, 2, np.random.default_rng(0), "halton")
+
+
+@pytest.mark.parametrize("sampler", ["antithetic", "stratified", "sobol"])
+def test_generate_paths_with_sampler(sampler):
+    hist_df = _make_hist_df(120)
+    paths = MonteCarloSimulator().generate_paths(
+        hist_df, 16, 10, np.random.default_rng(1), sampler,
+    )
+    assert len(paths) == 16 and all(len(p) == 10 for p in paths)
+    assert all((p > 0).all() for p in paths)
+
+
+def test_variance_reduction_lowers_error_of_mean_return():
+    hist_df = _make_hist_df(250)
+    sim = MonteCarloSimulator()
+    last = float(hist_df["Close"].iloc[-1])
+
+    def spread(sampler: str) -> float:
+        rng = np.random.default_rng(11)
+        means = [
+            np.mean([p.iloc[-1] / last for p in sim.generate_paths(hist_df, 64, 20, rng, sampler)])
+            for _ in range(30)
+        ]
+        return float(np.std(means))
+
+    iid = spread("iid")
+    assert spread("antithetic") < iid
+    assert spread("stratified") < iid
+
+
+# ---------------------------------------------------------------------------
+# Streaming accumulator
+# ---------------------------------------------------------------------------
+
+from src.backtest.montecarlo import MonteCarloAccumulator, _summarize
+
+
+def test_accumulator_matches_exact_summary_for_small_runs():
+    rng = np.random.default_rng(4)
+    metrics = [rng.normal(2, 10, 80), rng.uniform(0, 30, 80), rng.normal(1, 1, 80), rng.uniform(0, 100, 80)]
+    exact = _summarize("T", "rsi", 90, 1, *metrics)
+
+    acc = MonteCarloAccumulator()
+    acc.add(*(m[:30] for m in metrics))
+    acc.merge(MonteCarloAccumulator().add(*(m[30:] for m in metrics)))
+    approx = acc.summarize("T", "rsi", 90, 1)
+
+    assert approx.n_simulations == 80
+    assert approx.prob_loss == exact.prob_loss
+    for field in ("return_median", "return_p10", "return_p90", "var_95", "max_dd_p95", "sharpe_median"):
+        assert getattr(approx, field) == pytest.approx(getattr(exact, field)), field
+    assert approx.cvar_95 <= approx.var_95
+
+
+def test_run_asset_streaming_chunks_paths():
+    hist_df = _make_hist_df(120)
+    with patch("vectorbt.Portfolio.from_signals", side_effect=_fake_vbt(list(range(-12, 13)))):
+        r = MonteCarloAnalyzer().run_asset_streaming(
+            "TEST", _quiet_strategy(), "rsi", hist_df, n_simulations=25, horizon=5,
+            rng=np.random.default_rng(0), seed=0, chunk=10,
+        )
+    assert r.n_simulations == 25
+    assert r.return_median == pytest.approx(0.0)
+    assert r.prob_loss == pytest.approx(12 / 25)
+
+
+# ---------------------------------------------------------------------------
+# Shared path cache
+# ---------------------------------------------------------------------------
+
+from src.backtest.montecarlo import PathCache
+
+
+def test_path_cache_reuses_paths_across_strategies_and_stop_losses():
+    hist_df = _make_hist_df(120)
+    cache = PathCache()
+    analyzer = MonteCarloAnalyzer(path_cache=cache)
+    seen_paths = []
+
+    def fake_from_signals(close, entries, exits, **kwargs):
+        seen_paths.append(close)
+        pf = MagicMock()
+        pf.stats.return_value = {"Total Return [%]": 1.0, "Sharpe Ratio": 1.0,
+                                 "Max Drawdown [%]": 1.0, "Win Rate [%]": 50.0}
+        return pf
+
+    with patch("vectorbt.Portfolio.from_signals", side_effect=fake_from_signals):
+        for strategy_name, sl in (("rsi", None), ("rsi", 5.0), ("bollinger", 10.0)):
+            analyzer.run_asset(
+                "TEST", _quiet_strategy(), strategy_name, hist_df, 4, 10,
+                rng=np.random.default_rng(), seed=123, stop_loss_pct=sl,
+            )
+
+    assert (cache.misses, cache.hits) == (1, 2)
+    assert seen_paths[0] is seen_paths[4] is seen_paths[8]
+
+
+def test_sl_sweep_evaluates_the_strategy_once_per_path():
+    hist_df = _make_hist_df(120)
+    single, sweep = _quiet_strategy(), _quiet_strategy()
+    sl_seen = []
+
+    def fake_from_signals(close, entries, exits, **kwargs):
+        sl_seen.append(kwargs.get("sl_stop"))
+        pf = MagicMock()
+        pf.stats.return_value = {"Total Return [%]": 1.0, "Sharpe Ratio": 1.0,
+                                 "Max Drawdown [%]": 1.0, "Win Rate [%]": 50.0}
+        return pf
+
+    analyzer = MonteCarloAnalyzer(path_cache=PathCache())
+    with patch("vectorbt.Portfolio.from_signals", side_effect=fake_from_signals):
+        analyzer.run_asset("TEST", single, "rsi", hist_df, 4, 10, np.random.default_rng(), seed=5)
+        sl_seen.clear()
+        results = analyzer.run_asset_sl_sweep(
+            "TEST", sweep, "rsi", hist_df, 4, 10, np.random.default_rng(), seed=5,
+            stop_loss_levels=[None, 5.0, 10.0],
+        )
+
+    assert sweep.evaluate.call_count == single.evaluate.call_count == 4 * 10
+    assert [sl for sl, _ in results] == [None, 5.0, 10.0]
+    assert all(r.n_simulations == 4 for _, r in results)
+    assert sl_seen == [None, 0.05, 0.10] * 4                # only the portfolio is rebuilt
+
+
+def test_path_cache_key_includes_ticker_seed_and_size():
+    hist_df = _make_hist_df(120)
+    cache = PathCache()
+    sim = MonteCarloSimulator()
+    a = sim.cached_paths(cache, "A", hist_df, 5, 10, seed=1)
+    assert sim.cached_paths(cache, "A", hist_df, 5, 10, seed=1) is a
+    sim.cached_paths(cache, "B", hist_df, 5, 10, seed=1)
+    sim.cached_paths(cache, "A", hist_df, 5, 10, seed=2)
+    sim.cached_paths(cache, "A", hist_df, 6, 10, seed=1)
+    sim.cached_paths(cache, "A", hist_df, 5, 10, seed=1, generator="block")
+    assert cache.misses == 5 and cache.hits == 1
+
+
+def test_cached_paths_are_reproducible_without_the_cache():
+    hist_df = _make_hist_df(120)
+    sim = MonteCarloSimulator()
+    a = sim.cached_paths(PathCache(), "A", hist_df, 3, 10, seed=9)
+    b = sim.cached_paths(PathCache(), "A", hist_df, 3, 10, seed=9)
+    for x, y in zip(a, b):
+        pd.testing.assert_series_equal(x, y)
+
+
+def test_path_cache_is_bounded():
+    cache = PathCache(max_entries=2)
+    for i in range(4):
+        cache.get_or_create((i,), lambda: [])
+    cache.get_or_create((0,), lambda: [])
+    assert cache.misses == 5
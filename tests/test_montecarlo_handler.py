@@ -94,6 +94,7 @@ async def test_montecarlo_falls_back_to_positions_when_no_basket_assets():
     fake_mc_result.max_dd_p95 = -20.0
     fake_mc_result.sharpe_median = 1.2
     fake_mc_result.win_rate_median = 60.0
+    fake_mc_result.se_median = None
 
     with (
         patch("src.bot.handlers.montecarlo.async_session_factory", return_value=_wrap(session)),
@@ -137,3 +138,107 @@ async def test_montecarlo_shows_error_when_no_assets_and_no_positions():
     assert any("sin activos" in c for c in calls), (
         f"Should show 'sin activos' when no positions either. Got: {calls}"
     )
+
+
+# ---------------------------------------------------------------------------
+# Portfolio mode (`cartera` token)
+# ---------------------------------------------------------------------------
+
+def test_pop_portfolio_flag():
+    from src.bot.handlers.montecarlo import _pop_portfolio_flag
+
+    assert _pop_portfolio_flag(["Mi", "Cesta", "200", "cartera"]) == (["Mi", "Cesta", "200"], True)
+    assert _pop_portfolio_flag(["Mi", "Cesta"]) == (["Mi", "Cesta"], False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("token", ["auto", "antitetico", "garch", "sl=5"])
+async def test_montecarlo_cartera_rejects_per_asset_options(token):
+    update, msg = _make_update()
+    ctx = _make_context(["Mi_Apuesta", "cartera", token])
+    with patch("src.bot.handlers.montecarlo.MonteCarloAnalyzer") as MockAnalyzer:
+        await cmd_montecarlo(update, ctx)
+
+    MockAnalyzer.return_value.run_portfolio.assert_not_called()
+    update.message.reply_text.assert_awaited_once()
+    assert "no admite" in update.message.reply_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_montecarlo_cartera_runs_one_joint_simulation():
+    """`cartera` → one run_portfolio call over all tickers instead of run_asset per ticker."""
+    import numpy as np
+    import pandas as pd
+    from src.backtest.montecarlo import MonteCarloAnalyzer
+
+    update, msg = _make_update()
+    ctx = _make_context(["Mi_Apuesta", "cartera"])
+
+    basket = _make_basket("Mi_Apuesta", "rsi", basket_id=12)
+    held = MagicMock()
+    held.all.return_value = [("NVDA", Decimal("10"))]
+    session = _make_session(
+        _exec_scalar(basket),
+        _exec_scalars([_make_asset("NVDA"), _make_asset("AAPL")]),
+        held,                                  # positions for weights
+    )
+
+    idx = pd.bdate_range("2024-01-01", periods=100)
+    hist = {
+        "NVDA": MagicMock(data=pd.DataFrame({"Close": np.linspace(100, 120, 100)}, index=idx)),
+        "AAPL": MagicMock(data=pd.DataFrame({"Close": np.linspace(50, 40, 100)}, index=idx)),
+    }
+
+    with (
+        patch("src.bot.handlers.montecarlo.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.montecarlo.YahooDataProvider") as MockProvider,
+        patch.object(MonteCarloAnalyzer, "run_asset") as run_asset,
+    ):
+        MockProvider.return_value.get_historical.side_effect = lambda t, **_: hist[t]
+        await cmd_montecarlo(update, ctx)
+
+    run_asset.assert_not_called()
+    combined = " ".join(c[0][0] for c in update.message.reply_text.call_args_list)
+    assert "CARTERA" in combined
+    assert "NVDA 100%" in combined and "AAPL 0%" in combined
+    assert "VaR 95%" in combined
+
+
+# ---------------------------------------------------------------------------
+# seed= / sl= tokens
+# ---------------------------------------------------------------------------
+
+def test_pop_seed_and_sl_sweep_tokens():
+    from src.bot.handlers.montecarlo import _pop_seed, _pop_sl_sweep
+
+    assert _pop_seed(["Cesta", "seed=42", "100"]) == (["Cesta", "100"], 42)
+    assert _pop_seed(["Cesta"]) == (["Cesta"], None)
+    assert _pop_sl_sweep(["Cesta", "sl=0,5,10%"]) == (["Cesta"], [None, 5.0, 10.0])
+    assert _pop_sl_sweep(["Cesta", "sl=abc"]) == (["Cesta", "sl=abc"], None)
+
+
+@pytest.mark.asyncio
+async def test_montecarlo_sl_sweep_runs_all_levels_in_one_pass():
+    update, msg = _make_update()
+    ctx = _make_context(["Mi_Apuesta", "50", "30", "seed=7", "sl=0,8"])
+
+    basket = _make_basket("Mi_Apuesta", "rsi", basket_id=12)
+    session = _make_session(_exec_scalar(basket), _exec_scalars([_make_asset("NVDA")]))
+
+    fake = MagicMock(
+        return_median=1.0, var_95=-5.0, cvar_95=-7.0, max_dd_p95=12.0, prob_loss=0.4,
+    )
+    with (
+        patch("src.bot.handlers.montecarlo.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.montecarlo.YahooDataProvider"),
+        patch("src.bot.handlers.montecarlo.MonteCarloAnalyzer") as MockAnalyzer,
+    ):
+        MockAnalyzer.return_value.run_asset_sl_sweep.return_value = [(None, fake), (8.0, fake)]
+        await cmd_montecarlo(update, ctx)
+
+    MockAnalyzer.return_value.run_asset.assert_not_called()
+    call = MockAnalyzer.return_value.run_asset_sl_sweep.call_args
+    assert call[0][8] == [None, 8.0]                      # every level in one call
+    assert call[0][7] == 7 and call[0][4:6] == (50, 30)
+    combined = " ".join(c[0][0] for c in update.message.reply_text.call_args_list)
+    assert "comparativa de stop-loss" in combined and "seed: 7" in combined
@@ -0,0 +1,83 @@
+"""Tests for the per-basket order queue."""
+import asyncio
+
+import pytest
+
+from src.orders.queue import BasketOrderQueue
+
+
+@pytest.mark.asyncio
+async def test_same_basket_runs_one_at_a_time_in_arrival_order():
+    queue = BasketOrderQueue()
+    running, peak, done = 0, 0, []
+
+    async def order(n):
+        nonlocal running, peak
+        async with queue.slot(1):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            done.append(n)
+
+    await asyncio.gather(*(order(n) for n in range(5)))
+
+    assert peak == 1
+    assert done == [0, 1, 2, 3, 4]
+    assert queue.depth(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_baskets_do_not_wait_for_each_other():
+    queue = BasketOrderQueue()
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow():
+        async with queue.slot(1):
+            entered.set()
+            await release.wait()
+
+    task = asyncio.create_task(slow())
+    await entered.wait()
+    async with queue.slot(2):          # would deadlock if basket 2 waited on basket 1
+        assert queue.depth(1) == 1
+    release.set()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_depth_counts_waiters_and_lane_is_dropped_when_idle():
+    queue = BasketOrderQueue()
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def holder():
+        async with queue.slot(7):
+            entered.set()
+            await release.wait()
+
+    async def waiter():
+        async with queue.slot(7):
+            pass
+
+    first = asyncio.create_task(holder())
+    await entered.wait()
+    second = asyncio.create_task(waiter())
+    await asyncio.sleep(0)
+    assert queue.depth(7) == 2
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert queue.depth(7) == 0
+    assert 7 not in queue._lanes
+
+
+@pytest.mark.asyncio
+async def test_error_in_slot_releases_the_basket():
+    queue = BasketOrderQueue()
+    with pytest.raises(ValueError):
+        async with queue.slot(1):
+            raise ValueError("boom")
+    async with queue.slot(1):
+        assert queue.depth(1) == 1
@@ -57,3 +57,109 @@ async def test_sell_no_position_raises(executor):
             session, basket_id=1, asset_id=1, user_id=1,
             ticker="AAPL", quantity=Decimal("5"), price=Decimal("150"),
         )
+
+
+# ---------------------------------------------------------------------------
+# sell_many — atomic batch
+# ---------------------------------------------------------------------------
+
+def _batch_session(basket, positions, lots=()):
+    pos_result = MagicMock()
+    pos_result.scalars.return_value.all.return_value = list(positions)
+    lots_result = MagicMock()
+    lots_result.scalars.return_value.all.return_value = list(lots)
+    session = _make_session(basket=basket)
+    session.execute = AsyncMock(side_effect=[pos_result, lots_result])
+    session.add_all = MagicMock()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_sell_many_one_commit_for_all_legs(executor):
+    from src.orders.base import OrderRequest
+
+    basket = MagicMock(cash=Decimal("0"), id=1)
+    positions = [
+        MagicMock(asset_id=1, quantity=Decimal("10"), avg_price=Decimal("100")),
+        MagicMock(asset_id=2, quantity=Decimal("5"), avg_price=Decimal("20")),
+    ]
+    session = _batch_session(basket, positions)
+
+    orders = await executor.sell_many(session, 1, 1, [
+        OrderRequest(1, "AAPL", Decimal("10"), Decimal("110")),
+        OrderRequest(2, "SAN.MC", Decimal("5"), Decimal("4")),
+    ])
+
+    assert [o.type for o in orders] == ["SELL", "SELL"]
+    assert basket.cash == Decimal("1120")
+    assert positions[0].quantity == 0 and positions[1].quantity == 0
+    session.commit.assert_awaited_once()
+    session.refresh.assert_not_awaited()
+    assert session.add_all.call_args_list[0].args[0] == orders
+
+
+@pytest.mark.asyncio
+async def test_sell_many_validates_every_leg_before_changing_anything(executor):
+    from src.orders.base import OrderRequest
+
+    basket = MagicMock(cash=Decimal("0"), id=1)
+    positions = [MagicMock(asset_id=1, quantity=Decimal("10"), avg_price=Decimal("100"))]
+    session = _batch_session(basket, positions)
+
+    with pytest.raises(ValueError, match="Insufficient position SAN.MC"):
+        await executor.sell_many(session, 1, 1, [
+            OrderRequest(1, "AAPL", Decimal("10"), Decimal("110")),
+            OrderRequest(2, "SAN.MC", Decimal("5"), Decimal("4")),
+        ])
+
+    assert positions[0].quantity == Decimal("10")
+    assert basket.cash == Decimal("0")
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_orders_lock_basket_row_before_reading_cash(executor):
+    basket = MagicMock(cash=Decimal("10000"), id=1)
+    position = MagicMock(quantity=Decimal("10"), avg_price=Decimal("100"))
+    session = _make_session(basket=basket, position=position)
+    session.add_all = MagicMock()
+
+    await executor.buy(
+        session, basket_id=1, asset_id=1, user_id=1,
+        ticker="AAPL", quantity=Decimal("1"), price=Decimal("100"),
+    )
+    await executor.sell(
+        session, basket_id=1, asset_id=1, user_id=1,
+        ticker="AAPL", quantity=Decimal("1"), price=Decimal("100"),
+    )
+
+    for call in session.get.call_args_list:
+        assert call.kwargs == {"with_for_update": True, "populate_existing": True}
+
+
+@pytest.mark.asyncio
+async def test_orders_read_positions_with_a_locking_read(executor):
+    """The handler's transaction is open before the order slot, so a plain
+    SELECT would see its old snapshot (REPEATABLE READ) — positions are
+    re-read FOR UPDATE and overwrite the session's copy."""
+    from sqlalchemy.dialects import mysql
+
+    from src.orders.base import OrderRequest
+
+    basket = MagicMock(cash=Decimal("10000"), id=1)
+    position = MagicMock(asset_id=1, quantity=Decimal("10"), avg_price=Decimal("100"))
+    session = _make_session(basket=basket, position=position)
+    session.add_all = MagicMock()
+    await executor.buy(session, 1, 1, 1, "AAPL", Decimal("1"), Decimal("100"))
+    await executor.sell(session, 1, 1, 1, "AAPL", Decimal("1"), Decimal("100"))
+    stmts = [c.args[0] for c in session.execute.call_args_list]
+
+    batch = _batch_session(basket, [position])
+    await executor.sell_many(batch, 1, 1, [OrderRequest(1, "AAPL", Decimal("1"), Decimal("100"))])
+    stmts.append(batch.execute.call_args_list[0].args[0])
+
+    for stmt in stmts:
+        sql = str(stmt.compile(dialect=mysql.dialect()))
+        if "FROM positions" in sql:
+            assert sql.endswith("FOR UPDATE")
+            assert stmt.get_execution_options().get("populate_existing")
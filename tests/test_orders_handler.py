@@ -3,7 +3,7 @@ import pytest
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.bot.handlers.orders import cmd_compra, cmd_vende
+from src.bot.handlers.orders import cmd_compra, cmd_liquidarcesta, cmd_vende
 
 
 # ---------------------------------------------------------------------------
@@ -166,3 +166,89 @@ async def test_vende_uses_active_basket():
 
     mock_executor.sell.assert_awaited_once()
     assert mock_executor.sell.call_args[0][1] == 10
+
+
+# ---------------------------------------------------------------------------
+# /liquidarcesta — one batched quote, one atomic sell_many
+# ---------------------------------------------------------------------------
+
+def _liquidation_session(positions):
+    caller = MagicMock(id=1)
+    basket = MagicMock(id=10)
+    owner = MagicMock(role="OWNER")
+    pairs = MagicMock()
+    pairs.all.return_value = positions
+    session = _make_session(_exec(caller), _exec(basket), _exec(owner), pairs)
+    session.rollback = AsyncMock()
+    return session
+
+
+def _pair(asset_id, ticker, currency, qty, avg):
+    return (
+        MagicMock(quantity=Decimal(qty), avg_price=Decimal(avg)),
+        MagicMock(id=asset_id, ticker=ticker, currency=currency),
+    )
+
+
+@pytest.mark.asyncio
+async def test_liquidarcesta_prices_once_and_sells_in_one_batch():
+    session = _liquidation_session([
+        _pair(1, "AAPL", "USD", "10", "100"),
+        _pair(2, "SAN.MC", "EUR", "50", "4"),
+    ])
+    update = _make_update()
+    mock_executor = AsyncMock()
+    with patch("src.bot.handlers.orders.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.orders._provider") as mock_prov, \
+         patch("src.bot.handlers.orders._executor", mock_executor):
+        mock_prov.get_current_prices.return_value = {
+            "AAPL": _mock_price(110.0), "SAN.MC": _mock_price(5.0, "EUR"),
+        }
+        await cmd_liquidarcesta(update, _make_context(["Cesta"]))
+
+    mock_prov.get_current_prices.assert_called_once()
+    mock_prov.get_current_price.assert_not_called()
+    mock_executor.sell.assert_not_awaited()
+    mock_executor.sell_many.assert_awaited_once()
+    requests = mock_executor.sell_many.call_args.args[3]
+    assert [(r.ticker, r.price) for r in requests] == [("AAPL", Decimal("110.0")), ("SAN.MC", Decimal("5.0"))]
+    reply = update.message.reply_text.call_args.args[0]
+    assert "Cash recuperado: 1350.00" in reply
+
+
+@pytest.mark.asyncio
+async def test_liquidarcesta_missing_quote_sells_nothing():
+    session = _liquidation_session([
+        _pair(1, "AAPL", "USD", "10", "100"),
+        _pair(3, "GONE", "USD", "1", "1"),
+    ])
+    update = _make_update()
+    mock_executor = AsyncMock()
+    with patch("src.bot.handlers.orders.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.orders._provider") as mock_prov, \
+         patch("src.bot.handlers.orders._executor", mock_executor):
+        mock_prov.get_current_prices.return_value = {"AAPL": _mock_price(110.0)}
+        await cmd_liquidarcesta(update, _make_context(["Cesta"]))
+
+    mock_executor.sell_many.assert_not_awaited()
+    reply = update.message.reply_text.call_args.args[0]
+    assert "no se ha vendido nada: sin cotización de GONE" in reply
+    assert "Cash recuperado" not in reply
+
+
+@pytest.mark.asyncio
+async def test_liquidarcesta_failure_sells_nothing():
+    session = _liquidation_session([_pair(1, "AAPL", "USD", "10", "100")])
+    update = _make_update()
+    mock_executor = AsyncMock()
+    mock_executor.sell_many.side_effect = ValueError("db down")
+    with patch("src.bot.handlers.orders.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.orders._provider") as mock_prov, \
+         patch("src.bot.handlers.orders._executor", mock_executor):
+        mock_prov.get_current_prices.return_value = {"AAPL": _mock_price(110.0)}
+        await cmd_liquidarcesta(update, _make_context(["Cesta"]))
+
+    session.rollback.assert_awaited_once()
+    reply = update.message.reply_text.call_args.args[0]
+    assert "no se ha vendido nada" in reply
+    assert "Cash recuperado" not in reply
@@ -0,0 +1,207 @@
+"""Tests for the order-ledger performance engine (TWR / MWR / vol / DD)."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot.handlers.rendimiento import cmd_rendimiento
+from src.data.bar_store import BarStore
+from src.portfolio.performance import OrderLedger, _irr, compute_performance, load_ledger
+
+
+def _ledger(orders):
+    """orders: [(timestamp, ticker, signed_qty, price)]"""
+    return OrderLedger(
+        when=np.array([o[0] for o in orders], dtype="datetime64[ns]"),
+        tickers=np.array([o[1] for o in orders], dtype=object),
+        qty=np.array([o[2] for o in orders], dtype=float),
+        price=np.array([o[3] for o in orders], dtype=float),
+    )
+
+
+def _closes(n=253, **cols):
+    idx = pd.bdate_range("2025-01-01", periods=n)
+    return pd.DataFrame({k: v(n) for k, v in cols.items()}, index=idx)
+
+
+def test_buy_and_hold_twr_equals_price_return():
+    closes = _closes(A=lambda n: np.linspace(100, 110, n))
+    ledger = _ledger([(closes.index[0], "A", 10, 100.0)])
+
+    r = compute_performance(ledger, closes, current_cash=0.0)
+
+    assert r.twr_pct == pytest.approx(10.0)
+    assert r.account_return_pct == pytest.approx(10.0)
+    assert r.max_drawdown_pct == pytest.approx(0.0)
+    assert r.n_orders == 1 and r.n_days == 253
+
+
+def test_twr_ignores_flow_timing_but_mwr_does_not():
+    # price rises 100 → 110 → 121 → 110: adding money before the drop hurts MWR only
+    closes = _closes(3, A=lambda n: np.array([100.0, 110.0, 121.0]))
+    closes = pd.concat([closes, pd.DataFrame({"A": [110.0]}, index=[closes.index[-1] + pd.offsets.BDay()])])
+    ledger = _ledger([
+        (closes.index[0], "A", 1, 100.0),
+        (closes.index[2], "A", 9, 121.0),
+    ])
+
+    r = compute_performance(ledger, closes, current_cash=0.0)
+
+    expected_twr = (110 / 100) * (121 / 110) * (110 / 121) - 1
+    assert r.twr_pct == pytest.approx(expected_twr * 100)
+    assert r.mwr_annualized_pct is not None
+    assert r.mwr_annualized_pct < 0 < r.twr_pct
+
+
+def test_full_sell_and_reentry_and_cash_curve():
+    closes = _closes(5, A=lambda n: np.array([10.0, 11.0, 12.0, 12.0, 13.2]))
+    idx = closes.index
+    ledger = _ledger([
+        (idx[0], "A", 10, 10.0),
+        (idx[2], "A", -10, 12.0),      # flat on day 2 with +20%
+        (idx[3], "A", 10, 12.0),       # back in, then +10%
+    ])
+
+    r = compute_performance(ledger, closes, current_cash=868.0)
+
+    assert r.twr_pct == pytest.approx((1.2 * 1.1 - 1) * 100)
+    # opening cash = current + later net flows (−120 + 120) → 868; equity 968 → 1000
+    assert r.equity.iloc[0] == pytest.approx(968.0)
+    assert r.equity.iloc[-1] == pytest.approx(868.0 + 132.0)
+
+
+def test_orders_before_window_become_opening_position():
+    closes = _closes(10, A=lambda n: np.arange(100.0, 100.0 + n))
+    ledger = _ledger([(closes.index[0] - timedelta(days=30), "A", 5, 80.0)])
+
+    r = compute_performance(ledger, closes, current_cash=0.0, start=closes.index[3])
+
+    assert r.start == closes.index[3].to_pydatetime()
+    assert r.twr_pct == pytest.approx((109 / 103 - 1) * 100)
+
+
+def test_missing_prices_raise():
+    closes = _closes(5, A=lambda n: np.ones(n))
+    with pytest.raises(ValueError, match="ZZZ"):
+        compute_performance(_ledger([(closes.index[0], "ZZZ", 1, 1.0)]), closes, 0.0)
+
+
+def test_irr_matches_closed_form():
+    # −100 today, +110 in one year → 10%
+    assert _irr(np.array([-100.0, 110.0]), np.array([0.0, 1.0])) == pytest.approx(0.10, abs=1e-9)
+    assert _irr(np.array([100.0, 110.0]), np.array([0.0, 1.0])) is None
+
+
+def test_thousands_of_orders_vectorized():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2024-01-01", periods=500)
+    closes = pd.DataFrame(
+        {f"T{i}": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 500))) for i in range(20)}, index=idx,
+    )
+    n = 5_000
+    days = np.sort(rng.integers(0, 500, n))
+    cols = rng.integers(0, 20, n)
+    ledger = OrderLedger(
+        when=idx.values[days], tickers=np.array([f"T{c}" for c in cols], dtype=object),
+        qty=np.abs(rng.normal(5, 1, n)), price=closes.to_numpy()[days, cols],
+    )
+    r = compute_performance(ledger, closes, current_cash=1_000.0)
+    assert np.isfinite(r.twr_pct) and np.isfinite(r.volatility_pct)
+
+
+@pytest.mark.asyncio
+async def test_load_ledger_signs_sells():
+    rows = [
+        MagicMock(type="BUY", quantity=Decimal("3"), price=Decimal("10"),
+                  created_at=datetime(2025, 1, 2), executed_at=None, ticker="A"),
+        MagicMock(type="SELL", quantity=Decimal("1"), price=Decimal("12"),
+                  created_at=datetime(2025, 1, 3), executed_at=datetime(2025, 1, 3, 15), ticker="A"),
+    ]
+    result = MagicMock()
+    result.all.return_value = rows
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+
+    ledger = await load_ledger(session, 1)
+
+    assert ledger.qty.tolist() == [3.0, -1.0]
+    assert ledger.cash_flow.tolist() == [30.0, -12.0]
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cmd_rendimiento_reports_ledger_metrics_from_bar_store():
+    idx = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=60)
+    close = pd.Series(np.linspace(100, 120, 60), index=idx)
+    provider = MagicMock()
+    provider.get_historical.return_value = MagicMock(data=pd.DataFrame({"Close": close}))
+    store = BarStore(provider)
+    store.refresh(["AAPL"])                           # done by the precompute job
+
+    basket = MagicMock(id=1, cash=Decimal("0"))
+    basket.name = "Cesta"
+    basket_result = MagicMock()
+    basket_result.scalar_one_or_none.return_value = basket
+    no_snapshots = MagicMock()
+    no_snapshots.all.return_value = []
+    orders = MagicMock()
+    orders.all.return_value = [MagicMock(
+        type="BUY", quantity=Decimal("10"), price=Decimal("100"),
+        created_at=idx[0].to_pydatetime(), executed_at=None, ticker="AAPL",
+    )]
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_result, no_snapshots, orders])
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["Cesta", "max"]
+
+    with patch("src.bot.handlers.rendimiento.async_session_factory", return_value=cm), \
+         patch("src.bot.handlers.rendimiento.bar_store", store):
+        await cmd_rendimiento(update, ctx)
+
+    provider.get_historical.assert_called_once()     # the handler never downloads
+    text = update.message.reply_text.call_args.args[0]
+    assert "TWR: +20.00%" in text
+    assert "1 órdenes" in text
+
+
+@pytest.mark.asyncio
+async def test_cmd_rendimiento_reports_uncached_tickers_without_downloading():
+    provider = MagicMock()
+    store = BarStore(provider)
+    basket = MagicMock(id=1, cash=Decimal("0"))
+    basket.name = "Cesta"
+    basket_result = MagicMock()
+    basket_result.scalar_one_or_none.return_value = basket
+    no_snapshots = MagicMock()
+    no_snapshots.all.return_value = []
+    orders = MagicMock()
+    orders.all.return_value = [MagicMock(
+        type="BUY", quantity=Decimal("10"), price=Decimal("100"),
+        created_at=datetime(2025, 1, 2), executed_at=None, ticker="AAPL",
+    )]
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_result, no_snapshots, orders])
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["Cesta", "max"]
+
+    with patch("src.bot.handlers.rendimiento.async_session_factory", return_value=cm), \
+         patch("src.bot.handlers.rendimiento.bar_store", store):
+        await cmd_rendimiento(update, ctx)
+
+    provider.get_historical.assert_not_called()
+    text = update.message.reply_text.call_args.args[0]
+    assert "sin cierres guardados de AAPL" in text
+    assert store.get("AAPL") is None
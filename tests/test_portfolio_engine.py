@@ -0,0 +1,151 @@
+"""Tests for batched pricing in PortfolioEngine.get_valuation."""
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.base import DataProvider
+from src.data.models import Price, PriceSnapshot
+from src.data.yahoo import YahooDataProvider
+from src.portfolio.engine import PortfolioEngine
+
+
+class _CountingProvider(DataProvider):
+    """Quotes from a fixed table; records every batch and per-ticker call."""
+
+    def __init__(self, quotes: dict[str, tuple[str, str]]):
+        self.quotes = quotes
+        self.batches: list[list[str]] = []
+        self.single_calls = 0
+
+    def get_current_price(self, ticker):
+        self.single_calls += 1
+        price, cur = self.quotes[ticker]
+        return Price(ticker=ticker, price=Decimal(price), currency=cur)
+
+    def get_current_prices(self, tickers, currencies=None):
+        self.batches.append(list(tickers))
+        return {
+            t: Price(ticker=t, price=Decimal(self.quotes[t][0]), currency=self.quotes[t][1])
+            for t in tickers if t in self.quotes
+        }
+
+    def get_historical(self, ticker, period="3mo", interval="1d"):
+        raise NotImplementedError
+
+    def get_atr(self, ticker, period=14):
+        raise NotImplementedError
+
+
+def _session(rows, cash="1000"):
+    basket = MagicMock(id=1, cash=Decimal(cash))
+    basket.name = "Cesta"
+    session = AsyncMock()
+    session.get.return_value = basket
+    result = MagicMock()
+    result.all.return_value = rows
+    session.execute.return_value = result
+    return session
+
+
+def _row(ticker, currency, qty="10", avg="100"):
+    pos = MagicMock(quantity=Decimal(qty), avg_price=Decimal(avg))
+    asset = MagicMock(ticker=ticker, currency=currency)
+    return pos, asset
+
+
+@pytest.mark.asyncio
+async def test_valuation_prices_all_positions_in_one_batch_with_one_fx_per_currency():
+    quotes = {f"US{i}": ("110", "USD") for i in range(5)}
+    quotes.update({"SAN.MC": ("4", "EUR"), "BP.L": ("5", "GBP"), "USDEUR=X": ("0.9", "EUR"),
+                   "GBPEUR=X": ("1.2", "EUR")})
+    prov = _CountingProvider(quotes)
+    rows = [_row(f"US{i}", "USD") for i in range(5)]
+    rows += [_row("SAN.MC", "EUR", avg="4"), _row("BP.L", "GBP", avg="5")]
+
+    val = await PortfolioEngine(prov).get_valuation(_session(rows), 1)
+
+    assert len(prov.batches) == 1
+    batch = prov.batches[0]
+    assert batch.count("USDEUR=X") == 1 and batch.count("GBPEUR=X") == 1
+    assert "EUREUR=X" not in batch
+    assert prov.single_calls == 0
+    assert len(val.positions) == 7
+    us0 = next(p for p in val.positions if p.ticker == "US0")
+    assert us0.market_value == Decimal("110") * Decimal("0.9") * 10
+    assert us0.currency == "USD"
+
+
+@pytest.mark.asyncio
+async def test_valuation_converts_a_quote_in_another_unit_than_the_asset_currency():
+    # stored as GBP, but the fallback quote came back in pence
+    prov = _CountingProvider({"BP.L": ("480", "GBp"), "GBPEUR=X": ("1.2", "EUR")})
+    rows = [_row("BP.L", "GBP", qty="100", avg="400")]
+
+    val = await PortfolioEngine(prov).get_valuation(_session(rows, cash="0"), 1)
+
+    assert len(prov.batches) == 1                      # GBp shares the GBP pair
+    [bp] = val.positions
+    assert bp.currency == "GBp"
+    assert bp.market_value == Decimal("480") * Decimal("0.012") * 100
+
+
+def test_snapshot_prices_fx_for_an_unexpected_quote_currency():
+    prov = _CountingProvider({"AAA": ("10", "USD"), "USDEUR=X": ("0.9", "EUR")})
+    snap = prov.get_price_snapshot({"AAA": "EUR"})
+
+    assert prov.batches == [["AAA"], ["USDEUR=X"]]
+    assert snap.fx_rate("USD") == Decimal("0.9")
+
+
+@pytest.mark.asyncio
+async def test_valuation_skips_unpriced_ticker_and_reuses_given_snapshot():
+    prov = _CountingProvider({})
+    snap = PriceSnapshot(
+        prices={"AAA": Price(ticker="AAA", price=Decimal("50"), currency="EUR")},
+    )
+    rows = [_row("AAA", "EUR", avg="40"), _row("ZZZ", "EUR")]
+
+    val = await PortfolioEngine(prov).get_valuation(_session(rows, cash="0"), 1, snapshot=snap)
+
+    assert prov.batches == []
+    assert [p.ticker for p in val.positions] == ["AAA"]
+    assert val.total_pnl == Decimal("100")
+
+
+def test_default_get_current_prices_skips_failures():
+    prov = _CountingProvider({"A": ("1", "EUR")})
+    prices = DataProvider.get_current_prices(prov, ["A", "B", "A"])
+    assert list(prices) == ["A"]
+    assert prov.single_calls == 2
+
+
+def test_yahoo_batch_uses_one_download_and_last_valid_close():
+    idx = pd.bdate_range("2024-01-01", periods=3)
+    cols = pd.MultiIndex.from_product([["Close", "Open"], ["AAPL", "SAN.MC"]])
+    df = pd.DataFrame(
+        [[100, 4, 0, 0], [101, 4.1, 0, 0], [102, np.nan, 0, 0]], index=idx, columns=cols,
+    )
+    prov = YahooDataProvider()
+    with patch("src.data.yahoo.yf.download", return_value=df) as dl, \
+         patch.object(prov, "get_current_price") as single:
+        prices = prov.get_current_prices(["AAPL", "SAN.MC"], {"AAPL": "USD", "SAN.MC": "EUR"})
+
+    dl.assert_called_once()
+    single.assert_not_called()
+    assert prices["AAPL"].price == Decimal("102.0") and prices["AAPL"].currency == "USD"
+    assert prices["SAN.MC"].price == Decimal("4.1")
+
+
+def test_yahoo_batch_falls_back_per_ticker_when_currency_unknown():
+    idx = pd.bdate_range("2024-01-01", periods=1)
+    df = pd.DataFrame({("Close", "X"): [10.0]}, index=idx)
+    prov = YahooDataProvider()
+    fallback = Price(ticker="X", price=Decimal("10"), currency="GBP")
+    with patch("src.data.yahoo.yf.download", return_value=df), \
+         patch.object(prov, "get_current_price", return_value=fallback) as single:
+        prices = prov.get_current_prices(["X"])
+    single.assert_called_once_with("X")
+    assert prices["X"].currency == "GBP"
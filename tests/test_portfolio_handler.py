@@ -0,0 +1,114 @@
+"""Tests for /valoracion: concurrent per-basket valuation over one price snapshot."""
+import asyncio
+from decimal import Decimal
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.bot.handlers.portfolio import cmd_valoracion
+from src.portfolio.models import BasketValuation
+
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+def _make_basket(basket_id, name):
+    b = MagicMock(id=basket_id)
+    b.name = name
+    return b
+
+
+def _valuation(basket_id, name):
+    return BasketValuation(
+        basket_id=basket_id, basket_name=name, positions=[], cash=Decimal("100"),
+        total_invested=Decimal("0"), total_value=Decimal("100"),
+        total_pnl=Decimal("0"), total_pnl_pct=Decimal("0"),
+    )
+
+
+def _setup(baskets, held):
+    baskets_result = MagicMock()
+    baskets_result.scalars.return_value.all.return_value = baskets
+    held_result = MagicMock()
+    held_result.all.return_value = held
+    list_session = MagicMock()
+    list_session.execute = AsyncMock(side_effect=[baskets_result, held_result])
+    per_basket = [MagicMock(name=f"session_{b.id}") for b in baskets]
+    factory = MagicMock(side_effect=[_wrap(list_session)] + [_wrap(s) for s in per_basket])
+
+    msgs = [MagicMock(edit_text=AsyncMock()) for _ in baskets]
+    update = MagicMock()
+    update.message.reply_text = AsyncMock(side_effect=msgs)
+    ctx = MagicMock()
+    ctx.args = []
+    return factory, per_basket, msgs, update, ctx
+
+
+@pytest.mark.asyncio
+async def test_valoracion_shares_one_snapshot_and_values_baskets_concurrently():
+    baskets = [_make_basket(1, "Lenta"), _make_basket(2, "Rapida")]
+    factory, per_basket, msgs, update, ctx = _setup(
+        baskets, [("AAPL", "USD"), ("SAN.MC", "EUR")],
+    )
+    shared = object()
+    order = []
+
+    async def fake_valuation(session, basket_id, snapshot=None):
+        assert snapshot is shared
+        # the first basket is slower: the second must finish (and render) first
+        await asyncio.sleep(0.05 if basket_id == 1 else 0)
+        order.append(basket_id)
+        return _valuation(basket_id, baskets[basket_id - 1].name)
+
+    with patch("src.bot.handlers.portfolio.async_session_factory", factory), \
+         patch("src.bot.handlers.portfolio._engine") as engine:
+        engine.snapshot = MagicMock(return_value=shared)
+        engine.get_valuation = AsyncMock(side_effect=fake_valuation)
+        await cmd_valoracion(update, ctx)
+
+    engine.snapshot.assert_called_once_with({"AAPL": "USD", "SAN.MC": "EUR"})
+    assert order == [2, 1]
+    sessions_used = [c.args[0] for c in engine.get_valuation.call_args_list]
+    assert set(map(id, sessions_used)) == set(map(id, per_basket))
+    assert "Lenta" in msgs[0].edit_text.call_args.args[0]
+    assert "Rapida" in msgs[1].edit_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_valoracion_error_in_one_basket_does_not_block_others():
+    baskets = [_make_basket(1, "Rota"), _make_basket(2, "Buena")]
+    factory, _, msgs, update, ctx = _setup(baskets, [])
+
+    async def fake_valuation(session, basket_id, snapshot=None):
+        if basket_id == 1:
+            raise RuntimeError("boom")
+        return _valuation(basket_id, "Buena")
+
+    with patch("src.bot.handlers.portfolio.async_session_factory", factory), \
+         patch("src.bot.handlers.portfolio._engine") as engine:
+        engine.snapshot = MagicMock(return_value=object())
+        engine.get_valuation = AsyncMock(side_effect=fake_valuation)
+        await cmd_valoracion(update, ctx)
+
+    assert "❌ Error calculando Rota" in msgs[0].edit_text.call_args.args[0]
+    assert "Buena" in msgs[1].edit_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_valoracion_snapshot_failure_reports_on_every_basket():
+    baskets = [_make_basket(1, "A"), _make_basket(2, "B")]
+    factory, _, msgs, update, ctx = _setup(baskets, [("AAPL", "USD")])
+
+    with patch("src.bot.handlers.portfolio.async_session_factory", factory), \
+         patch("src.bot.handlers.portfolio._engine") as engine:
+        engine.snapshot = MagicMock(side_effect=RuntimeError("yahoo caído"))
+        engine.get_valuation = AsyncMock()
+        await cmd_valoracion(update, ctx)
+
+    engine.get_valuation.assert_not_called()
+    for msg in msgs:
+        assert "yahoo caído" in msg.edit_text.call_args.args[0]
@@ -0,0 +1,108 @@
+"""Tests for the shared-cash basket simulator."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.portfolio_sim import simulate_shared_cash
+
+
+def _frames(prices: dict[str, list[float]], entries: dict[str, list[int]], exits=None):
+    idx = pd.bdate_range("2024-01-01", periods=len(next(iter(prices.values()))))
+    close = pd.DataFrame(prices, index=idx, dtype=float)
+    ent = pd.DataFrame({t: [bool(v) for v in vs] for t, vs in entries.items()}, index=idx)
+    ex = pd.DataFrame(False, index=idx, columns=close.columns)
+    for t, vs in (exits or {}).items():
+        ex[t] = [bool(v) for v in vs]
+    return close, ent, ex
+
+
+def test_equal_allocation_invests_one_share_of_equity_per_ticker():
+    close, ent, ex = _frames(
+        {"A": [10, 10, 20], "B": [10, 10, 10]},
+        {"A": [1, 0, 0], "B": [1, 0, 0]},
+    )
+    r = simulate_shared_cash(close, ent, ex, init_cash=1_000, allocation="equal")
+    # 500 in A doubles, 500 in B flat → 1500
+    assert r.equity.iloc[-1] == pytest.approx(1_500)
+    assert r.cash.iloc[-1] == pytest.approx(0)
+    assert r.total_return_pct == pytest.approx(50)
+    assert r.n_trades == 2
+
+
+def test_cash10_spends_ten_percent_of_remaining_cash_per_buy():
+    close, ent, ex = _frames(
+        {"A": [10, 10], "B": [10, 10]},
+        {"A": [1, 0], "B": [1, 0]},
+    )
+    r = simulate_shared_cash(close, ent, ex, init_cash=1_000, allocation="cash10")
+    assert r.cash.iloc[0] == pytest.approx(1_000 - 100 - 90)
+
+
+def test_exit_frees_cash_for_same_bar_entry():
+    close, ent, ex = _frames(
+        {"A": [10, 20, 20], "B": [10, 10, 10]},
+        {"A": [1, 0, 0], "B": [0, 1, 0]},
+        exits={"A": [0, 1, 0]},
+    )
+    r = simulate_shared_cash(close, ent, ex, init_cash=1_000, allocation="equal")
+    # bar 1: A sold for 1000 (500 → 1000), then B bought with equity/2 = 750
+    assert r.cash.iloc[1] == pytest.approx(1_500 - 750)
+    assert r.equity.iloc[-1] == pytest.approx(1_500)
+    assert r.n_trades == 2   # A bought and sold is one round trip; B still open
+
+
+def test_drawdown_comes_from_the_portfolio_curve_not_worst_asset():
+    close, ent, ex = _frames(
+        {"A": [10, 5, 5], "B": [10, 15, 15]},
+        {"A": [1, 0, 0], "B": [1, 0, 0]},
+    )
+    r = simulate_shared_cash(close, ent, ex, init_cash=1_000, allocation="equal")
+    # A alone drew down 50%, but the basket is flat
+    assert r.max_drawdown_pct == pytest.approx(0)
+
+
+def test_stop_loss_closes_position():
+    close, ent, ex = _frames({"A": [10, 8, 4]}, {"A": [1, 0, 0]})
+    r = simulate_shared_cash(close, ent, ex, init_cash=1_000, stop_loss_pct=10)
+    assert r.equity.iloc[-1] == pytest.approx(800)
+
+
+def test_monthly_rebalance_restores_equal_weights():
+    idx = pd.bdate_range("2024-01-29", periods=6)   # crosses into February
+    close = pd.DataFrame({"A": [10, 20, 20, 20, 20, 20], "B": [10.0] * 6}, index=idx)
+    ent = pd.DataFrame({"A": [True] + [False] * 5, "B": [True] + [False] * 5}, index=idx)
+    ex = pd.DataFrame(False, index=idx, columns=["A", "B"])
+
+    r = simulate_shared_cash(close, ent, ex, init_cash=1_000, allocation="equal", rebalance="M")
+    no_reb = simulate_shared_cash(close, ent, ex, init_cash=1_000, allocation="equal")
+    assert r.n_trades == 2   # trim A + top up B resize the two open trades
+    assert r.equity.iloc[-1] == pytest.approx(no_reb.equity.iloc[-1])
+
+
+def test_invalid_allocation_raises():
+    close, ent, ex = _frames({"A": [10, 10]}, {"A": [1, 0]})
+    with pytest.raises(ValueError):
+        simulate_shared_cash(close, ent, ex, allocation="kelly")
+
+
+def test_engine_shared_cash_mode_uses_portfolio_curve():
+    from unittest.mock import MagicMock
+    from src.backtest.engine import BacktestEngine
+
+    n = 120
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    up = pd.DataFrame({"Close": np.linspace(100, 200, n)}, index=idx)
+    down = pd.DataFrame({"Close": np.linspace(100, 50, n)}, index=idx)
+    ohlcv = {"UP": MagicMock(data=up), "DOWN": MagicMock(data=down)}
+    strategy = MagicMock()
+    strategy.evaluate.return_value = None   # exit-only → always invested from warmup
+
+    result = BacktestEngine().run(
+        ["UP", "DOWN"], strategy, "hold", "6mo", None, ohlcv, "equal",
+    )
+    assert result.allocation == "equal"
+    assert len(result.equity_curve) == n
+    assert result.n_trades == 2
+    assert result.total_return_pct == pytest.approx(
+        (result.equity_curve.iloc[-1] / 10_000 - 1) * 100
+    )
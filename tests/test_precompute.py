@@ -0,0 +1,333 @@
+"""Tests for the nightly precompute pipeline, bar store and cached answers."""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.engine import PortfolioBacktestResult
+from src.data.bar_store import BarStore
+from src.scheduler.precompute import (
+    Materialized, PrecomputeStore, computed_stamp, pop_live_flag, precomputed, run_precompute,
+)
+
+
+def _make_df(n=520):
+    idx = pd.bdate_range("2023-01-02", periods=n)
+    close = pd.Series(100 + np.arange(n, dtype=float), index=idx)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                         "Close": close, "Volume": 1_000.0}, index=idx)
+
+
+def _ohlcv(df):
+    o = MagicMock()
+    o.data = df
+    return o
+
+
+@pytest.fixture(autouse=True)
+def _clean_store():
+    precomputed.clear()
+    yield
+    precomputed.clear()
+
+
+# ---------------------------------------------------------------------------
+# BarStore
+# ---------------------------------------------------------------------------
+
+def test_bar_store_downloads_once_and_slices_periods():
+    provider = MagicMock()
+    provider.get_historical.return_value = _ohlcv(_make_df())
+    store = BarStore(provider)
+
+    assert store.refresh(["AAPL", "AAPL"]) == ["AAPL"]
+    provider.get_historical.assert_called_once_with("AAPL", period="2y", interval="1d")
+
+    one_year = store.get("AAPL", "1y").data
+    three_months = store.get("AAPL", "3mo").data
+    assert len(three_months) < len(one_year) < len(store.get("AAPL").data)
+    assert one_year.index[-1] == three_months.index[-1]
+
+
+def test_bar_store_keeps_previous_bars_on_failure():
+    provider = MagicMock()
+    provider.get_historical.return_value = _ohlcv(_make_df())
+    store = BarStore(provider)
+    store.refresh(["AAPL"])
+
+    provider.get_historical.side_effect = ValueError("No data")
+    assert store.refresh(["AAPL"]) == []
+    assert store.get("AAPL") is not None
+    assert store.get("MSFT") is None
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def test_pop_live_flag():
+    assert pop_live_flag(["Cesta", "LIVE", "1y"]) == (["Cesta", "1y"], True)
+    assert pop_live_flag(["Cesta"]) == (["Cesta"], False)
+
+
+def test_computed_stamp_shows_time():
+    assert "calculado a las 22:05" in computed_stamp(datetime(2026, 3, 2, 22, 5))
+
+
+# ---------------------------------------------------------------------------
+# run_precompute
+# ---------------------------------------------------------------------------
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+@pytest.mark.asyncio
+async def test_run_precompute_materialises_everything():
+    basket = MagicMock(id=7, strategy="rsi", stop_loss_pct=None)
+    basket.name = "Modelo RSI"
+    baskets_r = MagicMock()
+    baskets_r.scalars.return_value.all.return_value = [basket]
+    fixed_r = MagicMock()
+    fixed_r.all.return_value = [(7, "AAPL", "USD")]
+    held_r = MagicMock()
+    held_r.all.return_value = []
+    traded_r = MagicMock()
+    traded_r.scalars.return_value.all.return_value = ["AAPL", "SOLD.MC"]   # SOLD.MC: ledger only
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[baskets_r, fixed_r, held_r, traded_r])
+
+    provider = MagicMock()
+    provider.get_historical.return_value = _ohlcv(_make_df())
+    store = PrecomputeStore()
+    fake_bt = MagicMock(spec=PortfolioBacktestResult)
+
+    with (
+        patch("src.scheduler.precompute.scheduler_session_factory", return_value=_wrap(session)),
+        patch("src.scheduler.precompute.bar_store", BarStore(provider)),
+        patch("src.scheduler.precompute.BacktestEngine") as MockEngine,
+        patch("src.scheduler.precompute.MonteCarloAnalyzer") as MockAnalyzer,
+    ):
+        MockEngine.return_value.run.return_value = fake_bt
+        MockAnalyzer.return_value.run_asset.return_value = MagicMock()
+        await run_precompute(store)
+
+    fetched = [c.args[0] for c in provider.get_historical.call_args_list]
+    assert fetched == ["AAPL", "SOLD.MC"], "bars must be downloaded once per ticker"
+    assert {p for (_, p) in store.backtests} == {"1mo", "3mo", "6mo", "1y", "2y"}
+    assert store.backtests[(7, "1y")].value is fake_bt
+    assert store.backtests[(7, "1y")].computed_for(basket)
+    assert len(store.montecarlo[7].value.results) == 1
+    assert "AAPL" in store.analyses and "RSI" in store.analyses["AAPL"].value
+    assert "SOLD.MC" not in store.analyses
+
+
+def test_large_precompute_montecarlo_streams_per_ticker_paths():
+    from src.backtest.montecarlo import MonteCarloAnalyzer
+    from src.scheduler.precompute import _run_montecarlo
+
+    def fake_from_signals(close, entries, exits, **kwargs):
+        pf = MagicMock()
+        pf.stats.return_value = {"Total Return [%]": float(close.iloc[-1]) - 600, "Sharpe Ratio": 1.0,
+                                 "Max Drawdown [%]": 1.0, "Win Rate [%]": 50.0}
+        return pf
+
+    store = BarStore(MagicMock(**{"get_historical.return_value": _ohlcv(_make_df())}))
+    store.refresh(["AAPL"])
+    a = MagicMock(strategy="rsi", stop_loss_pct=None)
+    b = MagicMock(strategy="rsi", stop_loss_pct=None)
+    analyzer = MonteCarloAnalyzer()
+    with (
+        patch("src.scheduler.precompute.bar_store", store),
+        patch("src.scheduler.precompute.STREAM_CHUNK", 10),
+        patch("src.scheduler.precompute.app_config", {"scheduler": {"precompute": {"montecarlo_sims": 25}}}),
+        patch.object(analyzer, "run_asset", side_effect=AssertionError("must stream")),
+        patch("vectorbt.Portfolio.from_signals", side_effect=fake_from_signals),
+    ):
+        snap_a = _run_montecarlo(a, ["AAPL"], 11, analyzer)
+        snap_b = _run_montecarlo(b, ["AAPL"], 11, analyzer)
+
+    assert snap_a.n_sims == 25 and snap_a.results[0].n_simulations == 25
+    # per-ticker stream: the same seed gives the same paths in every basket
+    assert snap_a.results[0].return_median == snap_b.results[0].return_median
+
+
+@pytest.mark.asyncio
+async def test_montecarlo_serves_a_larger_precomputed_run():
+    from src.bot.handlers.montecarlo import cmd_montecarlo
+    from src.scheduler.precompute import MonteCarloSnapshot
+
+    basket = MagicMock(id=3, strategy="rsi", stop_loss_pct=None)
+    basket.name = "Modelo RSI"
+    snap = MonteCarloSnapshot(seed=1, n_sims=20_000, horizon=90)
+    precomputed.montecarlo[3] = Materialized(snap, datetime(2026, 3, 2, 22, 5), "rsi")
+    r = MagicMock()
+    r.scalar_one_or_none.return_value = basket
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=r)
+    msg = MagicMock()
+    msg.delete = AsyncMock()
+    update = MagicMock()
+    update.message.reply_text = AsyncMock(return_value=msg)
+    with (
+        patch("src.bot.handlers.montecarlo.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.montecarlo.MonteCarloAnalyzer") as MockAnalyzer,
+    ):
+        await cmd_montecarlo(update, MagicMock(args=["Modelo", "RSI"]))
+
+    MockAnalyzer.return_value.run_asset.assert_not_called()
+    combined = " ".join(c[0][0] for c in update.message.reply_text.call_args_list)
+    assert "20000" in combined and "calculado a las 22:05" in combined
+
+
+# ---------------------------------------------------------------------------
+# Handlers answer from the store unless `live`
+# ---------------------------------------------------------------------------
+
+def _bt_session(basket):
+    r = MagicMock()
+    r.scalar_one_or_none.return_value = basket
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[r, MagicMock()])
+    return session
+
+
+def _bt_result():
+    return PortfolioBacktestResult(
+        period="1y", strategy_name="rsi", total_return_pct=4.2,
+        annualized_return_pct=4.2, sharpe_ratio=1.0, max_drawdown_pct=3.0,
+        n_trades=2, benchmark_return_pct=1.0, per_asset={},
+    )
+
+
+@pytest.mark.asyncio
+async def test_backtest_answers_from_precomputed():
+    from src.bot.handlers.backtest import cmd_backtest
+    basket = MagicMock(id=3, strategy="rsi", stop_loss_pct=None)
+    basket.name = "Modelo RSI"
+    precomputed.backtests[(3, "1y")] = Materialized(_bt_result(), datetime(2026, 3, 2, 22, 5), "rsi")
+
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock(args=["Modelo", "RSI"])
+    with (
+        patch("src.bot.handlers.backtest.async_session_factory", return_value=_wrap(_bt_session(basket))),
+        patch("src.bot.handlers.backtest.BacktestEngine") as MockEngine,
+    ):
+        await cmd_backtest(update, ctx)
+
+    MockEngine.return_value.run.assert_not_called()
+    text = update.message.reply_text.call_args[0][0]
+    assert "+4.2%" in text and "calculado a las 22:05" in text
+
+
+@pytest.mark.asyncio
+async def test_backtest_live_flag_bypasses_store():
+    from src.bot.handlers.backtest import cmd_backtest
+    basket = MagicMock(id=3, strategy="rsi", stop_loss_pct=None)
+    basket.name = "Modelo RSI"
+    precomputed.backtests[(3, "1y")] = Materialized(_bt_result(), datetime(2026, 3, 2, 22, 5), "rsi")
+    assets_r = MagicMock()
+    assets_r.scalars.return_value.all.return_value = [MagicMock(ticker="AAPL")]
+    basket_r = MagicMock()
+    basket_r.scalar_one_or_none.return_value = basket
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_r, assets_r])
+
+    msg = MagicMock()
+    msg.edit_text = AsyncMock()
+    update = MagicMock()
+    update.message.reply_text = AsyncMock(return_value=msg)
+    ctx = MagicMock(args=["Modelo", "RSI", "live"])
+    with (
+        patch("src.bot.handlers.backtest.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.backtest.BacktestEngine") as MockEngine,
+    ):
+        MockEngine.return_value.run.return_value = _bt_result()
+        await cmd_backtest(update, ctx)
+
+    MockEngine.return_value.run.assert_called_once()
+    assert "calculado" not in msg.edit_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_backtest_ignores_result_computed_with_another_strategy():
+    from src.bot.handlers.backtest import cmd_backtest
+    basket = MagicMock(id=3, strategy="ma_crossover", stop_loss_pct=None)   # was "rsi" last night
+    basket.name = "Modelo RSI"
+    precomputed.backtests[(3, "1y")] = Materialized(_bt_result(), datetime(2026, 3, 2, 22, 5), "rsi")
+    assets_r = MagicMock()
+    assets_r.scalars.return_value.all.return_value = [MagicMock(ticker="AAPL")]
+    basket_r = MagicMock()
+    basket_r.scalar_one_or_none.return_value = basket
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_r, assets_r])
+
+    msg = MagicMock()
+    msg.edit_text = AsyncMock()
+    update = MagicMock()
+    update.message.reply_text = AsyncMock(return_value=msg)
+    with (
+        patch("src.bot.handlers.backtest.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.backtest.BacktestEngine") as MockEngine,
+    ):
+        MockEngine.return_value.run.return_value = _bt_result()
+        await cmd_backtest(update, MagicMock(args=["Modelo", "RSI"]))
+
+    MockEngine.return_value.run.assert_called_once()
+    assert "calculado" not in msg.edit_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_estrategia_evicts_the_basket_from_the_store():
+    from src.backtest.montecarlo import PathCache
+    from src.bot.handlers.admin import cmd_estrategia
+
+    precomputed.backtests[(3, "1y")] = Materialized(_bt_result(), datetime(2026, 3, 2, 22, 5), "rsi")
+    precomputed.backtests[(4, "1y")] = Materialized(_bt_result(), datetime(2026, 3, 2, 22, 5), "rsi")
+    precomputed.montecarlo[3] = Materialized(MagicMock(), datetime(2026, 3, 2, 22, 5), "rsi")
+    cache = PathCache()
+    cache.get_or_create(("AAPL", 1), list)
+    cache.get_or_create(("MSFT", 1), list)
+
+    basket = MagicMock(id=3, strategy="rsi", stop_loss_pct=None)
+    basket.name = "Modelo RSI"
+    basket_r = MagicMock()
+    basket_r.scalar_one_or_none.return_value = basket
+    tickers_r = MagicMock()
+    tickers_r.scalars.return_value.all.return_value = ["AAPL"]
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_r, tickers_r])
+    session.commit = AsyncMock()
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    with (
+        patch("src.bot.handlers.admin.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.admin.identity_cache") as ident,
+        patch("src.bot.handlers.admin.path_cache", cache),
+    ):
+        ident.user = AsyncMock(return_value=MagicMock(id=1))
+        ident.role = AsyncMock(return_value="OWNER")
+        await cmd_estrategia(update, MagicMock(args=["Modelo", "RSI", "ma_crossover"]))
+
+    assert basket.strategy == "ma_crossover"
+    assert list(precomputed.backtests) == [(4, "1y")]
+    assert 3 not in precomputed.montecarlo
+    assert [k[0] for k in cache._paths] == ["MSFT"]
+
+
+@pytest.mark.asyncio
+async def test_analiza_answers_from_precomputed():
+    from src.bot.handlers.analysis import cmd_analiza
+    precomputed.analyses["SAN.MC"] = Materialized("📊 *Análisis: SAN.MC*", datetime(2026, 3, 2, 22, 5))
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    with patch("src.bot.handlers.analysis._provider") as prov:
+        await cmd_analiza(update, MagicMock(args=["san.mc"]))
+    prov.get_current_price.assert_not_called()
+    assert "calculado a las 22:05" in update.message.reply_text.call_args[0][0]
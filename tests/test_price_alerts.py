@@ -0,0 +1,184 @@
+"""Tests for /avisame price alerts and their in-memory threshold index."""
+import time
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.alerts.engine import AlertEngine
+from src.alerts.price_alerts import PriceAlertEntry, PriceAlertIndex, trigger_price_alerts
+from src.bot.handlers.price_alerts import _parse_avisame_args, cmd_avisame
+
+
+def _e(alert_id, direction, threshold, ticker="SAN.MC", tg_id=100, currency=None):
+    return PriceAlertEntry(alert_id, tg_id, ticker, direction, Decimal(str(threshold)), currency)
+
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+def test_index_fires_every_crossed_threshold_and_keeps_the_rest():
+    index = PriceAlertIndex()
+    index.add(_e(1, "ABOVE", "4.00"))
+    index.add(_e(2, "ABOVE", "4.50"))
+    index.add(_e(3, "BELOW", "3.50"))
+    index.add(_e(4, "BELOW", "3.90"))
+    index.add(_e(5, "ABOVE", "1", ticker="IBE.MC"))
+
+    fired = index.crossed({"SAN.MC": Decimal("4.00")})
+    assert [(e.alert_id, p) for e, p in fired] == [(1, Decimal("4.00"))]
+
+    fired = index.crossed({"SAN.MC": Decimal("3.80")})
+    assert [e.alert_id for e, _ in fired] == [4]
+    assert len(index) == 3 and index.tickers() == {"SAN.MC", "IBE.MC"}
+
+
+def test_remove_and_many_alerts_scan_in_bisect_time():
+    index = PriceAlertIndex()
+    for i in range(20_000):
+        index.add(_e(i, "ABOVE" if i % 2 else "BELOW", 100 + (i % 500) / 10 * (1 if i % 2 else -1)))
+    assert index.remove(1).alert_id == 1 and 1 not in index
+
+    start = time.perf_counter()
+    for _ in range(1_000):
+        assert index.crossed({"SAN.MC": Decimal("100.05")}) == []   # between both ladders
+    assert time.perf_counter() - start < 0.2
+
+
+@pytest.mark.asyncio
+async def test_trigger_price_alerts_bulk_update_in_one_statement():
+    index = PriceAlertIndex()
+    index.add(_e(1, "ABOVE", 4))
+    index.add(_e(2, "ABOVE", 4.1))
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+
+    with patch("src.alerts.price_alerts.scheduler_session_factory", return_value=_wrap(session)):
+        fired = await trigger_price_alerts({"SAN.MC": Decimal("4.2")}, index)
+
+    assert len(fired) == 2 and len(index) == 0
+    session.execute.assert_awaited_once()
+    params = session.execute.call_args.args[1]
+    assert [p["id"] for p in params] == [1, 2]
+    assert all(p["status"] == "TRIGGERED" and p["triggered_price"] == Decimal("4.2") for p in params)
+
+
+@pytest.mark.asyncio
+async def test_trigger_price_alerts_keeps_alerts_indexed_when_the_update_fails():
+    index = PriceAlertIndex()
+    index.add(_e(1, "ABOVE", 4))
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=RuntimeError("db down"))
+
+    with patch("src.alerts.price_alerts.scheduler_session_factory", return_value=_wrap(session)):
+        with pytest.raises(RuntimeError):
+            await trigger_price_alerts({"SAN.MC": Decimal("4.2")}, index)
+
+    assert 1 in index
+    assert [e.alert_id for e, _ in index.crossed({"SAN.MC": Decimal("4.2")})] == [1]
+
+
+@pytest.mark.asyncio
+async def test_scan_reuses_position_quotes_and_batches_the_rest():
+    index = PriceAlertIndex()
+    index.add(_e(1, "ABOVE", 4, ticker="SAN.MC"))
+    index.add(_e(2, "BELOW", 10, ticker="IBE.MC", currency="EUR"))
+    index.add(_e(3, "BELOW", 1, ticker="IBE.MC", currency="EUR"))
+    engine = AlertEngine.__new__(AlertEngine)
+    engine.data = MagicMock()
+    engine.data.get_current_prices.return_value = {"IBE.MC": MagicMock(price=Decimal("9"))}
+    engine.app = MagicMock()
+    engine.app.bot.send_message = AsyncMock()
+    engine._quotes = {"SAN.MC": Decimal("4.1")}     # quoted while scanning positions
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+
+    with patch("src.alerts.engine.price_alert_index", index), \
+         patch("src.alerts.price_alerts.price_alert_index", index), \
+         patch("src.alerts.price_alerts.scheduler_session_factory", return_value=_wrap(session)):
+        await engine._check_price_alerts()
+
+    # the stored currency lets the provider price IBE.MC from the batch download
+    engine.data.get_current_prices.assert_called_once_with(["IBE.MC"], {"IBE.MC": "EUR"})
+    assert engine.app.bot.send_message.await_count == 2
+    assert len(index) == 1
+
+
+def test_parse_avisame_args():
+    assert _parse_avisame_args(["san.mc", ">", "4.00"]) == ("SAN.MC", "ABOVE", Decimal("4.00"))
+    assert _parse_avisame_args(["SAN.MC", "<3,5"]) == ("SAN.MC", "BELOW", Decimal("3.5"))
+    with pytest.raises(ValueError):
+        _parse_avisame_args(["SAN.MC", "=", "4"])
+    with pytest.raises(ValueError):
+        _parse_avisame_args(["SAN.MC", ">", "x"])
+
+
+@pytest.mark.parametrize("price", ["nan", "inf", "Infinity", "-inf"])
+def test_parse_avisame_args_rejects_non_finite_prices(price):
+    with pytest.raises(ValueError, match="Precio inválido"):
+        _parse_avisame_args(["SAN.MC", ">", price])
+
+
+def _exec(value):
+    r = MagicMock()
+    r.scalar_one_or_none.return_value = value
+    return r
+
+
+def _update(tg_id=100):
+    update = MagicMock()
+    update.effective_user.id = tg_id
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+@pytest.mark.asyncio
+async def test_cmd_avisame_stores_and_indexes_alert():
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[_exec(MagicMock(id=1))])
+    session.add = MagicMock()
+    session.commit = AsyncMock()
+
+    async def assign_id(obj):
+        obj.id = 7
+    session.refresh = AsyncMock(side_effect=assign_id)
+    update = _update()
+    ctx = MagicMock()
+    ctx.args = ["SAN.MC", ">", "4"]
+    index = PriceAlertIndex()
+
+    with patch("src.bot.handlers.price_alerts.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.price_alerts._provider") as prov, \
+         patch("src.bot.handlers.price_alerts.price_alert_index", index), \
+         patch("src.bot.handlers.price_alerts.log_command", AsyncMock()):
+        prov.get_current_price.return_value = MagicMock(price=Decimal("3.8"), currency="EUR")
+        await cmd_avisame(update, ctx)
+
+    assert 7 in index
+    assert session.add.call_args.args[0].currency == "EUR"
+    assert index.currencies() == {"SAN.MC": "EUR"}
+    assert "#7 SAN.MC > 4.00" in update.message.reply_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_cmd_avisame_rejects_already_crossed_threshold():
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[_exec(MagicMock(id=1))])
+    session.add = MagicMock()
+    update = _update()
+    ctx = MagicMock()
+    ctx.args = ["SAN.MC", "<", "4"]
+
+    with patch("src.bot.handlers.price_alerts.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.price_alerts._provider") as prov:
+        prov.get_current_price.return_value = MagicMock(price=Decimal("3.8"))
+        await cmd_avisame(update, ctx)
+
+    session.add.assert_not_called()
+    assert "ya cotiza" in update.message.reply_text.call_args.args[0]
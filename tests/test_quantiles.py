@@ -0,0 +1,48 @@
+"""Tests for the mergeable streaming quantile sketch."""
+import pickle
+
+import numpy as np
+import pytest
+
+from src.backtest.quantiles import QuantileSketch
+
+
+def test_small_samples_match_numpy_exactly():
+    x = np.random.default_rng(0).normal(size=60)
+    s = QuantileSketch().update(x)
+    for p in (0, 5, 10, 50, 90, 95, 100):
+        assert s.percentile(p) == pytest.approx(np.percentile(x, p))
+    assert s.mean == pytest.approx(x.mean())
+
+
+def test_large_stream_stays_bounded_and_accurate():
+    x = np.random.default_rng(1).standard_t(4, size=200_000)
+    s = QuantileSketch()
+    for chunk in np.array_split(x, 200):
+        s.update(chunk)
+    assert s.count == len(x)
+    assert s.n_centroids < 300
+    for p in (5, 10, 50, 90, 95):
+        assert s.percentile(p) == pytest.approx(np.percentile(x, p), abs=0.02)
+    var = np.percentile(x, 5)
+    assert s.tail_mean(0.05) == pytest.approx(x[x <= var].mean(), abs=0.02)
+
+
+def test_merged_sketches_equal_single_pass():
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(loc=i, size=20_000) for i in range(4)]
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(pickle.loads(pickle.dumps(QuantileSketch().update(part))))
+    x = np.concatenate(parts)
+    assert merged.count == len(x)
+    assert merged.min == x.min() and merged.max == x.max()
+    for p in (5, 50, 95):
+        assert merged.percentile(p) == pytest.approx(np.percentile(x, p), abs=0.03)
+
+
+def test_empty_and_non_finite():
+    s = QuantileSketch()
+    assert np.isnan(s.quantile(0.5))
+    s.update([np.nan, np.inf, 1.0])
+    assert s.count == 1 and s.quantile(0.5) == 1.0
@@ -0,0 +1,121 @@
+"""Query-plan regression suite for the hot queries.
+
+Seeds a local SQLite database from the models' metadata, runs
+`EXPLAIN QUERY PLAN` on each hot query exactly as the handlers / alert scan
+build it and fails if any step falls back to a full table scan, a skip-scan
+over an index whose leading column is not constrained (`ANY(col)`), or a
+temp B-tree sort for /historial. Add a query here when it lands on a hot path.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from src.db.base import Base
+from src.db.models import Alert, Asset, Basket, BasketMember, Order, Position, User
+
+N_BASKETS, N_USERS, N_ASSETS = 50, 200, 100
+
+
+@pytest.fixture(scope="module")
+def conn():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime(2026, 1, 1)
+    with engine.begin() as c:
+        c.execute(insert(User), [
+            {"id": i, "tg_id": 1000 + i, "username": f"user{i}", "created_at": now}
+            for i in range(1, N_USERS + 1)
+        ])
+        c.execute(insert(Basket), [
+            {"id": i, "name": f"Cesta {i}", "name_normalized": f"cesta {i}", "strategy": "rsi",
+             "cash": Decimal("1000"), "created_at": now}
+            for i in range(1, N_BASKETS + 1)
+        ])
+        c.execute(insert(Asset), [
+            {"id": i, "ticker": f"T{i}", "currency": "USD"} for i in range(1, N_ASSETS + 1)
+        ])
+        c.execute(insert(BasketMember), [
+            {"basket_id": b, "user_id": u, "role": "OWNER" if u % 10 == 0 else "MEMBER"}
+            for b in range(1, N_BASKETS + 1) for u in range(b, N_USERS + 1, 7)
+        ])
+        c.execute(insert(Position), [
+            {"basket_id": b, "asset_id": a, "quantity": Decimal(a % 3), "avg_price": Decimal("10"),
+             "updated_at": now}
+            for b in range(1, N_BASKETS + 1) for a in range(1, N_ASSETS + 1, 3)
+        ])
+        c.execute(insert(Order), [
+            {"basket_id": b, "asset_id": 1 + k % N_ASSETS, "user_id": 1, "type": "BUY",
+             "quantity": Decimal("1"), "price": Decimal("10"), "status": "EXECUTED",
+             "created_at": now + timedelta(minutes=k)}
+            for b in range(1, N_BASKETS + 1) for k in range(60)
+        ])
+        c.execute(insert(Alert), [
+            {"basket_id": b, "asset_id": 1 + k % N_ASSETS, "strategy": "rsi", "signal": "BUY",
+             "price": Decimal("10"), "status": ("PENDING", "EXPIRED", "CONFIRMED")[k % 3],
+             "created_at": now}
+            for b in range(1, N_BASKETS + 1) for k in range(40)
+        ])
+        c.exec_driver_sql("ANALYZE")
+    with engine.connect() as c:
+        yield c
+    engine.dispose()
+
+
+HOT_QUERIES = {
+    # AlertEngine._scan_basket: dedup, once per position per scan
+    "alert_dedup": select(Alert).where(
+        Alert.basket_id == 3, Alert.asset_id == 7, Alert.status == "PENDING",
+    ),
+    # AlertEngine._scan_basket, /valoracion, /liquidarcesta: open positions
+    "open_positions": (
+        select(Position, Asset).join(Asset, Position.asset_id == Asset.id)
+        .where(Position.basket_id == 3, Position.quantity > 0)
+    ),
+    # /historial
+    "historial": (
+        select(Order, Asset).join(Asset, Order.asset_id == Asset.id)
+        .where(Order.basket_id == 3)
+        .order_by(Order.created_at.desc()).limit(10)
+    ),
+    # OWNER checks in admin handlers
+    "owner_check": select(BasketMember).where(
+        BasketMember.user_id == 10, BasketMember.role == "OWNER",
+    ),
+    # /adduser, /removeuser
+    "user_by_username": select(User).where(User.username == "user42"),
+    # every handler
+    "user_by_tg_id": select(User).where(User.tg_id == 1042),
+    "basket_by_name": select(Basket).where(
+        Basket.name_normalized == "cesta 3", Basket.active == True,
+    ),
+}
+
+
+def _plan(conn, stmt) -> list[str]:
+    sql = stmt.compile(conn.engine, compile_kwargs={"literal_binds": True})
+    return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_an_index(conn, name):
+    plan = _plan(conn, HOT_QUERIES[name])
+    full_scans = [step for step in plan if step.startswith("SCAN ") or "ANY(" in step]
+    assert not full_scans, f"{name}: full scan in plan {plan}"
+
+
+def test_historial_reads_in_index_order(conn):
+    plan = _plan(conn, HOT_QUERIES["historial"])
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_indexes_match_migration():
+    from importlib import import_module
+    migration = import_module("src.db.migrations.versions.d0e1f2a3b456_add_hot_query_indexes")
+    declared = {
+        (ix.name, ix.table.name, tuple(c.name for c in ix.columns))
+        for table in Base.metadata.tables.values() for ix in table.indexes
+    }
+    for name, table, columns in migration.INDEXES:
+        assert (name, table, tuple(columns)) in declared
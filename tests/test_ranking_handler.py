@@ -0,0 +1,108 @@
+"""Tests for /ranking: shared-universe multi-basket backtest comparison."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.backtest.engine import PortfolioBacktestResult
+from src.bot.handlers.ranking import _format_ranking, _parse_period, cmd_ranking
+
+
+def _make_update():
+    update = MagicMock()
+    msg = MagicMock()
+    msg.edit_text = AsyncMock()
+    update.message.reply_text = AsyncMock(return_value=msg)
+    return update, msg
+
+
+def _make_context(args):
+    ctx = MagicMock()
+    ctx.args = args
+    return ctx
+
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+def _make_basket(basket_id, name, strategy, stop_loss_pct=None):
+    b = MagicMock(id=basket_id, strategy=strategy, stop_loss_pct=stop_loss_pct)
+    b.name = name
+    return b
+
+
+def _result(total, bench=2.0, sharpe=1.0, dd=5.0):
+    return PortfolioBacktestResult(
+        period="1y", strategy_name="x", total_return_pct=total,
+        annualized_return_pct=total, sharpe_ratio=sharpe, max_drawdown_pct=dd,
+        n_trades=1, benchmark_return_pct=bench, per_asset={},
+    )
+
+
+def _make_session(baskets, rows):
+    baskets_result = MagicMock()
+    baskets_result.scalars.return_value.all.return_value = baskets
+    rows_result = MagicMock()
+    rows_result.all.return_value = rows
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[baskets_result, rows_result])
+    return session
+
+
+def test_parse_period_default_and_invalid():
+    assert _parse_period([]) == "1y"
+    assert _parse_period(["6MO"]) == "6mo"
+    assert _parse_period(["5y"]) is None
+
+
+def test_format_ranking_sorts_by_return():
+    text = _format_ranking(
+        "1y",
+        [("Modelo RSI", "rsi", _result(3.0)), ("Modelo MA Crossover", "ma_crossover", _result(9.0))],
+        failed=["Modelo Rota"],
+        n_tickers=6,
+    )
+    assert text.index("Modelo MA") < text.index("Modelo RSI")
+    assert "+7.0%" in text            # alpha of the winner
+    assert "Modelo Rota" in text
+
+
+@pytest.mark.asyncio
+async def test_ranking_downloads_union_once_and_runs_every_basket():
+    update, msg = _make_update()
+    baskets = [
+        _make_basket(1, "Modelo RSI", "rsi", stop_loss_pct=10),
+        _make_basket(2, "Modelo Bollinger", "bollinger"),
+        _make_basket(3, "Mi Apuesta", "rsi"),        # no BasketAsset rows → skipped
+    ]
+    rows = [(1, "AAPL"), (1, "MSFT"), (2, "AAPL"), (2, "GLD")]
+    session = _make_session(baskets, rows)
+    shared = {"AAPL": MagicMock(), "MSFT": MagicMock(), "GLD": MagicMock()}
+
+    with (
+        patch("src.bot.handlers.ranking.async_session_factory", return_value=_wrap(session)),
+        patch("src.bot.handlers.ranking.BacktestEngine") as MockEngine,
+    ):
+        MockEngine.return_value.fetch_data.return_value = shared
+        MockEngine.return_value.run.side_effect = [_result(4.0), _result(6.0)]
+        await cmd_ranking(update, _make_context([]))
+
+    engine = MockEngine.return_value
+    engine.fetch_data.assert_called_once_with(["AAPL", "MSFT", "GLD"], "1y")
+    assert engine.run.call_count == 2
+    for call in engine.run.call_args_list:
+        assert call[0][-1] is shared, "every run must reuse the shared universe"
+    assert engine.run.call_args_list[0][0][4] == 10.0   # stop_loss_pct forwarded
+
+    text = msg.edit_text.call_args[0][0]
+    assert text.index("Modelo Bollinger") < text.index("Modelo RSI")
+    assert "Mi Apuesta" not in text
+
+
+@pytest.mark.asyncio
+async def test_ranking_invalid_period():
+    update, _ = _make_update()
+    await cmd_ranking(update, _make_context(["10y"]))
+    assert "no válido" in update.message.reply_text.call_args[0][0]
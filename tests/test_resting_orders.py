@@ -0,0 +1,225 @@
+"""Tests for resting limit / stop orders: trigger book, fills and /orden."""
+import time
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.bot.handlers.resting_orders import _parse_orden_args, cmd_cancelaorden, cmd_orden
+from src.db.models import RestingOrder
+from src.orders.trigger_book import Trigger, TriggerBook
+from src.scheduler.resting_orders import scan_book, trigger_for
+
+
+def _t(order_id, side, kind, level, limit=None, ticker="AAPL", basket_id=1):
+    return Trigger(order_id, basket_id, ticker, side, kind, Decimal(str(level)),
+                   Decimal(str(limit)) if limit is not None else None)
+
+
+def test_limit_and_stop_fire_on_the_right_side():
+    book = TriggerBook()
+    book.add(_t(1, "BUY", "LIMIT", 100))     # buy if ≤ 100
+    book.add(_t(2, "SELL", "STOP", 95))      # sell if ≤ 95
+    book.add(_t(3, "SELL", "LIMIT", 120))    # sell if ≥ 120
+    book.add(_t(4, "BUY", "STOP", 115))      # buy if ≥ 115
+
+    assert book.crossed("AAPL", Decimal("105")) == []
+    assert [t.order_id for t in book.crossed("AAPL", Decimal("100"))] == [1]
+    assert [t.order_id for t in book.crossed("AAPL", Decimal("90"))] == [2]
+    assert [t.order_id for t in book.crossed("AAPL", Decimal("125"))] == [3, 4]
+    assert len(book) == 0
+
+
+def test_crossed_only_touches_its_ticker_and_remove_works():
+    book = TriggerBook()
+    book.add(_t(1, "BUY", "LIMIT", 100, ticker="AAPL"))
+    book.add(_t(2, "BUY", "LIMIT", 100, ticker="MSFT"))
+    book.add(_t(3, "BUY", "LIMIT", 100, ticker="AAPL"))
+    assert book.remove(3).order_id == 3
+    assert [t.order_id for t in book.crossed("AAPL", Decimal("50"))] == [1]
+    assert 2 in book and 3 not in book
+
+
+def test_stop_limit_arms_into_limit():
+    stop_limit = _t(1, "SELL", "STOP_LIMIT", 95, limit=93)
+    armed = stop_limit.armed()
+    assert armed.kind == "LIMIT" and armed.level == Decimal("93") and not armed.fires_below
+
+
+def test_thousands_of_orders_scan_only_crossed_range():
+    book = TriggerBook()
+    for i in range(20_000):
+        book.add(_t(i, "BUY", "LIMIT", 50 + (i % 1000) / 10))   # levels 50.0 … 149.9
+    start = time.perf_counter()
+    for _ in range(1_000):
+        assert book.crossed("AAPL", Decimal("150")) == []
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.1                        # ~µs per quote, independent of book size
+
+    fired = book.crossed("AAPL", Decimal("149.9"))
+    assert len(fired) == 20 and len(book) == 19_980
+
+
+def test_trigger_for_uses_phase_of_row():
+    asset = MagicMock(ticker="SAN.MC", currency="EUR", market="BME")
+    row = RestingOrder(id=7, basket_id=1, side="BUY", kind="STOP_LIMIT",
+                       stop_price=Decimal("4"), limit_price=Decimal("4.1"), status="OPEN")
+    assert trigger_for(row, asset).level == Decimal("4")
+    row.status = "ARMED"
+    armed = trigger_for(row, asset)
+    assert armed.kind == "LIMIT" and armed.level == Decimal("4.1")
+
+
+@pytest.mark.asyncio
+async def test_scan_book_arms_stop_limit_then_fills_it_in_same_scan():
+    book = TriggerBook()
+    book.add(_t(1, "SELL", "STOP_LIMIT", 95, limit=93))
+    calls = []
+
+    async def fake_fill(trigger, price, book_):
+        calls.append((trigger.kind, price))
+        if trigger.kind == "STOP_LIMIT":
+            book_.add(trigger.armed())
+            return "ARMED"
+        return "FILLED"
+
+    with patch("src.scheduler.resting_orders._fill", side_effect=fake_fill):
+        results = await scan_book({"AAPL": Decimal("94")}, book)
+    # stop at 95 fires; the armed sell limit at 93 is marketable at 94
+    assert calls == [("STOP_LIMIT", Decimal("94")), ("LIMIT", Decimal("94"))]
+    assert results == {1: "FILLED"} and len(book) == 0
+
+
+@pytest.mark.asyncio
+async def test_scan_book_keeps_order_on_unexpected_error():
+    book = TriggerBook()
+    book.add(_t(1, "BUY", "LIMIT", 100))
+    with patch("src.scheduler.resting_orders._fill", AsyncMock(side_effect=RuntimeError("db"))):
+        results = await scan_book({"AAPL": Decimal("99")}, book)
+    assert results == {1: "ERROR"} and 1 in book
+
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+@pytest.mark.asyncio
+async def test_fill_executes_through_executor_and_marks_row():
+    from src.scheduler.resting_orders import _fill
+
+    row = RestingOrder(id=1, basket_id=1, asset_id=2, user_id=3, side="BUY", kind="LIMIT",
+                       quantity=Decimal("10"), limit_price=Decimal("100"), status="OPEN")
+    session = MagicMock()
+    session.get = AsyncMock(return_value=row)
+    session.commit = AsyncMock()
+    executor = MagicMock()
+    executor.buy = AsyncMock(return_value=MagicMock(id=42))
+
+    with patch("src.scheduler.resting_orders.scheduler_session_factory", return_value=_wrap(session)), \
+         patch("src.scheduler.resting_orders._executor", executor):
+        status = await _fill(_t(1, "BUY", "LIMIT", 100), Decimal("99"), TriggerBook())
+
+    assert status == "FILLED"
+    executor.buy.assert_awaited_once()
+    assert executor.buy.call_args.args[5:7] == (Decimal("10"), Decimal("99"))
+    assert row.status == "FILLED" and row.order_id == 42
+
+
+@pytest.mark.asyncio
+async def test_fill_rejects_when_executor_refuses_and_skips_cancelled():
+    from src.scheduler.resting_orders import _fill
+
+    row = RestingOrder(id=1, basket_id=1, asset_id=2, user_id=3, side="BUY", kind="LIMIT",
+                       quantity=Decimal("10"), limit_price=Decimal("100"), status="OPEN")
+    session = MagicMock()
+    session.get = AsyncMock(return_value=row)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    executor = MagicMock()
+    executor.buy = AsyncMock(side_effect=ValueError("Insufficient cash"))
+
+    with patch("src.scheduler.resting_orders.scheduler_session_factory", return_value=_wrap(session)), \
+         patch("src.scheduler.resting_orders._executor", executor):
+        assert await _fill(_t(1, "BUY", "LIMIT", 100), Decimal("99"), TriggerBook()) == "REJECTED"
+        assert row.reason == "Insufficient cash"
+
+        row.status = "CANCELLED"
+        executor.buy.reset_mock()
+        assert await _fill(_t(1, "BUY", "LIMIT", 100), Decimal("99"), TriggerBook()) == "CANCELLED"
+        executor.buy.assert_not_called()
+
+
+def test_parse_orden_args():
+    assert _parse_orden_args(["vende", "aapl", "10", "stop", "180"]) == (
+        "SELL", "AAPL", Decimal("10"), "STOP", Decimal("180"), None, None,
+    )
+    assert _parse_orden_args(["compra", "SAN.MC", "5", "stoplimit", "4", "4.1", "@Mi", "Cesta"]) == (
+        "BUY", "SAN.MC", Decimal("5"), "STOP_LIMIT", Decimal("4"), Decimal("4.1"), "Mi Cesta",
+    )
+    with pytest.raises(ValueError):
+        _parse_orden_args(["compra", "AAPL", "5", "limite"])
+    with pytest.raises(ValueError):
+        _parse_orden_args(["compra", "AAPL", "-5", "limite", "100"])
+
+
+def _exec(value):
+    r = MagicMock()
+    r.scalar_one_or_none.return_value = value
+    return r
+
+
+@pytest.mark.asyncio
+async def test_cmd_orden_stores_row_and_adds_to_book():
+    caller = MagicMock(id=1, active_basket_id=10)
+    basket = MagicMock(id=10)
+    basket.name = "Cesta"
+    asset = MagicMock(id=5, ticker="AAPL", currency="USD", market="NYSE")
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[_exec(caller), _exec(basket), _exec(asset)])
+    session.commit = AsyncMock()
+    session.add = MagicMock()
+
+    async def assign_id(obj):
+        obj.id = 99
+    session.refresh = AsyncMock(side_effect=assign_id)
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["compra", "AAPL", "10", "limite", "150"]
+    book = TriggerBook()
+
+    with patch("src.bot.handlers.resting_orders.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.resting_orders.trigger_book", book), \
+         patch("src.bot.handlers.resting_orders.log_command", AsyncMock()):
+        await cmd_orden(update, ctx)
+
+    row = session.add.call_args.args[0]
+    assert (row.side, row.kind, row.limit_price, row.stop_price) == ("BUY", "LIMIT", Decimal("150"), None)
+    assert 99 in book
+    assert "#99 Compra límite 10 AAPL" in update.message.reply_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_cmd_cancelaorden_removes_from_book():
+    caller = MagicMock(id=1)
+    row = RestingOrder(id=99, basket_id=10, user_id=1, status="OPEN")
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[_exec(caller)])
+    session.get = AsyncMock(return_value=row)
+    session.commit = AsyncMock()
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["99"]
+    book = TriggerBook()
+    book.add(_t(99, "BUY", "LIMIT", 100))
+
+    with patch("src.bot.handlers.resting_orders.async_session_factory", return_value=_wrap(session)), \
+         patch("src.bot.handlers.resting_orders.trigger_book", book), \
+         patch("src.bot.handlers.resting_orders.log_command", AsyncMock()):
+        await cmd_cancelaorden(update, ctx)
+
+    assert row.status == "CANCELLED" and 99 not in book
@@ -0,0 +1,136 @@
+"""End-to-end checks for the embedded SQLite backend.
+
+Runs every Alembic migration on a temporary SQLite file, then drives real
+handlers (no mocked sessions) through an aiosqlite engine built by
+`make_engine`, the same way the bot does when SQLITE_PATH is set.
+"""
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import settings
+from src.data.models import Price
+from src.db.base import make_engine
+from src.db.models import Basket, Order, Position, PriceAlert
+
+TG_ID = 5001   # owner of basket 1 in the `sqlite_db` fixture (conftest.py)
+
+
+def _update():
+    update = MagicMock()
+    update.effective_user.id = TG_ID
+    update.effective_user.username = "ana"
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+def _ctx(*args):
+    ctx = MagicMock()
+    ctx.args = list(args)
+    return ctx
+
+
+def test_migrations_reach_head_on_sqlite(sqlite_db):
+    sync = create_engine(f"sqlite:///{sqlite_db}")
+    with sync.connect() as c:
+        tables = {r[0] for r in c.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+        # the unique on baskets.name was dropped: a soft-deleted name can be reused
+        c.execute(insert(Basket), [
+            {"name": "Mi Cesta", "name_normalized": "mi cesta#1", "strategy": "rsi", "cash": 0},
+        ])
+    sync.dispose()
+    assert {"users", "baskets", "orders", "tax_lots", "resting_orders", "price_alerts"} <= tables
+
+
+def test_migrations_downgrade_to_base_and_back_on_sqlite(sqlite_db):
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config()
+    cfg.set_main_option("script_location", "src/db/migrations")
+    command.downgrade(cfg, "base")
+    command.upgrade(cfg, "head")
+
+    sync = create_engine(f"sqlite:///{sqlite_db}")
+    with sync.connect() as c:
+        fks = c.execute(text("PRAGMA foreign_key_list(users)")).all()
+    sync.dispose()
+    assert [(fk[2], fk[3]) for fk in fks] == [("baskets", "active_basket_id")]
+
+
+@pytest.mark.asyncio
+async def test_engine_applies_pragmas(sqlite_db):
+    engine = make_engine(settings.database_url)
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA foreign_keys"))).scalar() == 1
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_order_handlers_run_on_sqlite(sqlite_db):
+    from src.bot.handlers.baskets import cmd_sel
+    from src.bot.handlers.orders import cmd_compra, cmd_vende
+    from src.bot.handlers.price_alerts import cmd_avisame
+
+    engine = make_engine(settings.database_url)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    provider = MagicMock()
+    provider.get_current_price.return_value = Price("SAN.MC", Decimal("4.00"), "EUR")
+    provider.get_ticker_info.return_value = {"name": "Santander", "market": "BME"}
+
+    with patch("src.bot.handlers.baskets.async_session_factory", factory), \
+         patch("src.bot.handlers.orders.async_session_factory", factory), \
+         patch("src.bot.handlers.price_alerts.async_session_factory", factory), \
+         patch("src.bot.handlers.orders._provider", provider), \
+         patch("src.bot.handlers.price_alerts._provider", provider), \
+         patch("src.bot.handlers.price_alerts.price_alert_index"):
+        await cmd_sel(_update(), _ctx("mi", "cesta"))
+        await cmd_compra(_update(), _ctx("SAN.MC", "100"))
+        await cmd_vende(_update(), _ctx("SAN.MC", "40"))
+        await cmd_avisame(_update(), _ctx("SAN.MC", ">", "5"))
+
+    async with factory() as session:
+        basket = await session.get(Basket, 1)
+        position = (await session.execute(select(Position))).scalar_one()
+        orders = (await session.execute(select(Order).order_by(Order.id))).scalars().all()
+        alert = (await session.execute(select(PriceAlert))).scalar_one()
+    await engine.dispose()
+
+    assert basket.cash == Decimal("760.00")            # 1000 − 400 + 160
+    assert position.quantity == Decimal("60")
+    assert [o.type for o in orders] == ["BUY", "SELL"]
+    assert alert.direction == "ABOVE" and alert.threshold == Decimal("5")
+
+
+@pytest.mark.asyncio
+async def test_sell_inside_open_transaction_sees_other_sessions_sale(sqlite_db):
+    """A session that already read the position (transaction open, row in its
+    identity map) must not sell from that copy once another session sold."""
+    from src.db.models import Asset
+    from src.orders.paper import PaperTradingExecutor
+
+    engine = make_engine(settings.database_url)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    executor = PaperTradingExecutor()
+    async with factory() as session:
+        session.add(Asset(id=1, ticker="SAN.MC", name="Santander", market="BME", currency="EUR"))
+        await session.commit()
+        await executor.buy(session, 1, 1, 1, "SAN.MC", Decimal("100"), Decimal("4"))
+
+    async with factory() as first, factory() as second:
+        stale = (await first.execute(select(Position))).scalar_one()      # as the handler does
+        await executor.sell(second, 1, 1, 1, "SAN.MC", Decimal("40"), Decimal("4"))
+        await executor.sell(first, 1, 1, 1, "SAN.MC", Decimal("60"), Decimal("4"))
+        with pytest.raises(ValueError, match="Insufficient position"):
+            await executor.sell(first, 1, 1, 1, "SAN.MC", Decimal("1"), Decimal("4"))
+        assert stale.quantity == Decimal("0")
+
+    async with factory() as session:
+        basket = await session.get(Basket, 1)
+    await engine.dispose()
+    assert basket.cash == Decimal("1000")
@@ -0,0 +1,230 @@
+"""Tests for the FIFO tax-lot ledger and /fiscal."""
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.bot.handlers.fiscal import _parse_args, cmd_fiscal
+from src.db.models import TaxLot
+from src.orders.paper import PaperTradingExecutor
+from src.portfolio.tax_lots import close_lots_fifo, match_fifo, savings_tax, wash_sale_flags
+
+
+def _lot(lot_id, qty, price, acquired=datetime(2024, 1, 1)):
+    return TaxLot(
+        id=lot_id, basket_id=1, asset_id=1, acquired_at=acquired,
+        quantity=Decimal(qty), remaining=Decimal(qty), price=Decimal(price),
+    )
+
+
+def _lots_session(lots):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = lots
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.add = MagicMock()
+    return session
+
+
+def test_match_fifo_consumes_oldest_first_and_reports_uncovered():
+    a, b = _lot(1, "10", "3.2"), _lot(2, "10", "3.8")
+    fills = match_fifo([a, b], Decimal("15"))
+    assert [(f.lot, f.quantity) for f in fills] == [(a, Decimal("10")), (b, Decimal("5"))]
+
+    fills = match_fifo([a], Decimal("12"))
+    assert fills[-1].lot is None and fills[-1].quantity == Decimal("2")
+
+
+@pytest.mark.asyncio
+async def test_close_lots_fifo_matches_docs_example():
+    # docs §4.2: 10 @ 3.20 (2022), 10 @ 3.80 (2023), sell 10 @ 4.50 → gain 13
+    old = _lot(1, "10", "3.20", datetime(2022, 1, 10))
+    new = _lot(2, "10", "3.80", datetime(2023, 3, 10))
+    session = _lots_session([old, new])
+    sold_at = datetime(2024, 6, 10)
+
+    gains = await close_lots_fifo(
+        session, 1, 1, Decimal("10"), Decimal("4.50"), sold_at, fallback_cost=Decimal("3.50"),
+    )
+
+    assert len(gains) == 1
+    assert gains[0].gain == Decimal("13.00")
+    assert gains[0].lot is old and gains[0].acquired_at == datetime(2022, 1, 10)
+    assert old.remaining == 0 and old.closed_at == sold_at
+    assert new.remaining == Decimal("10") and new.closed_at is None
+    session.execute.assert_awaited_once()    # one indexed query for open lots
+
+
+@pytest.mark.asyncio
+async def test_close_lots_fifo_uses_avg_price_for_pre_ledger_quantity():
+    session = _lots_session([])
+    gains = await close_lots_fifo(
+        session, 1, 1, Decimal("4"), Decimal("12"), datetime(2025, 1, 1), fallback_cost=Decimal("10"),
+    )
+    assert gains[0].lot is None
+    assert gains[0].cost == Decimal("40") and gains[0].gain == Decimal("8")
+
+
+@pytest.mark.asyncio
+async def test_executor_buy_opens_lot_and_sell_records_gain():
+    executor = PaperTradingExecutor()
+    basket = MagicMock(cash=Decimal("1000"), id=1)
+    pos_result = MagicMock()
+    pos_result.scalar_one_or_none.return_value = None
+    session = MagicMock()
+    session.get = AsyncMock(return_value=basket)
+    session.execute = AsyncMock(return_value=pos_result)
+    session.commit = AsyncMock()
+    session.refresh = AsyncMock()
+    session.add = MagicMock()
+
+    order = await executor.buy(session, 1, 1, 1, "SAN.MC", Decimal("10"), Decimal("4"))
+    lots = [c.args[0] for c in session.add.call_args_list if isinstance(c.args[0], TaxLot)]
+    assert len(lots) == 1
+    assert lots[0].remaining == Decimal("10") and lots[0].buy_order is order
+
+    position = MagicMock(quantity=Decimal("10"), avg_price=Decimal("4"))
+    pos_result.scalar_one_or_none.return_value = position
+    lots_result = MagicMock()
+    lots_result.scalars.return_value.all.return_value = lots
+    session.execute = AsyncMock(side_effect=[pos_result, lots_result])
+    session.add_all = MagicMock()
+
+    await executor.sell(session, 1, 1, 1, "SAN.MC", Decimal("6"), Decimal("5"))
+    gains = [g for c in session.add_all.call_args_list for g in c.args[0]]
+    assert [g.gain for g in gains] == [Decimal("6")]
+    assert lots[0].remaining == Decimal("4")
+
+
+def test_backfill_values_pre_ledger_quantity_at_avg_price(sqlite_db):
+    """The migration's replay uses the same fallback as `realize_fifo`."""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine, text
+
+    cfg = Config()
+    cfg.set_main_option("script_location", "src/db/migrations")
+    command.downgrade(cfg, "f6a7b8c9d012")
+    sync = create_engine(f"sqlite:///{sqlite_db}")
+    with sync.begin() as c:
+        c.execute(text("INSERT INTO assets (id, ticker, name, market, currency) "
+                       "VALUES (1, 'SAN.MC', 'Santander', 'BME', 'EUR')"))
+        c.execute(text("INSERT INTO positions (basket_id, asset_id, quantity, avg_price, updated_at) "
+                       "VALUES (1, 1, 2, 8, '2025-02-03 10:00:00')"))
+        c.execute(text(
+            "INSERT INTO orders (basket_id, asset_id, user_id, type, quantity, price, status, created_at) VALUES "
+            "(1, 1, 1, 'BUY', 5, 10, 'EXECUTED', '2025-01-02 10:00:00'), "
+            "(1, 1, 1, 'SELL', 8, 12, 'EXECUTED', '2025-02-03 10:00:00')"
+        ))
+    command.upgrade(cfg, "a7b8c9d0e123")
+    with sync.connect() as c:
+        gains = c.execute(text(
+            "SELECT lot_id IS NULL, quantity, cost, gain FROM realized_gains ORDER BY id"
+        )).all()
+    sync.dispose()
+
+    assert [(bool(g[0]), Decimal(str(g[1])), Decimal(str(g[2]))) for g in gains] == [
+        (False, Decimal("5"), Decimal("50")),        # the replayed lot
+        (True, Decimal("3"), Decimal("24")),         # uncovered: 3 × avg_price 8, not 0
+    ]
+
+
+def test_savings_tax_brackets_match_docs():
+    assert savings_tax(Decimal("5000")) == Decimal("950.00")
+    assert savings_tax(Decimal("60000")) == Decimal("12680.00")
+    assert savings_tax(Decimal("-100")) == 0
+
+
+def test_wash_sale_flags_repurchase_within_two_months():
+    sold = datetime(2025, 5, 1)
+    losses = [(1, 10, sold), (2, 20, sold)]
+    lots = [
+        (10, 1, datetime(2025, 1, 1), sold),     # the lot sold itself
+        (11, 1, datetime(2025, 6, 15), None),    # bought back 6 weeks later → flagged
+        (21, 2, datetime(2025, 4, 20), sold),    # emptied by the same sale → not a repurchase
+        (22, 2, datetime(2025, 8, 1), None),     # outside the window
+    ]
+    assert wash_sale_flags(losses, lots) == {0}
+
+
+def test_parse_args_year_optional():
+    assert _parse_args(["Mi", "Cesta", "2024"]) == ("Mi Cesta", 2024)
+    assert _parse_args(["Cesta"])[1] == datetime.now().year
+
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+@pytest.mark.asyncio
+async def test_cmd_fiscal_report_from_indexed_queries():
+    basket = MagicMock(id=1)
+    basket.name = "Cesta"
+    basket_result = MagicMock()
+    basket_result.scalar_one_or_none.return_value = basket
+    per_asset = MagicMock()
+    per_asset.all.return_value = [
+        MagicMock(ticker="SAN.MC", currency="EUR", n=2, quantity=Decimal("20"), gain=Decimal("500")),
+        MagicMock(ticker="IBE.MC", currency="EUR", n=1, quantity=Decimal("5"), gain=Decimal("-100")),
+    ]
+    losses = MagicMock()
+    losses.all.return_value = [
+        MagicMock(asset_id=2, lot_id=7, sold_at=datetime(2025, 3, 1), gain=Decimal("-100"), currency="EUR"),
+    ]
+    lots = MagicMock()
+    lots.all.return_value = [(8, 2, datetime(2025, 3, 20), None)]
+    open_lots = MagicMock()
+    open_lots.all.return_value = [
+        MagicMock(ticker="IBE.MC", currency="EUR", acquired_at=datetime(2025, 3, 20),
+                  remaining=Decimal("5"), price=Decimal("10")),
+        MagicMock(ticker="TEF.MC", currency="EUR", acquired_at=datetime(2025, 6, 2),
+                  remaining=Decimal("1"), price=Decimal("4")),
+    ]
+    snapshot = MagicMock()
+    snapshot.first.return_value = MagicMock(
+        taken_at=datetime(2025, 12, 30, 17, 0), positions=[{"ticker": "IBE.MC", "price": 12.5}],
+    )
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_result, per_asset, losses, lots, open_lots, snapshot])
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["Cesta", "2025"]
+
+    with patch("src.bot.handlers.fiscal.async_session_factory", return_value=_wrap(session)):
+        await cmd_fiscal(update, ctx)
+
+    text = update.message.reply_text.call_args.args[0]
+    assert "Fiscal `Cesta` — 2025" in text
+    assert "+400.00€" in text                       # net of gains and losses
+    assert "norma antiaplicación" in text
+    # the deferred loss is excluded from the indicative tax: 500 × 19%
+    assert "95.00€" in text
+    assert "Lotes abiertos* (2) — latente a 30/12 17:00" in text
+    assert "IBE.MC   20/03/2025 · 5.00 u @ 10.00 → +12.50€" in text    # (12.5 − 10) × 5
+    assert "TEF.MC   02/06/2025 · 1.00 u @ 4.00 · sin cotización" in text
+
+
+@pytest.mark.asyncio
+async def test_cmd_fiscal_no_sales():
+    basket = MagicMock(id=1)
+    basket.name = "Cesta"
+    basket_result = MagicMock()
+    basket_result.scalar_one_or_none.return_value = basket
+    empty = MagicMock()
+    empty.all.return_value = []
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_result, empty])
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["Cesta", "2020"]
+
+    with patch("src.bot.handlers.fiscal.async_session_factory", return_value=_wrap(session)):
+        await cmd_fiscal(update, ctx)
+
+    assert "sin ventas en 2020" in update.message.reply_text.call_args.args[0]
@@ -0,0 +1,182 @@
+"""Tests for periodic valuation snapshots and the /rendimiento command."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.bot.handlers.rendimiento import (
+    _max_drawdown_pct, _parse_args, _sparkline, cmd_rendimiento, format_rendimiento,
+)
+from src.data.models import Price, PriceSnapshot
+from src.portfolio.models import BasketValuation, PositionView
+from src.scheduler.valuation import run_valuation_snapshots
+
+
+def _wrap(session):
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=session)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+def _make_basket(basket_id, name):
+    b = MagicMock(id=basket_id)
+    b.name = name
+    return b
+
+
+def _valuation(basket_id):
+    pos = PositionView(
+        ticker="AAPL", quantity=Decimal("2"), avg_price=Decimal("90"),
+        current_price=Decimal("100"), currency="USD", market_value=Decimal("180"),
+        cost_basis=Decimal("162"), pnl=Decimal("18"), pnl_pct=Decimal("11.1"),
+    )
+    return BasketValuation(
+        basket_id=basket_id, basket_name="x", positions=[pos], cash=Decimal("820"),
+        total_invested=Decimal("162"), total_value=Decimal("1000"),
+        total_pnl=Decimal("18"), total_pnl_pct=Decimal("11.1"),
+    )
+
+
+def _no_orders():
+    r = MagicMock()
+    r.all.return_value = []
+    return r
+
+
+def _job_session(baskets, held):
+    baskets_result = MagicMock()
+    baskets_result.scalars.return_value.all.return_value = baskets
+    held_result = MagicMock()
+    held_result.all.return_value = held
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[baskets_result, held_result, MagicMock()])
+    session.commit = AsyncMock()
+    return session
+
+
+# ---------------------------------------------------------------------------
+# Scheduler job
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_job_prices_once_and_bulk_inserts_one_row_per_basket():
+    baskets = [_make_basket(1, "A"), _make_basket(2, "B")]
+    session = _job_session(baskets, [(1, "AAPL", "USD"), (2, "AAPL", "USD")])
+    snap = PriceSnapshot(
+        prices={"AAPL": Price(ticker="AAPL", price=Decimal("100"), currency="USD")},
+        fx={"USD": Decimal("0.9")},
+    )
+    engine = MagicMock()
+    engine.snapshot = MagicMock(return_value=snap)
+    engine.get_valuation = AsyncMock(side_effect=lambda s, bid, snapshot: _valuation(bid))
+
+    with patch("src.scheduler.valuation.scheduler_session_factory", return_value=_wrap(session)):
+        n = await run_valuation_snapshots(engine, market_hours_only=False)
+
+    assert n == 2
+    engine.snapshot.assert_called_once_with({"AAPL": "USD"})
+    assert session.execute.await_count == 3            # baskets, holdings, one INSERT
+    rows = session.execute.call_args_list[-1].args[1]
+    assert [r["basket_id"] for r in rows] == [1, 2]
+    assert rows[0]["taken_at"] == rows[1]["taken_at"]
+    assert rows[0]["total_value"] == Decimal("1000")
+    assert rows[0]["positions"][0] == {
+        "ticker": "AAPL", "quantity": 2.0, "price": 100.0, "currency": "USD", "value_eur": 180.0,
+    }
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_job_skips_basket_with_unpriced_holding():
+    baskets = [_make_basket(1, "A"), _make_basket(2, "B")]
+    session = _job_session(baskets, [(1, "AAPL", "USD"), (2, "GONE", "EUR")])
+    snap = PriceSnapshot(
+        prices={"AAPL": Price(ticker="AAPL", price=Decimal("100"), currency="USD")},
+        fx={"USD": Decimal("0.9")},
+    )
+    engine = MagicMock()
+    engine.snapshot = MagicMock(return_value=snap)
+    engine.get_valuation = AsyncMock(side_effect=lambda s, bid, snapshot: _valuation(bid))
+
+    with patch("src.scheduler.valuation.scheduler_session_factory", return_value=_wrap(session)):
+        n = await run_valuation_snapshots(engine, market_hours_only=False)
+
+    assert n == 1
+    assert [r["basket_id"] for r in session.execute.call_args_list[-1].args[1]] == [1]
+
+
+@pytest.mark.asyncio
+async def test_job_does_nothing_while_markets_closed():
+    engine = MagicMock()
+    with patch("src.scheduler.valuation.any_market_open", return_value=False), \
+         patch("src.scheduler.valuation.scheduler_session_factory") as factory:
+        assert await run_valuation_snapshots(engine) == 0
+    factory.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# /rendimiento
+# ---------------------------------------------------------------------------
+
+def test_parse_args_period_is_optional_last_token():
+    assert _parse_args([]) == (None, "1mo")
+    assert _parse_args(["Mi", "Cesta", "3MO"]) == ("Mi Cesta", "3mo")
+    assert _parse_args(["Agresiva"]) == ("Agresiva", "1mo")
+
+
+def test_sparkline_and_drawdown():
+    assert _sparkline([1, 2, 3]) == "▁▅█"
+    assert len(_sparkline(list(range(100)))) == 30
+    assert _sparkline([5, 5]) == "▅▅"
+    assert _max_drawdown_pct([100, 120, 90, 130]) == pytest.approx(25.0)
+
+
+def test_format_rendimiento_summary():
+    t0 = datetime(2026, 1, 1, 10, 0)
+    text = format_rendimiento("Cesta", "1mo", [(t0, 1000.0), (t0 + timedelta(days=1), 1100.0)])
+    assert "+100.00€ (+10.00%)" in text
+    assert "2 registros" in text
+
+
+@pytest.mark.asyncio
+async def test_cmd_rendimiento_reads_table_only():
+    basket = _make_basket(1, "Cesta")
+    basket_result = MagicMock()
+    basket_result.scalar_one_or_none.return_value = basket
+    t0 = datetime.now() - timedelta(days=2)
+    rows_result = MagicMock()
+    rows_result.all.return_value = [(t0, Decimal("1000")), (t0 + timedelta(days=1), Decimal("950"))]
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_result, rows_result, _no_orders()])
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["Cesta", "1w"]
+
+    with patch("src.bot.handlers.rendimiento.async_session_factory", return_value=_wrap(session)):
+        await cmd_rendimiento(update, ctx)
+
+    text = update.message.reply_text.call_args.args[0]
+    assert "Rendimiento `Cesta` — 1w" in text
+    assert "-50.00€ (-5.00%)" in text
+
+
+@pytest.mark.asyncio
+async def test_cmd_rendimiento_without_history():
+    basket_result = MagicMock()
+    basket_result.scalar_one_or_none.return_value = _make_basket(1, "Cesta")
+    rows_result = MagicMock()
+    rows_result.all.return_value = []
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[basket_result, rows_result, _no_orders()])
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    ctx = MagicMock()
+    ctx.args = ["Cesta"]
+
+    with patch("src.bot.handlers.rendimiento.async_session_factory", return_value=_wrap(session)):
+        await cmd_rendimiento(update, ctx)
+
+    assert "aún no hay suficiente histórico" in update.message.reply_text.call_args.args[0]